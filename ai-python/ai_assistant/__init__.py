@@ -9,4 +9,23 @@ __all__ = [
     "bridge",
     "pipeline",
     "openai_client",
+    "segmenter",
+    "deadline",
+    "events",
+    "transport",
+    "standin",
+    "app_index",
+    "bridge_async",
+    "capture",
+    "cache",
+    "heartbeat",
+    "loadtest",
+    "audio",
+    "vad",
+    "local_whisper",
+    "incremental",
+    "chunking",
+    "endpointing",
+    "wake_gate",
+    "keyword_spotting",
 ]
@@ -0,0 +1,255 @@
+"""In-memory index of the application registry used to resolve app names locally."""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from . import prompts
+from .schemas import Command
+
+logger = logging.getLogger(__name__)
+
+# Actions whose ``application`` parameter is looked up in the core registry.
+RESOLVED_ACTIONS = ("open_app", "capture_window")
+
+# How often to look for a registry file again when none was found.
+REDISCOVER_INTERVAL_SECONDS = 30.0
+
+_TRANSLITERATION = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e",
+    "ж": "zh", "з": "z", "и": "i", "й": "i", "к": "k", "л": "l", "м": "m",
+    "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u",
+    "ф": "f", "х": "h", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "sch", "ъ": "",
+    "ы": "y", "ь": "", "э": "e", "ю": "yu", "я": "ya",
+}  # fmt: skip
+
+
+@dataclass(frozen=True)
+class AppMatch:
+    """Registry entry found for a spoken or LLM-produced application name."""
+
+    name: str
+    method: str
+    distance: int = 0
+
+
+class ApplicationIndex:
+    """Resolve application names against ``applications.json`` without the core.
+
+    Names and aliases are indexed case-folded and transliterated to Latin, so
+    "Телеграм", "telegram" and "TELEGRAM" land on the same entry. Names that
+    still do not match are compared by edit distance; a unique closest entry
+    within ``max_distance`` edits wins. The file is found through
+    :func:`prompts._candidate_registry_paths` and reloaded whenever its mtime
+    changes.
+    """
+
+    def __init__(
+        self,
+        *,
+        registry_path: Optional[Path] = None,
+        max_distance: int = 2,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._explicit_path = registry_path
+        self._max_distance = max_distance
+        self._clock = clock
+        self._path: Optional[Path] = None
+        self._mtime: Optional[float] = None
+        self._last_discovery: Optional[float] = None
+        self._exact: Dict[str, str] = {}
+        self._latin: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.resolved = 0
+        self.unresolved = 0
+
+    @property
+    def path(self) -> Optional[Path]:
+        return self._path
+
+    def lookup(self, name: str) -> Optional[AppMatch]:
+        """Return the registry entry for ``name`` or ``None`` when unsure."""
+
+        self._refresh()
+        key = _normalize(name)
+        if not key:
+            return None
+
+        with self._lock:
+            exact, latin = self._exact, self._latin
+
+        match = exact.get(key)
+        if match is not None:
+            return AppMatch(match, "exact")
+
+        transliterated = _transliterate(key)
+        match = latin.get(transliterated)
+        if match is not None:
+            return AppMatch(match, "transliteration")
+
+        return self._closest(transliterated, latin)
+
+    def resolve(self, name: str) -> Optional[str]:
+        match = self.lookup(name)
+        if match is None:
+            self.unresolved += 1
+            return None
+        self.resolved += 1
+        if match.method != "exact" or match.name != name:
+            logger.info("Resolved application '%s' to '%s' (%s)", name, match.name, match.method)
+        return match.name
+
+    def resolve_command(self, command: Command) -> Command:
+        """Return ``command`` with its application replaced by the registry name."""
+
+        if command.action not in RESOLVED_ACTIONS:
+            return command
+        application = command.params.get("application")
+        if not isinstance(application, str):
+            return command
+
+        resolved = self.resolve(application)
+        if resolved is None or resolved == application:
+            return command
+        return replace(command, params={**command.params, "application": resolved})
+
+    def _closest(self, key: str, latin: Dict[str, str]) -> Optional[AppMatch]:
+        # Short names tolerate fewer typos: "edge" must not become "excel".
+        limit = min(self._max_distance, len(key) // 4)
+        if limit < 1:
+            return None
+
+        best: Optional[Tuple[int, str]] = None
+        ambiguous = False
+        for candidate, name in latin.items():
+            if abs(len(candidate) - len(key)) > limit:
+                continue
+            distance = _edit_distance(key, candidate, limit)
+            if distance > limit:
+                continue
+            if best is None or distance < best[0]:
+                best, ambiguous = (distance, name), False
+            elif distance == best[0] and name != best[1]:
+                ambiguous = True
+
+        if best is None or ambiguous:
+            return None
+        return AppMatch(best[1], "fuzzy", best[0])
+
+    def _refresh(self) -> None:
+        path = self._path
+        if path is None or not path.exists():
+            path = self._discover()
+            if path is None:
+                return
+
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            return
+        if path == self._path and mtime == self._mtime:
+            return
+
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError) as exc:  # noqa: BLE001
+            logger.warning("Failed to read application registry at %s: %s", path, exc)
+            return
+
+        exact, latin = _build_keys(raw)
+        with self._lock:
+            self._exact, self._latin = exact, latin
+            self._path, self._mtime = path, mtime
+        logger.info("Loaded %d application names from %s", len(exact), path)
+
+    def _discover(self) -> Optional[Path]:
+        now = self._clock()
+        if (
+            self._last_discovery is not None
+            and now - self._last_discovery < REDISCOVER_INTERVAL_SECONDS
+        ):
+            return None
+        self._last_discovery = now
+
+        for candidate in prompts._candidate_registry_paths(self._explicit_path):  # noqa: SLF001
+            if candidate.exists():
+                return candidate
+        return None
+
+
+_SHARED_INDEX: Optional[ApplicationIndex] = None
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_index() -> ApplicationIndex:
+    """Return the process-wide index used by the bridge clients."""
+
+    global _SHARED_INDEX
+    with _SHARED_LOCK:
+        if _SHARED_INDEX is None:
+            _SHARED_INDEX = ApplicationIndex()
+        return _SHARED_INDEX
+
+
+def _build_keys(raw: object) -> Tuple[Dict[str, str], Dict[str, str]]:
+    exact: Dict[str, str] = {}
+    latin: Dict[str, str] = {}
+    if not isinstance(raw, list):
+        return exact, latin
+
+    for entry in raw:
+        if not isinstance(entry, dict) or not isinstance(entry.get("name"), str):
+            continue
+        name = entry["name"].strip()
+        for alias in _entry_names(entry):
+            key = _normalize(alias)
+            if key:
+                exact.setdefault(key, name)
+                latin.setdefault(_transliterate(key), name)
+    return exact, latin
+
+
+def _entry_names(entry: Dict[str, object]) -> Iterable[str]:
+    yield entry["name"]  # type: ignore[misc]
+    aliases = entry.get("aliases")
+    if isinstance(aliases, list):
+        yield from (alias for alias in aliases if isinstance(alias, str))
+    executable = entry.get("executableName")
+    if isinstance(executable, str):
+        yield executable
+
+
+def _normalize(name: str) -> str:
+    key = " ".join(name.casefold().split())
+    key = key.removeprefix("known_")
+    return key.removesuffix(".exe")
+
+
+def _transliterate(key: str) -> str:
+    return "".join(_TRANSLITERATION.get(char, char) for char in key if not char.isspace())
+
+
+def _edit_distance(left: str, right: str, limit: int) -> int:
+    """Levenshtein distance, giving up early once it exceeds ``limit``."""
+
+    previous: List[int] = list(range(len(right) + 1))
+    for i, left_char in enumerate(left, start=1):
+        current = [i]
+        for j, right_char in enumerate(right, start=1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (left_char != right_char),
+                )
+            )
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
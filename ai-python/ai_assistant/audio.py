@@ -0,0 +1,457 @@
+"""Capture buffers and WAV framing for 16 kHz mono PCM audio.
+
+Microphone blocks are copied once into a :class:`PcmBuffer` that was sized for
+the longest recording up front. The buffer keeps :data:`WAV_HEADER_SIZE` bytes
+free in front of the samples, so turning the recording into a WAV file only
+writes a header into that gap; :class:`MemoryFile` then hands the result to
+the HTTP client as a file object without another copy. :class:`PcmRing` keeps
+the recent past of an endless stream in the same way.
+
+:func:`encode_upload` can instead send the recording as 8-bit G.711 μ-law
+(half the bytes) or FLAC (lossless, needs the optional ``soundfile``
+package).
+"""
+
+from __future__ import annotations
+
+import io
+import struct
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+SAMPLE_RATE = 16_000
+SAMPLE_WIDTH = 2  # 16-bit PCM
+WAV_HEADER_SIZE = 44
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_MULAW = 7
+
+UPLOAD_ENCODINGS = ("pcm16", "mulaw", "flac")
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+_MULAW_BIAS = 0x84
+_MULAW_CLIP = 32635
+
+
+def wav_header(
+    data_size: int,
+    *,
+    sample_rate: int = SAMPLE_RATE,
+    channels: int = 1,
+    sample_width: int = SAMPLE_WIDTH,
+    format_tag: int = WAVE_FORMAT_PCM,
+) -> bytes:
+    """Return the RIFF/WAVE header for ``data_size`` bytes of audio.
+
+    PCM headers are :data:`WAV_HEADER_SIZE` bytes. Other formats get the
+    18-byte ``fmt`` chunk and the ``fact`` chunk they require.
+    """
+
+    byte_rate = sample_rate * channels * sample_width
+    fmt = struct.pack(
+        "<HHIIHH",
+        format_tag,
+        channels,
+        sample_rate,
+        byte_rate,
+        channels * sample_width,
+        sample_width * 8,
+    )
+    chunks = b""
+    if format_tag != WAVE_FORMAT_PCM:
+        fmt += struct.pack("<H", 0)
+        frames = data_size // (channels * sample_width)
+        chunks = struct.pack("<4sII", b"fact", 4, frames)
+    chunks = struct.pack("<4sI", b"fmt ", len(fmt)) + fmt + chunks
+    return (
+        struct.pack("<4sI4s", b"RIFF", 4 + len(chunks) + 8 + data_size, b"WAVE")
+        + chunks
+        + struct.pack("<4sI", b"data", data_size)
+    )
+
+
+class PcmBuffer:
+    """Preallocated int16 mono recording with room for a WAV header.
+
+    :meth:`append` copies a captured block into place; :attr:`samples`,
+    :meth:`pcm` and :meth:`wav` are views of the same memory. Iterating the
+    buffer yields the PCM bytes as one chunk, so it can be passed wherever an
+    iterable of audio chunks is expected.
+    """
+
+    def __init__(self, capacity_samples: int, *, sample_rate: int = SAMPLE_RATE) -> None:
+        if capacity_samples <= 0:
+            raise ValueError("capacity_samples must be positive")
+        self._memory = bytearray(WAV_HEADER_SIZE + capacity_samples * SAMPLE_WIDTH)
+        self._samples = np.frombuffer(
+            self._memory, dtype=np.int16, offset=WAV_HEADER_SIZE, count=capacity_samples
+        )
+        self._length = 0
+        # (offset, bytes) of recorded samples a framed range was written over.
+        self._overwritten: List[Tuple[int, bytes]] = []
+        self.sample_rate = sample_rate
+
+    @classmethod
+    def for_duration(cls, seconds: float, *, sample_rate: int = SAMPLE_RATE) -> "PcmBuffer":
+        return cls(max(1, int(round(seconds * sample_rate))), sample_rate=sample_rate)
+
+    @classmethod
+    def from_chunks(
+        cls,
+        chunks: Iterable[BytesLike],
+        *,
+        sample_rate: int = SAMPLE_RATE,
+        min_duration: float = 0.0,
+    ) -> "PcmBuffer":
+        """Copy PCM ``chunks`` into a new buffer with room for ``min_duration``."""
+
+        views = [memoryview(chunk).cast("B") for chunk in chunks]
+        count = sum(len(view) for view in views) // SAMPLE_WIDTH
+        capacity = max(1, count, int(round(min_duration * sample_rate)))
+        buffer = cls(capacity, sample_rate=sample_rate)
+        # Chunks need not end on a sample boundary; a trailing odd byte is dropped.
+        offset = WAV_HEADER_SIZE
+        end = WAV_HEADER_SIZE + count * SAMPLE_WIDTH
+        for view in views:
+            size = min(len(view), end - offset)
+            buffer._memory[offset : offset + size] = view[:size]
+            offset += size
+        buffer._length = count
+        return buffer
+
+    @property
+    def capacity(self) -> int:
+        return len(self._samples)
+
+    @property
+    def sample_count(self) -> int:
+        return self._length
+
+    @property
+    def nbytes(self) -> int:
+        return self._length * SAMPLE_WIDTH
+
+    @property
+    def duration(self) -> float:
+        return self._length / self.sample_rate
+
+    @property
+    def samples(self) -> np.ndarray:
+        """The recorded samples, as a view into the buffer."""
+
+        return self._samples[: self._length]
+
+    def append(self, block: Union[np.ndarray, BytesLike]) -> int:
+        """Copy ``block`` after the recorded samples; return how many fitted.
+
+        Samples beyond the capacity are dropped.
+        """
+
+        if isinstance(block, np.ndarray):
+            data = block.reshape(-1)
+        else:
+            data = np.frombuffer(block, dtype=np.int16)
+        count = min(len(data), self.capacity - self._length)
+        self._samples[self._length : self._length + count] = data[:count]
+        self._length += count
+        return count
+
+    def clear(self) -> None:
+        self._length = 0
+        self._overwritten.clear()
+
+    def pcm(self) -> memoryview:
+        """Raw little-endian PCM of the recorded samples."""
+
+        return memoryview(self._memory)[WAV_HEADER_SIZE : WAV_HEADER_SIZE + self.nbytes]
+
+    def wav(
+        self, *, min_duration: float = 0.0, start: int = 0, end: Optional[int] = None
+    ) -> memoryview:
+        """Write the WAV header in front of the samples and return the whole file.
+
+        Only samples ``start:end`` are included. The header is written over the
+        bytes just before ``start``, so when ``start`` is not zero up to 22
+        leading samples outside the range are overwritten. A range shorter than
+        ``min_duration`` is padded with silence after ``end``; the padding must
+        fit in the buffer, and may cover recorded samples when ``end`` is not
+        the end of the recording. Recorded samples overwritten either way are
+        saved first: call :meth:`restore` once the returned file is no longer
+        needed. The next :meth:`wav` call restores them as well, so only one
+        framed range is valid at a time.
+        """
+
+        self.restore()
+        end = self._length if end is None else min(end, self._length)
+        if not 0 <= start <= end:
+            raise ValueError(f"Invalid sample range {start}:{end}")
+        length = max(end - start, int(round(min_duration * self.sample_rate)))
+        if start + length > self.capacity:
+            raise ValueError(f"{length} samples do not fit in a buffer of {self.capacity}")
+        data_size = length * SAMPLE_WIDTH
+        offset = start * SAMPLE_WIDTH
+        if start:
+            self._save(offset, offset + WAV_HEADER_SIZE)
+        padded = WAV_HEADER_SIZE + end * SAMPLE_WIDTH
+        self._save(padded, min(offset + WAV_HEADER_SIZE + data_size, WAV_HEADER_SIZE + self.nbytes))
+        self._samples[end : start + length] = 0
+        self._memory[offset : offset + WAV_HEADER_SIZE] = wav_header(
+            data_size, sample_rate=self.sample_rate
+        )
+        return memoryview(self._memory)[offset : offset + WAV_HEADER_SIZE + data_size]
+
+    def restore(self) -> None:
+        """Put back the recorded samples the last :meth:`wav` call overwrote."""
+
+        while self._overwritten:
+            offset, saved = self._overwritten.pop()
+            self._memory[offset : offset + len(saved)] = saved
+
+    def _save(self, begin: int, end: int) -> None:
+        if end > begin:
+            self._overwritten.append((begin, bytes(self._memory[begin:end])))
+
+    def __iter__(self) -> Iterator[memoryview]:
+        yield self.pcm()
+
+
+class PcmRing:
+    """The last ``capacity`` samples of an endless int16 mono stream.
+
+    Every sample is stored twice, half a buffer apart, so any range of up to
+    ``capacity`` recent samples is one contiguous slice: :meth:`window` returns
+    a view instead of joining blocks. Positions count samples from the first
+    :meth:`append`, as :class:`~ai_assistant.wake_gate.VoiceGate` does.
+
+    One thread may :meth:`append` while another reads windows, provided the
+    reader stays well within ``capacity`` samples of the writer.
+    """
+
+    def __init__(self, capacity_samples: int, *, sample_rate: int = SAMPLE_RATE) -> None:
+        if capacity_samples <= 0:
+            raise ValueError("capacity_samples must be positive")
+        self._samples = np.zeros(2 * capacity_samples, dtype=np.int16)
+        self._float: Optional[np.ndarray] = None
+        self._position = 0
+        self.sample_rate = sample_rate
+
+    @property
+    def capacity(self) -> int:
+        return len(self._samples) // 2
+
+    @property
+    def position(self) -> int:
+        """Samples appended so far; the end of the newest one."""
+
+        return self._position
+
+    @property
+    def start(self) -> int:
+        """Position of the oldest sample still kept."""
+
+        return max(0, self._position - self.capacity)
+
+    def append(self, block: Union[np.ndarray, BytesLike]) -> int:
+        """Copy ``block`` after the newest sample and return the new position."""
+
+        if isinstance(block, np.ndarray):
+            data = block.reshape(-1)
+        else:
+            data = np.frombuffer(block, dtype=np.int16)
+        capacity = self.capacity
+        if len(data) > capacity:
+            self._position += len(data) - capacity
+            data = data[-capacity:]
+        index = self._position % capacity
+        first = min(len(data), capacity - index)
+        self._samples[index : index + first] = data[:first]
+        self._samples[index + capacity : index + capacity + first] = data[:first]
+        rest = len(data) - first
+        self._samples[:rest] = data[first:]
+        self._samples[capacity : capacity + rest] = data[first:]
+        self._position += len(data)
+        return self._position
+
+    def window(self, start: int, end: Optional[int] = None) -> np.ndarray:
+        """Samples ``start:end`` as a view into the ring.
+
+        ``start`` is moved up to the oldest sample still kept. The view is
+        overwritten once ``capacity`` more samples have been appended.
+        """
+
+        end = self._position if end is None else end
+        if end > self._position:
+            raise ValueError(f"Sample {end} has not been appended yet")
+        start = min(max(start, self.start), end)
+        index = start % self.capacity
+        return self._samples[index : index + end - start]
+
+    def window_float(self, start: int, end: Optional[int] = None) -> np.ndarray:
+        """Samples ``start:end`` scaled to float32 in ``[-1, 1)``.
+
+        The conversion is written into a scratch buffer that is reused and
+        only grows when a longer window is asked for, so the result is only
+        valid until the next call.
+        """
+
+        samples = self.window(start, end)
+        if self._float is None or len(self._float) < len(samples):
+            self._float = np.empty(len(samples), dtype=np.float32)
+        return np.multiply(samples, np.float32(1 / 32768), out=self._float[: len(samples)])
+
+
+def build_wav(
+    chunks: Iterable[BytesLike], *, sample_rate: int = SAMPLE_RATE, min_duration: float = 0.0
+) -> memoryview:
+    """Frame PCM ``chunks`` as a WAV file, copying each chunk exactly once.
+
+    A :class:`PcmBuffer` is framed in place without copying.
+    """
+
+    if isinstance(chunks, PcmBuffer):
+        if chunks.sample_count == 0:
+            raise ValueError("No audio data received")
+        min_samples = int(round(min_duration * chunks.sample_rate))
+        if min_samples <= chunks.capacity:
+            return chunks.wav(min_duration=min_duration)
+        chunks = [chunks.pcm()]
+
+    views = [memoryview(chunk).cast("B") for chunk in chunks]
+    size = sum(len(view) for view in views)
+    if size == 0:
+        raise ValueError("No audio data received")
+
+    min_size = int(round(min_duration * sample_rate)) * SAMPLE_WIDTH
+    data_size = max(size, min_size)
+    memory = bytearray(WAV_HEADER_SIZE + data_size)
+    memory[:WAV_HEADER_SIZE] = wav_header(data_size, sample_rate=sample_rate)
+    offset = WAV_HEADER_SIZE
+    for view in views:
+        memory[offset : offset + len(view)] = view
+        offset += len(view)
+    return memoryview(memory)
+
+
+def encode_mulaw(samples: np.ndarray) -> np.ndarray:
+    """Compress int16 ``samples`` to 8-bit G.711 μ-law codes."""
+
+    values = samples.astype(np.int32)
+    sign = (values < 0).astype(np.int32) << 7
+    magnitude = np.minimum(np.abs(values), _MULAW_CLIP) + _MULAW_BIAS
+    # frexp gives magnitude = m * 2**e with 0.5 <= m < 1, so e - 1 is the
+    # index of the highest set bit (7..14 after biasing and clipping).
+    exponent = np.frexp(magnitude)[1] - 8
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return (~(sign | (exponent << 4) | mantissa) & 0xFF).astype(np.uint8)
+
+
+def decode_mulaw(codes: np.ndarray) -> np.ndarray:
+    """Expand G.711 μ-law ``codes`` back to int16 samples."""
+
+    values = ~codes.astype(np.int32) & 0xFF
+    exponent = (values >> 4) & 0x07
+    magnitude = ((((values & 0x0F) << 3) + _MULAW_BIAS) << exponent) - _MULAW_BIAS
+    return np.where(values & 0x80, -magnitude, magnitude).astype(np.int16)
+
+
+def mulaw_wav(samples: np.ndarray, *, sample_rate: int = SAMPLE_RATE) -> memoryview:
+    """Return ``samples`` as a μ-law WAV file (one byte per sample)."""
+
+    header = wav_header(
+        len(samples), sample_rate=sample_rate, sample_width=1, format_tag=WAVE_FORMAT_MULAW
+    )
+    memory = bytearray(len(header) + len(samples))
+    memory[: len(header)] = header
+    np.frombuffer(memory, dtype=np.uint8, offset=len(header))[:] = encode_mulaw(samples)
+    return memoryview(memory)
+
+
+def flac_bytes(samples: np.ndarray, *, sample_rate: int = SAMPLE_RATE) -> memoryview:
+    """Return ``samples`` as a FLAC file; requires the ``soundfile`` package."""
+
+    try:
+        import soundfile
+    except ImportError as exc:  # pragma: no cover - depends on optional package
+        raise RuntimeError(
+            "FLAC uploads require the 'soundfile' package; install it with "
+            "'pip install soundfile' or choose another transcription encoding."
+        ) from exc
+
+    buffer = io.BytesIO()
+    soundfile.write(buffer, samples, sample_rate, format="FLAC", subtype="PCM_16")
+    return buffer.getbuffer()
+
+
+def encode_upload(
+    audio: PcmBuffer,
+    encoding: str = "pcm16",
+    *,
+    start: int = 0,
+    end: Optional[int] = None,
+    min_duration: float = 0.0,
+) -> Tuple[memoryview, str]:
+    """Encode samples ``start:end`` of ``audio``; return the body and a file name.
+
+    ``encoding`` is one of :data:`UPLOAD_ENCODINGS`. ``pcm16`` frames the
+    samples in place (see :meth:`PcmBuffer.wav`; call :meth:`PcmBuffer.restore`
+    after the upload); the others write a new, smaller buffer.
+    """
+
+    if encoding == "pcm16":
+        return audio.wav(min_duration=min_duration, start=start, end=end), "stream.wav"
+    if encoding not in UPLOAD_ENCODINGS:
+        raise ValueError(f"Unsupported upload encoding: {encoding}")
+
+    samples = audio.samples[start:end]
+    min_samples = int(round(min_duration * audio.sample_rate))
+    if len(samples) < min_samples:
+        samples = np.pad(samples, (0, min_samples - len(samples)))
+    if encoding == "mulaw":
+        return mulaw_wav(samples, sample_rate=audio.sample_rate), "stream.wav"
+    return flac_bytes(samples, sample_rate=audio.sample_rate), "stream.flac"
+
+
+class MemoryFile(io.RawIOBase):
+    """Read-only, seekable file object over a buffer, without copying it.
+
+    ``name`` is what HTTP clients use as the upload file name.
+    """
+
+    def __init__(self, data: BytesLike, *, name: Optional[str] = None) -> None:
+        super().__init__()
+        self._view = memoryview(data).cast("B")
+        self._position = 0
+        if name is not None:
+            self.name = name
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: memoryview) -> int:  # type: ignore[override]
+        target = memoryview(buffer).cast("B")
+        count = max(0, min(len(target), len(self._view) - self._position))
+        target[:count] = self._view[self._position : self._position + count]
+        self._position += count
+        return count
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = len(self._view) + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError("Negative seek position")
+        self._position = position
+        return position
+
+    def tell(self) -> int:
+        return self._position
@@ -4,35 +4,220 @@ from __future__ import annotations
 
 import json
 import logging
-from http.client import RemoteDisconnected
-from typing import Dict, Optional
-from urllib import error, request
+import time
+from http.client import HTTPException
+from typing import Awaitable, Callable, Dict, Generator, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
 
+from .app_index import ApplicationIndex, shared_index
+from .cache import ResultCache
+from .capture import CaptureDestination, CaptureResult, read_capture
+from .deadline import Deadline, DeadlineExceeded, LatencyTracker, stage_timeout
+from .heartbeat import DEFAULT_HEARTBEAT_SECONDS, PROBE_TIMEOUT_SECONDS, Heartbeat
 from .schemas import Command
+from .transport import ConnectionPool, shared_pool
+
+_HEADERS = {"User-Agent": "JarvisAssistant/1.0"}
+
+# Capture responses are read in pieces of this size; see :meth:`HttpBridge.capture`.
+CAPTURE_CHUNK_SIZE = 256 * 1024
+_ERROR_BODY_LIMIT = 4096
 
 logger = logging.getLogger(__name__)
 
 
 class HttpBridge:
-    """Send commands to the C# layer via HTTP."""
+    """Send commands to the C# layer via HTTP.
+
+    ``timeout`` is the per-attempt ceiling. Once enough calls have been seen
+    the timeout for each action follows its observed latency, and it never
+    exceeds what is left of the query :class:`Deadline`.
+
+    Requests go through a keep-alive :class:`ConnectionPool`; by default the
+    process-wide pool for the endpoint, shared with the ``requests`` bridge.
+
+    ``open_app``/``capture_window`` names are resolved against the local
+    :class:`ApplicationIndex` before sending, so a misspelled or transliterated
+    name does not cost a failed round trip.
+
+    Results of read-only actions (``system_status``, ``list_applications``)
+    are served from a :class:`ResultCache` while fresh. :meth:`is_available`
+    reads the state kept by a background :class:`Heartbeat` every
+    ``heartbeat_interval`` seconds; pass ``None`` to check on every call.
+    """
 
-    def __init__(self, endpoint: str, *, timeout: float = 10.0) -> None:
+    def __init__(
+        self,
+        endpoint: str,
+        *,
+        timeout: float = 10.0,
+        pool: Optional[ConnectionPool] = None,
+        app_index: Optional[ApplicationIndex] = None,
+        cache: Optional[ResultCache] = None,
+        heartbeat_interval: Optional[float] = DEFAULT_HEARTBEAT_SECONDS,
+    ) -> None:
         self._endpoint = endpoint.rstrip("/")
+        self._app_index = app_index or shared_index()
+        self._cache = cache if cache is not None else ResultCache()
+        self._heartbeat = (
+            Heartbeat(self._probe, interval=heartbeat_interval)
+            if heartbeat_interval is not None
+            else None
+        )
         self._timeout = timeout
+        self._latency = LatencyTracker(initial=timeout, floor=min(1.0, timeout), ceiling=timeout)
+        self._pool = pool or shared_pool(self._endpoint)
+        self._base_path = urlsplit(self._endpoint).path
+        self._supports_batch: Optional[bool] = None
 
     @property
     def endpoint(self) -> str:
         return self._endpoint
 
-    def send_command(self, command: Command) -> Optional[Dict[str, object]]:
-        payload_template = command.to_json()
-        application = payload_template.get("params", {}).get("application")
+    @property
+    def cache(self) -> ResultCache:
+        return self._cache
+
+    def send_command(
+        self, command: Command, *, deadline: Optional[Deadline] = None
+    ) -> Optional[Dict[str, object]]:
+        command = self._app_index.resolve_command(command)
+        cached = self._cache.get(command)
+        if cached is not None:
+            return cached
+        response = self._send_candidates(
+            command, application_candidates(command), deadline=deadline
+        )
+        self._cache.store(command, response)
+        return response
 
-        # Some prompts produce "known_*" aliases, but the registry contains the
-        # plain name. Try both to maximize the chance of a match.
-        candidates = [application]
-        if isinstance(application, str) and application.startswith("known_"):
-            candidates.append(application.removeprefix("known_"))
+    def send_commands(
+        self, commands: Sequence[Command], *, deadline: Optional[Deadline] = None
+    ) -> List[Optional[Dict[str, object]]]:
+        """Execute an ordered plan, in one request when the core supports it.
+
+        Returns one response per executed command. Execution stops after the
+        first failed command, so the list may be shorter than ``commands``.
+        Cores that do not advertise ``/action/batch`` get one
+        ``/action/execute`` request per command. A command at the head of the
+        remaining plan whose result is cached is answered without a request.
+        """
+
+        return execute_plan(
+            [self._app_index.resolve_command(command) for command in commands],
+            self._cache,
+            supports_batch=self.supports_batch,
+            send_batch=lambda batch: self._send_batch(batch, deadline=deadline),
+            send_candidates=lambda command, candidates: self._send_candidates(
+                command, candidates, deadline=deadline
+            ),
+            send_command=lambda command: self.send_command(command, deadline=deadline),
+        )
+
+    def capture(
+        self,
+        command: Command,
+        destination: CaptureDestination,
+        *,
+        deadline: Optional[Deadline] = None,
+    ) -> Optional[CaptureResult]:
+        """Run a ``capture_window``/``screenshot`` command, streaming the image.
+
+        The base64 image is decoded while the response arrives and written to
+        ``destination`` (see :func:`ai_assistant.capture.read_capture`); only
+        the metadata is kept in memory. Returns ``None`` when the core is
+        unreachable or answers with a non-200 status.
+        """
+
+        command = self._app_index.resolve_command(command)
+        try:
+            timeout = stage_timeout(self._latency, command.action, deadline)
+        except DeadlineExceeded as exc:
+            logger.error("Skipping bridge call for %s: %s", command.action, exc)
+            return None
+
+        payload = json.dumps(command.to_json()).encode()
+        headers = {**_HEADERS, "Content-Type": "application/json"}
+        logger.info("Sending capture command to C# bridge: %s", payload)
+        try:
+            started = time.monotonic()
+            with self._pool.stream(
+                "POST",
+                self._base_path + "/action/execute",
+                body=payload,
+                headers=headers,
+                timeout=timeout,
+            ) as response:
+                if response.status != 200:
+                    logger.error(
+                        "C# bridge capture call returned status %s: %s. Endpoint: %s",
+                        response.status,
+                        response.read(_ERROR_BODY_LIMIT),
+                        self._endpoint,
+                    )
+                    return None
+                result = read_capture(
+                    iter(lambda: response.read(CAPTURE_CHUNK_SIZE), b""), destination
+                )
+        except (HTTPException, OSError, ValueError) as exc:  # noqa: BLE001
+            logger.error(
+                "C# bridge capture call failed (%s). Endpoint: %s", exc, self._endpoint
+            )
+            return None
+
+        self._latency.observe(command.action, time.monotonic() - started)
+        return result
+
+    def supports_batch(self) -> bool:
+        """Return ``True`` when ``GET /`` lists a batch endpoint.
+
+        The answer is cached until a batch request fails, so a core restarted
+        with an older build is detected on the next plan.
+        """
+
+        if self._supports_batch is None:
+            info = self._perform_request("GET", "/", context="capability check")
+            if info is None:
+                return False
+            self._supports_batch = advertises_batch(info)
+            logger.info(
+                "C# bridge at %s %s batch execution",
+                self._endpoint,
+                "supports" if self._supports_batch else "does not support",
+            )
+        return self._supports_batch
+
+    def _send_batch(
+        self, commands: Sequence[Command], *, deadline: Optional[Deadline]
+    ) -> List[Optional[Dict[str, object]]]:
+        logger.info("Sending batch of %d commands to C# bridge", len(commands))
+        try:
+            timeout = batch_timeout(self._timeout, len(commands), deadline)
+        except DeadlineExceeded as exc:
+            logger.error("Skipping batch bridge call: %s", exc)
+            return [None]
+
+        response = self._perform_request(
+            "POST",
+            "/action/batch",
+            body=json.dumps(batch_payload(commands)).encode(),
+            context="batch call",
+            timeout=timeout,
+        )
+        results = batch_results(response, len(commands))
+        if results is None:
+            self._supports_batch = None
+            return [None]
+        return results
+
+    def _send_candidates(
+        self,
+        command: Command,
+        candidates: List[Optional[str]],
+        *,
+        deadline: Optional[Deadline],
+    ) -> Optional[Dict[str, object]]:
+        payload_template = command.to_json()
 
         for candidate in candidates:
             payload = json.dumps({
@@ -41,19 +226,20 @@ class HttpBridge:
             }).encode()
 
             logger.info("Sending command to C# bridge: %s", payload)
-            http_request = request.Request(
-                url=f"{self._endpoint}/action/execute",
-                data=payload,
-                headers={
-                    "Content-Type": "application/json",
-                    "User-Agent": "JarvisAssistant/1.0",
-                    "Connection": "close",
-                },
-            )
 
             try:
-                response = self._perform_request(http_request, context="bridge call")
+                timeout = stage_timeout(self._latency, command.action, deadline)
+            except DeadlineExceeded as exc:
+                logger.error("Skipping bridge call for %s: %s", command.action, exc)
+                return None
+
+            try:
+                started = time.monotonic()
+                response = self._perform_request(
+                    "POST", "/action/execute", body=payload, context="bridge call", timeout=timeout
+                )
                 if response is not None:
+                    self._latency.observe(command.action, time.monotonic() - started)
                     return response
             except Exception as exc:  # noqa: BLE001
                 logger.warning(
@@ -66,20 +252,23 @@ class HttpBridge:
     def get_status(self) -> Optional[Dict[str, object]]:
         """Fetch system status from the C# service."""
 
-        http_request = request.Request(
-            url=f"{self._endpoint}/system/status",
-            headers={
-                "User-Agent": "JarvisAssistant/1.0",
-                "Connection": "close",
-            },
-        )
-        return self._perform_request(http_request, context="status check")
+        return self._perform_request("GET", "/system/status", context="status check")
 
     def is_available(self) -> bool:
-        """Return ``True`` when the bridge responds to /system/status."""
+        """Return ``True`` when the bridge responds to /system/status.
 
-        status = self.get_status()
-        if status is None:
+        With the heartbeat enabled, a bridge known to be up is reported
+        without a request. Otherwise a status request bounded by
+        :data:`~ai_assistant.heartbeat.PROBE_TIMEOUT_SECONDS` is made, so a
+        core that has just come back is not reported down while the heartbeat
+        backs off.
+        """
+
+        if self._heartbeat is None:
+            available = self._probe()
+        else:
+            available = self._heartbeat.refresh()
+        if not available:
             logger.error(
                 "C# bridge at %s is unreachable. Is the Windows service running?",
                 self._endpoint,
@@ -87,18 +276,215 @@ class HttpBridge:
             return False
         return True
 
+    def close(self) -> None:
+        """Stop the heartbeat.
+
+        The connection pool is left open: it is either the process-wide
+        :func:`~ai_assistant.transport.shared_pool`, which other bridges use
+        too, or was passed in and belongs to the caller.
+        """
+
+        if self._heartbeat is not None:
+            self._heartbeat.stop()
+
+    def _probe(self) -> bool:
+        timeout = min(self._timeout, PROBE_TIMEOUT_SECONDS)
+        status = self._perform_request("GET", "/system/status", context="status check", timeout=timeout)
+        return status is not None
+
     def _perform_request(
-        self, http_request: request.Request, *, context: str
+        self,
+        method: str,
+        path: str,
+        *,
+        body: Optional[bytes] = None,
+        context: str,
+        timeout: Optional[float] = None,
     ) -> Optional[Dict[str, object]]:
+        headers = dict(_HEADERS)
+        if body is not None:
+            headers["Content-Type"] = "application/json"
         try:
-            with request.urlopen(http_request, timeout=self._timeout) as response:  # noqa: S310
-                raw = response.read().decode()
-                logger.debug("%s response: %s", context.capitalize(), raw)
-                if response.status != 200:
-                    raise RuntimeError(f"Bridge returned status {response.status}: {raw}")
-                return json.loads(raw)
-        except (RemoteDisconnected, error.URLError, OSError) as exc:  # noqa: BLE001
+            response = self._pool.request(
+                method,
+                self._base_path + path,
+                body=body,
+                headers=headers,
+                timeout=timeout or self._timeout,
+            )
+        except (HTTPException, OSError) as exc:  # noqa: BLE001
             logger.error(
                 "C# bridge %s failed (%s). Endpoint: %s", context, exc, self._endpoint
             )
+            self._report(False)
+            return None
+
+        self._report(True)
+        raw = response.text()
+        logger.debug("%s response: %s", context.capitalize(), raw)
+        if response.status != 200:
+            logger.error(
+                "C# bridge %s returned status %s: %s. Endpoint: %s",
+                context,
+                response.status,
+                raw,
+                self._endpoint,
+            )
             return None
+        return json.loads(raw)
+
+    def _report(self, ok: bool) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.report(ok)
+
+
+def application_candidates(command: Command) -> List[Optional[str]]:
+    """Return the ``application`` values to try for ``command``, in order.
+
+    Some prompts produce "known_*" aliases, but the registry contains the
+    plain name. Try both to maximize the chance of a match.
+    """
+
+    application = command.params.get("application")
+    candidates = [application]
+    if isinstance(application, str) and application.startswith("known_"):
+        candidates.append(application.removeprefix("known_"))
+    return candidates
+
+
+def response_failed(response: Optional[object]) -> bool:
+    """Return ``True`` for a missing response or a core ``"error"`` status."""
+
+    if not isinstance(response, dict):
+        return response is None
+    return response.get("status") == "error" or bool(response.get("error"))
+
+
+def advertises_batch(info: object) -> bool:
+    """Return ``True`` when a ``GET /`` answer lists the batch endpoint."""
+
+    endpoints = info.get("endpoints") if isinstance(info, dict) else None
+    return isinstance(endpoints, dict) and "batch" in endpoints
+
+
+def batch_payload(commands: Sequence[Command]) -> Dict[str, object]:
+    """Body of an ``/action/batch`` request; the core stops at the first error."""
+
+    return {"commands": [command.to_json() for command in commands], "stopOnError": True}
+
+
+def batch_timeout(timeout: float, count: int, deadline: Optional[Deadline]) -> float:
+    """Allow ``timeout`` per command in a batch, within what is left of ``deadline``."""
+
+    total = timeout * count
+    return deadline.timeout(total) if deadline is not None else total
+
+
+def batch_results(response: object, count: int) -> Optional[List[Optional[Dict[str, object]]]]:
+    """Per-command results of a batch answer, or ``None`` if it is not one."""
+
+    results = response.get("result") if isinstance(response, dict) else None
+    if not isinstance(results, list):
+        return None
+    return results[:count]
+
+
+_Response = Optional[Dict[str, object]]
+# A request the plan walk needs answered: the name of a step and its arguments.
+_Step = Tuple[str, tuple]
+
+
+def _walk_plan(
+    commands: Sequence[Command], cache: ResultCache
+) -> Generator[_Step, object, List[_Response]]:
+    """Walk a plan, yielding each request it needs and receiving the answer.
+
+    Kept free of I/O so the synchronous and asyncio bridges share it; see
+    :func:`execute_plan` for the steps and what they must return.
+    """
+
+    responses: List[_Response] = []
+    while len(responses) < len(commands):
+        pending = commands[len(responses):]
+        cached = cache.get(pending[0])
+        if cached is not None:
+            responses.append(cached)
+            continue
+        if len(pending) > 1 and (yield "supports_batch", ()):
+            batch = list((yield "send_batch", (pending,)))
+            if batch and response_failed(batch[-1]):
+                failed = pending[len(batch) - 1]
+                aliases = application_candidates(failed)[1:]
+                if aliases:
+                    batch[-1] = yield "send_candidates", (failed, aliases)
+            for command, response in zip(pending, batch):
+                cache.store(command, response)
+        else:
+            batch = [(yield "send_command", (pending[0],))]
+
+        responses.extend(batch)
+        if not batch or response_failed(batch[-1]):
+            break
+    return responses
+
+
+def execute_plan(
+    commands: Sequence[Command],
+    cache: ResultCache,
+    *,
+    supports_batch: Callable[[], bool],
+    send_batch: Callable[[Sequence[Command]], List[_Response]],
+    send_candidates: Callable[[Command, List[Optional[str]]], _Response],
+    send_command: Callable[[Command], _Response],
+) -> List[_Response]:
+    """Run ``send_commands`` for a bridge, given how it sends each request.
+
+    A command at the head of the remaining plan whose result is cached is
+    answered from ``cache``. Otherwise, when more than one command remains
+    and ``supports_batch()`` holds, the rest go to ``send_batch``; if the
+    batch stops at a command whose ``application`` has a plain-name alias,
+    ``send_candidates`` retries just that command with the alias. Single
+    commands go to ``send_command``. Execution stops after the first failure.
+    """
+
+    steps = {
+        "supports_batch": supports_batch,
+        "send_batch": send_batch,
+        "send_candidates": send_candidates,
+        "send_command": send_command,
+    }
+    walk = _walk_plan(commands, cache)
+    answer: object = None
+    while True:
+        try:
+            name, args = walk.send(answer)
+        except StopIteration as done:
+            return done.value
+        answer = steps[name](*args)
+
+
+async def execute_plan_async(
+    commands: Sequence[Command],
+    cache: ResultCache,
+    *,
+    supports_batch: Callable[[], Awaitable[bool]],
+    send_batch: Callable[[Sequence[Command]], Awaitable[List[_Response]]],
+    send_candidates: Callable[[Command, List[Optional[str]]], Awaitable[_Response]],
+    send_command: Callable[[Command], Awaitable[_Response]],
+) -> List[_Response]:
+    """:func:`execute_plan` for bridges whose requests are coroutines."""
+
+    steps = {
+        "supports_batch": supports_batch,
+        "send_batch": send_batch,
+        "send_candidates": send_candidates,
+        "send_command": send_command,
+    }
+    walk = _walk_plan(commands, cache)
+    answer: object = None
+    while True:
+        try:
+            name, args = walk.send(answer)
+        except StopIteration as done:
+            return done.value
+        answer = await steps[name](*args)
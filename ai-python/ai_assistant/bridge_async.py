@@ -0,0 +1,255 @@
+"""Asyncio bridge client for callers that run many queries concurrently."""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from http.client import HTTPException
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+from .app_index import ApplicationIndex, shared_index
+from .bridge import (
+    advertises_batch,
+    application_candidates,
+    batch_payload,
+    batch_results,
+    batch_timeout,
+    execute_plan_async,
+)
+from .cache import ResultCache
+from .deadline import Deadline, DeadlineExceeded, LatencyTracker, stage_timeout
+from .schemas import Command
+from .transport import AsyncConnectionPool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_IN_FLIGHT = 8
+
+_HEADERS = {"User-Agent": "JarvisAssistant/1.0"}
+
+
+class AsyncHttpBridge:
+    """Send commands to the C# layer from asyncio code.
+
+    Mirrors :class:`ai_assistant.bridge.HttpBridge`: the same methods (as
+    coroutines), adaptive per-action timeouts bounded by the query
+    :class:`Deadline`, registry name resolution and the ``known_`` alias
+    retry. An :class:`AsyncConnectionPool` keeps up to ``max_in_flight``
+    connections alive and its semaphore caps in-flight requests at the same
+    number, so a burst of queries queues in the client instead of flooding the
+    core. Read-only results are cached in a :class:`ResultCache` as in the
+    synchronous bridge. Create the bridge (or pass a ``pool``) per event loop.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        *,
+        timeout: float = 10.0,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        app_index: Optional[ApplicationIndex] = None,
+        pool: Optional[AsyncConnectionPool] = None,
+        cache: Optional[ResultCache] = None,
+    ) -> None:
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+
+        self._endpoint = endpoint.rstrip("/")
+        self._timeout = timeout
+        self._latency = LatencyTracker(initial=timeout, floor=min(1.0, timeout), ceiling=timeout)
+        self._app_index = app_index or shared_index()
+        self._cache = cache if cache is not None else ResultCache()
+        # Only a pool created here is closed by aclose(); a passed one belongs to the caller.
+        self._owns_pool = pool is None
+        self._pool = pool or AsyncConnectionPool.for_endpoint(
+            self._endpoint, max_size=max_in_flight, timeout=timeout
+        )
+        self._base_path = urlsplit(self._endpoint).path
+        self._supports_batch: Optional[bool] = None
+
+    @property
+    def endpoint(self) -> str:
+        return self._endpoint
+
+    @property
+    def cache(self) -> ResultCache:
+        return self._cache
+
+    async def send_command(
+        self, command: Command, *, deadline: Optional[Deadline] = None
+    ) -> Optional[Dict[str, object]]:
+        command = self._app_index.resolve_command(command)
+        cached = self._cache.get(command)
+        if cached is not None:
+            return cached
+        response = await self._send_candidates(
+            command, application_candidates(command), deadline=deadline
+        )
+        if response is None:
+            logger.error(
+                "All bridge attempts failed for command: %s", json.dumps(command.to_json())
+            )
+        self._cache.store(command, response)
+        return response
+
+    async def send_commands(
+        self, commands: Sequence[Command], *, deadline: Optional[Deadline] = None
+    ) -> List[Optional[Dict[str, object]]]:
+        """Execute an ordered plan, in one request when the core supports it.
+
+        Same contract as :meth:`ai_assistant.bridge.HttpBridge.send_commands`.
+        """
+
+        return await execute_plan_async(
+            [self._app_index.resolve_command(command) for command in commands],
+            self._cache,
+            supports_batch=self.supports_batch,
+            send_batch=lambda batch: self._send_batch(batch, deadline=deadline),
+            send_candidates=lambda command, candidates: self._send_candidates(
+                command, candidates, deadline=deadline
+            ),
+            send_command=lambda command: self.send_command(command, deadline=deadline),
+        )
+
+    async def supports_batch(self) -> bool:
+        """Return ``True`` when ``GET /`` lists a batch endpoint."""
+
+        if self._supports_batch is None:
+            info = await self._perform_request("GET", "/", context="capability check")
+            if info is None:
+                return False
+            self._supports_batch = advertises_batch(info)
+        return self._supports_batch
+
+    async def get_status(self) -> Optional[Dict[str, object]]:
+        """Fetch system status from the C# service."""
+
+        return await self._perform_request("GET", "/system/status", context="status check")
+
+    async def is_available(self) -> bool:
+        """Return ``True`` when the bridge responds to /system/status."""
+
+        status = await self.get_status()
+        if status is None:
+            logger.error(
+                "C# bridge at %s is unreachable. Is the Windows service running?",
+                self._endpoint,
+            )
+            return False
+        return True
+
+    async def aclose(self) -> None:
+        """Close idle pooled connections, unless the pool was passed in."""
+
+        if self._owns_pool:
+            await self._pool.aclose()
+
+    async def __aenter__(self) -> "AsyncHttpBridge":
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        await self.aclose()
+
+    async def _send_batch(
+        self, commands: Sequence[Command], *, deadline: Optional[Deadline]
+    ) -> List[Optional[Dict[str, object]]]:
+        logger.info("Sending batch of %d commands to C# bridge", len(commands))
+        try:
+            timeout = batch_timeout(self._timeout, len(commands), deadline)
+        except DeadlineExceeded as exc:
+            logger.error("Skipping batch bridge call: %s", exc)
+            return [None]
+
+        response = await self._perform_request(
+            "POST",
+            "/action/batch",
+            payload=batch_payload(commands),
+            context="batch call",
+            timeout=timeout,
+        )
+        results = batch_results(response, len(commands))
+        if results is None:
+            self._supports_batch = None
+            return [None]
+        return results
+
+    async def _send_candidates(
+        self,
+        command: Command,
+        candidates: List[Optional[str]],
+        *,
+        deadline: Optional[Deadline],
+    ) -> Optional[Dict[str, object]]:
+        payload_template = command.to_json()
+
+        for candidate in candidates:
+            payload = {
+                **payload_template,
+                "params": {**payload_template.get("params", {}), "application": candidate},
+            }
+            logger.info("Sending command to C# bridge: %s", json.dumps(payload))
+            try:
+                timeout = stage_timeout(self._latency, command.action, deadline)
+            except DeadlineExceeded as exc:
+                logger.error("Skipping bridge call for %s: %s", command.action, exc)
+                return None
+
+            started = time.monotonic()
+            response = await self._perform_request(
+                "POST", "/action/execute", payload=payload, context="bridge call", timeout=timeout
+            )
+            if response is not None:
+                self._latency.observe(command.action, time.monotonic() - started)
+                return response
+            logger.warning("Bridge call with application '%s' failed", candidate)
+
+        return None
+
+    async def _perform_request(
+        self,
+        method: str,
+        path: str,
+        *,
+        payload: Optional[Dict[str, object]] = None,
+        context: str,
+        timeout: Optional[float] = None,
+    ) -> Optional[Dict[str, object]]:
+        headers = dict(_HEADERS)
+        body = None
+        if payload is not None:
+            headers["Content-Type"] = "application/json"
+            body = json.dumps(payload).encode()
+        try:
+            response = await self._pool.request(
+                method,
+                self._base_path + path,
+                body=body,
+                headers=headers,
+                timeout=timeout or self._timeout,
+            )
+        except (HTTPException, OSError) as exc:  # noqa: BLE001
+            logger.error(
+                "C# bridge %s failed (%s). Endpoint: %s", context, exc, self._endpoint
+            )
+            return None
+
+        raw = response.text()
+        logger.debug("%s response: %s", context.capitalize(), raw)
+        if response.status != 200:
+            logger.error(
+                "C# bridge %s returned status %s: %s. Endpoint: %s",
+                context,
+                response.status,
+                raw,
+                self._endpoint,
+            )
+            return None
+        try:
+            return json.loads(raw)
+        except ValueError as exc:
+            logger.error(
+                "C# bridge %s returned invalid JSON (%s). Endpoint: %s", context, exc, self._endpoint
+            )
+            return None
@@ -4,7 +4,9 @@ from __future__ import annotations
 
 import json
 import logging
-from typing import Dict, Optional
+import time
+from http.client import HTTPException
+from typing import Dict, List, Optional, Sequence
 
 try:
     import requests
@@ -13,43 +15,205 @@ except ImportError:
         "The 'requests' library is required. Install it with: pip install requests"
     )
 
+from .bridge import (
+    advertises_batch,
+    application_candidates,
+    batch_payload,
+    batch_results,
+    batch_timeout,
+    execute_plan,
+)
+from .app_index import ApplicationIndex, shared_index
+from .cache import ResultCache
+from .deadline import Deadline, DeadlineExceeded, LatencyTracker, stage_timeout
+from .heartbeat import DEFAULT_HEARTBEAT_SECONDS, PROBE_TIMEOUT_SECONDS, Heartbeat
 from .schemas import Command
+from .transport import UNIX_SCHEME, ConnectionPool, shared_pool
 
 logger = logging.getLogger(__name__)
 
 
+class PooledAdapter(requests.adapters.BaseAdapter):
+    """``requests`` adapter that sends through a shared :class:`ConnectionPool`."""
+
+    def __init__(self, pool: ConnectionPool) -> None:
+        super().__init__()
+        self._pool = pool
+
+    def send(  # type: ignore[override]
+        self, request: requests.PreparedRequest, stream: bool = False, timeout=None, **_: object
+    ) -> requests.Response:
+        if isinstance(timeout, tuple):
+            timeout = max(value for value in timeout if value is not None)
+        body = request.body.encode("utf-8") if isinstance(request.body, str) else request.body
+
+        try:
+            pooled = self._pool.request(
+                request.method or "GET",
+                request.path_url,
+                body=body,
+                headers=dict(request.headers),
+                timeout=timeout,
+            )
+        except TimeoutError as exc:
+            raise requests.exceptions.Timeout(exc, request=request) from exc
+        except (HTTPException, OSError) as exc:
+            raise requests.exceptions.ConnectionError(exc, request=request) from exc
+
+        response = requests.Response()
+        response.status_code = pooled.status
+        response.reason = pooled.reason
+        response.headers = requests.structures.CaseInsensitiveDict(pooled.headers)
+        response._content = pooled.body  # noqa: SLF001
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.url = request.url or ""
+        response.request = request
+        return response
+
+    def close(self) -> None:
+        # The pool is shared or belongs to the caller; see HttpBridge.close.
+        pass
+
+
 class HttpBridge:
-    """Send commands to the C# layer via HTTP using requests library."""
+    """Send commands to the C# layer via HTTP using requests library.
+
+    Per-action timeouts adapt to observed latency (capped by ``timeout``) and
+    are bounded by the query :class:`Deadline` when one is given. HTTP goes
+    through the keep-alive pool shared with :mod:`ai_assistant.bridge`, and
+    application names are resolved against the same :class:`ApplicationIndex`.
+    The result cache and availability heartbeat behave as in
+    :class:`ai_assistant.bridge.HttpBridge`.
+    """
 
-    def __init__(self, endpoint: str, *, timeout: float = 10.0) -> None:
+    def __init__(
+        self,
+        endpoint: str,
+        *,
+        timeout: float = 10.0,
+        pool: Optional[ConnectionPool] = None,
+        app_index: Optional[ApplicationIndex] = None,
+        cache: Optional[ResultCache] = None,
+        heartbeat_interval: Optional[float] = DEFAULT_HEARTBEAT_SECONDS,
+    ) -> None:
         self._endpoint = endpoint.rstrip("/")
+        self._app_index = app_index or shared_index()
+        self._cache = cache if cache is not None else ResultCache()
+        self._heartbeat = (
+            Heartbeat(self._probe, interval=heartbeat_interval)
+            if heartbeat_interval is not None
+            else None
+        )
         self._timeout = timeout
+        self._latency = LatencyTracker(initial=timeout, floor=min(1.0, timeout), ceiling=timeout)
         self._session = requests.Session()
-        # Disable keep-alive to avoid connection issues
-        self._session.headers.update(
-            {
-                "User-Agent": "JarvisAssistant/1.0",
-                "Connection": "close",
-            }
-        )
+        adapter = PooledAdapter(pool or shared_pool(self._endpoint))
+        self._session.mount("http://", adapter)
+        self._session.mount(f"{UNIX_SCHEME}://", adapter)
+        self._session.headers.update({"User-Agent": "JarvisAssistant/1.0"})
         # Disable proxy for localhost connections
         self._session.proxies = {
             'http': None,
             'https': None,
         }
         self._session.trust_env = False
+        self._supports_batch: Optional[bool] = None
 
     @property
     def endpoint(self) -> str:
         return self._endpoint
 
-    def send_command(self, command: Command) -> Optional[Dict[str, object]]:
-        payload_template = command.to_json()
-        application = payload_template.get("params", {}).get("application")
+    @property
+    def cache(self) -> ResultCache:
+        return self._cache
+
+    def send_command(
+        self, command: Command, *, deadline: Optional[Deadline] = None
+    ) -> Optional[Dict[str, object]]:
+        command = self._app_index.resolve_command(command)
+        cached = self._cache.get(command)
+        if cached is not None:
+            return cached
+        response = self._send_candidates(
+            command, application_candidates(command), deadline=deadline
+        )
+        if response is None:
+            logger.error(
+                "All bridge attempts failed for command: %s", json.dumps(command.to_json())
+            )
+        self._cache.store(command, response)
+        return response
+
+    def send_commands(
+        self, commands: Sequence[Command], *, deadline: Optional[Deadline] = None
+    ) -> List[Optional[Dict[str, object]]]:
+        """Execute an ordered plan, in one request when the core supports it.
 
-        candidates = [application]
-        if isinstance(application, str) and application.startswith("known_"):
-            candidates.append(application.removeprefix("known_"))
+        Same contract as :meth:`ai_assistant.bridge.HttpBridge.send_commands`.
+        """
+
+        return execute_plan(
+            [self._app_index.resolve_command(command) for command in commands],
+            self._cache,
+            supports_batch=self.supports_batch,
+            send_batch=lambda batch: self._send_batch(batch, deadline=deadline),
+            send_candidates=lambda command, candidates: self._send_candidates(
+                command, candidates, deadline=deadline
+            ),
+            send_command=lambda command: self.send_command(command, deadline=deadline),
+        )
+
+    def supports_batch(self) -> bool:
+        """Return ``True`` when ``GET /`` lists a batch endpoint."""
+        if self._supports_batch is None:
+            try:
+                response = self._session.get(f"{self._endpoint}/", timeout=self._timeout)
+                response.raise_for_status()
+                info = response.json()
+            except (requests.exceptions.RequestException, ValueError) as exc:
+                logger.warning("C# bridge capability check failed: %s", exc)
+                return False
+            self._supports_batch = advertises_batch(info)
+            logger.info(
+                "C# bridge at %s %s batch execution",
+                self._endpoint,
+                "supports" if self._supports_batch else "does not support",
+            )
+        return self._supports_batch
+
+    def _send_batch(
+        self, commands: Sequence[Command], *, deadline: Optional[Deadline]
+    ) -> List[Optional[Dict[str, object]]]:
+        logger.info("Sending batch of %d commands to C# bridge", len(commands))
+        try:
+            timeout = batch_timeout(self._timeout, len(commands), deadline)
+        except DeadlineExceeded as exc:
+            logger.error("Skipping batch bridge call: %s", exc)
+            return [None]
+
+        try:
+            response = self._session.post(
+                f"{self._endpoint}/action/batch", json=batch_payload(commands), timeout=timeout
+            )
+            response.raise_for_status()
+            results = batch_results(response.json(), len(commands))
+        except (requests.exceptions.RequestException, ValueError) as exc:
+            logger.error("Batch bridge call failed: %s. Endpoint: %s", exc, self._endpoint)
+            results = None
+
+        if results is None:
+            self._supports_batch = None
+            return [None]
+        return results
+
+    def _send_candidates(
+        self,
+        command: Command,
+        candidates: List[Optional[str]],
+        *,
+        deadline: Optional[Deadline],
+    ) -> Optional[Dict[str, object]]:
+        payload_template = command.to_json()
 
         for candidate in candidates:
             payload = {
@@ -58,15 +222,26 @@ class HttpBridge:
             }
             logger.info("Sending command to C# bridge: %s", json.dumps(payload))
             try:
+                timeout = stage_timeout(self._latency, command.action, deadline)
+            except DeadlineExceeded as exc:
+                logger.error("Skipping bridge call for %s: %s", command.action, exc)
+                return None
+
+            try:
+                started = time.monotonic()
                 response = self._session.post(
                     f"{self._endpoint}/action/execute",
                     json=payload,
-                    timeout=self._timeout,
+                    timeout=timeout,
                 )
+                self._report(True)
                 response.raise_for_status()
                 logger.debug("Bridge response: %s", response.text)
+                self._latency.observe(command.action, time.monotonic() - started)
                 return response.json()
             except requests.exceptions.RequestException as exc:
+                if isinstance(exc, requests.exceptions.ConnectionError):
+                    self._report(False)
                 logger.warning(
                     "Bridge call with application '%s' failed: %s. Endpoint: %s",
                     candidate,
@@ -75,15 +250,14 @@ class HttpBridge:
                 )
                 continue
 
-        logger.error("All bridge attempts failed for command: %s", json.dumps(payload_template))
         return None
 
-    def get_status(self) -> Optional[Dict[str, object]]:
+    def get_status(self, *, timeout: Optional[float] = None) -> Optional[Dict[str, object]]:
         """Fetch system status from the C# service."""
         try:
             response = self._session.get(
                 f"{self._endpoint}/system/status",
-                timeout=self._timeout,
+                timeout=timeout or self._timeout,
             )
             response.raise_for_status()
             logger.debug("Status response: %s", response.text)
@@ -95,9 +269,15 @@ class HttpBridge:
             return None
 
     def is_available(self) -> bool:
-        """Return ``True`` when the bridge responds to /system/status."""
-        status = self.get_status()
-        if status is None:
+        """Return ``True`` when the bridge responds to /system/status.
+
+        See :meth:`ai_assistant.bridge.HttpBridge.is_available`.
+        """
+        if self._heartbeat is None:
+            available = self._probe()
+        else:
+            available = self._heartbeat.refresh()
+        if not available:
             logger.error(
                 "C# bridge at %s is unreachable. Is the Windows service running?",
                 self._endpoint,
@@ -106,5 +286,14 @@ class HttpBridge:
         return True
 
     def close(self) -> None:
-        """Close the session."""
+        """Stop the heartbeat and close the session; the connection pool stays open."""
+        if self._heartbeat is not None:
+            self._heartbeat.stop()
         self._session.close()
+
+    def _probe(self) -> bool:
+        return self.get_status(timeout=min(self._timeout, PROBE_TIMEOUT_SECONDS)) is not None
+
+    def _report(self, ok: bool) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.report(ok)
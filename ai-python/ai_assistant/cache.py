@@ -0,0 +1,128 @@
+"""Short-lived cache for the results of read-only bridge actions."""
+
+from __future__ import annotations
+
+import copy
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+from .schemas import Command
+
+logger = logging.getLogger(__name__)
+
+# Seconds a successful result stays valid, per read-only action. CPU and
+# memory figures go stale quickly; the application list only changes when the
+# registry is rescanned.
+DEFAULT_TTLS: Dict[str, float] = {
+    "system_status": 2.0,
+    "list_applications": 60.0,
+}
+
+# Mutating actions and the cached actions whose results they make stale.
+DEFAULT_INVALIDATIONS: Dict[str, Tuple[str, ...]] = {
+    "scan_applications": ("list_applications",),
+}
+
+DEFAULT_MAX_ENTRIES = 256
+
+_CacheKey = Tuple[str, str]
+
+
+class ResultCache:
+    """Remember core responses to idempotent actions for a per-action TTL.
+
+    Only actions listed in ``ttls`` are cached, and only successful responses
+    are stored. Running an action listed in ``invalidations`` drops the
+    cached results of the actions it affects, whether or not it succeeded.
+    Entries are keyed by action and parameters, so ``list_applications`` with
+    different filters are cached separately. Callers get a copy of the stored
+    response and may modify it.
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[Mapping[str, float]] = None,
+        *,
+        invalidations: Optional[Mapping[str, Iterable[str]]] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self._invalidations = {
+            action: tuple(targets)
+            for action, targets in (
+                DEFAULT_INVALIDATIONS if invalidations is None else invalidations
+            ).items()
+        }
+        self._max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[_CacheKey, Tuple[float, Dict[str, object]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, command: Command) -> Optional[Dict[str, object]]:
+        """Return the cached response for ``command`` or ``None``."""
+
+        if command.action not in self._ttls:
+            return None
+        key = _key(command)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            response = entry[1]
+        logger.debug("Serving %s from the result cache", command.action)
+        return copy.deepcopy(response)
+
+    def store(self, command: Command, response: Optional[Dict[str, object]]) -> None:
+        """Record the outcome of ``command``: cache it or invalidate what it changed."""
+
+        stale = self._invalidations.get(command.action)
+        if stale:
+            self.invalidate(*stale)
+
+        ttl = self._ttls.get(command.action)
+        if not ttl or not _succeeded(response):
+            return
+        key = _key(command)
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, copy.deepcopy(response))  # type: ignore[arg-type]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *actions: str) -> None:
+        """Drop cached results of ``actions``, or of every action when none are given."""
+
+        with self._lock:
+            if not actions:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] in actions]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def _key(command: Command) -> _CacheKey:
+    return command.action, json.dumps(command.params, sort_keys=True, default=str)
+
+
+def _succeeded(response: Optional[Dict[str, object]]) -> bool:
+    return (
+        isinstance(response, dict)
+        and response.get("status") == "ok"
+        and not response.get("error")
+    )
@@ -0,0 +1,213 @@
+"""Streaming decoding of capture_window/screenshot responses.
+
+The core returns screenshots as a base64 PNG inside the JSON result. Parsing
+such a body with ``json.loads`` and then ``base64.b64decode`` holds the raw
+body, the decoded text, the base64 string and the PNG in memory at the same
+time. :class:`CaptureDecoder` instead scans the body as it arrives, decodes
+the ``image`` string in fixed-size pieces straight into a sink, and keeps
+only the small remainder of the JSON for the metadata.
+"""
+
+from __future__ import annotations
+
+import binascii
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Optional, Union
+
+IMAGE_FIELD = b"image"
+
+CaptureDestination = Union[str, Path, BinaryIO, bytearray, memoryview]
+
+# System.Text.Json escapes "+" as \u002B by default, and "/" may arrive as "\/".
+_ESCAPE_PATTERN = re.compile(rb"\\u([0-9a-fA-F]{4})|\\(.)", re.DOTALL)
+# Checked before decoding: a2b_base64 skips stray characters, and its
+# strict_mode keyword only exists from Python 3.11 on.
+_BASE64_PATTERN = re.compile(rb"[A-Za-z0-9+/]*={0,2}")
+
+
+@dataclass
+class CaptureResult:
+    """Metadata of a capture response whose image went to a sink."""
+
+    status: Optional[str]
+    error: Optional[str]
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    image_bytes: int = 0
+    path: Optional[Path] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok" and self.image_bytes > 0
+
+
+class CaptureDecoder:
+    """Incremental JSON scanner that diverts the ``image`` value to ``write``.
+
+    Feed the response body in chunks of any size. Everything except the image
+    string is kept (a few hundred bytes for a capture result); the image is
+    unescaped and base64-decoded on the fly, with at most one chunk plus three
+    base64 characters buffered.
+    """
+
+    def __init__(self, write: Callable[[bytes], object]) -> None:
+        self._write = write
+        self._skeleton = bytearray()
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._last_string: Optional[bytes] = None
+        self._value_key: Optional[bytes] = None
+        self._in_image = False
+        self._pending = b""
+        self.image_bytes = 0
+
+    def feed(self, chunk: bytes) -> None:
+        position = 0
+        size = len(chunk)
+        while position < size:
+            if self._in_image:
+                position = self._feed_image(chunk, position)
+                continue
+
+            byte = chunk[position : position + 1]
+            position += 1
+            if self._in_string:
+                self._skeleton += byte
+                if self._escaped:
+                    self._escaped = False
+                elif byte == b"\\":
+                    self._escaped = True
+                elif byte == b'"':
+                    self._in_string = False
+                    self._last_string = bytes(self._skeleton[self._string_start + 1 : -1])
+                    self._value_key = None
+                continue
+
+            if byte == b'"':
+                if self._value_key == IMAGE_FIELD:
+                    self._in_image = True
+                    self._skeleton += b"null"
+                    continue
+                self._in_string = True
+                self._string_start = len(self._skeleton)
+            elif byte == b":":
+                self._value_key = self._last_string
+            elif byte in (b",", b"{", b"}", b"[", b"]"):
+                self._value_key = None
+            self._skeleton += byte
+
+    def close(self) -> Dict[str, Any]:
+        """Finish decoding and return the parsed JSON without the image."""
+
+        if self._in_image or self._in_string:
+            raise ValueError("Capture response ended inside a string")
+        document = json.loads(bytes(self._skeleton))
+        if not isinstance(document, dict):
+            raise ValueError("Capture response is not a JSON object")
+        return document
+
+    def _feed_image(self, chunk: bytes, position: int) -> int:
+        end = chunk.find(b'"', position)
+        stop = len(chunk) if end == -1 else end
+        text = self._pending + chunk[position:stop]
+
+        tail = b""
+        backslash = text.rfind(b"\\", max(0, len(text) - 5))
+        if backslash != -1 and end == -1:
+            # Keep a possibly incomplete escape for the next chunk.
+            text, tail = text[:backslash], text[backslash:]
+        if b"\\" in text:
+            text = _ESCAPE_PATTERN.sub(_unescape, text)
+
+        usable = len(text) if end != -1 else len(text) - len(text) % 4
+        if usable:
+            data = text[:usable]
+            if _BASE64_PATTERN.fullmatch(data) is None:
+                raise ValueError("Invalid base64 image data: unexpected character")
+            try:
+                decoded = binascii.a2b_base64(data)
+            except binascii.Error as exc:
+                raise ValueError(f"Invalid base64 image data: {exc}") from exc
+            self._write(decoded)
+            self.image_bytes += len(decoded)
+        self._pending = text[usable:] + tail
+
+        if end == -1:
+            return len(chunk)
+        self._in_image = False
+        self._value_key = None
+        return end + 1
+
+
+def read_capture(chunks: Iterable[bytes], destination: CaptureDestination) -> CaptureResult:
+    """Decode a capture response body from ``chunks`` into ``destination``.
+
+    ``destination`` is a file path (written via a temporary ``.part`` file and
+    only kept when an image arrived), a writable binary file object, or a
+    preallocated ``bytearray``/``memoryview`` that must be large enough.
+    """
+
+    if isinstance(destination, (str, Path)):
+        return _read_capture_to_path(chunks, Path(destination))
+    if isinstance(destination, (bytearray, memoryview)):
+        sink = _BufferSink(destination)
+        return _decode(chunks, sink.write)
+    return _decode(chunks, destination.write)
+
+
+def _read_capture_to_path(chunks: Iterable[bytes], path: Path) -> CaptureResult:
+    partial = path.with_name(path.name + ".part")
+    try:
+        with partial.open("wb") as handle:
+            result = _decode(chunks, handle.write)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+
+    if result.image_bytes:
+        os.replace(partial, path)
+        result.path = path
+    else:
+        partial.unlink(missing_ok=True)
+    return result
+
+
+def _decode(chunks: Iterable[bytes], write: Callable[[bytes], object]) -> CaptureResult:
+    decoder = CaptureDecoder(write)
+    for chunk in chunks:
+        decoder.feed(chunk)
+    document = decoder.close()
+
+    result = document.get("result")
+    metadata: Dict[str, Any] = {}
+    if isinstance(result, dict):
+        metadata = {key: value for key, value in result.items() if key != "image"}
+    return CaptureResult(
+        status=document.get("status"),
+        error=document.get("error"),
+        metadata=metadata,
+        image_bytes=decoder.image_bytes,
+    )
+
+
+class _BufferSink:
+    def __init__(self, buffer: Union[bytearray, memoryview]) -> None:
+        self._view = memoryview(buffer).cast("B")
+        self._offset = 0
+
+    def write(self, data: bytes) -> None:
+        end = self._offset + len(data)
+        if end > len(self._view):
+            raise ValueError(f"Capture buffer of {len(self._view)} bytes is too small")
+        self._view[self._offset : end] = data
+        self._offset = end
+
+
+def _unescape(match: "re.Match[bytes]") -> bytes:
+    if match.group(1) is not None:
+        return bytes([int(match.group(1), 16)])
+    return match.group(2)
@@ -0,0 +1,139 @@
+"""Split long recordings at pauses and transcribe the pieces concurrently."""
+
+from __future__ import annotations
+
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Sequence
+
+import numpy as np
+
+from .audio import SAMPLE_WIDTH, PcmBuffer
+from .vad import DEFAULT_VAD, VadConfig, frame_energy_db
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SEGMENT_SECONDS = 15.0
+DEFAULT_WORKERS = 4
+# Cuts are placed in the quietest stretch of this many seconds before the limit.
+SEARCH_SECONDS = 4.0
+# Length of the quiet stretch looked for, and the overlap used without one.
+PAUSE_SECONDS = 0.2
+OVERLAP_SECONDS = 1.0
+# Longest run of repeated words removed where two overlapping segments meet.
+MAX_OVERLAP_WORDS = 8
+
+
+@dataclass(frozen=True)
+class Segment:
+    start: int
+    end: int
+    overlaps_previous: bool = False
+
+
+def split_segments(
+    samples: np.ndarray,
+    *,
+    sample_rate: int,
+    max_seconds: float = DEFAULT_SEGMENT_SECONDS,
+    config: VadConfig = DEFAULT_VAD,
+) -> List[Segment]:
+    """Cut ``samples`` into segments of at most ``max_seconds``.
+
+    Each cut goes into the quietest ``PAUSE_SECONDS`` within the last
+    ``SEARCH_SECONDS`` of the segment. A stretch counts as a pause when it is
+    within ``config.extend_db`` of the noise floor and ``config.margin_db``
+    below loud speech. Without one (e.g. in fast speech), the segment runs to
+    the limit, the next one starts ``OVERLAP_SECONDS`` earlier and
+    :func:`stitch` removes the words heard twice.
+    """
+
+    total = len(samples)
+    limit = int(max_seconds * sample_rate)
+    if total <= limit:
+        return [Segment(0, total)]
+
+    frame = max(1, int(round(config.frame_seconds * sample_rate)))
+    energy = frame_energy_db(samples, frame)
+    width = max(1, int(round(PAUSE_SECONDS / config.frame_seconds)))
+    # smooth[i] is the mean energy of frames i .. i + width - 1.
+    smooth = np.convolve(energy, np.ones(width) / width, mode="valid")
+    floor, loud = np.percentile(energy, [config.floor_percentile, 100 - config.floor_percentile])
+    quiet_level = min(floor + config.extend_db, loud - config.margin_db)
+    search = int(SEARCH_SECONDS * sample_rate) // frame
+    overlap = int(OVERLAP_SECONDS * sample_rate)
+
+    segments: List[Segment] = []
+    start, overlapped = 0, False
+    while total - start > limit:
+        last = min((start + limit) // frame - width, len(smooth) - 1)
+        first = max(start // frame + 1, last - search)
+        best = first + int(np.argmin(smooth[first : last + 1])) if first <= last else -1
+        if best >= 0 and smooth[best] <= quiet_level:
+            cut = (best + width // 2) * frame
+            segments.append(Segment(start, cut, overlapped))
+            start, overlapped = cut, False
+        else:
+            segments.append(Segment(start, start + limit, overlapped))
+            start, overlapped = start + max(1, limit - overlap), True
+    segments.append(Segment(start, total, overlapped))
+    return segments
+
+
+def _words(text: str) -> List[str]:
+    return re.findall(r"\w+", text.lower())
+
+
+def stitch(texts: Sequence[str], segments: Sequence[Segment]) -> str:
+    """Join segment transcripts, dropping words repeated across overlaps."""
+
+    parts: List[str] = []
+    for text, segment in zip(texts, segments):
+        text = text.strip()
+        if segment.overlaps_previous and parts and text:
+            previous, current = _words(parts[-1]), _words(text)
+            for count in range(min(MAX_OVERLAP_WORDS, len(previous), len(current)), 0, -1):
+                if previous[-count:] == current[:count]:
+                    text = _drop_words(text, count)
+                    break
+        if text:
+            parts.append(text)
+    return " ".join(parts)
+
+
+def _drop_words(text: str, count: int) -> str:
+    matches = list(re.finditer(r"\w+", text))
+    rest = text[matches[count - 1].end() :]
+    return rest.lstrip(" ,.;:!?-—").strip()
+
+
+def transcribe_segments(
+    audio: PcmBuffer,
+    segments: Sequence[Segment],
+    transcribe: Callable[[PcmBuffer], str],
+    *,
+    offset: int = 0,
+    max_workers: int = DEFAULT_WORKERS,
+) -> str:
+    """Transcribe ``segments`` of ``audio`` (shifted by ``offset``) concurrently.
+
+    Every segment gets its own copy of the samples, so backends that frame
+    their upload in place cannot overwrite a neighbour still in flight.
+    """
+
+    pcm = audio.pcm()
+    pieces = [
+        PcmBuffer.from_chunks(
+            [pcm[(offset + segment.start) * SAMPLE_WIDTH : (offset + segment.end) * SAMPLE_WIDTH]],
+            sample_rate=audio.sample_rate,
+        )
+        for segment in segments
+    ]
+    logger.info("Transcribing %.1f s of audio as %d segments", audio.duration, len(pieces))
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(pieces))), thread_name_prefix="segment-stt"
+    ) as executor:
+        texts = list(executor.map(transcribe, pieces))
+    return stitch(texts, segments)
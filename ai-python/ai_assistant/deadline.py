@@ -0,0 +1,258 @@
+"""Per-query deadlines, cancellation and latency-based adaptive timeouts."""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, Set, TypeVar
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUERY_BUDGET_SECONDS = 30.0
+
+T = TypeVar("T")
+
+# Blocking LLM/transcription calls run here so a cancelled query can stop
+# waiting for them. A running call cannot be interrupted: an abandoned one
+# keeps its worker until it returns, which its own request timeout bounds.
+# At most CALL_WORKERS calls, abandoned or not, run at once; further calls
+# queue, and Deadline.run stops waiting for them when the budget runs out.
+CALL_WORKERS = 8
+_CALL_EXECUTOR = ThreadPoolExecutor(max_workers=CALL_WORKERS, thread_name_prefix="query-call")
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when the query budget ran out before or during a stage."""
+
+
+class QueryCancelled(RuntimeError):
+    """Raised when a query was superseded by a newer one from the same session."""
+
+
+class Deadline:
+    """Absolute point in time by which a whole query must finish.
+
+    One instance is created per query and handed to every stage. Stages ask
+    for :meth:`timeout` instead of using their own fixed timeouts, so a slow
+    LLM call leaves less time for the bridge rather than extending the query.
+
+    The deadline doubles as the query's cancellation handle: after
+    :meth:`cancel` every later :meth:`timeout` raises :class:`QueryCancelled`,
+    so no further bridge command is dispatched, and calls waiting in
+    :meth:`run` return immediately.
+    """
+
+    def __init__(
+        self, budget_seconds: float, *, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self._clock = clock
+        self._budget = budget_seconds
+        self._expires_at = clock() + budget_seconds
+        self._cancelled = threading.Event()
+        self._waiters: Set[threading.Event] = set()
+        self._lock = threading.Lock()
+        self.abandoned_calls = 0
+        self.skipped_dispatches = 0
+
+    @classmethod
+    def from_env(cls) -> "Deadline":
+        """Create a deadline from ``JARVIS_QUERY_BUDGET_SECONDS`` (30 s by default)."""
+
+        return cls(default_query_budget())
+
+    @property
+    def budget(self) -> float:
+        return self._budget
+
+    def remaining(self) -> float:
+        return max(0.0, self._expires_at - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        """Abort the query: wake up pending :meth:`run` calls and block new stages."""
+
+        with self._lock:
+            self._cancelled.set()
+            waiters = list(self._waiters)
+        for waiter in waiters:
+            waiter.set()
+
+    def check(self) -> None:
+        if self.cancelled:
+            raise QueryCancelled("Query was superseded by a newer one")
+
+    def allows(self, seconds: float) -> bool:
+        """Return ``True`` when at least ``seconds`` of budget are left."""
+
+        return not self.cancelled and self.remaining() >= seconds
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """Return the timeout for the next stage, bounded by ``cap``.
+
+        Raises :class:`QueryCancelled` after :meth:`cancel` and
+        :class:`DeadlineExceeded` when nothing is left of the budget.
+        """
+
+        self.check()
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Query budget of {self._budget:.1f}s exhausted")
+        return remaining if cap is None else min(cap, remaining)
+
+    def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a blocking call that is abandoned once the query is cancelled or expires.
+
+        Raises :class:`QueryCancelled` or :class:`DeadlineExceeded` when the
+        call is abandoned; it then finishes in the background.
+        """
+
+        self.check()
+        waiter = threading.Event()
+        with self._lock:
+            self._waiters.add(waiter)
+        try:
+            future = _CALL_EXECUTOR.submit(func, *args, **kwargs)
+            future.add_done_callback(lambda _: waiter.set())
+            if self.cancelled:
+                waiter.set()
+            waiter.wait(self.remaining())
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+        if not future.done():
+            future.cancel()
+            with self._lock:
+                self.abandoned_calls += 1
+            if self.cancelled:
+                raise QueryCancelled("Query was superseded while a call was in flight")
+            raise DeadlineExceeded(f"Query budget of {self._budget:.1f}s ran out while a call was in flight")
+        return future.result()
+
+
+class SessionRegistry:
+    """Track the in-flight query of each session and cancel superseded ones."""
+
+    def __init__(self) -> None:
+        self._active: Dict[str, Deadline] = {}
+        self._lock = threading.Lock()
+        self.cancelled_queries = 0
+        self.abandoned_calls = 0
+        self.skipped_dispatches = 0
+
+    @contextmanager
+    def track(self, session_id: Optional[str], deadline: Deadline) -> Iterator[Deadline]:
+        """Register ``deadline`` for ``session_id``, cancelling the previous query."""
+
+        if session_id is None:
+            yield deadline
+            return
+
+        with self._lock:
+            previous = self._active.get(session_id)
+            self._active[session_id] = deadline
+        if previous is not None and previous is not deadline:
+            logger.info("New query for session %s supersedes the one in flight", session_id)
+            previous.cancel()
+
+        try:
+            yield deadline
+        finally:
+            with self._lock:
+                if self._active.get(session_id) is deadline:
+                    del self._active[session_id]
+
+    def record_cancelled(self, deadline: Deadline) -> None:
+        with self._lock:
+            self.cancelled_queries += 1
+            self.abandoned_calls += deadline.abandoned_calls
+            self.skipped_dispatches += deadline.skipped_dispatches
+
+
+SESSIONS = SessionRegistry()
+
+
+def default_query_budget() -> float:
+    raw_value = os.getenv("JARVIS_QUERY_BUDGET_SECONDS")
+    if raw_value:
+        try:
+            return float(raw_value)
+        except ValueError:
+            logger.warning("Ignoring invalid JARVIS_QUERY_BUDGET_SECONDS=%s", raw_value)
+    return DEFAULT_QUERY_BUDGET_SECONDS
+
+
+class LatencyTracker:
+    """Derive per-key timeouts from observed latency percentiles.
+
+    Until ``min_samples`` latencies are recorded for a key the ``initial``
+    timeout is used. Afterwards the timeout is ``quantile`` latency times
+    ``multiplier``, clamped to ``[floor, ceiling]``.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial: float,
+        floor: float,
+        ceiling: float,
+        quantile: float = 0.95,
+        multiplier: float = 2.0,
+        window: int = 100,
+        min_samples: int = 10,
+    ) -> None:
+        self._initial = initial
+        self._floor = floor
+        self._ceiling = ceiling
+        self._quantile = quantile
+        self._multiplier = multiplier
+        self._window = window
+        self._min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, key: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self._window)
+            samples.append(seconds)
+
+    def percentile(self, key: str, quantile: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, math.ceil(quantile * len(samples)) - 1))
+        return samples[index]
+
+    def timeout(self, key: str) -> float:
+        with self._lock:
+            count = len(self._samples.get(key, ()))
+        if count < self._min_samples:
+            return self._initial
+
+        observed = self.percentile(key, self._quantile) or self._initial
+        return max(self._floor, min(self._ceiling, observed * self._multiplier))
+
+
+def stage_timeout(
+    tracker: LatencyTracker, key: str, deadline: Optional[Deadline] = None
+) -> float:
+    """Combine the adaptive timeout for ``key`` with the query deadline."""
+
+    adaptive = tracker.timeout(key)
+    return deadline.timeout(adaptive) if deadline is not None else adaptive
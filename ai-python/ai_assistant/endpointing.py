@@ -0,0 +1,212 @@
+"""Decide when a spoken command has ended, from a live stream of audio blocks."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+
+from .audio import SAMPLE_RATE
+from .vad import frame_energy_db
+
+
+@dataclass(frozen=True)
+class EndpointConfig:
+    """Tuning for :class:`Endpointer`.
+
+    The noise floor follows the quietest recent frames: it drops at once to a
+    quieter frame and rises by at most ``floor_rise_db`` per second, so speech
+    does not lift it while a louder room does within seconds. A frame is
+    speech when it is ``margin_db`` above the floor and above
+    ``min_level_db``. Unless ``initial_floor_db`` is given, the floor starts
+    at the quietest frame of the first block.
+
+    The trailing silence that ends a command starts at ``min_silence`` and
+    grows to ``gap_factor`` times the longest pause heard inside the command
+    so far, up to ``max_silence``: a short command ends quickly, while a
+    speaker who already paused between phrases gets that much time again.
+    """
+
+    frame_seconds: float = 0.02
+    margin_db: float = 8.0
+    min_level_db: float = -60.0
+    floor_rise_db: float = 3.0
+    initial_floor_db: Optional[float] = None
+    min_speech_frames: int = 3
+    min_silence: float = 0.8
+    max_silence: float = 1.0
+    gap_factor: float = 1.5
+
+
+DEFAULT_ENDPOINT = EndpointConfig()
+
+
+def track_floor(energy_db: np.ndarray, floor_db: float, rise_db: float) -> np.ndarray:
+    """Noise floor after each frame, starting from ``floor_db``.
+
+    A leaky minimum: ``floor[n] = min(energy[n], floor[n - 1] + rise_db)``,
+    i.e. the minimum over ``k <= n`` of ``energy[k] + rise_db * (n - k)``,
+    computed without a Python loop.
+    """
+
+    steps = np.arange(1, len(energy_db) + 1) * rise_db
+    return np.minimum(floor_db + steps, np.minimum.accumulate(energy_db - steps) + steps)
+
+
+@dataclass
+class EndpointState:
+    speech_started: bool = False
+    # Sample index just after the last speech frame.
+    speech_end: int = 0
+    # Trailing silence, in seconds, that currently ends the command.
+    silence_window: float = DEFAULT_ENDPOINT.min_silence
+    done: bool = False
+    gaps: List[float] = field(default_factory=list)
+
+
+class Endpointer:
+    """Track the noise floor and speech in 16 kHz int16 blocks.
+
+    Feed every captured block to :meth:`process`; it returns whether the
+    block contained speech. :attr:`state` tells whether the command is over.
+    Energy and the floor are computed for all frames of a block at once;
+    samples that do not fill a whole frame are carried over to the next
+    block.
+
+    When the recording starts in the middle of speech, the first floor
+    estimate is the speech itself. Until speech has been found, the frames
+    heard so far are therefore judged again whenever the floor has come down
+    far enough below the loudest of them.
+    """
+
+    def __init__(
+        self, config: EndpointConfig = DEFAULT_ENDPOINT, *, sample_rate: int = SAMPLE_RATE
+    ) -> None:
+        self.config = config
+        self.sample_rate = sample_rate
+        self.frame_size = max(1, int(round(config.frame_seconds * sample_rate)))
+        self.floor_db: Optional[float] = config.initial_floor_db
+        self.state = EndpointState(silence_window=config.min_silence)
+        self._position = 0  # samples consumed into whole frames
+        self._pending = np.empty(0, dtype=np.int16)
+        self._run = 0  # consecutive speech frames
+        self._silent_frames = 0
+        self._lead: List[np.ndarray] = []  # frame energy before speech started
+        self._lead_peak = -np.inf
+
+    def process(self, block: np.ndarray) -> bool:
+        """Consume ``block``; return ``True`` when it contained speech."""
+
+        samples = block.reshape(-1)
+        if self._pending.size:
+            samples = np.concatenate((self._pending, samples))
+        count = len(samples) // self.frame_size
+        self._pending = samples[count * self.frame_size :].copy()
+        if count == 0:
+            return False
+
+        config = self.config
+        energy = frame_energy_db(samples[: count * self.frame_size], self.frame_size)
+        if self.floor_db is None:
+            self.floor_db = float(energy.min())
+        floors = track_floor(energy, self.floor_db, config.floor_rise_db * config.frame_seconds)
+        # Judge each frame against the floor before that frame.
+        before = np.concatenate(([self.floor_db], floors[:-1]))
+        self.floor_db = float(floors[-1])
+        voiced = energy > np.maximum(before + config.margin_db, config.min_level_db)
+
+        spoke = self._advance(voiced)
+        self._position += count * self.frame_size
+        if self.state.speech_started:
+            self._lead = []
+        else:
+            self._lead.append(energy)
+            self._lead_peak = max(self._lead_peak, float(energy.max()))
+            if self._lead_peak > self.floor_db + config.margin_db:
+                spoke = self._recheck_lead(count)
+        return spoke
+
+    def _advance(self, voiced: np.ndarray) -> bool:
+        config = self.config
+        state = self.state
+        spoke = False
+        frame_seconds = config.frame_seconds
+        for offset, is_voiced in enumerate(voiced):
+            if is_voiced:
+                self._run += 1
+                if self._run >= config.min_speech_frames:
+                    if state.speech_started and self._silent_frames:
+                        self._record_gap(self._silent_frames * frame_seconds)
+                    state.speech_started = True
+                    state.speech_end = self._position + (offset + 1) * self.frame_size
+                    self._silent_frames = 0
+                    spoke = True
+            else:
+                self._run = 0
+                if state.speech_started:
+                    self._silent_frames += 1
+                    if self._silent_frames * frame_seconds >= state.silence_window:
+                        state.done = True
+        return spoke
+
+    def _recheck_lead(self, block_frames: int) -> bool:
+        config = self.config
+        energy = np.concatenate(self._lead)
+        voiced = energy > max(self.floor_db + config.margin_db, config.min_level_db)
+        width = config.min_speech_frames
+        runs = np.flatnonzero(np.convolve(voiced, np.ones(width), mode="valid") >= width)
+        if not runs.size:
+            return False
+        end = int(runs[-1]) + width
+        silent = len(voiced) - end
+        state = self.state
+        state.speech_started = True
+        state.speech_end = self._position - silent * self.frame_size
+        self._silent_frames = silent
+        self._run = 0 if silent else width
+        if silent * config.frame_seconds >= state.silence_window:
+            state.done = True
+        self._lead = []
+        return silent < block_frames
+
+    def _record_gap(self, seconds: float) -> None:
+        config = self.config
+        state = self.state
+        state.gaps.append(seconds)
+        state.silence_window = float(
+            np.clip(config.gap_factor * max(state.gaps), config.min_silence, config.max_silence)
+        )
+
+
+class PeakThreshold:
+    """The fixed endpointing rule: speech is any block whose peak reaches
+    ``threshold``, and ``silence_seconds`` of quieter blocks end the command.
+
+    It offers the same :meth:`process` and :attr:`state` as :class:`Endpointer`.
+    """
+
+    def __init__(
+        self, threshold: float, silence_seconds: float, *, sample_rate: int = SAMPLE_RATE
+    ) -> None:
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.state = EndpointState(silence_window=silence_seconds)
+        self._position = 0
+        self._silent = 0
+
+    def process(self, block: np.ndarray) -> bool:
+        """Consume ``block``; return ``True`` when its peak reached the threshold."""
+
+        samples = block.reshape(-1)
+        self._position += len(samples)
+        if len(samples) and max(int(samples.max()), -int(samples.min())) >= self.threshold:
+            self.state.speech_started = True
+            self.state.speech_end = self._position
+            self._silent = 0
+            return True
+        if self.state.speech_started:
+            self._silent += len(samples)
+            if self._silent >= self.state.silence_window * self.sample_rate:
+                self.state.done = True
+        return False
@@ -0,0 +1,28 @@
+"""JSON Lines output for pipeline events consumed by the GUI."""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+from typing import Any, Dict, Optional, TextIO
+
+_TRUTHY = {"1", "true", "yes", "on"}
+
+
+def event_stream_enabled() -> bool:
+    """Return ``True`` when ``JARVIS_EVENT_STREAM`` asks for one JSON line per event."""
+
+    return os.getenv("JARVIS_EVENT_STREAM", "").strip().lower() in _TRUTHY
+
+
+def serialize(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def emit_event(event: Dict[str, Any], *, stream: Optional[TextIO] = None) -> None:
+    """Write ``event`` as a single JSON line and flush so readers see it at once."""
+
+    target = stream or sys.stdout
+    target.write(serialize(event) + "\n")
+    target.flush()
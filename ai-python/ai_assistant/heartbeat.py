@@ -0,0 +1,136 @@
+"""Background health checks that keep bridge availability current."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEARTBEAT_SECONDS = 5.0
+MAX_BACKOFF_SECONDS = 60.0
+# Status probes should answer at once; a slow one is as good as none.
+PROBE_TIMEOUT_SECONDS = 2.0
+
+
+class Heartbeat:
+    """Run ``probe`` on a daemon thread and remember whether it succeeded.
+
+    :meth:`start` runs the first probe in the caller's thread, so
+    :attr:`available` is known as soon as it returns; after that the thread
+    probes every ``interval`` seconds and callers only read the stored state.
+    Real traffic counts as well: :meth:`report` records the outcome of a
+    request, and the thread skips its probe while reports keep arriving.
+    While the probe fails the interval doubles, up to ``max_backoff``, so a
+    stopped core is not polled (and logged) every few seconds. Because of
+    that, a stored "down" can be up to ``max_backoff`` seconds out of date;
+    :meth:`refresh` checks again instead of trusting it.
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[], bool],
+        *,
+        interval: float = DEFAULT_HEARTBEAT_SECONDS,
+        max_backoff: float = MAX_BACKOFF_SECONDS,
+        name: str = "bridge-heartbeat",
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self._probe = probe
+        self._interval = interval
+        self._max_backoff = max(interval, max_backoff)
+        self._name = name
+        self._clock = clock
+        self._available: Optional[bool] = None
+        self._updated_at: Optional[float] = None
+        self._failures = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.probes = 0
+
+    @property
+    def available(self) -> Optional[bool]:
+        """Last known state, or ``None`` before the first probe."""
+
+        return self._available
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "Heartbeat":
+        """Probe once and start the background thread; later calls do nothing."""
+
+        with self._lock:
+            if self._thread is not None:
+                return self
+            self._stop.clear()
+            self._check()
+            self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        self._stop.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(5)
+
+    def refresh(self) -> bool:
+        """Return the state, probing now unless the core is known to be up.
+
+        A successful probe also resets the background thread's backoff.
+        """
+
+        if self._thread is None:
+            return bool(self.start().available)
+        if not self._available:
+            self._check()
+        return bool(self._available)
+
+    def report(self, ok: bool) -> None:
+        """Record the outcome of a request made outside the heartbeat."""
+
+        self._update(ok)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._next_delay()):
+            updated_at = self._updated_at
+            if (
+                self._available
+                and updated_at is not None
+                and self._clock() - updated_at < self._interval
+            ):
+                continue
+            self._check()
+
+    def _next_delay(self) -> float:
+        if self._failures == 0:
+            return self._interval
+        return min(self._interval * 2 ** (self._failures - 1), self._max_backoff)
+
+    def _check(self) -> None:
+        self.probes += 1
+        try:
+            ok = bool(self._probe())
+        except Exception as exc:  # noqa: BLE001
+            logger.debug("Heartbeat probe raised: %s", exc)
+            ok = False
+        self._update(ok)
+
+    def _update(self, ok: bool) -> None:
+        previous = self._available
+        self._available = ok
+        self._updated_at = self._clock()
+        self._failures = 0 if ok else self._failures + 1
+        if previous is not None and previous != ok:
+            if ok:
+                logger.info("C# bridge is reachable again")
+            else:
+                logger.warning("C# bridge stopped responding")
@@ -0,0 +1,124 @@
+"""Transcribe a recording segment by segment while the user is still speaking."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional
+
+from .audio import SAMPLE_WIDTH, BytesLike, PcmBuffer
+from .speech import transcribe_stream
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAUSE_SECONDS = 0.4
+DEFAULT_MIN_SEGMENT_SECONDS = 1.0
+
+
+@dataclass
+class Segment:
+    start: int
+    end: int
+    future: "Future[str]"
+
+
+class IncrementalTranscriber:
+    """Send each finished phrase for transcription as soon as a pause follows it.
+
+    The recorder calls :meth:`observe` after every captured block, saying
+    whether the block contained speech. Once ``pause_seconds`` of silence
+    follow at least ``min_segment_seconds`` of new audio, that audio is
+    transcribed in the background and recording goes on. :meth:`finish`
+    then only has to transcribe what was said after the last pause.
+
+    Segments are transcribed one at a time, in order, by a single worker.
+    If any of them fails, :meth:`finish` transcribes the whole recording in
+    one request instead.
+    """
+
+    def __init__(
+        self,
+        transcribe: Callable[[Iterable[BytesLike]], str] = transcribe_stream,
+        *,
+        pause_seconds: float = DEFAULT_PAUSE_SECONDS,
+        min_segment_seconds: float = DEFAULT_MIN_SEGMENT_SECONDS,
+        on_partial: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        self._transcribe = transcribe
+        self.pause_seconds = pause_seconds
+        self.min_segment_seconds = min_segment_seconds
+        self._on_partial = on_partial
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="incremental-stt")
+        self._lock = threading.Lock()
+        self.segments: List[Segment] = []
+        self._committed = 0
+        self._silent_samples = 0
+        self._speech_pending = False
+
+    @property
+    def partial(self) -> str:
+        """Text of the segments transcribed so far, in order."""
+
+        texts = []
+        for segment in self.segments:
+            if not segment.future.done() or segment.future.exception() is not None:
+                break
+            texts.append(segment.future.result())
+        return _join(texts)
+
+    def observe(self, audio: PcmBuffer, speaking: bool, block_samples: int) -> None:
+        """Account for the latest ``block_samples`` appended to ``audio``."""
+
+        if speaking:
+            self._speech_pending = True
+            self._silent_samples = 0
+            return
+        self._silent_samples += block_samples
+        if (
+            self._speech_pending
+            and self._silent_samples >= self.pause_seconds * audio.sample_rate
+            and audio.sample_count - self._committed >= self.min_segment_seconds * audio.sample_rate
+        ):
+            self._submit(audio, audio.sample_count)
+            self._speech_pending = False
+
+    def finish(self, audio: PcmBuffer) -> str:
+        """Transcribe the rest of ``audio`` and return the full transcript."""
+
+        try:
+            if self._speech_pending or not self.segments:
+                self._submit(audio, audio.sample_count)
+            texts = [segment.future.result() for segment in self.segments]
+        except (RuntimeError, ValueError) as exc:
+            logger.warning("Incremental transcription failed, transcribing in one request: %s", exc)
+            return self._transcribe(audio)
+        finally:
+            self._executor.shutdown(wait=False)
+
+        logger.info("Transcribed the recording in %d segments", len(self.segments))
+        return _join(texts)
+
+    def _submit(self, audio: PcmBuffer, end: int) -> None:
+        start = self._committed
+        if end <= start:
+            return
+        # Copy the segment: transcription may frame its upload in place, which
+        # would overwrite samples of a neighbouring segment still in flight.
+        pcm = bytes(audio.pcm()[start * SAMPLE_WIDTH : end * SAMPLE_WIDTH])
+        future = self._executor.submit(self._transcribe, [pcm])
+        if self._on_partial is not None:
+            future.add_done_callback(self._report_partial)
+        self.segments.append(Segment(start, end, future))
+        self._committed = end
+        logger.debug("Transcribing segment %d:%d in the background", start, end)
+
+    def _report_partial(self, future: "Future[str]") -> None:
+        if future.exception() is None:
+            with self._lock:
+                self._on_partial(self.partial)
+
+
+def _join(texts: Iterable[str]) -> str:
+    return " ".join(text.strip() for text in texts if text and text.strip())
@@ -0,0 +1,247 @@
+"""Spot the wake word with MFCC features and template matching.
+
+A handful of recordings of the wake word are enrolled as templates.
+:meth:`KeywordSpotter.detect` looks for the best match of any template
+anywhere in a window of audio with subsequence dynamic time warping (DTW).
+Everything is NumPy and costs a few milliseconds per window, so it can run in
+front of Whisper, which then only confirms the word and reads the command.
+
+Templates are kept as mel power spectra. At detection time the noise floor
+of the window is added to the window and to the templates before the MFCCs
+are taken, so a word enrolled in a quiet room still matches in a noisy one.
+
+Enroll from the command line::
+
+    python -m ai_assistant.keyword_spotting --output aurora.npz rec1.wav rec2.wav rec3.wav
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .audio import SAMPLE_RATE
+from .local_whisper import read_audio
+from .vad import DEFAULT_VAD, trim_silence
+
+logger = logging.getLogger(__name__)
+
+FRAME_SECONDS = 0.025
+HOP_SECONDS = 0.01
+N_FFT = 512
+N_MELS = 26
+# Coefficients 1..N_MFCC - 1; c0 (loudness) is left out.
+N_MFCC = 13
+PRE_EMPHASIS = 0.97
+# Per-band noise floor: this percentile of the window's frames, at least MIN_POWER.
+NOISE_PERCENTILE = 10
+MIN_POWER = 1e-5
+# Templates match windows spoken between half and twice as fast.
+MIN_MATCH_RATIO = 0.5
+# Enrollment sets the threshold this far above the worst match between recordings.
+THRESHOLD_FACTOR = 1.6
+# With only two recordings that threshold comes from comparing a single pair.
+MIN_RECORDINGS = 3
+
+
+@lru_cache(maxsize=4)
+def _mel_filters(sample_rate: int) -> np.ndarray:
+    def to_mel(hz):
+        return 2595 * np.log10(1 + np.asarray(hz) / 700)
+
+    def to_hz(mel):
+        return 700 * (10 ** (np.asarray(mel) / 2595) - 1)
+
+    edges = to_hz(np.linspace(to_mel(0), to_mel(sample_rate / 2), N_MELS + 2))
+    bins = np.fft.rfftfreq(N_FFT, 1 / sample_rate)
+    lower, center, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    rising = (bins - lower) / (center - lower)
+    falling = (upper - bins) / (upper - center)
+    return np.maximum(0, np.minimum(rising, falling)).astype(np.float32)
+
+
+@lru_cache(maxsize=1)
+def _dct() -> np.ndarray:
+    n = np.arange(N_MELS)
+    k = np.arange(1, N_MFCC)[:, None]
+    return (np.cos(np.pi * k * (2 * n + 1) / (2 * N_MELS)) * np.sqrt(2 / N_MELS)).astype(np.float32)
+
+
+def mel_power(samples: np.ndarray, *, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Mel filterbank power of int16 or float ``samples``, one row per 10 ms."""
+
+    audio = np.asarray(samples, dtype=np.float32).reshape(-1)
+    if samples.dtype == np.int16:
+        audio = audio / 32768.0
+    frame = int(FRAME_SECONDS * sample_rate)
+    hop = int(HOP_SECONDS * sample_rate)
+    if len(audio) < frame:
+        return np.empty((0, N_MELS), dtype=np.float32)
+
+    emphasized = np.empty_like(audio)
+    emphasized[0] = audio[0]
+    emphasized[1:] = audio[1:] - PRE_EMPHASIS * audio[:-1]
+    frames = np.lib.stride_tricks.sliding_window_view(emphasized, frame)[::hop] * np.hamming(frame).astype(np.float32)
+    power = np.abs(np.fft.rfft(frames, N_FFT)) ** 2 / N_FFT
+    return (power @ _mel_filters(sample_rate).T).astype(np.float32)
+
+
+def noise_floor(power: np.ndarray) -> np.ndarray:
+    """Per-band noise power of a window of :func:`mel_power` frames."""
+
+    if not len(power):
+        return np.full(N_MELS, MIN_POWER, dtype=np.float32)
+    return np.maximum(np.percentile(power, NOISE_PERCENTILE, axis=0), MIN_POWER).astype(np.float32)
+
+
+def mfcc(power: np.ndarray, floor: np.ndarray) -> np.ndarray:
+    """MFCCs of :func:`mel_power` frames heard over ``floor``."""
+
+    return np.log(power + floor) @ _dct().T
+
+
+def match(template: np.ndarray, features: np.ndarray) -> Tuple[float, int]:
+    """Best alignment of ``template`` anywhere in ``features``.
+
+    Returns the mean distance per template frame and the feature frame where
+    the match ends. Each step advances the template, the features, or both by
+    one or two frames, so every row of the cost matrix depends only on the
+    rows before it and is computed in one vectorised operation.
+    """
+
+    n, m = len(template), len(features)
+    if n == 0 or m < n * MIN_MATCH_RATIO:
+        return float("inf"), -1
+    distance = np.sqrt(
+        np.maximum(
+            (template**2).sum(1)[:, None] + (features**2).sum(1)[None, :] - 2 * template @ features.T, 0
+        )
+    )
+    rows = [distance[0]]
+    for i in range(1, n):
+        previous = rows[-1]
+        best = np.full(m, np.inf, dtype=distance.dtype)
+        best[1:] = previous[:-1]
+        best[2:] = np.minimum(best[2:], previous[:-2])
+        if i >= 2:
+            best[1:] = np.minimum(best[1:], rows[-2][:-1])
+        rows.append(distance[i] + best)
+    end = int(np.argmin(rows[-1]))
+    return float(rows[-1][end]) / n, end
+
+
+@dataclass(frozen=True)
+class Detection:
+    distance: float
+    # Sample just after the end of the keyword, relative to the window.
+    end: int
+
+
+class KeywordSpotter:
+    """Detect the enrolled keyword in windows of 16 kHz audio.
+
+    ``templates`` are :func:`mel_power` frames of the keyword alone.
+    """
+
+    def __init__(
+        self, templates: Sequence[np.ndarray], threshold: float, *, sample_rate: int = SAMPLE_RATE
+    ) -> None:
+        if not templates:
+            raise ValueError("At least one template is required")
+        self.templates = [np.asarray(template, dtype=np.float32) for template in templates]
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+
+    @classmethod
+    def enroll(
+        cls,
+        recordings: Sequence[np.ndarray],
+        *,
+        sample_rate: int = SAMPLE_RATE,
+        threshold_factor: float = THRESHOLD_FACTOR,
+    ) -> "KeywordSpotter":
+        """Build templates from :data:`MIN_RECORDINGS` or more recordings of the keyword alone.
+
+        Silence around the word is trimmed for the template. The threshold is
+        ``threshold_factor`` times the worst score of a recording against the
+        templates of the others.
+        """
+
+        if len(recordings) < MIN_RECORDINGS:
+            raise ValueError(f"Enroll at least {MIN_RECORDINGS} recordings of the keyword")
+        tight = replace(DEFAULT_VAD, max_gap=0.06, lead_margin=0.0, tail_margin=0.0)
+        templates = [
+            mel_power(trim_silence(recording, sample_rate=sample_rate, config=tight), sample_rate=sample_rate)
+            for recording in recordings
+        ]
+        worst = max(
+            cls(templates[:index] + templates[index + 1 :], 0.0, sample_rate=sample_rate).score(recording)[0]
+            for index, recording in enumerate(recordings)
+        )
+        threshold = threshold_factor * worst
+        logger.info("Enrolled %d templates, threshold %.2f", len(templates), threshold)
+        return cls(templates, threshold, sample_rate=sample_rate)
+
+    def score(self, samples: np.ndarray) -> Tuple[float, int]:
+        """Distance of the best template match in ``samples`` and its end sample."""
+
+        power = mel_power(samples, sample_rate=self.sample_rate)
+        floor = noise_floor(power)
+        features = mfcc(power, floor)
+        best, end = float("inf"), -1
+        for template in self.templates:
+            distance, frame = match(mfcc(template, floor), features)
+            if distance < best:
+                best, end = distance, frame
+        hop = int(HOP_SECONDS * self.sample_rate)
+        return best, end * hop + int(FRAME_SECONDS * self.sample_rate)
+
+    def detect(self, samples: np.ndarray) -> Optional[Detection]:
+        distance, end = self.score(samples)
+        return Detection(distance, end) if distance <= self.threshold else None
+
+    def save(self, path: Path) -> None:
+        np.savez(
+            path,
+            templates=np.concatenate(self.templates),
+            lengths=np.array([len(template) for template in self.templates]),
+            threshold=self.threshold,
+            sample_rate=self.sample_rate,
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "KeywordSpotter":
+        with np.load(path) as data:
+            templates = np.split(data["templates"], np.cumsum(data["lengths"])[:-1])
+            return cls(templates, float(data["threshold"]), sample_rate=int(data["sample_rate"]))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Enroll wake word templates from recordings.")
+    parser.add_argument("recordings", nargs="+", type=Path, help="16 kHz mono WAV files of the word alone")
+    parser.add_argument("--output", type=Path, required=True)
+    parser.add_argument("--threshold-factor", type=float, default=THRESHOLD_FACTOR)
+    args = parser.parse_args(argv)
+    if len(args.recordings) < MIN_RECORDINGS:
+        parser.error(f"enroll at least {MIN_RECORDINGS} recordings")
+    logging.basicConfig(level=logging.INFO)
+
+    recordings = []
+    for path in args.recordings:
+        audio = read_audio(path)
+        if isinstance(audio, str):
+            raise SystemExit(f"{path} is not a 16 kHz mono 16-bit WAV file")
+        recordings.append((audio * 32767).astype(np.int16))
+    spotter = KeywordSpotter.enroll(recordings, threshold_factor=args.threshold_factor)
+    spotter.save(args.output)
+    print(f"Saved {len(spotter.templates)} templates to {args.output} (threshold {spotter.threshold:.2f})")
+
+
+if __name__ == "__main__":
+    main()
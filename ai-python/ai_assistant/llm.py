@@ -4,22 +4,187 @@ from __future__ import annotations
 
 import json
 import logging
+import math
 import os
 import re
+import threading
+import time
+from collections import deque
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, Optional, Protocol
+from typing import Any, Deque, Dict, Mapping, Optional, Protocol, Tuple
 from uuid import uuid4
 
 from . import prompts
+from .deadline import Deadline, LatencyTracker, QueryCancelled, stage_timeout
 from .openai_client import build_openai_client
 
 logger = logging.getLogger(__name__)
 
+# With a query deadline the SDK's own retries are turned off: each of them
+# would get a full per-request timeout of its own. Failed requests are retried
+# here instead, at most this many times and only while the budget allows.
+DEADLINE_RETRIES = 2
+MIN_RETRY_SECONDS = 1.0
+
+
+def _retryable_errors() -> Tuple[type, ...]:
+    from openai import APIConnectionError, InternalServerError, RateLimitError
+
+    return (APIConnectionError, InternalServerError, RateLimitError)
+
+
+@dataclass(frozen=True)
+class GenerationProfile:
+    """Generation settings for one kind of prompt.
+
+    ``model`` falls back to the backend default when omitted. ``max_tokens`` is
+    the starting limit; :class:`ProfileTuner` adjusts it from observed output
+    lengths once enough completions have been seen.
+    """
+
+    name: str
+    max_tokens: int
+    temperature: float = 0.0
+    stop: Tuple[str, ...] = ()
+    model: Optional[str] = None
+
+
+# Every prompt ends with "Assistant:", so a model that keeps going after the
+# JSON usually starts a new "User:" turn. Cutting there saves the wasted tokens.
+_TURN_STOPS = ("\nUser:", "\nAssistant:")
+
+DEFAULT_PROFILES: Dict[str, GenerationProfile] = {
+    "command": GenerationProfile(name="command", max_tokens=256, stop=_TURN_STOPS),
+    "answer": GenerationProfile(
+        name="answer", max_tokens=200, temperature=0.3, stop=("\nUser:",)
+    ),
+    "multistep": GenerationProfile(name="multistep", max_tokens=512, stop=_TURN_STOPS),
+    "recovery": GenerationProfile(name="recovery", max_tokens=512, stop=_TURN_STOPS),
+}
+
+
+@dataclass
+class _ProfileStats:
+    lengths: Deque[int]
+    truncations: Deque[bool]
+    max_tokens: int
+
+
+class ProfileTuner:
+    """Tune ``max_tokens`` per profile from observed completion lengths.
+
+    The limit follows the ``quantile`` of recent completion lengths multiplied
+    by ``headroom``. Truncated completions (``finish_reason == "length"``) are
+    tracked separately: while the truncation rate is above
+    ``max_truncation_rate`` the limit is only allowed to grow, so a limit that
+    was tuned too tight recovers instead of shrinking further.
+    """
+
+    def __init__(
+        self,
+        *,
+        window: int = 200,
+        min_samples: int = 20,
+        quantile: float = 0.99,
+        headroom: float = 1.5,
+        max_truncation_rate: float = 0.02,
+        floor: int = 64,
+        ceiling: int = 2048,
+    ) -> None:
+        self._window = window
+        self._min_samples = min_samples
+        self._quantile = quantile
+        self._headroom = headroom
+        self._max_truncation_rate = max_truncation_rate
+        self._floor = floor
+        self._ceiling = ceiling
+        self._stats: Dict[str, _ProfileStats] = {}
+        self._lock = threading.Lock()
+
+    def max_tokens_for(self, profile: GenerationProfile) -> int:
+        with self._lock:
+            stats = self._stats.get(profile.name)
+            return stats.max_tokens if stats else profile.max_tokens
+
+    def observe(
+        self, profile: GenerationProfile, completion_tokens: Optional[int], *, truncated: bool
+    ) -> None:
+        """Record one completion and retune the profile limit."""
+
+        with self._lock:
+            stats = self._stats.get(profile.name)
+            if stats is None:
+                stats = _ProfileStats(
+                    lengths=deque(maxlen=self._window),
+                    truncations=deque(maxlen=self._window),
+                    max_tokens=profile.max_tokens,
+                )
+                self._stats[profile.name] = stats
+
+            if completion_tokens is not None:
+                stats.lengths.append(completion_tokens)
+            stats.truncations.append(truncated)
+            self._retune(profile.name, stats)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Return per-profile length and truncation statistics."""
+
+        with self._lock:
+            return {
+                name: {
+                    "samples": len(stats.lengths),
+                    "p50": _quantile(stats.lengths, 0.5),
+                    "p99": _quantile(stats.lengths, 0.99),
+                    "truncation_rate": _rate(stats.truncations),
+                    "max_tokens": stats.max_tokens,
+                }
+                for name, stats in self._stats.items()
+            }
+
+    def _retune(self, name: str, stats: _ProfileStats) -> None:
+        truncation_rate = _rate(stats.truncations)
+        if truncation_rate > self._max_truncation_rate:
+            # Truncated lengths are censored at the current limit, so the
+            # quantile alone underestimates what the model wanted to say.
+            target = stats.max_tokens * 2
+        elif len(stats.lengths) >= self._min_samples:
+            target = math.ceil(_quantile(stats.lengths, self._quantile) * self._headroom)
+        else:
+            return
+
+        target = max(self._floor, min(self._ceiling, target))
+        if target != stats.max_tokens:
+            logger.info(
+                "Retuned %s profile max_tokens %d -> %d (truncation rate %.1f%%)",
+                name,
+                stats.max_tokens,
+                target,
+                truncation_rate * 100,
+            )
+            stats.max_tokens = target
+            if truncation_rate > self._max_truncation_rate:
+                stats.truncations.clear()
+
+
+def _quantile(values: Deque[int], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+    return float(ordered[index])
+
+
+def _rate(flags: Deque[bool]) -> float:
+    return sum(flags) / len(flags) if flags else 0.0
+
+
 class LLMBackend(Protocol):
     """A protocol that abstracts a chat completion backend."""
 
-    def complete(self, prompt: str) -> str:
+    def complete(
+        self, prompt: str, *, profile: GenerationProfile, deadline: Optional[Deadline] = None
+    ) -> str:
         ...
 
 
@@ -84,34 +249,58 @@ def _extract_json_candidates(text: str) -> list[str]:
 class PromptSender:
     """High-level interface to send prompts and handle errors."""
 
-    def __init__(self, backend: LLMBackend) -> None:
+    def __init__(
+        self,
+        backend: LLMBackend,
+        *,
+        profiles: Optional[Mapping[str, GenerationProfile]] = None,
+    ) -> None:
         self._backend = backend
+        self._profiles = {**DEFAULT_PROFILES, **(profiles or {})}
 
-    def send(self, user_message: str) -> str:
+    def send(self, user_message: str, *, deadline: Optional[Deadline] = None) -> str:
         prompt = prompts.build_prompt(user_message)
         try:
-            return self._backend.complete(prompt)
+            return self._backend.complete(
+                prompt, profile=self._profiles["command"], deadline=deadline
+            )
+        except QueryCancelled:
+            raise
         except Exception as exc:  # noqa: BLE001
             error = self._normalize_error(exc)
             logger.error("LLM call failed: %s", error.message, exc_info=exc)
             raise RuntimeError(error.message) from exc
 
-    def answer(self, user_message: str) -> str:
+    def answer(self, user_message: str, *, deadline: Optional[Deadline] = None) -> str:
         """Request a concise direct answer for the user question."""
 
         prompt = prompts.build_answer_prompt(user_message)
         try:
-            return self._backend.complete(prompt)
+            return self._backend.complete(
+                prompt, profile=self._profiles["answer"], deadline=deadline
+            )
+        except QueryCancelled:
+            raise
         except Exception as exc:  # noqa: BLE001
             error = self._normalize_error(exc)
             logger.error("LLM answer call failed: %s", error.message, exc_info=exc)
             raise RuntimeError(error.message) from exc
 
-    def complete_custom(self, prompt: str) -> str:
-        """Send a pre-built prompt and normalize backend errors."""
+    def complete_custom(
+        self, prompt: str, *, profile: str = "command", deadline: Optional[Deadline] = None
+    ) -> str:
+        """Send a pre-built prompt and normalize backend errors.
+
+        ``profile`` names the generation profile (``multistep``, ``recovery``...)
+        that bounds the completion.
+        """
 
         try:
-            return self._backend.complete(prompt)
+            return self._backend.complete(
+                prompt, profile=self._profiles[profile], deadline=deadline
+            )
+        except QueryCancelled:
+            raise
         except Exception as exc:  # noqa: BLE001
             error = self._normalize_error(exc)
             logger.error("LLM custom prompt failed: %s", error.message, exc_info=exc)
@@ -126,7 +315,13 @@ class PromptSender:
 class EchoBackend:
     """Simple backend used for local development and tests."""
 
-    def complete(self, prompt: str) -> str:  # type: ignore[override]
+    def complete(  # type: ignore[override]
+        self,
+        prompt: str,
+        *,
+        profile: Optional[GenerationProfile] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> str:
         logger.debug("EchoBackend received prompt: %s", prompt)
         return json.dumps(
             {
@@ -140,7 +335,14 @@ class EchoBackend:
 
 
 class ChatGPTBackend:
-    """Backend that sends universal chat requests to OpenAI."""
+    """Backend that sends universal chat requests to OpenAI.
+
+    Each call is bounded by its :class:`GenerationProfile`. The model can be
+    overridden per profile with ``OPENAI_MODEL_<PROFILE>`` (for example
+    ``OPENAI_MODEL_ANSWER``). Request timeouts adapt to the observed latency
+    of each profile and never exceed what is left of the query deadline; a
+    cancelled deadline stops waiting for the request immediately.
+    """
 
     def __init__(
         self,
@@ -148,24 +350,97 @@ class ChatGPTBackend:
         api_key: Optional[str] = None,
         model: Optional[str] = None,
         base_url: Optional[str] = None,
+        tuner: Optional[ProfileTuner] = None,
+        latency: Optional[LatencyTracker] = None,
     ) -> None:
         key = api_key or os.getenv("OPENAI_API_KEY")
         if not key:
             raise RuntimeError("OPENAI_API_KEY is not configured")
 
         self._client = build_openai_client(api_key=key, base_url=base_url)
+        self._single_attempt_client = self._client.with_options(max_retries=0)
         self._model = model or os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        self._tuner = tuner or ProfileTuner()
+        self._latency = latency or LatencyTracker(initial=60.0, floor=5.0, ceiling=60.0)
 
-    def complete(self, prompt: str) -> str:  # type: ignore[override]
-        logger.info("Sending prompt to ChatGPT model %s", self._model)
-        response = self._client.chat.completions.create(
-            model=self._model,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0,
+    @property
+    def tuner(self) -> ProfileTuner:
+        return self._tuner
+
+    def complete(  # type: ignore[override]
+        self,
+        prompt: str,
+        *,
+        profile: GenerationProfile = DEFAULT_PROFILES["command"],
+        deadline: Optional[Deadline] = None,
+    ) -> str:
+        model = self._resolve_model(profile)
+        max_tokens = self._tuner.max_tokens_for(profile)
+        timeout = stage_timeout(self._latency, profile.name, deadline)
+        logger.info(
+            "Sending %s prompt to ChatGPT model %s (max_tokens=%d, timeout=%.1fs)",
+            profile.name,
+            model,
+            max_tokens,
+            timeout,
+        )
+        request_kwargs: Dict[str, Any] = {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": profile.temperature,
+            "max_tokens": max_tokens,
+            "timeout": timeout,
+        }
+        if profile.stop:
+            request_kwargs["stop"] = list(profile.stop)
+
+        started = time.monotonic()
+        if deadline is None:
+            response = self._client.chat.completions.create(**request_kwargs)
+        else:
+            response = self._create_within(deadline, profile, request_kwargs)
+        self._latency.observe(profile.name, time.monotonic() - started)
+
+        first = response.choices[0] if response.choices else None
+        truncated = getattr(first, "finish_reason", None) == "length"
+        usage = getattr(response, "usage", None)
+        self._tuner.observe(
+            profile, getattr(usage, "completion_tokens", None), truncated=truncated
         )
+        if truncated:
+            logger.warning(
+                "ChatGPT completion for %s profile hit max_tokens=%d", profile.name, max_tokens
+            )
 
-        choice = response.choices[0].message.content if response.choices else None
+        choice = first.message.content if first else None
         if not choice:
             raise RuntimeError("ChatGPT did not return a completion")
 
         return choice
+
+    def _create_within(
+        self, deadline: Deadline, profile: GenerationProfile, request_kwargs: Dict[str, Any]
+    ) -> Any:
+        """Send the request, retrying failures only while the deadline allows."""
+
+        create = self._single_attempt_client.chat.completions.create
+        retryable = _retryable_errors()
+        retries = 0
+        while True:
+            try:
+                return deadline.run(create, **request_kwargs)
+            except retryable as exc:
+                retries += 1
+                if retries > DEADLINE_RETRIES or not deadline.allows(MIN_RETRY_SECONDS):
+                    raise
+                logger.warning(
+                    "ChatGPT %s request failed (%s); retrying with %.1fs left",
+                    profile.name,
+                    exc,
+                    deadline.remaining(),
+                )
+                request_kwargs["timeout"] = stage_timeout(self._latency, profile.name, deadline)
+
+    def _resolve_model(self, profile: GenerationProfile) -> str:
+        override = os.getenv(f"OPENAI_MODEL_{profile.name.upper()}")
+        return override or profile.model or self._model
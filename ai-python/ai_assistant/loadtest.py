@@ -0,0 +1,459 @@
+"""Load generator for the core's ``/action/execute`` endpoint.
+
+Usage::
+
+    python -m ai_assistant.loadtest [--mode closed|open] [--rate 200]
+                                    [--concurrency 16] [--duration 10]
+                                    [--requests N] [--mix tests/custom_inputs.json]
+                                    [--endpoint http://127.0.0.1:5055]
+                                    [--allow-side-effects] [--json]
+
+Commands go through :class:`~ai_assistant.bridge_async.AsyncHttpBridge` with
+its result cache turned off, so every command reaches the core. Without
+``--endpoint`` a local :class:`~ai_assistant.standin.SimulatedCore` is started.
+Against a real core the generated mix is read-only (:data:`READ_ONLY_MIX`)
+unless ``--allow-side-effects`` is given: the default mix launches
+applications and changes the volume hundreds of times a second.
+
+*Closed loop* runs ``--concurrency`` workers that each send the next command
+when the previous one finished, optionally paced to ``--rate`` in total; it
+measures what the core sustains. *Open loop* starts commands at ``--rate``
+per second whatever the core does (Poisson arrivals by default) and measures
+latency from the planned start, so queueing in the client counts against
+the core instead of hiding behind a slower send rate.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+import uuid
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence
+
+from .bridge_async import AsyncHttpBridge
+from .cache import ResultCache
+from .schemas import Command
+from .standin import DEFAULT_PROFILES, ActionProfile, SimulatedCore
+
+logger = logging.getLogger(__name__)
+
+# Share of each action in a generated mix: mostly cheap status and launch
+# commands, as in interactive use, with some searches and list reads.
+DEFAULT_MIX: Dict[str, float] = {
+    "system_status": 0.25,
+    "open_app": 0.20,
+    "search_files": 0.15,
+    "list_applications": 0.10,
+    "set_volume": 0.10,
+    "mute": 0.10,
+    "show_desktop": 0.05,
+    "answer_question": 0.05,
+}
+
+# The part of the default mix that does not change anything on the machine.
+READ_ONLY_MIX: Dict[str, float] = {
+    "system_status": 0.50,
+    "search_files": 0.30,
+    "list_applications": 0.20,
+}
+
+_MIX_PARAMS: Dict[str, Dict[str, Any]] = {
+    "open_app": {"application": "notepad"},
+    "search_files": {"query": "report"},
+    "set_volume": {"level": 40},
+    "answer_question": {"question": "What time is it?", "answer": "It is noon."},
+    "capture_window": {"application": "notepad"},
+    "adjust_setting": {"setting": "brightness", "value": "50"},
+}
+
+# Histogram bucket upper bounds in seconds: 0.25 ms doubling up to ~65 s.
+_BUCKET_BOUNDS = tuple(0.00025 * 2**index for index in range(19))
+
+OUTCOMES = ("ok", "error", "failed")
+
+
+@dataclass
+class LatencyHistogram:
+    """Latency samples with percentiles and log2-spaced buckets."""
+
+    samples: List[float] = field(default_factory=list)
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    @property
+    def count(self) -> int:
+        return len(self.samples)
+
+    def percentile(self, fraction: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+        return ordered[index]
+
+    def buckets(self) -> List[int]:
+        """Sample counts per bucket of ``_BUCKET_BOUNDS``, plus one overflow bucket."""
+
+        counts = [0] * (len(_BUCKET_BOUNDS) + 1)
+        for sample in self.samples:
+            index = next(
+                (i for i, bound in enumerate(_BUCKET_BOUNDS) if sample <= bound),
+                len(_BUCKET_BOUNDS),
+            )
+            counts[index] += 1
+        return counts
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "p50_ms": self.percentile(0.50) * 1000,
+            "p90_ms": self.percentile(0.90) * 1000,
+            "p99_ms": self.percentile(0.99) * 1000,
+            "p999_ms": self.percentile(0.999) * 1000,
+            "max_ms": max(self.samples, default=0.0) * 1000,
+        }
+
+
+@dataclass
+class LoadReport:
+    """Outcome of one load run.
+
+    ``errors`` are commands the core answered with ``"status": "error"``;
+    ``failures`` got no usable answer (transport error, timeout, non-200
+    such as the core's 429 rate limit). ``dropped`` counts open-loop
+    arrivals skipped because ``max_outstanding`` commands were in flight.
+    """
+
+    mode: str
+    endpoint: str
+    elapsed: float = 0.0
+    outcomes: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(OUTCOMES, 0))
+    dropped: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    per_action: Dict[str, LatencyHistogram] = field(default_factory=dict)
+
+    @property
+    def completed(self) -> int:
+        return sum(self.outcomes.values())
+
+    @property
+    def throughput(self) -> float:
+        return self.completed / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        if not self.completed:
+            return 0.0
+        return (self.outcomes["error"] + self.outcomes["failed"]) / self.completed
+
+    def record(self, action: str, outcome: str, seconds: float) -> None:
+        self.outcomes[outcome] += 1
+        self.latency.record(seconds)
+        self.per_action.setdefault(action, LatencyHistogram()).record(seconds)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "endpoint": self.endpoint,
+            "elapsed_s": self.elapsed,
+            "completed": self.completed,
+            "throughput_per_s": self.throughput,
+            "error_rate": self.error_rate,
+            "outcomes": dict(self.outcomes),
+            "dropped": self.dropped,
+            "latency": self.latency.summary(),
+            "latency_buckets": dict(zip(_bucket_labels(), self.latency.buckets())),
+            "per_action": {
+                action: histogram.summary() for action, histogram in sorted(self.per_action.items())
+            },
+        }
+
+    def format(self) -> str:
+        lines = [
+            f"{self.mode} loop against {self.endpoint}: {self.completed} commands"
+            f" in {self.elapsed:.2f} s",
+            f"throughput {self.throughput:.1f} cmd/s, error rate {self.error_rate:.2%}"
+            f" (ok {self.outcomes['ok']}, error {self.outcomes['error']},"
+            f" failed {self.outcomes['failed']}, dropped {self.dropped})",
+            "",
+            f"{'action':<20} {'count':>7} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}",
+        ]
+        rows = [("all", self.latency), *sorted(self.per_action.items())]
+        for action, histogram in rows:
+            summary = histogram.summary()
+            lines.append(
+                f"{action:<20} {histogram.count:>7} {summary['p50_ms']:>9.2f}"
+                f" {summary['p90_ms']:>9.2f} {summary['p99_ms']:>9.2f} {summary['max_ms']:>9.2f}"
+            )
+
+        counts = self.latency.buckets()
+        used = [index for index, count in enumerate(counts) if count]
+        if used:
+            lines += ["", "latency histogram"]
+            peak = max(counts)
+            labels = _bucket_labels()
+            for index in range(used[0], used[-1] + 1):
+                bar = "#" * round(40 * counts[index] / peak)
+                lines.append(f"{labels[index]:>12} | {bar:<40} {counts[index]}")
+        return "\n".join(lines)
+
+
+@dataclass
+class LoadConfig:
+    """How much load to generate; see the module docstring for the modes."""
+
+    mode: str = "closed"
+    rate: Optional[float] = None
+    concurrency: int = 16
+    duration: Optional[float] = 10.0
+    requests: Optional[int] = None
+    max_in_flight: int = 16
+    max_outstanding: int = 10_000
+    arrivals: str = "poisson"
+    timeout: float = 10.0
+    seed: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.mode not in ("closed", "open"):
+            raise ValueError("mode must be 'closed' or 'open'")
+        if self.mode == "open" and not self.rate:
+            raise ValueError("open-loop mode needs a rate")
+        if self.duration is None and self.requests is None:
+            raise ValueError("set a duration, a request count or both")
+
+
+def load_mix(path: Path) -> List[Command]:
+    """Read commands from a JSON list like ``tests/custom_inputs.json``."""
+
+    raw = json.loads(Path(path).read_text(encoding="utf-8"))
+    if isinstance(raw, dict):
+        raw = raw.get("commands", [raw])
+    commands = [
+        Command(
+            action=entry["action"],
+            params=dict(entry.get("params") or {}),
+            uuid=str(entry.get("uuid") or uuid.uuid4()),
+            timestamp=str(entry.get("timestamp") or _now()),
+        )
+        for entry in raw
+        if isinstance(entry, dict) and entry.get("action")
+    ]
+    if not commands:
+        raise ValueError(f"No commands found in {path}")
+    return commands
+
+
+def generate_mix(
+    weights: Optional[Mapping[str, float]] = None, *, size: int = 100, seed: Optional[int] = None
+) -> List[Command]:
+    """Draw ``size`` commands with action frequencies given by ``weights``."""
+
+    weights = dict(weights or DEFAULT_MIX)
+    rng = random.Random(seed)
+    actions = rng.choices(list(weights), weights=list(weights.values()), k=size)
+    return [
+        Command(
+            action=action,
+            params=dict(_MIX_PARAMS.get(action, {})),
+            uuid=str(uuid.uuid4()),
+            timestamp=_now(),
+        )
+        for action in actions
+    ]
+
+
+async def run_load(endpoint: str, mix: Sequence[Command], config: LoadConfig) -> LoadReport:
+    """Send ``mix`` (cycled) to ``endpoint`` as described by ``config``."""
+
+    report = LoadReport(mode=config.mode, endpoint=endpoint)
+    commands = _cycle(mix)
+    async with AsyncHttpBridge(
+        endpoint,
+        timeout=config.timeout,
+        max_in_flight=config.max_in_flight,
+        cache=ResultCache(ttls={}),
+    ) as client:
+        started = time.perf_counter()
+        if config.mode == "open":
+            await _run_open(client, commands, config, report, started)
+        else:
+            await _run_closed(client, commands, config, report, started)
+        report.elapsed = time.perf_counter() - started
+    return report
+
+
+async def _send(
+    client: AsyncHttpBridge, command: Command, report: LoadReport, started: float
+) -> None:
+    response = await client.send_command(command)
+    if response is None:
+        outcome = "failed"
+    elif response.get("status") == "error" or response.get("error"):
+        outcome = "error"
+    else:
+        outcome = "ok"
+    report.record(command.action, outcome, time.perf_counter() - started)
+
+
+async def _run_closed(
+    client: AsyncHttpBridge,
+    commands: Iterator[Command],
+    config: LoadConfig,
+    report: LoadReport,
+    started: float,
+) -> None:
+    stop_at = started + config.duration if config.duration is not None else math.inf
+    issued = 0
+
+    async def worker() -> None:
+        nonlocal issued
+        while time.perf_counter() < stop_at:
+            if config.requests is not None and issued >= config.requests:
+                return
+            slot = issued
+            issued += 1
+            if config.rate:
+                await _sleep_until(started + slot / config.rate)
+            await _send(client, next(commands), report, time.perf_counter())
+
+    await asyncio.gather(*(worker() for _ in range(config.concurrency)))
+
+
+async def _run_open(
+    client: AsyncHttpBridge,
+    commands: Iterator[Command],
+    config: LoadConfig,
+    report: LoadReport,
+    started: float,
+) -> None:
+    assert config.rate
+    rng = random.Random(config.seed)
+    stop_at = started + config.duration if config.duration is not None else math.inf
+    outstanding: set[asyncio.Task[None]] = set()
+    arrival = started
+    issued = 0
+
+    while config.requests is None or issued < config.requests:
+        if config.arrivals == "poisson":
+            arrival += rng.expovariate(config.rate)
+        else:
+            arrival += 1 / config.rate
+        if arrival >= stop_at:
+            break
+        await _sleep_until(arrival)
+        issued += 1
+        if len(outstanding) >= config.max_outstanding:
+            report.dropped += 1
+            continue
+        # Latency counts from the planned arrival, not from when the task ran.
+        task = asyncio.create_task(_send(client, next(commands), report, arrival))
+        outstanding.add(task)
+        task.add_done_callback(outstanding.discard)
+
+    if outstanding:
+        await asyncio.gather(*outstanding)
+
+
+async def _sleep_until(moment: float) -> None:
+    delay = moment - time.perf_counter()
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+
+def _cycle(mix: Sequence[Command]) -> Iterator[Command]:
+    while True:
+        for command in mix:
+            yield replace(command, uuid=str(uuid.uuid4()), timestamp=_now())
+
+
+def _bucket_labels() -> List[str]:
+    return [f"<= {bound * 1000:g} ms" for bound in _BUCKET_BOUNDS] + [
+        f"> {_BUCKET_BOUNDS[-1] * 1000:g} ms"
+    ]
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=("closed", "open"), default="closed")
+    parser.add_argument("--rate", type=float, help="Target commands per second")
+    parser.add_argument("--concurrency", type=int, default=16, help="Closed-loop workers")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run")
+    parser.add_argument("--requests", type=int, help="Stop after this many commands")
+    parser.add_argument("--arrivals", choices=("poisson", "uniform"), default="poisson")
+    parser.add_argument("--max-in-flight", type=int, default=16)
+    parser.add_argument("--max-outstanding", type=int, default=10_000)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--mix", type=Path, help="JSON list of commands to replay")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--endpoint", help="Load a running core instead of the stand-in")
+    parser.add_argument(
+        "--allow-side-effects",
+        action="store_true",
+        help="With --endpoint, generate the full mix (opens apps, changes volume)",
+    )
+    parser.add_argument(
+        "--time-scale", type=float, default=1.0, help="Stand-in latency multiplier"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Stand-in failure share")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Log every bridge failure")
+    args = parser.parse_args(argv)
+    if args.mode == "open" and not args.rate:
+        parser.error("--mode open needs --rate")
+
+    logging.basicConfig(level=logging.WARNING)
+    if not args.verbose:
+        logging.getLogger("ai_assistant").setLevel(logging.CRITICAL)
+
+    config = LoadConfig(
+        mode=args.mode,
+        rate=args.rate,
+        concurrency=args.concurrency,
+        duration=args.duration,
+        requests=args.requests,
+        max_in_flight=args.max_in_flight,
+        max_outstanding=args.max_outstanding,
+        arrivals=args.arrivals,
+        timeout=args.timeout,
+        seed=args.seed,
+    )
+    if args.mix:
+        mix = load_mix(args.mix)
+    elif args.endpoint and not args.allow_side_effects:
+        mix = generate_mix(READ_ONLY_MIX, seed=args.seed)
+    else:
+        mix = generate_mix(seed=args.seed)
+
+    if args.endpoint:
+        report = asyncio.run(run_load(args.endpoint, mix, config))
+    else:
+        profiles = {
+            action: replace(profile, error_rate=args.error_rate)
+            for action, profile in DEFAULT_PROFILES.items()
+        }
+        with SimulatedCore(
+            profiles=profiles,
+            default_profile=ActionProfile(error_rate=args.error_rate),
+            time_scale=args.time_scale,
+            seed=args.seed,
+        ) as core:
+            report = asyncio.run(run_load(core.endpoint, mix, config))
+
+    print(json.dumps(report.to_json(), indent=2) if args.json else report.format())
+
+
+if __name__ == "__main__":
+    main()
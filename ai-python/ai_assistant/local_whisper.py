@@ -0,0 +1,148 @@
+"""Offline transcription with a locally loaded Whisper model."""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+import wave
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+import numpy as np
+
+from .audio import SAMPLE_RATE, SAMPLE_WIDTH
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "base"
+
+
+@dataclass
+class LocalTranscript:
+    text: str
+    language: Optional[str]
+
+
+def default_model_name() -> str:
+    """Model size from ``WHISPER_MODEL``, shared with ``wake_word.py``."""
+
+    return os.getenv("WHISPER_MODEL", DEFAULT_MODEL)
+
+
+def _load_whisper(name: str, device: str) -> Any:
+    try:
+        import whisper
+    except ImportError as exc:  # pragma: no cover - depends on optional package
+        raise RuntimeError(
+            "Local transcription requires the 'openai-whisper' package; "
+            "install it with 'pip install openai-whisper'."
+        ) from exc
+    return whisper.load_model(name, device=device)
+
+
+class LocalWhisper:
+    """A Whisper model that is loaded once and kept in memory between calls.
+
+    Transcription is serialized with a lock: a single model instance is not
+    safe to run from several threads at once, and on CPU concurrent runs
+    would only compete for the same cores.
+    """
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        *,
+        device: str = "cpu",
+        loader: Callable[[str, str], Any] = _load_whisper,
+    ) -> None:
+        self.model_name = model_name or default_model_name()
+        self.device = device
+        self._loader = loader
+        self._model: Any = None
+        self._lock = threading.Lock()
+        self.load_seconds: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def load(self) -> Any:
+        with self._lock:
+            return self._load_locked()
+
+    def _load_locked(self) -> Any:
+        if self._model is None:
+            logger.info("Loading local Whisper model %s on %s", self.model_name, self.device)
+            started = time.perf_counter()
+            self._model = self._loader(self.model_name, self.device)
+            self.load_seconds = time.perf_counter() - started
+            logger.info("Local Whisper model loaded in %.1f s", self.load_seconds)
+        return self._model
+
+    def transcribe(
+        self,
+        audio: Union[np.ndarray, Path],
+        *,
+        language: Optional[str] = None,
+        prompt: Optional[str] = None,
+    ) -> LocalTranscript:
+        """Transcribe 16 kHz mono ``audio`` (int16 or float samples, or a file)."""
+
+        samples = read_audio(audio) if isinstance(audio, Path) else to_float32(audio)
+        options: Dict[str, Any] = {
+            "language": language,
+            "initial_prompt": prompt,
+            "temperature": 0.0,
+            "fp16": self.device != "cpu",
+            "condition_on_previous_text": False,
+        }
+        with self._lock:
+            model = self._load_locked()
+            result = model.transcribe(samples, **options)
+        return LocalTranscript(
+            text=str(result.get("text", "")).strip(), language=result.get("language")
+        )
+
+
+def to_float32(samples: np.ndarray) -> np.ndarray:
+    """Scale int16 PCM to the [-1, 1) float32 range Whisper expects."""
+
+    if samples.dtype == np.int16:
+        return samples.astype(np.float32) / 32768.0
+    return samples.astype(np.float32, copy=False)
+
+
+def read_audio(path: Path) -> Union[np.ndarray, str]:
+    """Load a 16 kHz mono 16-bit WAV directly; other files go through ffmpeg."""
+
+    try:
+        with wave.open(str(path), "rb") as wav_file:
+            if (
+                wav_file.getframerate() == SAMPLE_RATE
+                and wav_file.getnchannels() == 1
+                and wav_file.getsampwidth() == SAMPLE_WIDTH
+            ):
+                frames = wav_file.readframes(wav_file.getnframes())
+                return to_float32(np.frombuffer(frames, dtype=np.int16))
+    except (wave.Error, EOFError):
+        pass
+    # Whisper decodes (and resamples) anything else with the ffmpeg binary.
+    return str(path)
+
+
+_MODELS: Dict[str, LocalWhisper] = {}
+_MODELS_LOCK = threading.Lock()
+
+
+def get_local_whisper(model_name: Optional[str] = None) -> LocalWhisper:
+    """Return the process-wide resident model for ``model_name``."""
+
+    name = model_name or default_model_name()
+    with _MODELS_LOCK:
+        model = _MODELS.get(name)
+        if model is None:
+            model = _MODELS[name] = LocalWhisper(name)
+        return model
@@ -4,9 +4,10 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
+from .deadline import Deadline
 from .llm import PromptSender, parse_json_safely
 from .schemas import ALLOWED_ACTIONS, ValidationResult, validate_command
 
@@ -19,9 +20,9 @@ class IntentExtractor:
     def __init__(self, sender: PromptSender) -> None:
         self._sender = sender
 
-    def extract(self, text: str) -> ValidationResult:
+    def extract(self, text: str, *, deadline: Optional[Deadline] = None) -> ValidationResult:
         logger.debug("Extracting intent for text: %s", text)
-        raw_response = self._sender.send(text)
+        raw_response = self._sender.send(text, deadline=deadline)
         data = parse_json_safely(raw_response)
         enriched = self._ensure_required_fields(data)
         return validate_command(enriched)
@@ -3,85 +3,332 @@
 from __future__ import annotations
 
 import logging
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Any, Callable, Dict, Generator, Iterable, Iterator, List, Optional
 from uuid import uuid4
 
 from . import prompts
 from .bridge import HttpBridge
+from .deadline import SESSIONS, Deadline, QueryCancelled
 from .llm import ChatGPTBackend, EchoBackend, PromptSender, parse_json_safely
 from .nlu import IntentExtractor
 from .schemas import Command, ValidationIssue, ValidationResult, validate_command
+from .segmenter import count_actionable_clauses
 from .speech import transcribe_audio_file, transcribe_stream
 
 logger = logging.getLogger(__name__)
 
+# How many times a failing command may be sent back to the LLM for correction.
+MAX_RECOVERY_ATTEMPTS = 2
+
+# Optional stages (multistep expansion, LLM recovery) are skipped when less
+# than this much of the query budget is left.
+OPTIONAL_STAGE_MIN_SECONDS = 4.0
+
+
+@dataclass
+class ExpansionStats:
+    """Counters for the compound-request gate in front of the multistep prompt.
+
+    ``gated`` counts requests that contain a connector (comma, "и"...) but were
+    not expanded because fewer than two actionable clauses were found; each is
+    an LLM call the old connector check would have made. ``unnecessary``
+    counts expansions that still produced fewer than two commands.
+    """
+
+    expanded: int = 0
+    unnecessary: int = 0
+    gated: int = 0
+
+    @property
+    def unnecessary_rate(self) -> float:
+        return self.unnecessary / self.expanded if self.expanded else 0.0
+
+
+EXPANSION_STATS = ExpansionStats()
+
+
+PipelineEvent = Dict[str, Any]
+
 
 def process_text(
-    text: str, bridge: HttpBridge, *, sender: Optional[PromptSender] = None
+    text: str,
+    bridge: HttpBridge,
+    *,
+    sender: Optional[PromptSender] = None,
+    deadline: Optional[Deadline] = None,
+    session_id: Optional[str] = None,
 ) -> Optional[object]:
     """Process a text query and forward one or more validated commands.
 
     A custom :class:`PromptSender` can be injected for tests to avoid real LLM
-    calls. When omitted the production ChatGPT backend is used.
+    calls. When omitted the production ChatGPT backend is used. Every stage
+    shares ``deadline`` (``JARVIS_QUERY_BUDGET_SECONDS`` by default), and the
+    optional expansion and recovery stages are skipped when it runs short.
+
+    When ``session_id`` is given, a newer query for the same session cancels
+    this one: in-flight LLM calls are abandoned, commands not yet dispatched
+    are skipped and ``None`` is returned.
     """
 
+    return _final_result(
+        iter_text_events(text, bridge, sender=sender, deadline=deadline, session_id=session_id)
+    )
+
+
+def process_audio_file(
+    audio_path: Path,
+    bridge: HttpBridge,
+    *,
+    sender: Optional[PromptSender] = None,
+    deadline: Optional[Deadline] = None,
+    session_id: Optional[str] = None,
+) -> Optional[object]:
+    return _final_result(
+        iter_audio_file_events(
+            audio_path, bridge, sender=sender, deadline=deadline, session_id=session_id
+        )
+    )
+
+
+def process_audio_stream(
+    chunks: Iterable[bytes],
+    bridge: HttpBridge,
+    *,
+    sender: Optional[PromptSender] = None,
+    deadline: Optional[Deadline] = None,
+    session_id: Optional[str] = None,
+    transcribe: Callable[[Any], str] = transcribe_stream,
+) -> Optional[object]:
+    """Transcribe streamed audio and process the transcript.
+
+    Cancellation by a newer query for ``session_id`` also abandons a
+    transcription that is still in flight. ``transcribe`` replaces
+    :func:`transcribe_stream`, e.g. with
+    :meth:`~ai_assistant.incremental.IncrementalTranscriber.finish`.
+    """
+
+    return _final_result(
+        iter_audio_stream_events(
+            chunks,
+            bridge,
+            sender=sender,
+            deadline=deadline,
+            session_id=session_id,
+            transcribe=transcribe,
+        )
+    )
+
+
+def iter_text_events(
+    text: str,
+    bridge: HttpBridge,
+    *,
+    sender: Optional[PromptSender] = None,
+    deadline: Optional[Deadline] = None,
+    session_id: Optional[str] = None,
+) -> Iterator[PipelineEvent]:
+    """Process a text query, yielding an event at every milestone.
+
+    Events are dicts with a ``type`` key: ``commands`` once the LLM output is
+    validated, ``result`` for each bridge response, ``recovery`` when a failed
+    command goes back to the LLM, ``cancelled`` when superseded, and a final
+    ``done`` carrying the same ``result`` :func:`process_text` returns.
+    """
+
+    deadline = deadline or Deadline.from_env()
+    return _tracked(
+        session_id,
+        deadline,
+        lambda: _iter_process_text(text, bridge, sender=sender, deadline=deadline),
+    )
+
+
+def iter_audio_file_events(
+    audio_path: Path,
+    bridge: HttpBridge,
+    *,
+    sender: Optional[PromptSender] = None,
+    deadline: Optional[Deadline] = None,
+    session_id: Optional[str] = None,
+) -> Iterator[PipelineEvent]:
+    """Like :func:`iter_text_events`, preceded by a ``transcript`` event."""
+
+    deadline = deadline or Deadline.from_env()
+    return _tracked(
+        session_id,
+        deadline,
+        lambda: _iter_transcribed(
+            transcribe_audio_file, audio_path, bridge, sender=sender, deadline=deadline
+        ),
+    )
+
+
+def iter_audio_stream_events(
+    chunks: Iterable[bytes],
+    bridge: HttpBridge,
+    *,
+    sender: Optional[PromptSender] = None,
+    deadline: Optional[Deadline] = None,
+    session_id: Optional[str] = None,
+    transcribe: Callable[[Any], str] = transcribe_stream,
+) -> Iterator[PipelineEvent]:
+    """Like :func:`iter_text_events`, preceded by a ``transcript`` event."""
+
+    deadline = deadline or Deadline.from_env()
+    return _tracked(
+        session_id,
+        deadline,
+        lambda: _iter_transcribed(transcribe, chunks, bridge, sender=sender, deadline=deadline),
+    )
+
+
+def _final_result(events: Iterable[PipelineEvent]) -> Optional[object]:
+    result = None
+    for event in events:
+        if event["type"] == "done":
+            result = event["result"]
+    return result
+
+
+def _tracked(
+    session_id: Optional[str],
+    deadline: Deadline,
+    stages: Callable[[], Iterator[PipelineEvent]],
+) -> Iterator[PipelineEvent]:
+    try:
+        with SESSIONS.track(session_id, deadline):
+            yield from stages()
+    except QueryCancelled:
+        _report_cancellation(session_id, deadline)
+        yield {
+            "type": "cancelled",
+            "abandoned_calls": deadline.abandoned_calls,
+            "skipped_dispatches": deadline.skipped_dispatches,
+        }
+        yield {"type": "done", "result": None}
+
+
+def _iter_transcribed(
+    transcribe: Callable[[Any], str],
+    source: Any,
+    bridge: HttpBridge,
+    *,
+    sender: Optional[PromptSender],
+    deadline: Deadline,
+) -> Iterator[PipelineEvent]:
+    transcript = deadline.run(transcribe, source)
+    yield {"type": "transcript", "text": transcript}
+    yield from _iter_process_text(transcript, bridge, sender=sender, deadline=deadline)
+
+
+def _iter_process_text(
+    text: str,
+    bridge: HttpBridge,
+    *,
+    sender: Optional[PromptSender],
+    deadline: Deadline,
+) -> Iterator[PipelineEvent]:
     sender = sender or PromptSender(ChatGPTBackend())
     extractor = IntentExtractor(sender)
-    result = _expand_complex_request(text, extractor.extract(text), sender)
+    result = _expand_complex_request(
+        text, extractor.extract(text, deadline=deadline), sender, deadline=deadline
+    )
 
     if not result.commands:
         issue_messages = [f"{issue.field}: {issue.message}" for issue in result.issues]
         logger.warning("Invalid command for C# bridge: %s", "; ".join(issue_messages))
-        fallback = _build_fallback_answer(text, sender)
-        return bridge.send_command(fallback)
+        fallback = _build_fallback_answer(text, sender, deadline=deadline)
+        yield {"type": "commands", "commands": [fallback.to_json()], "fallback": True}
+        deadline.check()
+        response = bridge.send_command(fallback, deadline=deadline)
+        yield {"type": "result", "command": fallback.to_json(), "response": response}
+        yield {"type": "done", "result": response}
+        return
 
     if result.issues:
         issue_messages = [f"{issue.field}: {issue.message}" for issue in result.issues]
         logger.warning("Partial validation issues: %s", "; ".join(issue_messages))
 
+    yield {"type": "commands", "commands": [command.to_json() for command in result.commands]}
+
+    commands = result.commands
     responses: List[object] = []
-    for command in result.commands:
-        response = _send_with_recovery(
-            command,
-            bridge,
-            sender,
-            original_text=text,
-        )
-        if response is None:
-            continue
-        if isinstance(response, list):
-            responses.extend(response)
-        else:
-            responses.append(response)
+    index = 0
+    while index < len(commands):
+        if deadline.cancelled:
+            deadline.skipped_dispatches += len(commands) - index
+            deadline.check()
+        for response in _dispatch(commands[index:], bridge, deadline=deadline):
+            command = commands[index]
+            index += 1
+            yield {"type": "result", "command": command.to_json(), "response": response}
+            response = yield from _iter_handle_response(
+                command,
+                response,
+                bridge,
+                sender,
+                original_text=text,
+                deadline=deadline,
+            )
+            if response is None:
+                continue
+            if isinstance(response, list):
+                responses.extend(response)
+            else:
+                responses.append(response)
 
     if not responses:
-        return None
+        final: Optional[object] = None
+    else:
+        final = responses if len(responses) > 1 else responses[0]
+    yield {"type": "done", "result": final}
 
-    return responses if len(responses) > 1 else responses[0]
 
+def _dispatch(
+    commands: List[Command], bridge: HttpBridge, *, deadline: Deadline
+) -> List[Optional[object]]:
+    """Send the next commands of a plan and return the responses received.
 
-def process_audio_file(
-    audio_path: Path, bridge: HttpBridge, *, sender: Optional[PromptSender] = None
-) -> Optional[object]:
-    transcript = transcribe_audio_file(audio_path)
-    return process_text(transcript, bridge, sender=sender)
-
+    Plans of two or more commands go through ``bridge.send_commands`` when the
+    bridge has it, which stops at the first failure so recovery can run before
+    the rest of the plan. Otherwise only the first command is sent.
+    """
 
-def process_audio_stream(
-    chunks: Iterable[bytes], bridge: HttpBridge, *, sender: Optional[PromptSender] = None
-) -> Optional[object]:
-    transcript = transcribe_stream(chunks)
-    return process_text(transcript, bridge, sender=sender)
+    send_commands = getattr(bridge, "send_commands", None)
+    if len(commands) > 1 and send_commands is not None:
+        responses = send_commands(commands, deadline=deadline)
+        if responses:
+            return list(responses)
+    return [bridge.send_command(commands[0], deadline=deadline)]
+
+
+def _report_cancellation(session_id: Optional[str], deadline: Deadline) -> None:
+    SESSIONS.record_cancelled(deadline)
+    logger.info(
+        "Query for session %s cancelled: %d in-flight call(s) abandoned, "
+        "%d bridge dispatch(es) skipped (totals: %d queries, %d calls, %d dispatches)",
+        session_id,
+        deadline.abandoned_calls,
+        deadline.skipped_dispatches,
+        SESSIONS.cancelled_queries,
+        SESSIONS.abandoned_calls,
+        SESSIONS.skipped_dispatches,
+    )
 
 
-def _build_fallback_answer(transcript: str, sender: PromptSender) -> Command:
+def _build_fallback_answer(
+    transcript: str, sender: PromptSender, *, deadline: Optional[Deadline] = None
+) -> Command:
     """Ask the LLM to answer directly when a command cannot be parsed."""
 
     try:
-        answer_text = sender.answer(transcript)
+        answer_text = sender.answer(transcript, deadline=deadline)
         logger.info("Fallback answer from LLM: %s", answer_text)
+    except QueryCancelled:
+        raise
     except Exception:
         logger.exception("Failed to obtain fallback answer from LLM")
         answer_text = (
@@ -98,61 +345,154 @@ def _build_fallback_answer(transcript: str, sender: PromptSender) -> Command:
 
 
 def _expand_complex_request(
-    text: str, result: ValidationResult, sender: PromptSender
+    text: str,
+    result: ValidationResult,
+    sender: PromptSender,
+    *,
+    deadline: Optional[Deadline] = None,
 ) -> ValidationResult:
     """Request a multi-step plan when the text looks compound but only one command was parsed."""
 
     if len(result.commands) != 1 or not _looks_multi_action(text):
         return result
 
+    if deadline is not None and not deadline.allows(OPTIONAL_STAGE_MIN_SECONDS):
+        logger.warning(
+            "Skipping multi-step expansion: only %.1fs of the query budget left",
+            deadline.remaining(),
+        )
+        return result
+
     logger.info("Detected potentially compound request; asking LLM for multi-step plan")
+    EXPANSION_STATS.expanded += 1
     try:
-        raw = sender.complete_custom(prompts.build_multistep_prompt(text))
+        raw = sender.complete_custom(
+            prompts.build_multistep_prompt(text), profile="multistep", deadline=deadline
+        )
         enriched = IntentExtractor._ensure_required_fields(parse_json_safely(raw))  # noqa: SLF001
         expanded = validate_command(enriched)
+    except QueryCancelled:
+        raise
     except Exception:
         logger.exception("Unable to expand complex request via LLM")
         return result
 
     if len(expanded.commands) < 2:
+        EXPANSION_STATS.unnecessary += 1
+        _log_expansion_stats()
         return result
 
+    _log_expansion_stats()
     _log_validation_issues(expanded.issues)
     return expanded
 
 
 def _looks_multi_action(text: str) -> bool:
+    """Return ``True`` when the text holds at least two actionable clauses."""
+
+    if not _has_compound_marker(text):
+        return False
+
+    clauses = count_actionable_clauses(text, known_names=prompts.load_available_applications())
+    if clauses >= 2:
+        return True
+
+    EXPANSION_STATS.gated += 1
+    logger.debug(
+        "Compound marker found but only %d actionable clause(s); skipping expansion", clauses
+    )
+    return False
+
+
+def _has_compound_marker(text: str) -> bool:
     lowered = text.lower()
     multi_tokens = [
         " и ",
+        " and ",
         "затем",
         "потом",
         "после",
         "сначала",
         "далее",
+        "then",
         ",",
+        ";",
     ]
     return any(token in lowered for token in multi_tokens)
 
 
-def _send_with_recovery(
+def _log_expansion_stats() -> None:
+    logger.info(
+        "Multistep expansions: %d, unnecessary: %d (%.0f%%), LLM calls saved by gate: %d",
+        EXPANSION_STATS.expanded,
+        EXPANSION_STATS.unnecessary,
+        EXPANSION_STATS.unnecessary_rate * 100,
+        EXPANSION_STATS.gated,
+    )
+
+
+def _iter_send_with_recovery(
     command: Command,
     bridge: HttpBridge,
     sender: PromptSender,
     *,
     original_text: str,
-    allow_retry: bool = True,
-):
-    response = bridge.send_command(command)
-    if allow_retry and _is_error_response(response):
-        return _attempt_recovery(
+    recovery_attempt: int = 1,
+    deadline: Optional[Deadline] = None,
+) -> Generator[PipelineEvent, None, Optional[object]]:
+    response = bridge.send_command(command, deadline=deadline)
+    yield {"type": "result", "command": command.to_json(), "response": response}
+    return (
+        yield from _iter_handle_response(
+            command,
+            response,
+            bridge,
+            sender,
+            original_text=original_text,
+            recovery_attempt=recovery_attempt,
+            deadline=deadline,
+        )
+    )
+
+
+def _iter_handle_response(
+    command: Command,
+    response: Optional[object],
+    bridge: HttpBridge,
+    sender: PromptSender,
+    *,
+    original_text: str,
+    recovery_attempt: int = 1,
+    deadline: Optional[Deadline] = None,
+) -> Generator[PipelineEvent, None, Optional[object]]:
+    if recovery_attempt > MAX_RECOVERY_ATTEMPTS or not _is_error_response(response):
+        return response
+
+    if deadline is not None and not deadline.allows(OPTIONAL_STAGE_MIN_SECONDS):
+        logger.warning(
+            "Skipping LLM recovery for %s: only %.1fs of the query budget left",
+            command.action,
+            deadline.remaining(),
+        )
+        return response
+
+    yield {
+        "type": "recovery",
+        "command": command.to_json(),
+        "error": response,
+        "attempt": recovery_attempt,
+    }
+    return (
+        yield from _iter_recovery(
             original_text=original_text,
             failed_command=command,
             error_response=response,
             bridge=bridge,
             sender=sender,
+            attempt=recovery_attempt,
+            deadline=deadline,
         )
-    return response
+    )
 
 
 def _is_error_response(response: Optional[object]) -> bool:
@@ -167,26 +507,31 @@ def _is_error_response(response: Optional[object]) -> bool:
     return False
 
 
-def _attempt_recovery(
+def _iter_recovery(
     *,
     original_text: str,
     failed_command: Command,
     error_response: Optional[object],
     bridge: HttpBridge,
     sender: PromptSender,
-):
+    attempt: int = 1,
+    deadline: Optional[Deadline] = None,
+) -> Generator[PipelineEvent, None, Optional[object]]:
     logger.warning(
-        "Bridge returned an error for %s; requesting corrected commands from LLM",
+        "Bridge returned an error for %s; requesting corrected commands from LLM (attempt %d)",
         failed_command.action,
+        attempt,
     )
 
     try:
         prompt = prompts.build_error_resolution_prompt(
-            original_text, failed_command.to_json(), error_response or {}
+            original_text, failed_command.to_json(), error_response or {}, attempt=attempt
         )
-        raw = sender.complete_custom(prompt)
+        raw = sender.complete_custom(prompt, profile="recovery", deadline=deadline)
         enriched = IntentExtractor._ensure_required_fields(parse_json_safely(raw))  # noqa: SLF001
         recovery_result = validate_command(enriched)
+    except QueryCancelled:
+        raise
     except Exception:
         logger.exception("Failed to obtain recovery commands from LLM")
         return error_response
@@ -198,10 +543,17 @@ def _attempt_recovery(
     _log_validation_issues(recovery_result.issues)
     recovery_responses: List[object] = []
     for command in recovery_result.commands:
-        response = _send_with_recovery(
-            command, bridge, sender, original_text=original_text, allow_retry=False
+        response = yield from _iter_send_with_recovery(
+            command,
+            bridge,
+            sender,
+            original_text=original_text,
+            recovery_attempt=attempt + 1,
+            deadline=deadline,
         )
-        if response is not None:
+        if isinstance(response, list):
+            recovery_responses.extend(response)
+        elif response is not None:
             recovery_responses.append(response)
 
     return recovery_responses or error_response
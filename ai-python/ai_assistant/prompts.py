@@ -6,7 +6,7 @@ import json
 import logging
 import os
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Any, Iterable, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +26,21 @@ SYSTEM_PROMPT = (
     "how to use the computer."
 )
 
+# Short contract used instead of SYSTEM_PROMPT from the second recovery attempt
+# on. Every LLM request is stateless, so the model does not see the full prompt
+# again; this is a deliberate trade of some guidance (answer_question style,
+# timestamp format) for a smaller prompt on a path that has already failed once.
+RECOVERY_CONTRACT_REMINDER = (
+    "Emit JSON commands {action, params} for the Windows assistant using only "
+    "these actions: open_app, search_files, adjust_setting, system_status, "
+    "answer_question. Keep application names exactly as requested."
+)
+
+DEFAULT_RECOVERY_PAYLOAD_BYTES = 2048
+
+# Fields of a bridge response that explain the failure and are never dropped.
+_ERROR_FIELDS = ("status", "error", "message", "code")
+
 DEFAULT_APPLICATION_HINTS = [
     "notepad",
     "calculator",
@@ -169,21 +184,116 @@ def build_multistep_prompt(user_message: str) -> str:
     )
 
 
+def recovery_payload_budget() -> int:
+    """Return the byte budget for bridge responses embedded in recovery prompts.
+
+    Honors ``JARVIS_RECOVERY_PAYLOAD_BYTES``; roughly four bytes make one token.
+    """
+
+    raw_value = os.getenv("JARVIS_RECOVERY_PAYLOAD_BYTES")
+    if raw_value:
+        try:
+            return max(64, int(raw_value))
+        except ValueError:
+            logger.warning("Ignoring invalid JARVIS_RECOVERY_PAYLOAD_BYTES=%s", raw_value)
+    return DEFAULT_RECOVERY_PAYLOAD_BYTES
+
+
+def compact_payload(payload: Any, *, max_bytes: int) -> Any:
+    """Shrink a JSON-compatible payload so it serializes within ``max_bytes``.
+
+    Error fields (``status``, ``error``...) are kept verbatim. Large lists are
+    cut to the items that fit and end with a note saying how many were
+    omitted; long strings are truncated. Payloads that already fit are
+    returned unchanged.
+    """
+
+    if _json_size(payload) <= max_bytes:
+        return payload
+
+    if isinstance(payload, dict):
+        compacted = {key: payload[key] for key in _ERROR_FIELDS if key in payload}
+        remaining = max_bytes - _json_size(compacted)
+        for key, value in payload.items():
+            if key in compacted:
+                continue
+            # Reserve room for the key itself and the separators.
+            budget = remaining - _json_size(key) - 2
+            if budget <= 0:
+                break
+            compacted[key] = compact_payload(value, max_bytes=budget)
+            remaining = max_bytes - _json_size(compacted)
+        return compacted
+
+    if isinstance(payload, list):
+        return _compact_list(payload, max_bytes=max_bytes)
+
+    if isinstance(payload, str):
+        return payload[: max(0, max_bytes // 2 - 3)] + "..."
+
+    return payload
+
+
+def _compact_list(items: List[Any], *, max_bytes: int) -> List[Any]:
+    kept: List[Any] = []
+    # Leave room for the trailing "N more items omitted" marker.
+    budget = max_bytes - 48
+    item_budget = max(32, budget // 4)
+    for item in items:
+        candidate = compact_payload(item, max_bytes=item_budget)
+        if _json_size([*kept, candidate]) > budget:
+            break
+        kept.append(candidate)
+
+    omitted = len(items) - len(kept)
+    if omitted:
+        kept.append(f"... {omitted} more of {len(items)} items omitted")
+    return kept
+
+
+def _json_size(value: Any) -> int:
+    return len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+
 def build_error_resolution_prompt(
-    user_message: str, failed_command: dict, error_response: object
+    user_message: str,
+    failed_command: dict,
+    error_response: object,
+    *,
+    attempt: int = 1,
+    max_payload_bytes: Optional[int] = None,
 ) -> str:
-    """Ask the LLM to rebuild commands after the bridge returns an error."""
+    """Ask the LLM to rebuild commands after the bridge returns an error.
 
-    return "\n".join(
+    The bridge response is compacted to ``max_payload_bytes`` (see
+    :func:`recovery_payload_budget`). From the second recovery attempt on the
+    full :data:`SYSTEM_PROMPT` is replaced by the shorter
+    :data:`RECOVERY_CONTRACT_REMINDER`; the request carries no earlier context,
+    so that is all the model gets of the contract.
+    """
+
+    budget = max_payload_bytes if max_payload_bytes is not None else recovery_payload_budget()
+    compacted = compact_payload(error_response, max_bytes=budget)
+    header = SYSTEM_PROMPT if attempt <= 1 else RECOVERY_CONTRACT_REMINDER
+
+    prompt = "\n".join(
         [
-            SYSTEM_PROMPT,
+            header,
             "The previous command failed on execution. Craft new executable commands that resolve the issue.",
             "If multiple steps are needed, output a list of commands where each step is isolated.",
             "Use the provided error details to adjust application names or required arguments.",
             "Return JSON only.",
             "Original user request: " + user_message,
             "Failed command: " + json.dumps(failed_command, ensure_ascii=False),
-            "Bridge response: " + json.dumps(error_response, ensure_ascii=False),
+            "Bridge response: " + json.dumps(compacted, ensure_ascii=False),
             "Assistant:",
         ]
     )
+    logger.info(
+        "Recovery prompt (attempt %d): %d bytes; bridge response %d -> %d bytes",
+        attempt,
+        len(prompt.encode("utf-8")),
+        _json_size(error_response),
+        _json_size(compacted),
+    )
+    return prompt
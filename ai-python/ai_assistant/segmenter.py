@@ -0,0 +1,235 @@
+"""Local clause segmentation used to spot compound requests without the LLM."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Set
+
+# Imperative verb stems. Matching by prefix covers the usual inflections
+# ("открой"/"откройте", "запусти"/"запустите") without a morphology library.
+_RU_ACTION_STEMS = (
+    "откр",
+    "запус",
+    "закр",
+    "найд",
+    "найти",
+    "поищ",
+    "ищи",
+    "покаж",
+    "показ",
+    "включ",
+    "выключ",
+    "отключ",
+    "сдела",
+    "созда",
+    "удал",
+    "перемест",
+    "перенес",
+    "скопир",
+    "копир",
+    "установ",
+    "постав",
+    "убав",
+    "прибав",
+    "увелич",
+    "уменьш",
+    "сверн",
+    "провер",
+    "сканир",
+    "просканир",
+    "отсканир",
+    "сфотограф",
+    "сними",
+    "запиши",
+    "выведи",
+    "перечисл",
+)
+
+_EN_ACTION_WORDS = {
+    "open",
+    "launch",
+    "start",
+    "run",
+    "close",
+    "find",
+    "search",
+    "show",
+    "take",
+    "mute",
+    "unmute",
+    "set",
+    "turn",
+    "create",
+    "make",
+    "delete",
+    "remove",
+    "move",
+    "copy",
+    "check",
+    "scan",
+    "list",
+    "capture",
+    "record",
+    "increase",
+    "decrease",
+    "lower",
+    "raise",
+}
+
+_QUESTION_WORDS = {
+    "что",
+    "как",
+    "почему",
+    "зачем",
+    "когда",
+    "где",
+    "кто",
+    "сколько",
+    "какой",
+    "какая",
+    "какое",
+    "какие",
+    "ли",
+    "what",
+    "how",
+    "why",
+    "when",
+    "where",
+    "who",
+    "which",
+    "is",
+    "are",
+    "can",
+    "could",
+    "do",
+    "does",
+}
+
+# Filler words that never count as an action object on their own.
+_FILLER_WORDS = {
+    "пожалуйста",
+    "please",
+    "мне",
+    "me",
+    "тоже",
+    "ещё",
+    "еще",
+    "also",
+    "too",
+    "the",
+    "a",
+    "an",
+    "это",
+    "this",
+    "it",
+}
+
+# Connectors that may separate clauses, ordered longest first so that
+# "после этого" wins over "после".
+_CONNECTORS = (
+    "после этого",
+    "а потом",
+    "а затем",
+    "and then",
+    "after that",
+    "затем",
+    "потом",
+    "после",
+    "сначала",
+    "далее",
+    "then",
+    "и",
+    "and",
+)
+
+_SPLIT_PATTERN = re.compile(
+    r"\s*[,;]\s*|\s*(?<![\w-])(?:" + "|".join(re.escape(c) for c in _CONNECTORS) + r")(?![\w-])\s*",
+    re.IGNORECASE,
+)
+_WORD_PATTERN = re.compile(r"[\w-]+", re.UNICODE)
+
+
+@dataclass
+class Clause:
+    """A fragment of the request between two connectors."""
+
+    text: str
+    verb: Optional[str]
+    objects: List[str]
+    is_question: bool
+
+    @property
+    def is_actionable(self) -> bool:
+        return self.verb is not None and not self.is_question
+
+
+def segment_clauses(text: str) -> List[Clause]:
+    """Split ``text`` into clauses on commas and conjunctions like "и"/"затем"."""
+
+    clauses: List[Clause] = []
+    question = text.strip().endswith("?")
+    for fragment in _SPLIT_PATTERN.split(text):
+        fragment = fragment.strip(" .!?")
+        if not fragment:
+            continue
+        words = _WORD_PATTERN.findall(fragment)
+        if not words:
+            continue
+
+        lowered = [word.lower() for word in words]
+        verb = next((word for word in lowered if _is_action_word(word)), None)
+        objects = [
+            original
+            for original, word in zip(words, lowered)
+            if word != verb and word not in _FILLER_WORDS and not _is_action_word(word)
+        ]
+        is_question = lowered[0] in _QUESTION_WORDS or (question and verb is None)
+        clauses.append(
+            Clause(text=fragment, verb=verb, objects=objects, is_question=is_question)
+        )
+    return clauses
+
+
+def count_actionable_clauses(
+    text: str, *, known_names: Optional[Iterable[str]] = None
+) -> int:
+    """Count clauses that would each become a separate command.
+
+    A clause with an action verb counts once. A verbless clause that follows
+    an actionable one ("открой телеграм и калькулятор") counts as another
+    object for the same verb, unless it looks like part of a proper name
+    split by "и" ("открой Ромео и Джульетта"): a capitalised fragment that is
+    not a known application name is glued to the previous clause instead.
+    """
+
+    known: Set[str] = {name.casefold() for name in known_names or []}
+    count = 0
+    previous_actionable = False
+    for clause in segment_clauses(text):
+        if clause.is_actionable:
+            count += 1
+            previous_actionable = True
+            continue
+
+        if clause.is_question or not previous_actionable or not clause.objects:
+            previous_actionable = False
+            continue
+
+        if _looks_like_name_continuation(clause, known):
+            continue
+        count += 1
+
+    return count
+
+
+def _looks_like_name_continuation(clause: Clause, known: Set[str]) -> bool:
+    if clause.text.casefold() in known:
+        return False
+    return clause.text[:1].isupper()
+
+
+def _is_action_word(word: str) -> bool:
+    if word in _EN_ACTION_WORDS:
+        return True
+    return any(word.startswith(stem) for stem in _RU_ACTION_STEMS)
@@ -1,21 +1,39 @@
-"""Speech-to-text helpers for GPT transcription."""
+"""Speech-to-text helpers for GPT transcription.
+
+``JARVIS_TRANSCRIPTION_BACKEND`` picks where audio is transcribed: ``cloud``
+(the OpenAI API, default), ``local`` (a resident Whisper model, see
+:mod:`ai_assistant.local_whisper`) or ``local_first``, which falls back to the
+cloud when the local model is unavailable, fails or hears nothing.
+"""
 
 from __future__ import annotations
 
-import io
 import logging
 import os
+from contextlib import contextmanager
 from pathlib import Path
-from typing import BinaryIO, Iterable
-import wave
+from typing import BinaryIO, Callable, ContextManager, Iterable, Iterator, Union
+
+import numpy as np
 
 from openai import OpenAIError, PermissionDeniedError
 
+from .audio import UPLOAD_ENCODINGS, BytesLike, MemoryFile, PcmBuffer, encode_upload
+from .chunking import DEFAULT_SEGMENT_SECONDS, DEFAULT_WORKERS, split_segments, transcribe_segments
+from .local_whisper import get_local_whisper
 from .openai_client import build_openai_client
+from .vad import speech_bounds
 
 logger = logging.getLogger(__name__)
 
 _BASE_ALLOWED_LANGUAGES = {"ru", "en"}
+TRANSCRIPTION_BACKENDS = ("cloud", "local", "local_first")
+
+_TRANSCRIPTION_PROMPT = (
+    "The speaker will talk in Russian or English. If the audio is in another language, "
+    "treat it as unsupported and do not attempt to transcribe it."
+)
+_FALSY = {"0", "false", "no", "off"}
 _LANGUAGE_ALIASES = {
     "russian": "ru",
     "русский": "ru",
@@ -70,6 +88,48 @@ def _transcription_model() -> str:
     return os.getenv("OPENAI_TRANSCRIPTION_MODEL", "whisper-1")
 
 
+def _trim_silence_enabled() -> bool:
+    return os.getenv("JARVIS_TRIM_SILENCE", "").strip().lower() not in _FALSY
+
+
+def _upload_encoding() -> str:
+    encoding = os.getenv("OPENAI_TRANSCRIPTION_ENCODING", "").strip().lower()
+    if not encoding:
+        return "pcm16"
+    if encoding not in UPLOAD_ENCODINGS:
+        logger.warning("Ignoring invalid OPENAI_TRANSCRIPTION_ENCODING=%s", encoding)
+        return "pcm16"
+    return encoding
+
+
+def _transcription_backend() -> str:
+    backend = os.getenv("JARVIS_TRANSCRIPTION_BACKEND", "").strip().lower().replace("-", "_")
+    if not backend:
+        return "cloud"
+    if backend not in TRANSCRIPTION_BACKENDS:
+        logger.warning("Ignoring invalid JARVIS_TRANSCRIPTION_BACKEND=%s", backend)
+        return "cloud"
+    return backend
+
+
+def _float_env(name: str, default: float) -> float:
+    raw_value = os.getenv(name)
+    if raw_value:
+        try:
+            return float(raw_value)
+        except ValueError:
+            logger.warning("Ignoring invalid %s=%s", name, raw_value)
+    return default
+
+
+def _segment_seconds() -> float:
+    return _float_env("JARVIS_TRANSCRIPTION_SEGMENT_SECONDS", DEFAULT_SEGMENT_SECONDS)
+
+
+def _segment_workers() -> int:
+    return max(1, int(_float_env("JARVIS_TRANSCRIPTION_WORKERS", DEFAULT_WORKERS)))
+
+
 def _request_transcription(file: BinaryIO):
     client = build_openai_client()
 
@@ -79,10 +139,7 @@ def _request_transcription(file: BinaryIO):
         "file": file,
         "response_format": "verbose_json",
         "temperature": 0,
-        "prompt": (
-            "The speaker will talk in Russian or English. If the audio is in another language, "
-            "treat it as unsupported and do not attempt to transcribe it."
-        ),
+        "prompt": _TRANSCRIPTION_PROMPT,
     }
 
     if language_hint:
@@ -102,12 +159,36 @@ def _request_transcription(file: BinaryIO):
         raise RuntimeError("OpenAI transcription request failed") from exc
 
 
+def _transcribe(
+    local_audio: Union[np.ndarray, Path], cloud_file: Callable[[], ContextManager[BinaryIO]]
+):
+    """Run the configured backend; ``cloud_file`` is only opened for the API."""
+
+    backend = _transcription_backend()
+    if backend != "cloud":
+        try:
+            result = get_local_whisper().transcribe(
+                local_audio, language=_language_hint(), prompt=_TRANSCRIPTION_PROMPT
+            )
+        except Exception as exc:  # noqa: BLE001
+            if backend == "local":
+                logger.error("Local Whisper transcription failed: %s", exc)
+                raise RuntimeError("Local Whisper transcription failed") from exc
+            logger.warning("Local Whisper transcription failed, using the API: %s", exc)
+        else:
+            if result.text or backend == "local":
+                return result
+            logger.warning("Local Whisper returned no text, using the API")
+
+    with cloud_file() as file:
+        return _request_transcription(file)
+
+
 def transcribe_audio_file(audio_path: Path) -> str:
     """Transcribe a local audio file using ChatGPT/Whisper."""
 
     logger.info("Transcribing audio file: %s", audio_path)
-    with audio_path.open("rb") as audio_file:
-        response = _request_transcription(audio_file)
+    response = _transcribe(audio_path, lambda: audio_path.open("rb"))
     _ensure_allowed_language(getattr(response, "language", None))
     logger.info("Voice transcript recognized: %s", response.text)
     if not response.text:
@@ -116,44 +197,92 @@ def transcribe_audio_file(audio_path: Path) -> str:
     return response.text
 
 
-def transcribe_stream(chunks: Iterable[bytes]) -> str:
-    """Transcribe streamed audio chunks using ChatGPT/Whisper."""
+def transcribe_stream(chunks: Union[PcmBuffer, Iterable[BytesLike]]) -> str:
+    """Transcribe streamed audio chunks using ChatGPT/Whisper.
+
+    ``chunks`` are 16 kHz mono 16-bit PCM. A :class:`PcmBuffer` (as returned
+    by ``main.record_microphone_audio``) is uploaded from its own memory;
+    other chunks are copied once. Leading and trailing silence is trimmed
+    unless ``JARVIS_TRIM_SILENCE=0``, and ``OPENAI_TRANSCRIPTION_ENCODING``
+    selects the upload format (``pcm16``, ``mulaw`` or ``flac``).
+
+    Speech longer than ``JARVIS_TRANSCRIPTION_SEGMENT_SECONDS`` (15 s; ``0``
+    disables splitting) is cut at pauses and the pieces are transcribed by up
+    to ``JARVIS_TRANSCRIPTION_WORKERS`` concurrent requests.
+    """
 
     logger.info("Starting streaming transcription")
     min_duration_seconds = 0.1
-    sample_rate = 16_000
-    sample_width = 2  # 16-bit PCM
-    bytes_per_second = sample_rate * sample_width
 
-    collected = b"".join(chunks)
-    if not collected:
+    audio = chunks
+    if not isinstance(audio, PcmBuffer):
+        audio = PcmBuffer.from_chunks(chunks, min_duration=min_duration_seconds)
+    if audio.sample_count == 0:
         raise ValueError("No audio data received for streaming transcription")
 
-    logger.debug("Collected %d bytes from stream", len(collected))
+    start, end = 0, audio.sample_count
+    if _trim_silence_enabled():
+        bounds = speech_bounds(audio.samples, sample_rate=audio.sample_rate)
+        if bounds is not None:
+            start, end = bounds
 
-    duration_seconds = len(collected) / bytes_per_second
-    if duration_seconds < min_duration_seconds:
-        pad_bytes = int(min_duration_seconds * bytes_per_second) - len(collected)
-        collected += b"\x00" * pad_bytes
+    segment_seconds = _segment_seconds()
+    if segment_seconds > 0 and end - start > segment_seconds * audio.sample_rate:
+        segments = split_segments(
+            audio.samples[start:end], sample_rate=audio.sample_rate, max_seconds=segment_seconds
+        )
+        # One silent or inaudible piece must not fail the whole dictation;
+        # stitch() skips its empty text.
+        allow_empty = len(segments) > 1
+        text = transcribe_segments(
+            audio,
+            segments,
+            lambda piece: _transcribe_range(
+                piece, 0, piece.sample_count, min_duration_seconds, allow_empty=allow_empty
+            ),
+            offset=start,
+            max_workers=_segment_workers(),
+        )
+        if not text:
+            raise RuntimeError("No transcription text returned")
+        return text
+
+    return _transcribe_range(audio, start, end, min_duration_seconds)
+
+
+def _transcribe_range(
+    audio: PcmBuffer,
+    start: int,
+    end: int,
+    min_duration_seconds: float,
+    *,
+    allow_empty: bool = False,
+) -> str:
+    @contextmanager
+    def upload() -> Iterator[BinaryIO]:
+        # Wrap the PCM into a container the API accepts; audio shorter than the
+        # minimum is padded with silence.
+        body, filename = encode_upload(
+            audio, _upload_encoding(), start=start, end=end, min_duration=min_duration_seconds
+        )
         logger.debug(
-            "Padded audio stream with %d bytes of silence to reach %.1f seconds",
-            pad_bytes,
-            min_duration_seconds,
+            "Uploading %.2f of %.2f seconds of audio as %s (%d bytes)",
+            (end - start) / audio.sample_rate,
+            audio.duration,
+            filename,
+            len(body),
         )
-
-    # Wrap the raw bytes into a minimal WAV container so the API receives a
-    # supported audio format even when the incoming stream is raw PCM.
-    buffer = io.BytesIO()
-    with wave.open(buffer, "wb") as wav_file:
-        wav_file.setnchannels(1)
-        wav_file.setsampwidth(sample_width)
-        wav_file.setframerate(sample_rate)
-        wav_file.writeframes(collected)
-
-    buffer.seek(0)
-    buffer.name = "stream.wav"
-
-    response = _request_transcription(buffer)
+        try:
+            yield MemoryFile(body, name=filename)
+        finally:
+            # Put back the samples the WAV header or padding was written over.
+            audio.restore()
+
+    response = _transcribe(audio.samples[start:end], upload)
+    if not response.text and allow_empty:
+        # Language detection on a silent piece is unreliable; nothing to check.
+        logger.info("Voice transcript segment was empty")
+        return ""
     _ensure_allowed_language(getattr(response, "language", None))
 
     logger.info("Voice transcript recognized: %s", response.text)
@@ -0,0 +1,700 @@
+"""Pure-Python stand-in for the C# core, used by tests and benchmarks.
+
+The server speaks just enough HTTP/1.1 (keep-alive, ``Content-Length``
+bodies) to serve ``/``, ``/system/status``, ``/action/execute`` and
+``/action/batch`` the way ``core/Program.cs`` does. It runs an asyncio loop in a background thread so
+synchronous bridge code can talk to it.
+
+:class:`StandInCore` echoes every command back. :class:`SimulatedCore`
+validates commands like ``CommandValidator``, answers every action that
+``WindowsActionExecutor`` dispatches with a result of the same shape, and
+adds configurable latency, failures and payload sizes. Run it on its own
+with ``python -m ai_assistant.standin``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import math
+import os
+import random
+import threading
+from dataclasses import dataclass, fields, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from .transport import unix_endpoint
+
+logger = logging.getLogger(__name__)
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+# Actions and their required parameters, as in core/Validation/CommandValidator.cs.
+REQUIRED_PARAMS: Dict[str, Tuple[str, ...]] = {
+    "open_app": ("application",),
+    "run_exe": ("path",),
+    "search_files": ("query",),
+    "adjust_setting": ("setting", "value"),
+    "system_status": (),
+    "create_folder": ("path",),
+    "delete_folder": ("path",),
+    "move_file": ("source", "destination"),
+    "copy_file": ("source", "destination"),
+    "scan_applications": (),
+    "list_applications": (),
+    "capture_window": ("application",),
+    "answer_question": ("answer",),
+    "show_desktop": (),
+    "screenshot": (),
+    "mute": (),
+    "set_volume": ("level",),
+    "record_audio": ("duration",),
+}
+
+# z-score of the 99th percentile of a standard normal distribution.
+_Z99 = 2.326
+
+
+class StandInCore:
+    """Serve the core HTTP contract on ``host:port`` from a background thread.
+
+    ``port=0`` picks a free port; :attr:`endpoint` is available after
+    :meth:`start`. :attr:`connections` counts accepted TCP connections, which
+    makes connection reuse observable; :attr:`peak_in_flight` is the largest
+    number of requests handled at the same time.
+
+    With ``unix_socket`` the server listens on that Unix domain socket instead
+    of TCP and :attr:`endpoint` is the matching ``http+unix://`` URL.
+
+    ``batch=False`` behaves like a core built before ``/action/batch`` existed.
+    ``request_delay`` adds a fixed per-request cost, standing in for the
+    routing, validation and logging a real core does for every request.
+    """
+
+    def __init__(
+        self,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        unix_socket: Optional[str] = None,
+        batch: bool = True,
+        request_delay: float = 0.0,
+    ) -> None:
+        self._host = host
+        self._port = port
+        self._unix_socket = unix_socket
+        self._batch = batch
+        self._request_delay = request_delay
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._writers: set[asyncio.StreamWriter] = set()
+        self._handlers: set[asyncio.Task] = set()
+        self.connections = 0
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    @property
+    def endpoint(self) -> str:
+        if self._unix_socket is not None:
+            return unix_endpoint(self._unix_socket)
+        return f"http://{self._host}:{self._port}"
+
+    def start(self) -> "StandInCore":
+        self._thread = threading.Thread(target=self._run, name="standin-core", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(5):
+            raise RuntimeError("Stand-in core did not start")
+        return self
+
+    def stop(self) -> None:
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(5)
+        self._loop = None
+
+    def drop_idle_connections(self) -> None:
+        """Close every open client connection, as a restarted core would."""
+
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._close_writers(), self._loop).result(5)
+
+    def __enter__(self) -> "StandInCore":
+        return self.start()
+
+    def __exit__(self, *_: object) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        if self._unix_socket is not None:
+            start = asyncio.start_unix_server(self._handle_connection, self._unix_socket)
+        else:
+            start = asyncio.start_server(self._handle_connection, self._host, self._port)
+        self._server = self._loop.run_until_complete(start)
+        if self._unix_socket is None:
+            self._port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    async def _shutdown(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        await self._close_writers()
+        # Let the connection handlers finish before the loop stops, or asyncio
+        # reports them as destroyed while pending.
+        handlers = list(self._handlers)
+        for handler in handlers:
+            handler.cancel()
+        await asyncio.gather(*handlers, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+        if self._unix_socket is not None and os.path.exists(self._unix_socket):
+            os.unlink(self._unix_socket)
+
+    async def _close_writers(self) -> None:
+        for writer in list(self._writers):
+            writer.close()
+        self._writers.clear()
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        self._writers.add(writer)
+        handler = asyncio.current_task()
+        if handler is not None:
+            self._handlers.add(handler)
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                self.requests += 1
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+                try:
+                    if self._request_delay:
+                        await asyncio.sleep(self._request_delay)
+                    status, payload = await self.handle(method, path, body)
+                finally:
+                    self.in_flight -= 1
+                keep_alive = headers.get("connection", "").lower() != "close"
+                _write_response(writer, status, payload, keep_alive=keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            self._handlers.discard(handler)
+            writer.close()
+
+    async def handle(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        """Route one request; override in subclasses to change behaviour."""
+
+        if path == "/" and method == "GET":
+            endpoints = {"execute": "POST /action/execute", "status": "GET /system/status"}
+            if self._batch:
+                endpoints["batch"] = "POST /action/batch"
+            return 200, {
+                "service": "JarvisCore",
+                "version": "stand-in",
+                "status": "running",
+                "endpoints": endpoints,
+            }
+        if path == "/system/status" and method == "GET":
+            return 200, _ok({"service": "JarvisCore", "version": "stand-in", "timestamp": _now()})
+        if path == "/action/execute":
+            if method != "POST":
+                return 405, _error("Method not allowed")
+            try:
+                command = json.loads(body or b"{}")
+            except json.JSONDecodeError:
+                return 400, _error("Invalid JSON body")
+            return 200, await self.run(command)
+        if path == "/action/batch" and self._batch:
+            if method != "POST":
+                return 405, _error("Method not allowed")
+            try:
+                batch = json.loads(body or b"{}")
+            except json.JSONDecodeError:
+                return 400, _error("Invalid JSON body")
+            return 200, _ok(await self.execute_batch(batch))
+        return 404, _error(f"Unknown path {path}")
+
+    async def run(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute one command on the server loop; override to add waiting."""
+
+        return self.execute(command)
+
+    def execute(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        action = command.get("action")
+        return _ok({"action": action, "params": command.get("params", {})})
+
+    async def execute_batch(self, batch: Dict[str, Any]) -> List[Dict[str, Any]]:
+        results: List[Dict[str, Any]] = []
+        for command in batch.get("commands", []):
+            result = await self.run(command)
+            results.append(result)
+            if batch.get("stopOnError", True) and result.get("status") == "error":
+                break
+        return results
+
+
+async def _read_request(
+    reader: asyncio.StreamReader,
+) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    length = int(headers.get("content-length", "0") or 0)
+    body = await reader.readexactly(length) if length else b""
+    return method, path, headers, body
+
+
+def _write_response(
+    writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any], *, keep_alive: bool
+) -> None:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {_REASONS.get(status, 'OK')}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+
+def _ok(result: Any) -> Dict[str, Any]:
+    return {"status": "ok", "result": result, "error": None}
+
+
+def _error(message: str) -> Dict[str, Any]:
+    return {"status": "error", "result": None, "error": message}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+@dataclass(frozen=True)
+class ActionProfile:
+    """Simulated cost and failure behaviour of one action.
+
+    Latency is log-normal with the given median and 99th percentile, which
+    gives the long right tail real process launches and file searches have;
+    ``p99_ms <= median_ms`` makes it fixed. ``error_rate`` is the share of
+    commands answered with an ``"error"`` status. ``payload_bytes`` is the
+    size of the binary data (image, audio) or the number of list entries in
+    the result, depending on the action.
+    """
+
+    median_ms: float = 2.0
+    p99_ms: float = 10.0
+    error_rate: float = 0.0
+    payload_bytes: int = 0
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """Return one latency draw in seconds."""
+
+        if self.median_ms <= 0:
+            return 0.0
+        if self.p99_ms <= self.median_ms:
+            return self.median_ms / 1000
+        sigma = math.log(self.p99_ms / self.median_ms) / _Z99
+        return rng.lognormvariate(math.log(self.median_ms), sigma) / 1000
+
+
+# Rough figures for a desktop core: process launches and file searches take
+# hundreds of milliseconds, captures carry a few megabytes of image data and
+# a registry scan walks the disk.
+DEFAULT_PROFILES: Dict[str, ActionProfile] = {
+    "open_app": ActionProfile(median_ms=150, p99_ms=900),
+    "run_exe": ActionProfile(median_ms=150, p99_ms=900),
+    "search_files": ActionProfile(median_ms=120, p99_ms=2000, payload_bytes=25),
+    "system_status": ActionProfile(median_ms=1, p99_ms=5),
+    "scan_applications": ActionProfile(median_ms=1500, p99_ms=6000),
+    "list_applications": ActionProfile(median_ms=5, p99_ms=30, payload_bytes=150),
+    "capture_window": ActionProfile(median_ms=120, p99_ms=500, payload_bytes=1_500_000),
+    "screenshot": ActionProfile(median_ms=180, p99_ms=600, payload_bytes=3_000_000),
+    "answer_question": ActionProfile(median_ms=20, p99_ms=200),
+    "show_desktop": ActionProfile(median_ms=30, p99_ms=120),
+    "record_audio": ActionProfile(median_ms=20, p99_ms=100),
+}
+
+
+class SimulatedCore(StandInCore):
+    """Stand-in that behaves like the real core for load and latency tests.
+
+    ``profiles`` overrides :data:`DEFAULT_PROFILES` per action; actions
+    without a profile use ``default_profile``. Simulated work waits on the
+    server loop, so slow commands do not block other connections, and
+    ``time_scale`` multiplies every wait (``0`` disables them). ``seed``
+    makes latency draws, injected failures and payloads reproducible.
+    ``record_audio`` also waits for the requested ``duration``.
+
+    :attr:`executed` counts commands per action and :attr:`injected_errors`
+    the failures added by ``error_rate``.
+    """
+
+    def __init__(
+        self,
+        *,
+        profiles: Optional[Mapping[str, ActionProfile]] = None,
+        default_profile: ActionProfile = ActionProfile(),
+        time_scale: float = 1.0,
+        seed: Optional[int] = None,
+        **options: Any,
+    ) -> None:
+        super().__init__(**options)
+        self._profiles = {**DEFAULT_PROFILES, **(profiles or {})}
+        self._default_profile = default_profile
+        self._time_scale = time_scale
+        self._rng = random.Random(seed)
+        self._blobs: Dict[int, str] = {}
+        self._started = datetime.now(timezone.utc)
+        self.executed: Dict[str, int] = {}
+        self.injected_errors = 0
+
+    def profile(self, action: str) -> ActionProfile:
+        return self._profiles.get(action, self._default_profile)
+
+    async def run(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        errors = validate(command)
+        if errors:
+            return _error(f"Validation failed: {', '.join(errors)}")
+
+        action = command["action"]
+        params = command.get("params") or {}
+        self.executed[action] = self.executed.get(action, 0) + 1
+        profile = self.profile(action)
+
+        delay = profile.sample_latency(self._rng)
+        if action == "record_audio":
+            delay += _as_float(params.get("duration"))
+        if delay * self._time_scale > 0:
+            await asyncio.sleep(delay * self._time_scale)
+
+        if profile.error_rate and self._rng.random() < profile.error_rate:
+            self.injected_errors += 1
+            return _error(f"Execution failed: simulated {action} failure")
+        return self.execute(command)
+
+    def execute(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        action = command.get("action")
+        builder = _RESULT_BUILDERS.get(str(action))
+        if builder is None:
+            return _error(f"Unknown action: {action}")
+        params = command.get("params") or {}
+        return builder(self, params, self.profile(str(action)).payload_bytes)
+
+    def _blob(self, size: int) -> str:
+        """Base64 of ``size`` random bytes, generated once per size."""
+
+        if size not in self._blobs:
+            self._blobs[size] = base64.b64encode(self._rng.randbytes(size)).decode("ascii")
+        return self._blobs[size]
+
+    def _open_app(self, params: Dict[str, Any], _: int) -> Dict[str, Any]:
+        name = str(params["application"])
+        return _ok({
+            "application": name,
+            "path": f"C:\\Program Files\\{name}\\{name}.exe",
+            "category": "Other",
+            "processId": self._rng.randint(1000, 65000),
+            "message": f"Successfully opened {name}",
+        })
+
+    def _run_exe(self, params: Dict[str, Any], _: int) -> Dict[str, Any]:
+        path = str(params["path"])
+        file_name = path.replace("/", "\\").rsplit("\\", 1)[-1]
+        return _ok({
+            "path": path,
+            "fileName": file_name,
+            "processId": self._rng.randint(1000, 65000),
+            "message": f"Successfully started {file_name}",
+        })
+
+    def _search_files(self, params: Dict[str, Any], count: int) -> Dict[str, Any]:
+        query = str(params["query"])
+        files = [f"{query}_{index}.txt" for index in range(count)]
+        return _ok({"query": query, "filesFound": len(files), "files": files})
+
+    def _adjust_setting(self, params: Dict[str, Any], _: int) -> Dict[str, Any]:
+        return _ok({
+            "setting": params["setting"],
+            "value": params["value"],
+            "message": "Setting adjustment is not yet implemented. This is a placeholder.",
+        })
+
+    def _system_status(self, _params: Dict[str, Any], _: int) -> Dict[str, Any]:
+        uptime = datetime.now(timezone.utc) - self._started
+        return _ok({
+            "machineName": "STANDIN",
+            "userName": "jarvis",
+            "osVersion": "Microsoft Windows NT 10.0.22631.0",
+            "cpuCount": os.cpu_count() or 1,
+            "uptimeMs": int(uptime.total_seconds() * 1000),
+            "timestamp": _now(),
+        })
+
+    def _create_folder(self, params: Dict[str, Any], _: int) -> Dict[str, Any]:
+        return _ok({
+            "path": params["path"],
+            "message": "Folder created successfully",
+            "alreadyExisted": False,
+        })
+
+    def _delete_folder(self, params: Dict[str, Any], _: int) -> Dict[str, Any]:
+        return _ok({"path": params["path"], "message": "Folder deleted successfully"})
+
+    def _move_file(self, params: Dict[str, Any], _: int) -> Dict[str, Any]:
+        return _ok({
+            "source": params["source"],
+            "destination": params["destination"],
+            "message": "File moved successfully",
+        })
+
+    def _copy_file(self, params: Dict[str, Any], _: int) -> Dict[str, Any]:
+        return _ok({
+            "source": params["source"],
+            "destination": params["destination"],
+            "message": "File copied successfully",
+        })
+
+    def _scan_applications(self, _params: Dict[str, Any], _: int) -> Dict[str, Any]:
+        count = self.profile("list_applications").payload_bytes
+        return _ok({
+            "message": "Application scan completed successfully",
+            "statistics": _statistics(count),
+        })
+
+    def _list_applications(self, _params: Dict[str, Any], count: int) -> Dict[str, Any]:
+        applications = [
+            {
+                "name": f"Application {index}",
+                "category": "Other",
+                "path": f"C:\\Program Files\\App{index}\\app{index}.exe",
+                "aliases": [f"app{index}"],
+                "isSystemApp": index % 5 == 0,
+            }
+            for index in range(count)
+        ]
+        return _ok({
+            "applications": applications,
+            "count": count,
+            "statistics": _statistics(count),
+        })
+
+    def _capture_window(self, params: Dict[str, Any], size: int) -> Dict[str, Any]:
+        name = str(params["application"])
+        return _ok({
+            "application": name,
+            "windowTitle": f"{name} - Window",
+            "processName": name.lower(),
+            "width": 1920,
+            "height": 1080,
+            "image": self._blob(size),
+            "capturedAt": _now(),
+        })
+
+    def _answer_question(self, params: Dict[str, Any], _: int) -> Dict[str, Any]:
+        return _ok({
+            "question": params.get("question"),
+            "answer": params["answer"],
+            "spoken": False,
+            "logged": True,
+            "message": "Answer delivered",
+        })
+
+    def _show_desktop(self, _params: Dict[str, Any], _: int) -> Dict[str, Any]:
+        return _ok({"action": "show_desktop", "message": "Desktop shown (all windows minimized)"})
+
+    def _screenshot(self, _params: Dict[str, Any], size: int) -> Dict[str, Any]:
+        path = "C:\\Users\\jarvis\\Pictures\\screenshot.png"
+        return _ok({
+            "action": "screenshot",
+            "path": path,
+            "width": 3840,
+            "height": 2160,
+            "image": self._blob(size),
+            "message": f"Screenshot saved to {path}",
+        })
+
+    def _mute(self, _params: Dict[str, Any], _: int) -> Dict[str, Any]:
+        return _ok({"action": "mute", "message": "System mute toggled"})
+
+    def _set_volume(self, params: Dict[str, Any], _: int) -> Dict[str, Any]:
+        level = params["level"]
+        return _ok({"action": "set_volume", "level": level, "message": f"Volume set to {level}%"})
+
+    def _record_audio(self, params: Dict[str, Any], size: int) -> Dict[str, Any]:
+        duration = _as_float(params["duration"])
+        sample_rate = int(params.get("sampleRate") or 16_000)
+        channels = int(params.get("channels") or 1)
+        data_size = size or int(duration * sample_rate * channels * 2)
+        return _ok({
+            "fileName": params.get("fileName") or "recording.wav",
+            "path": "C:\\Users\\jarvis\\Music\\recording.wav",
+            "durationSeconds": duration,
+            "sampleRate": sample_rate,
+            "channels": channels,
+            "sizeBytes": data_size,
+            "format": "wav",
+            "base64Data": self._blob(data_size),
+            "capturedAt": _now(),
+        })
+
+
+_RESULT_BUILDERS: Dict[str, Callable[[SimulatedCore, Dict[str, Any], int], Dict[str, Any]]] = {
+    action: getattr(SimulatedCore, f"_{action}") for action in REQUIRED_PARAMS
+}
+
+
+def validate(command: Dict[str, Any]) -> List[str]:
+    """Return the errors ``CommandValidator`` would report for ``command``."""
+
+    errors: List[str] = []
+    action = command.get("action")
+    params = command.get("params") or {}
+    if not action:
+        errors.append("Action is required")
+    elif action not in REQUIRED_PARAMS:
+        errors.append(
+            f"Action '{action}' is not allowed. Allowed actions: {', '.join(REQUIRED_PARAMS)}"
+        )
+    else:
+        for name in REQUIRED_PARAMS[action]:
+            if name not in params:
+                errors.append(f"Missing required parameter: {name}")
+            elif params[name] is None or not str(params[name]).strip():
+                errors.append(f"Parameter '{name}' cannot be empty")
+
+    if not command.get("uuid"):
+        errors.append("UUID is required")
+    timestamp = command.get("timestamp")
+    if not timestamp:
+        errors.append("Timestamp is required")
+    else:
+        try:
+            datetime.fromisoformat(str(timestamp).replace("Z", "+00:00"))
+        except ValueError:
+            errors.append("Timestamp must be in ISO 8601 format")
+    return errors
+
+
+def load_profiles(path: Path) -> Dict[str, ActionProfile]:
+    """Read per-action profiles from JSON, e.g. ``{"open_app": {"median_ms": 80}}``.
+
+    Fields that are left out keep the value of :data:`DEFAULT_PROFILES` for
+    that action. The key ``"*"`` sets the profile of actions without one.
+    """
+
+    raw = json.loads(Path(path).read_text(encoding="utf-8"))
+    if not isinstance(raw, dict):
+        raise ValueError("Profile file must contain a JSON object")
+
+    known = {field.name for field in fields(ActionProfile)}
+    profiles: Dict[str, ActionProfile] = {}
+    for action, values in raw.items():
+        unknown = set(values) - known
+        if unknown:
+            raise ValueError(f"Unknown profile fields for {action}: {', '.join(sorted(unknown))}")
+        base = DEFAULT_PROFILES.get(action, ActionProfile())
+        profiles[action] = replace(base, **values)
+    return profiles
+
+
+def _statistics(count: int) -> Dict[str, Any]:
+    system = (count + 4) // 5
+    return {
+        "TotalApplications": count,
+        "SystemApplications": system,
+        "UserApplications": count - system,
+        "Categories": [{"Category": "Other", "Count": count}] if count else [],
+    }
+
+
+def _as_float(value: Any) -> float:
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Serve a simulated JarvisCore for load tests and benchmarks."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--unix-socket", help="Listen on this Unix domain socket instead of TCP")
+    parser.add_argument("--profile", type=Path, help="JSON file with per-action profiles")
+    parser.add_argument(
+        "--time-scale", type=float, default=1.0, help="Multiply simulated latency (0 disables it)"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, help="Failure share for every action, overriding profiles"
+    )
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--no-batch", action="store_true", help="Do not serve /action/batch")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    profiles = {**DEFAULT_PROFILES, **(load_profiles(args.profile) if args.profile else {})}
+    default_profile = profiles.pop("*", ActionProfile())
+    if args.error_rate is not None:
+        profiles = {
+            action: replace(profiles.get(action, default_profile), error_rate=args.error_rate)
+            for action in REQUIRED_PARAMS
+        }
+
+    core = SimulatedCore(
+        host=args.host,
+        port=args.port,
+        unix_socket=args.unix_socket,
+        batch=not args.no_batch,
+        profiles=profiles,
+        default_profile=default_profile,
+        time_scale=args.time_scale,
+        seed=args.seed,
+    )
+    with core:
+        logger.info("Simulated core listening on %s (Ctrl+C to stop)", core.endpoint)
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,556 @@
+"""Keep-alive HTTP connection pools used by the bridge clients."""
+
+from __future__ import annotations
+
+import asyncio
+import http.client
+import logging
+import select
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Awaitable, Dict, Iterator, List, Mapping, Optional, Tuple, TypeVar
+from urllib.parse import quote, unquote, urlsplit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_IDLE_TIMEOUT_SECONDS = 30.0
+
+_T = TypeVar("_T")
+
+# Endpoint scheme for a core listening on a Unix domain socket. The socket
+# path is percent-encoded into the host part, as in
+# ``http+unix://%2Frun%2Fjarvis%2Fcore.sock``, so request paths stay as-is.
+UNIX_SCHEME = "http+unix"
+
+# Errors that mean a reused socket may have been closed by the server while
+# idle. Raised while sending, they mean the core never got the request, so it
+# is resent on a new socket. Raised while reading the response, they can also
+# mean the core received and ran the request and then dropped the connection,
+# so only idempotent requests are resent; an /action/execute POST may delete
+# or move files and must not run twice.
+_STALE_SOCKET_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class _StaleConnection(Exception):
+    """A reused connection failed in a way that is safe to retry."""
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """``HTTPConnection`` that connects to a Unix domain socket."""
+
+    def __init__(self, socket_path: str, *, timeout: Optional[float] = None) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+@dataclass
+class PooledResponse:
+    """Fully read HTTP response returned by :meth:`ConnectionPool.request`."""
+
+    status: int
+    reason: str
+    headers: Dict[str, str]
+    body: bytes
+
+    def text(self) -> str:
+        return self.body.decode("utf-8")
+
+
+@dataclass
+class _IdleConnection:
+    connection: http.client.HTTPConnection
+    idle_since: float
+
+
+class ConnectionPool:
+    """Thread-safe pool of persistent HTTP/1.1 connections to one host.
+
+    At most ``max_size`` connections exist at a time; extra callers wait for a
+    free one. Connections idle for longer than ``idle_timeout`` are closed
+    when the pool is next used, and so are idle connections the server has
+    already closed. A request that fails because a reused socket went stale
+    is retried once on a fresh connection, as long as that cannot run it
+    twice (see ``_STALE_SOCKET_ERRORS``). With
+    ``keep_alive=False`` every request opens and closes its own connection,
+    which is how the bridge behaved before pooling.
+
+    Connections go over TCP to ``host:port`` unless ``unix_socket`` names a
+    Unix domain socket; :meth:`for_endpoint` picks the transport from the
+    endpoint scheme.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        *,
+        max_size: int = DEFAULT_POOL_SIZE,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT_SECONDS,
+        timeout: float = 10.0,
+        keep_alive: bool = True,
+        unix_socket: Optional[str] = None,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self._host = host
+        self._port = port
+        self._unix_socket = unix_socket
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+        self._timeout = timeout
+        self._keep_alive = keep_alive
+        self._idle: List[_IdleConnection] = []
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    @classmethod
+    def for_endpoint(cls, endpoint: str, **kwargs: object) -> "ConnectionPool":
+        host, port, unix_socket = _split_endpoint(endpoint)
+        return cls(host, port, unix_socket=unix_socket, **kwargs)  # type: ignore[arg-type]
+
+    @property
+    def keep_alive(self) -> bool:
+        return self._keep_alive
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        body: Optional[bytes] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> PooledResponse:
+        """Send a request and return the fully read response."""
+
+        with self.stream(method, path, body=body, headers=headers, timeout=timeout) as raw:
+            return PooledResponse(
+                status=raw.status,
+                reason=raw.reason,
+                headers=dict(raw.getheaders()),
+                body=raw.read(),
+            )
+
+    @contextmanager
+    def stream(
+        self,
+        method: str,
+        path: str,
+        *,
+        body: Optional[bytes] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> Iterator[http.client.HTTPResponse]:
+        """Send a request and yield the response before its body is read.
+
+        The connection returns to the pool only when the caller has read the
+        whole body; otherwise it is closed.
+        """
+
+        request_headers = dict(headers or {})
+        if not self._keep_alive:
+            request_headers["Connection"] = "close"
+
+        with self._slots:
+            connection, reused = self._acquire(timeout)
+            try:
+                raw = self._start(connection, method, path, body, request_headers, reused=reused)
+            except _StaleConnection:
+                connection.close()
+                logger.debug(
+                    "Pooled connection to %s:%s went stale; reconnecting", self._host, self._port
+                )
+                connection = self._open(timeout)
+                try:
+                    raw = self._start(connection, method, path, body, request_headers, reused=False)
+                except BaseException:
+                    connection.close()
+                    raise
+            except BaseException:
+                connection.close()
+                raise
+
+            try:
+                yield raw
+            except BaseException:
+                connection.close()
+                raise
+            self._release(connection, will_close=raw.will_close or not raw.isclosed())
+
+    def close(self) -> None:
+        """Close every idle connection."""
+
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for entry in idle:
+            entry.connection.close()
+
+    def _acquire(self, timeout: Optional[float]) -> Tuple[http.client.HTTPConnection, bool]:
+        now = time.monotonic()
+        expired: List[_IdleConnection] = []
+        reused: Optional[http.client.HTTPConnection] = None
+        with self._lock:
+            fresh = []
+            for entry in self._idle:
+                if now - entry.idle_since > self._idle_timeout:
+                    expired.append(entry)
+                else:
+                    fresh.append(entry)
+            self._idle = fresh
+            while self._idle and reused is None:
+                entry = self._idle.pop()
+                if _closed_by_server(entry.connection):
+                    expired.append(entry)
+                else:
+                    reused = entry.connection
+
+        for entry in expired:
+            entry.connection.close()
+
+        if reused is not None:
+            reused.timeout = timeout or self._timeout
+            if reused.sock is not None:
+                reused.sock.settimeout(reused.timeout)
+            return reused, True
+        return self._open(timeout), False
+
+    def _open(self, timeout: Optional[float]) -> http.client.HTTPConnection:
+        self.connections_opened += 1
+        if self._unix_socket is not None:
+            return UnixHTTPConnection(self._unix_socket, timeout=timeout or self._timeout)
+        return http.client.HTTPConnection(self._host, self._port, timeout=timeout or self._timeout)
+
+    @staticmethod
+    def _start(
+        connection: http.client.HTTPConnection,
+        method: str,
+        path: str,
+        body: Optional[bytes],
+        headers: Mapping[str, str],
+        *,
+        reused: bool,
+    ) -> http.client.HTTPResponse:
+        try:
+            connection.request(method, path, body=body, headers=dict(headers))
+        except _STALE_SOCKET_ERRORS as exc:
+            if reused:
+                raise _StaleConnection() from exc
+            raise
+        try:
+            return connection.getresponse()
+        except _STALE_SOCKET_ERRORS as exc:
+            if reused and method in _IDEMPOTENT_METHODS:
+                raise _StaleConnection() from exc
+            raise
+
+    def _release(self, connection: http.client.HTTPConnection, *, will_close: bool) -> None:
+        if not self._keep_alive or will_close:
+            connection.close()
+            return
+        with self._lock:
+            self._idle.append(_IdleConnection(connection, time.monotonic()))
+
+
+@dataclass
+class _IdleStream:
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+    idle_since: float
+
+
+class AsyncConnectionPool:
+    """Keep-alive HTTP/1.1 connections for asyncio callers, on plain streams.
+
+    Same policy as :class:`ConnectionPool`: at most ``max_size`` requests are
+    in flight (extra callers wait on a semaphore), idle connections expire
+    after ``idle_timeout`` and a request on a stale reused socket is retried
+    once when that cannot run it twice. Responses with ``Content-Length``, chunked bodies and
+    close-delimited bodies are supported, which covers what Kestrel sends.
+    ``unix_socket`` selects a Unix domain socket instead of TCP. A pool must
+    only be used from the event loop that first used it.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        *,
+        max_size: int = DEFAULT_POOL_SIZE,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT_SECONDS,
+        timeout: float = 10.0,
+        unix_socket: Optional[str] = None,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self._host = host
+        self._port = port
+        self._unix_socket = unix_socket
+        self._idle_timeout = idle_timeout
+        self._timeout = timeout
+        self._idle: List[_IdleStream] = []
+        self._slots = asyncio.Semaphore(max_size)
+        self.connections_opened = 0
+
+    @classmethod
+    def for_endpoint(cls, endpoint: str, **kwargs: object) -> "AsyncConnectionPool":
+        host, port, unix_socket = _split_endpoint(endpoint)
+        return cls(host, port, unix_socket=unix_socket, **kwargs)  # type: ignore[arg-type]
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        body: Optional[bytes] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> PooledResponse:
+        """Send a request and return the fully read response.
+
+        Raises :class:`TimeoutError` when no response arrives within
+        ``timeout`` and :class:`http.client.HTTPException` or :class:`OSError`
+        for connection and protocol failures.
+        """
+
+        head = self._encode_head(method, path, body, headers or {})
+        timeout = timeout or self._timeout
+        async with self._slots:
+            stream, reused = await self._acquire(timeout)
+            try:
+                response, will_close = await _wait_for(
+                    self._exchange(stream, head, body, method, reused=reused), timeout
+                )
+            except _StaleConnection:
+                stream.writer.close()
+                logger.debug(
+                    "Pooled connection to %s:%s went stale; reconnecting", self._host, self._port
+                )
+                stream = await self._open(timeout)
+                try:
+                    response, will_close = await _wait_for(
+                        self._exchange(stream, head, body, method, reused=False), timeout
+                    )
+                except BaseException:
+                    stream.writer.close()
+                    raise
+            except BaseException:
+                stream.writer.close()
+                raise
+
+            self._release(stream, will_close=will_close)
+            return response
+
+    async def aclose(self) -> None:
+        """Close every idle connection."""
+
+        idle, self._idle = self._idle, []
+        for entry in idle:
+            entry.writer.close()
+
+    async def _acquire(self, timeout: float) -> Tuple[_IdleStream, bool]:
+        now = time.monotonic()
+        while self._idle:
+            entry = self._idle.pop()
+            if now - entry.idle_since <= self._idle_timeout and not entry.reader.at_eof():
+                return entry, True
+            entry.writer.close()
+        return await self._open(timeout), False
+
+    async def _open(self, timeout: float) -> _IdleStream:
+        self.connections_opened += 1
+        if self._unix_socket is not None:
+            connect = asyncio.open_unix_connection(self._unix_socket)
+        else:
+            connect = asyncio.open_connection(self._host, self._port)
+        reader, writer = await _wait_for(connect, timeout)
+        return _IdleStream(reader, writer, time.monotonic())
+
+    def _release(self, stream: _IdleStream, *, will_close: bool) -> None:
+        if will_close:
+            stream.writer.close()
+            return
+        stream.idle_since = time.monotonic()
+        self._idle.append(stream)
+
+    def _encode_head(
+        self, method: str, path: str, body: Optional[bytes], headers: Mapping[str, str]
+    ) -> bytes:
+        host = "localhost" if self._unix_socket is not None else f"{self._host}:{self._port}"
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {host}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        if body is not None:
+            lines.append(f"Content-Length: {len(body)}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    @staticmethod
+    async def _exchange(
+        stream: _IdleStream, head: bytes, body: Optional[bytes], method: str, *, reused: bool
+    ) -> Tuple[PooledResponse, bool]:
+        try:
+            # One write keeps headers and body in the same segment.
+            stream.writer.write(head + body if body else head)
+            await stream.writer.drain()
+        except _ASYNC_STALE_ERRORS as exc:
+            if reused:
+                raise _StaleConnection() from exc
+            raise
+        try:
+            return await _read_response(stream.reader, method)
+        except _ASYNC_STALE_ERRORS as exc:
+            if reused and method in _IDEMPOTENT_METHODS:
+                raise _StaleConnection() from exc
+            raise
+
+
+# The same for asyncio streams, which report a short read differently.
+_ASYNC_STALE_ERRORS = _STALE_SOCKET_ERRORS + (asyncio.IncompleteReadError,)
+
+
+async def _read_response(
+    reader: asyncio.StreamReader, method: str
+) -> Tuple[PooledResponse, bool]:
+    status_line = await reader.readline()
+    if not status_line:
+        raise http.client.RemoteDisconnected("Remote end closed connection without response")
+    parts = status_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+    try:
+        version, status_code = parts[0], int(parts[1])
+    except (IndexError, ValueError) as exc:
+        raise http.client.BadStatusLine(status_line.decode("latin-1")) from exc
+    reason = parts[2] if len(parts) > 2 else ""
+
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip()] = value.strip()
+    lowered = {name.lower(): value.lower() for name, value in headers.items()}
+
+    connection = lowered.get("connection", "")
+    will_close = connection == "close" or (version == "HTTP/1.0" and connection != "keep-alive")
+
+    if method == "HEAD" or status_code in (204, 304) or 100 <= status_code < 200:
+        body = b""
+    elif "chunked" in lowered.get("transfer-encoding", ""):
+        body = await _read_chunked(reader)
+    elif "content-length" in lowered:
+        body = await reader.readexactly(int(lowered["content-length"]))
+    else:
+        body = await reader.read()
+        will_close = True
+
+    return PooledResponse(status_code, reason, headers, body), will_close
+
+
+async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+    chunks: List[bytes] = []
+    while True:
+        size_line = await reader.readline()
+        try:
+            size = int(size_line.split(b";", 1)[0].strip(), 16)
+        except ValueError as exc:
+            raise http.client.IncompleteRead(b"".join(chunks)) from exc
+        if size == 0:
+            break
+        chunks.append(await reader.readexactly(size))
+        await reader.readexactly(2)
+    # Skip trailers up to the terminating blank line.
+    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+        pass
+    return b"".join(chunks)
+
+
+async def _wait_for(awaitable: Awaitable[_T], timeout: float) -> _T:
+    """:func:`asyncio.wait_for`, raising the builtin :class:`TimeoutError`.
+
+    Before Python 3.11 ``asyncio.TimeoutError`` is a separate class that is
+    not an :class:`OSError`, so callers catching connection failures would
+    miss it.
+    """
+
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError as exc:
+        raise TimeoutError(f"No response within {timeout:g} s") from exc
+
+
+def _closed_by_server(connection: http.client.HTTPConnection) -> bool:
+    """Whether an idle connection has been closed (or written to) by the server.
+
+    An idle keep-alive socket has nothing to read; if it is readable, the
+    server has closed it or sent something unexpected, so it is not reused.
+    """
+
+    sock = connection.sock
+    if sock is None:
+        return True
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+_SHARED_POOLS: Dict[Tuple[str, int, Optional[str]], ConnectionPool] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_pool(endpoint: str) -> ConnectionPool:
+    """Return the process-wide pool for ``endpoint``.
+
+    Both bridge implementations use this, so a process that talks to the core
+    through either of them keeps one set of warm connections. The pool lives
+    as long as the process; closing a bridge leaves it open.
+    """
+
+    key = _split_endpoint(endpoint)
+    with _SHARED_LOCK:
+        pool = _SHARED_POOLS.get(key)
+        if pool is None:
+            host, port, unix_socket = key
+            pool = _SHARED_POOLS[key] = ConnectionPool(host, port, unix_socket=unix_socket)
+        return pool
+
+
+def unix_endpoint(socket_path: str) -> str:
+    """Return the bridge endpoint URL for a core listening on ``socket_path``."""
+
+    return f"{UNIX_SCHEME}://{quote(socket_path, safe='')}"
+
+
+def _split_endpoint(endpoint: str) -> Tuple[str, int, Optional[str]]:
+    parts = urlsplit(endpoint)
+    if parts.scheme == UNIX_SCHEME:
+        socket_path = unquote(parts.netloc)
+        if not socket_path:
+            raise ValueError(f"Missing socket path in bridge endpoint: {endpoint}")
+        return "localhost", 0, socket_path
+    if parts.scheme not in ("http", ""):
+        raise ValueError(f"Unsupported bridge endpoint scheme: {parts.scheme}")
+    return parts.hostname or "localhost", parts.port or 80, None
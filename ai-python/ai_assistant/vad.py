@@ -0,0 +1,120 @@
+"""Energy-based voice activity detection for trimming recordings before upload."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .audio import SAMPLE_RATE
+
+# Energy of a full-scale int16 square wave, the 0 dBFS reference.
+_FULL_SCALE_POWER = 32768.0**2
+
+
+@dataclass(frozen=True)
+class VadConfig:
+    """Thresholds for :func:`speech_bounds`.
+
+    A frame is voiced when its energy is ``margin_db`` above the noise floor
+    (the ``floor_percentile`` of all frame energies) and above
+    ``min_level_db``. Speech is found as runs of ``min_speech_frames`` voiced
+    frames and then extended outward until ``max_gap`` seconds in a row stay
+    within ``extend_db`` of the floor, which catches soft onsets, stop
+    consonants and trailing sounds. ``lead_margin`` and ``tail_margin``
+    seconds around that are kept as well.
+    """
+
+    frame_seconds: float = 0.02
+    margin_db: float = 10.0
+    extend_db: float = 4.0
+    max_gap: float = 0.3
+    min_level_db: float = -55.0
+    floor_percentile: float = 10.0
+    min_speech_frames: int = 3
+    lead_margin: float = 0.2
+    tail_margin: float = 0.3
+
+
+DEFAULT_VAD = VadConfig()
+
+
+def frame_energy_db(samples: np.ndarray, frame_size: int) -> np.ndarray:
+    """Mean power of each complete ``frame_size`` frame, in dBFS."""
+
+    count = len(samples) // frame_size
+    if count == 0:
+        return np.empty(0, dtype=np.float32)
+    frames = samples[: count * frame_size].reshape(count, frame_size).astype(np.float32)
+    power = np.einsum("ij,ij->i", frames, frames) / frame_size
+    return 10.0 * np.log10(np.maximum(power, 1.0) / _FULL_SCALE_POWER)
+
+
+def voiced_frames(
+    energy_db: np.ndarray, config: VadConfig = DEFAULT_VAD, *, margin_db: Optional[float] = None
+) -> np.ndarray:
+    """Boolean mask of frames ``margin_db`` (default ``config.margin_db``) above the floor."""
+
+    if energy_db.size == 0:
+        return np.zeros(0, dtype=bool)
+    margin = config.margin_db if margin_db is None else margin_db
+    floor = np.percentile(energy_db, config.floor_percentile)
+    return energy_db > max(floor + margin, config.min_level_db)
+
+
+def speech_bounds(
+    samples: np.ndarray,
+    *,
+    sample_rate: int = SAMPLE_RATE,
+    config: VadConfig = DEFAULT_VAD,
+) -> Optional[Tuple[int, int]]:
+    """Return ``(start, end)`` sample indices of the speech in ``samples``.
+
+    ``None`` means no run of voiced frames was found.
+    """
+
+    frame_size = max(1, int(round(config.frame_seconds * sample_rate)))
+    energy_db = frame_energy_db(samples, frame_size)
+    voiced = voiced_frames(energy_db, config)
+
+    run = config.min_speech_frames
+    if voiced.size < run:
+        return None
+    # Window sums equal ``run`` exactly where ``run`` voiced frames follow each other.
+    runs = np.convolve(voiced.astype(np.int8), np.ones(run, dtype=np.int8), mode="valid") == run
+    if not runs.any():
+        return None
+    first = int(np.argmax(runs))
+    last = len(runs) - 1 - int(np.argmax(runs[::-1])) + run
+
+    gap = max(1, int(round(config.max_gap / config.frame_seconds)))
+    quiet = ~voiced_frames(energy_db, config, margin_db=config.extend_db)
+    # quiet_runs[i] marks ``gap`` quiet frames starting at frame i.
+    quiet_runs = np.convolve(quiet.astype(np.int8), np.ones(gap, dtype=np.int8), mode="valid") == gap
+    before = np.flatnonzero(quiet_runs[: max(0, first - gap + 1)])
+    first = int(before[-1]) + gap if before.size else 0
+    after = np.flatnonzero(quiet_runs[last:])
+    last = last + int(after[0]) if after.size else len(quiet)
+
+    start = max(0, first * frame_size - int(config.lead_margin * sample_rate))
+    end = min(len(samples), last * frame_size + int(config.tail_margin * sample_rate))
+    return start, end
+
+
+def trim_silence(
+    samples: np.ndarray,
+    *,
+    sample_rate: int = SAMPLE_RATE,
+    config: VadConfig = DEFAULT_VAD,
+) -> np.ndarray:
+    """Return a view of ``samples`` without leading and trailing non-speech.
+
+    Recordings without detected speech are returned unchanged, so a quiet
+    speaker is never cut to nothing.
+    """
+
+    bounds = speech_bounds(samples, sample_rate=sample_rate, config=config)
+    if bounds is None:
+        return samples
+    return samples[bounds[0] : bounds[1]]
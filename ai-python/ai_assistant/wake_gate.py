@@ -0,0 +1,139 @@
+"""Pick out the stretches of a continuous microphone stream that contain speech.
+
+``wake_word.py`` listens all day; running Whisper on every few seconds of a
+silent room keeps a core busy. :class:`VoiceGate` looks at every block with
+a few NumPy operations and only returns windows worth transcribing.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+from .audio import SAMPLE_RATE
+from .endpointing import track_floor
+from .vad import frame_energy_db
+
+
+@dataclass(frozen=True)
+class GateConfig:
+    """Tuning for :class:`VoiceGate`.
+
+    Frames ``margin_db`` above the noise floor (tracked as in
+    :class:`~ai_assistant.endpointing.EndpointConfig`) and above
+    ``min_level_db`` are voiced. ``min_speech_frames`` voiced frames in a row
+    open a window ``pre_roll`` seconds before the first of them. The window
+    closes ``tail`` seconds after the last voiced frame once ``hangover``
+    seconds of silence have followed. Speech longer than ``max_window`` is
+    split; the next window then starts ``overlap`` seconds before the cut.
+    """
+
+    frame_seconds: float = 0.02
+    margin_db: float = 8.0
+    min_level_db: float = -60.0
+    floor_rise_db: float = 3.0
+    min_speech_frames: int = 4
+    pre_roll: float = 0.3
+    tail: float = 0.3
+    hangover: float = 0.6
+    max_window: float = 5.0
+    overlap: float = 1.0
+
+
+DEFAULT_GATE = GateConfig()
+
+
+@dataclass(frozen=True)
+class Window:
+    """Samples ``start:end`` of the stream, counted from the first block."""
+
+    start: int
+    end: int
+
+
+class VoiceGate:
+    """Turn a stream of int16 blocks into speech windows.
+
+    :meth:`process` takes every captured block and returns the windows that
+    were completed by it. Positions are absolute, so the caller has to keep
+    at least ``max_window + pre_roll`` seconds of audio to cut them out.
+    """
+
+    def __init__(self, config: GateConfig = DEFAULT_GATE, *, sample_rate: int = SAMPLE_RATE) -> None:
+        self.config = config
+        self.sample_rate = sample_rate
+        self.frame_size = max(1, int(round(config.frame_seconds * sample_rate)))
+        self.floor_db: Optional[float] = None
+        self.position = 0  # samples consumed into whole frames
+        self._pending = np.empty(0, dtype=np.int16)
+        self._run = 0
+        self._silent_frames = 0
+        self._start: Optional[int] = None  # start of the open window
+        self._last_voiced = 0  # end of the last voiced frame in it
+
+    @property
+    def speaking(self) -> bool:
+        """Whether a window is open."""
+
+        return self._start is not None
+
+    @property
+    def window_start(self) -> Optional[int]:
+        """Start of the open window, if any."""
+
+        return self._start
+
+    def process(self, block: np.ndarray) -> List[Window]:
+        samples = block.reshape(-1)
+        if self._pending.size:
+            samples = np.concatenate((self._pending, samples))
+        count = len(samples) // self.frame_size
+        self._pending = samples[count * self.frame_size :].copy()
+        if count == 0:
+            return []
+
+        config = self.config
+        energy = frame_energy_db(samples[: count * self.frame_size], self.frame_size)
+        if self.floor_db is None:
+            self.floor_db = float(energy.min())
+        floors = track_floor(energy, self.floor_db, config.floor_rise_db * config.frame_seconds)
+        before = np.concatenate(([self.floor_db], floors[:-1]))
+        self.floor_db = float(floors[-1])
+        voiced = energy > np.maximum(before + config.margin_db, config.min_level_db)
+
+        if self._start is None and not voiced.any():
+            # The common case in a quiet room: nothing to walk through.
+            self._run = 0
+            self.position += count * self.frame_size
+            return []
+        return self._advance(voiced)
+
+    def _advance(self, voiced: np.ndarray) -> List[Window]:
+        config = self.config
+        rate = self.sample_rate
+        windows: List[Window] = []
+        hangover = int(round(config.hangover / config.frame_seconds))
+        for is_voiced in voiced:
+            self.position += self.frame_size
+            if is_voiced:
+                self._run += 1
+                self._silent_frames = 0
+                if self._start is None and self._run >= config.min_speech_frames:
+                    onset = self.position - self._run * self.frame_size
+                    self._start = max(0, onset - int(config.pre_roll * rate))
+                if self._start is not None:
+                    self._last_voiced = self.position
+            else:
+                self._run = 0
+                if self._start is not None:
+                    self._silent_frames += 1
+                    if self._silent_frames >= hangover:
+                        end = min(self.position, self._last_voiced + int(config.tail * rate))
+                        windows.append(Window(self._start, end))
+                        self._start = None
+            if self._start is not None and self.position - self._start >= config.max_window * rate:
+                windows.append(Window(self._start, self.position))
+                self._start = self.position - int(config.overlap * rate)
+        return windows
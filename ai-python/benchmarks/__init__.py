@@ -0,0 +1,4 @@
+"""Micro-benchmarks for the assistant runtime.
+
+Run them from the ``ai-python`` folder, e.g. ``python -m benchmarks.bridge_pool``.
+"""
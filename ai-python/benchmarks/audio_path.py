@@ -0,0 +1,123 @@
+"""Peak memory and time from microphone blocks to the transcription upload body.
+
+Usage::
+
+    python -m benchmarks.audio_path [--seconds 30] [--runs 20]
+
+Replays ``--seconds`` of 16 kHz microphone blocks the way
+``sounddevice.InputStream.read`` returns them (a new 200 ms int16 array per
+block) and turns them into the bytes the HTTP client uploads. The "copying"
+row is the previous ``record_microphone_audio`` + ``transcribe_stream`` path:
+copy every block, ``numpy.concatenate``, ``tobytes``, ``b"".join``, ``wave``
+into ``BytesIO``. The "in place" row appends into a :class:`PcmBuffer` and
+uploads it through :class:`MemoryFile`. Each variant runs in a fresh process,
+so its peak RSS is not hidden by an earlier run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import multiprocessing
+import resource
+import statistics
+import time
+import tracemalloc
+import wave
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from ai_assistant.audio import MemoryFile, PcmBuffer, build_wav
+
+SAMPLE_RATE = 16_000
+BLOCK_SIZE = 3_200  # 200 ms, as in record_microphone_audio
+UPLOAD_CHUNK = 64 * 1024  # httpx multipart reads file bodies in 64 KiB pieces
+
+
+def _blocks(seconds: float) -> Iterator[np.ndarray]:
+    rng = np.random.default_rng(0)
+    for _ in range(int(seconds * SAMPLE_RATE / BLOCK_SIZE)):
+        yield rng.integers(-2000, 2000, size=(BLOCK_SIZE, 1), dtype=np.int16)
+
+
+def _upload(file: io.IOBase) -> int:
+    sent = 0
+    file.seek(0)
+    while chunk := file.read(UPLOAD_CHUNK):
+        sent += len(chunk)
+    return sent
+
+
+def copying(seconds: float) -> int:
+    frames = []
+    for block in _blocks(seconds):
+        frames.append(block.copy())
+    audio_bytes = np.concatenate(frames, axis=0).reshape(-1).tobytes()
+
+    collected = b"".join([audio_bytes])
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(SAMPLE_RATE)
+        wav_file.writeframes(collected)
+    buffer.name = "stream.wav"
+    return _upload(buffer)
+
+
+def in_place(seconds: float) -> int:
+    audio = PcmBuffer.for_duration(seconds)
+    for block in _blocks(seconds):
+        audio.append(block)
+    wav = build_wav(audio, min_duration=0.1)
+    return _upload(MemoryFile(wav, name="stream.wav"))
+
+
+VARIANTS: Dict[str, Callable[[float], int]] = {"copying": copying, "in place": in_place}
+
+
+def _measure(name: str, seconds: float, runs: int, results: "multiprocessing.Queue") -> None:
+    variant = VARIANTS[name]
+    variant(0.4)  # warm up imports and allocator pools
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    variant(seconds)
+    rss_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline
+
+    timings: List[float] = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        size = variant(seconds)
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    variant(seconds)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    results.put((name, size, statistics.median(timings), peak, rss_kib))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    context = multiprocessing.get_context("spawn")
+    pcm_mib = args.seconds * SAMPLE_RATE * 2 / 2**20
+    print(f"{args.seconds:g} s of audio ({pcm_mib:.2f} MiB PCM), median of {args.runs} runs")
+    print(f"{'variant':<10} {'upload':>10} {'time':>10} {'peak heap':>11} {'peak RSS +':>11}")
+    for name in VARIANTS:
+        results = context.Queue()
+        process = context.Process(target=_measure, args=(name, args.seconds, args.runs, results))
+        process.start()
+        _, size, elapsed, peak, rss_kib = results.get()
+        process.join()
+        print(
+            f"{name:<10} {size / 2**20:>6.2f} MiB {elapsed * 1000:>7.2f} ms"
+            f" {peak / 2**20:>7.2f} MiB {rss_kib / 1024:>7.2f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
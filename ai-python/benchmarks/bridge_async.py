@@ -0,0 +1,127 @@
+"""Load test of AsyncHttpBridge against thread-per-request use of the sync bridge.
+
+Usage::
+
+    python -m benchmarks.bridge_async [--commands 2000] [--concurrency 64]
+                                      [--max-in-flight 8] [--request-delay-ms 2]
+                                      [--endpoint http://127.0.0.1:5055]
+
+``--concurrency`` queries are issued at once; without ``--endpoint`` a local
+:class:`~ai_assistant.standin.StandInCore` with a fixed per-request cost is
+started.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Optional
+
+from ai_assistant import bridge
+from ai_assistant.bridge_async import AsyncHttpBridge
+from ai_assistant.schemas import Command
+from ai_assistant.standin import StandInCore
+from ai_assistant.transport import ConnectionPool
+
+
+def _command() -> Command:
+    return Command(
+        action="system_status",
+        params={},
+        uuid="00000000-0000-0000-0000-000000000000",
+        timestamp=datetime.utcnow().isoformat() + "Z",
+    )
+
+
+def _report(label: str, latencies: List[float], elapsed: float, errors: int, threads: int) -> None:
+    latencies.sort()
+    print(
+        f"{label:<30} {len(latencies) / elapsed:>8.0f} cmd/s"
+        f"  p50 {statistics.median(latencies) * 1000:7.2f} ms"
+        f"  p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:7.2f} ms"
+        f"  errors {errors:>3}  peak threads {threads:>3}"
+    )
+
+
+async def _run_async(endpoint: str, commands: int, concurrency: int, max_in_flight: int) -> None:
+    latencies: List[float] = []
+    errors = 0
+    queue: asyncio.Queue[Command] = asyncio.Queue()
+    for _ in range(commands):
+        queue.put_nowait(_command())
+
+    async with AsyncHttpBridge(endpoint, max_in_flight=max_in_flight) as client:
+
+        async def worker() -> None:
+            nonlocal errors
+            while not queue.empty():
+                command = queue.get_nowait()
+                started = time.perf_counter()
+                if await client.send_command(command) is None:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    _report(f"async, {max_in_flight} in flight", latencies, elapsed, errors, threading.active_count())
+
+
+def _run_threads(endpoint: str, commands: int, concurrency: int, max_in_flight: int) -> None:
+    pool = ConnectionPool.for_endpoint(endpoint, max_size=max_in_flight)
+    client = bridge.HttpBridge(endpoint, pool=pool)
+    latencies: List[float] = []
+    errors = 0
+    peak_threads = 0
+    lock = threading.Lock()
+
+    def call(_: int) -> None:
+        nonlocal errors, peak_threads
+        started = time.perf_counter()
+        response = client.send_command(_command())
+        with lock:
+            latencies.append(time.perf_counter() - started)
+            errors += response is None
+            peak_threads = max(peak_threads, threading.active_count())
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(call, range(commands)))
+    elapsed = time.perf_counter() - started
+    pool.close()
+
+    _report(f"threads, {max_in_flight} connections", latencies, elapsed, errors, peak_threads)
+
+
+def run(endpoint: str, commands: int, concurrency: int, max_in_flight: int) -> None:
+    print(f"{commands} commands, {concurrency} concurrent queries")
+    _run_threads(endpoint, commands, concurrency, max_in_flight)
+    asyncio.run(_run_async(endpoint, commands, concurrency, max_in_flight))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commands", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--max-in-flight", type=int, default=8)
+    parser.add_argument("--request-delay-ms", type=float, default=2.0)
+    parser.add_argument("--endpoint", help="Load a running core instead of the stand-in")
+    args = parser.parse_args(argv)
+
+    if args.endpoint:
+        run(args.endpoint, args.commands, args.concurrency, args.max_in_flight)
+        return
+
+    with StandInCore(request_delay=args.request_delay_ms / 1000) as core:
+        run(core.endpoint, args.commands, args.concurrency, args.max_in_flight)
+        print(f"stand-in: {core.connections} connections, peak {core.peak_in_flight} in flight")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Plan latency with one request per command versus one batch request.
+
+Usage::
+
+    python -m benchmarks.bridge_batch [--plans 200] [--request-delay-ms 1.0]
+                                      [--endpoint http://127.0.0.1:5055]
+
+Without ``--endpoint`` a local :class:`~ai_assistant.standin.StandInCore` is
+started; ``--request-delay-ms`` sets its fixed per-request cost.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence
+
+from ai_assistant import bridge
+from ai_assistant.schemas import Command
+from ai_assistant.standin import StandInCore
+from ai_assistant.transport import ConnectionPool
+
+PLAN_SIZES = (3, 5, 10)
+
+
+def _plan(size: int) -> List[Command]:
+    timestamp = datetime.utcnow().isoformat() + "Z"
+    return [
+        Command(
+            action="system_status",
+            params={},
+            uuid=f"00000000-0000-0000-0000-{index:012d}",
+            timestamp=timestamp,
+        )
+        for index in range(size)
+    ]
+
+
+def _time_plans(
+    send: Callable[[Sequence[Command]], object], plan: List[Command], plans: int
+) -> List[float]:
+    latencies: List[float] = []
+    for _ in range(plans):
+        started = time.perf_counter()
+        send(plan)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def run(endpoint: str, plans: int) -> None:
+    pool = ConnectionPool.for_endpoint(endpoint)
+    client = bridge.HttpBridge(endpoint, pool=pool)
+    if not client.supports_batch():
+        print("Core does not advertise /action/batch; both columns use /action/execute")
+
+    def one_by_one(plan: Sequence[Command]) -> None:
+        for command in plan:
+            client.send_command(command)
+
+    print(f"{'commands':>8} {'per command p50':>16} {'batch p50':>10} {'saved':>7} {'round trips':>12}")
+    for size in PLAN_SIZES:
+        plan = _plan(size)
+        single = statistics.median(_time_plans(one_by_one, plan, plans))
+        batched = statistics.median(_time_plans(client.send_commands, plan, plans))
+        print(
+            f"{size:>8} {single * 1000:>13.2f} ms {batched * 1000:>7.2f} ms"
+            f" {1 - batched / single:>6.0%} {size:>6} -> 1"
+        )
+    pool.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--plans", type=int, default=200)
+    parser.add_argument("--request-delay-ms", type=float, default=1.0)
+    parser.add_argument("--endpoint", help="Benchmark a running core instead of the stand-in")
+    args = parser.parse_args(argv)
+
+    if args.endpoint:
+        run(args.endpoint, args.plans)
+        return
+
+    with StandInCore(request_delay=args.request_delay_ms / 1000) as core:
+        run(core.endpoint, args.plans)
+
+
+if __name__ == "__main__":
+    main()
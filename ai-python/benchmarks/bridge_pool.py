@@ -0,0 +1,78 @@
+"""Commands/sec through both bridge clients with connection pooling on and off.
+
+Usage::
+
+    python -m benchmarks.bridge_pool [--commands 2000] [--endpoint http://127.0.0.1:5055]
+
+Without ``--endpoint`` a local :class:`~ai_assistant.standin.StandInCore` is
+started, so the numbers measure client and HTTP overhead only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from ai_assistant import bridge, bridge_requests
+from ai_assistant.schemas import Command
+from ai_assistant.standin import StandInCore
+from ai_assistant.transport import ConnectionPool
+
+
+def _command() -> Command:
+    return Command(
+        action="system_status",
+        params={},
+        uuid="00000000-0000-0000-0000-000000000000",
+        timestamp=datetime.utcnow().isoformat() + "Z",
+    )
+
+
+def _run(label: str, send: Callable[[Command], object], commands: int) -> None:
+    latencies: List[float] = []
+    command = _command()
+    started = time.perf_counter()
+    for _ in range(commands):
+        call_started = time.perf_counter()
+        if send(command) is None:
+            raise RuntimeError(f"{label}: bridge call failed")
+        latencies.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(
+        f"{label:<44} {commands / elapsed:>9.0f} cmd/s"
+        f"  p50 {statistics.median(latencies) * 1000:6.2f} ms"
+        f"  p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:6.2f} ms"
+    )
+
+
+def run(endpoint: str, commands: int) -> None:
+    for keep_alive in (False, True):
+        mode = "pooled" if keep_alive else "connection per call"
+        for name, module in (("bridge", bridge), ("bridge_requests", bridge_requests)):
+            pool = ConnectionPool.for_endpoint(endpoint, keep_alive=keep_alive)
+            client = module.HttpBridge(endpoint, pool=pool)
+            _run(f"{name}, {mode}", client.send_command, commands)
+            pool.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commands", type=int, default=2000)
+    parser.add_argument("--endpoint", help="Benchmark a running core instead of the stand-in")
+    args = parser.parse_args(argv)
+
+    if args.endpoint:
+        run(args.endpoint, args.commands)
+        return
+
+    with StandInCore() as core:
+        run(core.endpoint, args.commands)
+
+
+if __name__ == "__main__":
+    main()
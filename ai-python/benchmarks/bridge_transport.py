@@ -0,0 +1,110 @@
+"""Per-command overhead of the bridge over loopback TCP and a Unix domain socket.
+
+Usage::
+
+    python -m benchmarks.bridge_transport [--commands 5000]
+
+Starts one :class:`~ai_assistant.standin.StandInCore` per transport and sends
+the same command through each client. Unix domain sockets need Linux/macOS
+(or Windows 10+ with AF_UNIX support in Python).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import tempfile
+import time
+from contextlib import ExitStack
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from ai_assistant import bridge, bridge_requests
+from ai_assistant.bridge_async import AsyncHttpBridge
+from ai_assistant.schemas import Command
+from ai_assistant.standin import StandInCore
+from ai_assistant.transport import ConnectionPool
+
+
+def _command() -> Command:
+    return Command(
+        action="system_status",
+        params={},
+        uuid="00000000-0000-0000-0000-000000000000",
+        timestamp=datetime.utcnow().isoformat() + "Z",
+    )
+
+
+def _summary(latencies: List[float]) -> Dict[str, float]:
+    latencies.sort()
+    return {
+        "mean": statistics.fmean(latencies) * 1e6,
+        "p50": statistics.median(latencies) * 1e6,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1e6,
+    }
+
+
+def _time_sync(send: Callable[[Command], object], commands: int) -> Dict[str, float]:
+    command = _command()
+    latencies: List[float] = []
+    for _ in range(commands):
+        started = time.perf_counter()
+        if send(command) is None:
+            raise RuntimeError("bridge call failed")
+        latencies.append(time.perf_counter() - started)
+    return _summary(latencies)
+
+
+async def _time_async(endpoint: str, commands: int) -> Dict[str, float]:
+    command = _command()
+    latencies: List[float] = []
+    async with AsyncHttpBridge(endpoint) as client:
+        for _ in range(commands):
+            started = time.perf_counter()
+            if await client.send_command(command) is None:
+                raise RuntimeError("bridge call failed")
+            latencies.append(time.perf_counter() - started)
+    return _summary(latencies)
+
+
+def run(endpoints: Dict[str, str], commands: int) -> None:
+    print(f"{'client':<16} {'transport':<10} {'mean':>9} {'p50':>9} {'p99':>9}   (microseconds)")
+    for name, module in (("bridge", bridge), ("bridge_requests", bridge_requests)):
+        for transport, endpoint in endpoints.items():
+            pool = ConnectionPool.for_endpoint(endpoint)
+            client = module.HttpBridge(endpoint, pool=pool)
+            stats = _time_sync(client.send_command, commands)
+            pool.close()
+            _print_row(name, transport, stats)
+    for transport, endpoint in endpoints.items():
+        _print_row("bridge_async", transport, asyncio.run(_time_async(endpoint, commands)))
+
+
+def _print_row(client: str, transport: str, stats: Dict[str, float]) -> None:
+    print(
+        f"{client:<16} {transport:<10} {stats['mean']:>9.0f} {stats['p50']:>9.0f}"
+        f" {stats['p99']:>9.0f}"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commands", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    with ExitStack() as stack:
+        endpoints = {"tcp": stack.enter_context(StandInCore()).endpoint}
+        if hasattr(socket, "AF_UNIX"):
+            directory = stack.enter_context(tempfile.TemporaryDirectory())
+            core = StandInCore(unix_socket=os.path.join(directory, "core.sock"))
+            endpoints["unix"] = stack.enter_context(core).endpoint
+        else:
+            print("AF_UNIX is not available; measuring TCP only")
+        run(endpoints, args.commands)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Peak memory and time of a 4K capture: full JSON parse versus streaming decode.
+
+Usage::
+
+    python -m benchmarks.capture_stream [--image-mb 8] [--runs 5]
+
+A stand-in core in a child process answers ``capture_window`` with a random
+(incompressible) image of the given size, so the numbers cover the client
+only. The "json" row is what ``test_capture.py`` used to do: ``requests``,
+``response.json()`` and ``base64.b64decode``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from ai_assistant.bridge import HttpBridge
+from ai_assistant.schemas import Command
+from ai_assistant.standin import StandInCore
+from ai_assistant.transport import ConnectionPool
+
+WIDTH, HEIGHT = 3840, 2160
+
+
+class CaptureCore(StandInCore):
+    def __init__(self, image: bytes) -> None:
+        super().__init__()
+        self._encoded = base64.b64encode(image).decode()
+
+    def execute(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "result": {
+                "application": command.get("params", {}).get("application"),
+                "windowTitle": "Untitled - Notepad",
+                "processName": "notepad",
+                "width": WIDTH,
+                "height": HEIGHT,
+                "image": self._encoded,
+                "capturedAt": datetime.utcnow().isoformat() + "Z",
+            },
+            "error": None,
+        }
+
+
+def _serve(image_mb: float, endpoints: "multiprocessing.Queue[str]", stop: Any) -> None:
+    with CaptureCore(os.urandom(int(image_mb * 1024 * 1024))) as core:
+        endpoints.put(core.endpoint)
+        stop.wait()
+
+
+def _command() -> Command:
+    return Command(
+        action="capture_window",
+        params={"application": "notepad"},
+        uuid="00000000-0000-0000-0000-000000000000",
+        timestamp=datetime.utcnow().isoformat() + "Z",
+    )
+
+
+def _measure(label: str, capture: Callable[[], None], runs: int) -> None:
+    capture()  # warm up connections and imports
+    durations: List[float] = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        capture()
+        durations.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    capture()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{label:<28} {statistics.median(durations) * 1000:>8.1f} ms"
+        f" {peak / (1024 * 1024):>10.1f} MiB"
+    )
+
+
+def run(endpoint: str, runs: int, directory: Path) -> None:
+    session = requests.Session()
+    session.trust_env = False
+    bridge = HttpBridge(endpoint, pool=ConnectionPool.for_endpoint(endpoint))
+    target = directory / "capture.png"
+    size = 0
+
+    def json_decode() -> None:
+        nonlocal size
+        data = session.post(f"{endpoint}/action/execute", json=_command().to_json()).json()
+        image = base64.b64decode(data["result"]["image"])
+        size = len(image)
+        target.write_bytes(image)
+
+    buffer = bytearray()
+
+    def stream_to_file() -> None:
+        result = bridge.capture(_command(), target)
+        assert result is not None and result.ok
+
+    def stream_to_buffer() -> None:
+        result = bridge.capture(_command(), buffer)
+        assert result is not None and result.ok
+
+    print(f"{'client':<28} {'time p50':>11} {'peak heap':>14}")
+    _measure("json + b64decode -> file", json_decode, runs)
+    buffer.extend(bytes(size))
+    _measure("streaming -> file", stream_to_file, runs)
+    _measure("streaming -> bytearray", stream_to_buffer, runs)
+    print(f"image: {size / (1024 * 1024):.1f} MiB PNG payload, {WIDTH}x{HEIGHT}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--image-mb", type=float, default=8.0)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    endpoints: "multiprocessing.Queue[str]" = multiprocessing.Queue()
+    stop = multiprocessing.Event()
+    server = multiprocessing.Process(target=_serve, args=(args.image_mb, endpoints, stop))
+    server.start()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            run(endpoints.get(timeout=10), args.runs, Path(directory))
+    finally:
+        stop.set()
+        server.join(10)
+
+
+if __name__ == "__main__":
+    main()
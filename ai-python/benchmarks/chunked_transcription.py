@@ -0,0 +1,91 @@
+"""Speed-up of segmented, concurrent transcription on long recordings.
+
+Usage::
+
+    python -m benchmarks.chunked_transcription --corpus DIR
+        [--segment-seconds 15] [--workers 4] [--latency 0.5] [--per-second 0.1] [--real]
+
+Every clip of the corpus (see ``benchmarks.transcription_upload``) is
+transcribed once as a single request and once split by
+``chunking.split_segments`` with the pieces sent concurrently. Requests are
+simulated as ``--latency + --per-second * audio seconds`` unless ``--real``
+sends them through ``speech.transcribe_stream`` to the configured backend;
+``--real`` also reports the word error rate of both variants when the
+manifest has reference texts.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from ai_assistant import speech
+from ai_assistant.audio import PcmBuffer
+from ai_assistant.chunking import split_segments, transcribe_segments
+
+from .transcription_upload import load_corpus, read_clip, split_words, word_errors
+
+
+def _simulated(latency: float, per_second: float) -> Callable[[PcmBuffer], str]:
+    def transcribe(audio: PcmBuffer) -> str:
+        time.sleep(latency + per_second * audio.duration)
+        return ""
+
+    return transcribe
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, required=True)
+    parser.add_argument("--segment-seconds", type=float, default=15.0)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.5, help="simulated seconds per request")
+    parser.add_argument("--per-second", type=float, default=0.1, help="simulated seconds per audio second")
+    parser.add_argument("--real", action="store_true", help="use the configured transcription backend")
+    args = parser.parse_args(argv)
+
+    os.environ["JARVIS_TRANSCRIPTION_WORKERS"] = str(args.workers)
+    simulated = _simulated(args.latency, args.per_second)
+    single: List[float] = []
+    chunked: List[float] = []
+    counts: List[int] = []
+    errors = {"single": 0, "chunked": 0}
+    words = 0
+
+    for clip in load_corpus(args.corpus):
+        audio = read_clip(clip.path)
+        segments = split_segments(
+            audio.samples, sample_rate=audio.sample_rate, max_seconds=args.segment_seconds
+        )
+        counts.append(len(segments))
+        overlaps = sum(segment.overlaps_previous for segment in segments)
+        print(f"{clip.path.name}: {audio.duration:.1f} s, {len(segments)} segments, {overlaps} overlapping")
+
+        for name, seconds, timings in (("single", 0.0, single), ("chunked", args.segment_seconds, chunked)):
+            started = time.perf_counter()
+            if args.real:
+                os.environ["JARVIS_TRANSCRIPTION_SEGMENT_SECONDS"] = str(seconds)
+                text = speech.transcribe_stream(read_clip(clip.path))
+                if clip.text:
+                    errors[name] += word_errors(clip.text, text)
+            elif name == "single":
+                simulated(audio)
+            else:
+                transcribe_segments(audio, segments, simulated, max_workers=args.workers)
+            timings.append(time.perf_counter() - started)
+        if args.real and clip.text:
+            words += len(split_words(clip.text))
+
+    print(f"median of {len(single)} clips, {statistics.mean(counts):.1f} segments per clip")
+    print(f"single request {statistics.median(single):.2f} s, chunked {statistics.median(chunked):.2f} s,"
+          f" speed-up {statistics.median(single) / statistics.median(chunked):.2f}x")
+    if words:
+        print(f"WER single {errors['single'] / words:.1%}, chunked {errors['chunked'] / words:.1%}")
+
+
+if __name__ == "__main__":
+    main()
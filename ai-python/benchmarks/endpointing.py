@@ -0,0 +1,101 @@
+"""End-of-speech to end-of-recording latency, fixed against adaptive endpointing.
+
+Usage::
+
+    python -m benchmarks.endpointing --corpus DIR [--threshold 200] [--silence-seconds 1.0]
+
+Every clip of the corpus (see ``benchmarks.transcription_upload``; the
+manifest must give ``speech_end``) is replayed through
+``main.record_microphone_audio``, followed by up to 30 s more of the room
+noise found before its first word, as a microphone would go on capturing.
+The "fixed" row uses the ``--threshold`` peak amplitude, the "adaptive" row
+the :class:`~ai_assistant.endpointing.Endpointer`.
+
+Latency is counted in audio time, from ``speech_end`` to the last captured
+sample, so the replay runs as fast as possible. A recording that stops
+before ``speech_end`` cut the speaker off; one that reaches the maximum
+duration never found the end.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import main as entry_point
+from ai_assistant.endpointing import Endpointer
+
+from .replay import replay_device
+from .transcription_upload import Clip, load_corpus, read_clip
+
+# The fixed peak amplitude main.py stopped recording at before adaptive
+# endpointing; MIC_SILENCE_THRESHOLD still selects that mode.
+FIXED_THRESHOLD = 200
+
+
+def with_room_noise(clip: Clip, seconds: float) -> np.ndarray:
+    audio = read_clip(clip.path)
+    samples = audio.samples
+    lead = samples[: int((clip.speech_start or 0.0) * audio.sample_rate * 0.8)]
+    if not len(lead):
+        return samples
+    repeats = int(np.ceil(seconds * audio.sample_rate / len(lead)))
+    return np.concatenate((samples, np.tile(lead, repeats)))
+
+
+def percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else float("nan")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, required=True)
+    parser.add_argument("--threshold", type=float, default=FIXED_THRESHOLD)
+    parser.add_argument("--silence-seconds", type=float, default=entry_point.DEFAULT_SILENCE_DURATION_SECONDS)
+    args = parser.parse_args(argv)
+
+    clips = [clip for clip in load_corpus(args.corpus) if clip.speech_end is not None]
+    modes = {"fixed": args.threshold, "adaptive": None}
+    latencies: Dict[str, List[float]] = {name: [] for name in modes}
+    cut: Dict[str, int] = {name: 0 for name in modes}
+    timeouts: Dict[str, int] = {name: 0 for name in modes}
+
+    for clip in clips:
+        samples = with_room_noise(clip, entry_point.DEFAULT_MAX_DURATION_SECONDS)
+        for name, threshold in modes.items():
+            device = replay_device(samples, time_scale=1e-6)
+            entry_point._load_dependency = lambda _name: device
+            audio = entry_point.record_microphone_audio(
+                silence_duration_seconds=args.silence_seconds, silence_threshold=threshold
+            )
+            if audio.sample_count >= audio.capacity:
+                timeouts[name] += 1
+            elif audio.duration < clip.speech_end:
+                cut[name] += 1
+            else:
+                latencies[name].append(audio.duration - clip.speech_end)
+
+    samples = with_room_noise(clips[0], 10.0)
+    blocks = samples[: len(samples) // 1600 * 1600].reshape(-1, 1600)
+    endpointer = Endpointer()
+    started = time.perf_counter()
+    for block in blocks:
+        endpointer.process(block)
+    per_block = (time.perf_counter() - started) / len(blocks)
+
+    print(f"{len(clips)} clips, seconds from end of speech to end of recording")
+    print(f"{'mode':<9} {'median':>7} {'p90':>6} {'cut off':>8} {'hit max':>8}")
+    for name in modes:
+        print(
+            f"{name:<9} {percentile(latencies[name], 50):>7.2f} {percentile(latencies[name], 90):>6.2f}"
+            f" {cut[name]:>8} {timeouts[name]:>8}"
+        )
+    print(f"adaptive endpointer: {per_block * 1e6:.0f} us per 100 ms block")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""A ``sounddevice`` stand-in for benchmarks that run ``main.py`` as a process.
+
+Put this folder first on ``PYTHONPATH``. ``InputStream`` delivers, in real
+time, a repeating 3 s pattern: 0.3 s of faint noise, a 0.7 s tone standing in
+for speech, then 2 s of noise, so every recording ends after one "command".
+Both blocking ``read`` and ``callback`` streams are supported.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import numpy as np
+
+_RATE = 16_000
+
+
+def _pattern(rate: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    samples = rng.normal(0, 30, 3 * rate)
+    start, end = int(0.3 * rate), rate
+    t = np.arange(end - start) / rate
+    samples[start:end] += 6000 * np.sin(2 * np.pi * 220 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 3 * t))
+    return samples.astype(np.int16)
+
+
+class InputStream:
+    def __init__(self, *, samplerate=_RATE, channels=1, dtype="int16", blocksize=1600, callback=None, **_):
+        self._pattern = _pattern(int(samplerate))
+        self._rate = int(samplerate)
+        self._blocksize = int(blocksize)
+        self._callback = callback
+        self._position = 0
+        self._started = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _next(self, frames: int) -> np.ndarray:
+        index = (self._position + np.arange(frames)) % len(self._pattern)
+        self._position += frames
+        return self._pattern[index].reshape(-1, 1)
+
+    def _wait(self) -> None:
+        delay = self._started + self._position / self._rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        if self._callback is not None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            block = self._next(self._blocksize)
+            self._wait()
+            self._callback(block, self._blocksize, None, None)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def close(self) -> None:
+        self.stop()
+
+    def __enter__(self) -> "InputStream":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def read(self, frames: int):
+        block = self._next(frames)
+        self._wait()
+        return block, False
@@ -0,0 +1,100 @@
+"""End-of-speech to transcript time, sequential against incremental transcription.
+
+Usage::
+
+    python -m benchmarks.incremental_transcription --corpus DIR
+        [--latency 0.5] [--per-second 0.1] [--real] [--time-scale 0.25]
+
+Every clip of the corpus (see ``benchmarks.transcription_upload``; the
+manifest must give ``speech_end``) is replayed through
+``main.record_microphone_audio`` in real time, scaled by ``--time-scale``.
+The "sequential" row transcribes the recording once it has stopped, as
+``process_microphone_command`` does by default; the "incremental" row uses
+:class:`~ai_assistant.incremental.IncrementalTranscriber`. Both report the
+time from the end of speech to the finished transcript, and from the end of
+recording to the transcript, in unscaled seconds.
+
+Transcription is simulated as ``--latency + --per-second * audio seconds``
+per request unless ``--real`` sends it to the configured backend (then use
+``--time-scale 1``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import main as entry_point
+from ai_assistant.audio import BytesLike, PcmBuffer
+from ai_assistant.incremental import IncrementalTranscriber
+from ai_assistant.speech import transcribe_stream
+
+from .replay import replay_device
+from .transcription_upload import load_corpus, read_clip
+
+Transcribe = Callable[[Iterable[BytesLike]], str]
+
+
+def simulated_transcription(latency: float, per_second: float, time_scale: float) -> Transcribe:
+    def transcribe(chunks: Iterable[BytesLike]) -> str:
+        audio = chunks if isinstance(chunks, PcmBuffer) else PcmBuffer.from_chunks(chunks)
+        time.sleep((latency + per_second * audio.duration) * time_scale)
+        return "text"
+
+    return transcribe
+
+
+def measure(
+    clip_path: Path, speech_end: float, transcribe: Transcribe, incremental: bool, time_scale: float
+) -> Tuple[float, float]:
+    device = replay_device(read_clip(clip_path).samples, time_scale=time_scale)
+    entry_point._load_dependency = lambda name: device
+    transcriber = IncrementalTranscriber(transcribe) if incremental else None
+
+    audio = entry_point.record_microphone_audio(on_block=transcriber.observe if transcriber else None)
+    stopped = time.perf_counter()
+    if transcriber is not None:
+        transcriber.finish(audio)
+    else:
+        transcribe(audio)
+    done = time.perf_counter()
+
+    spoken = device.stream.time_of(int(speech_end * audio.sample_rate))
+    return (done - spoken) / time_scale, (done - stopped) / time_scale
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, required=True)
+    parser.add_argument("--latency", type=float, default=0.5, help="simulated seconds per request")
+    parser.add_argument("--per-second", type=float, default=0.1, help="simulated seconds per audio second")
+    parser.add_argument("--real", action="store_true", help="use the configured transcription backend")
+    parser.add_argument("--time-scale", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    if args.real:
+        transcribe, scale = transcribe_stream, 1.0
+    else:
+        scale = args.time_scale
+        transcribe = simulated_transcription(args.latency, args.per_second, scale)
+
+    clips = [clip for clip in load_corpus(args.corpus) if clip.speech_end is not None]
+    results: Dict[str, List[Tuple[float, float]]] = {"sequential": [], "incremental": []}
+    for clip in clips:
+        for name in results:
+            results[name].append(measure(clip.path, clip.speech_end, transcribe, name == "incremental", scale))
+
+    print(f"{len(clips)} clips, median seconds")
+    print(f"{'mode':<12} {'speech end -> text':>19} {'recording stop -> text':>23}")
+    for name, rows in results.items():
+        print(
+            f"{name:<12} {statistics.median(row[0] for row in rows):>19.2f}"
+            f" {statistics.median(row[1] for row in rows):>23.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Accuracy, latency and CPU of the keyword spotter in front of Whisper.
+
+Usage::
+
+    python -m benchmarks.keyword_spotting --corpus DIR --enroll DIR
+        [--threshold-factor F] [--minutes 10] [--call-seconds 2.2]
+
+``--enroll`` holds 16 kHz mono WAV recordings of the keyword alone. ``DIR``
+holds clips and a ``manifest.json`` list of ``{"file", "keyword",
+"keyword_end", "speaker"}`` entries: ``keyword`` tells whether the clip
+contains the keyword, ``keyword_end`` is where it ends in seconds and the
+optional ``speaker`` groups the rates (e.g. the enrolled voice and others).
+
+Every clip, followed by 1.5 s of silence, is replayed in the 0.5 s blocks
+``wake_word.py`` reads, through :class:`~ai_assistant.wake_gate.VoiceGate`
+and the spotter exactly as ``process_gated`` runs them. The report gives the
+false reject rate on keyword clips, the false accept rate on the others
+(also per hour of that audio) and the latency from the end of the keyword to
+the end of the block in which it was spotted.
+
+CPU is measured on the ``active`` stream of ``benchmarks.wake_word_gate``
+with the clips without the keyword spoken every 8 s, as when people talk in
+the room: the spotter's own time per hour and the Whisper calls left, at
+``--call-seconds`` per call.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ai_assistant.keyword_spotting import THRESHOLD_FACTOR, KeywordSpotter
+from ai_assistant.wake_gate import VoiceGate
+
+from .transcription_upload import read_clip
+from .wake_word_gate import BLOCK, RATE, scenario
+
+TRAILING_SECONDS = 1.5
+
+
+@dataclass
+class Replay:
+    windows: int = 0
+    spotted: int = 0  # windows passed on to Whisper
+    first_hit: Optional[int] = None  # end of the block where the keyword was first spotted
+    spotter_seconds: float = 0.0
+
+
+@dataclass
+class Group:
+    clips: int = 0
+    hits: int = 0
+    seconds: float = 0.0
+    latency: List[float] = field(default_factory=list)
+
+
+def replay(samples: np.ndarray, spotter: KeywordSpotter) -> Replay:
+    """Feed ``samples`` through the gate and the spotter like ``wake_word.process_gated``."""
+
+    gate = VoiceGate()
+    result = Replay()
+    spotted = False
+
+    def spot(audio: np.ndarray, position: int) -> bool:
+        started = time.process_time()
+        found = spotter.detect(audio) is not None
+        result.spotter_seconds += time.process_time() - started
+        if found and result.first_hit is None:
+            result.first_hit = position
+        return found
+
+    for start in range(0, len(samples), BLOCK):
+        position = min(start + BLOCK, len(samples))
+        windows = gate.process(samples[start:position])
+        spot_open = gate.speaking and not spotted
+        for window in windows:
+            result.windows += 1
+            if spotted or spot(samples[window.start : window.end], position):
+                result.spotted += 1
+        if not gate.speaking:
+            spotted = False
+        elif spot_open:
+            spotted = spot(samples[gate.window_start : position], position)
+    return result
+
+
+def evaluate(corpus: Path, spotter: KeywordSpotter) -> Dict[Tuple[bool, str], Group]:
+    groups: Dict[Tuple[bool, str], Group] = {}
+    entries = json.loads((corpus / "manifest.json").read_text(encoding="utf-8"))
+    for entry in entries:
+        clip = read_clip(corpus / entry["file"]).samples
+        samples = np.concatenate((clip, np.zeros(int(TRAILING_SECONDS * RATE), dtype=np.int16)))
+        result = replay(samples, spotter)
+        group = groups.setdefault((bool(entry["keyword"]), entry.get("speaker", "all")), Group())
+        group.clips += 1
+        group.seconds += len(clip) / RATE
+        if result.first_hit is not None:
+            group.hits += 1
+            if entry.get("keyword_end") is not None:
+                group.latency.append(result.first_hit / RATE - entry["keyword_end"])
+    return groups
+
+
+def phrases(corpus: Path) -> List[np.ndarray]:
+    entries = json.loads((corpus / "manifest.json").read_text(encoding="utf-8"))
+    return [
+        read_clip(corpus / entry["file"]).samples.astype(np.float64) for entry in entries if not entry["keyword"]
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, required=True)
+    parser.add_argument("--enroll", type=Path, required=True)
+    parser.add_argument("--threshold-factor", type=float, default=THRESHOLD_FACTOR)
+    parser.add_argument("--minutes", type=float, default=10.0)
+    parser.add_argument("--call-seconds", type=float, default=2.2, help="CPU seconds per Whisper call")
+    args = parser.parse_args(argv)
+
+    recordings = [read_clip(path).samples for path in sorted(args.enroll.glob("*.wav"))]
+    spotter = KeywordSpotter.enroll(recordings, threshold_factor=args.threshold_factor)
+    print(f"{len(recordings)} enrollment recordings, threshold {spotter.threshold:.2f}")
+
+    groups = evaluate(args.corpus, spotter)
+    print(f"{'clips':<22} {'n':>4} {'rate':>7} {'per hour':>9} {'latency p50':>12} {'p90':>6}")
+    for (keyword, speaker), group in sorted(groups.items(), key=lambda item: (not item[0][0], item[0][1])):
+        if keyword:
+            label, rate, per_hour = "false reject", 1 - group.hits / group.clips, ""
+        else:
+            label, rate = "false accept", group.hits / group.clips
+            per_hour = f"{group.hits * 3600 / group.seconds:.0f}"
+        latency = sorted(group.latency)
+        p50 = f"{statistics.median(latency):.2f}s" if latency else "-"
+        p90 = f"{latency[int(0.9 * (len(latency) - 1))]:.2f}s" if latency else "-"
+        print(f"{label + ' ' + speaker:<22} {group.clips:>4} {rate:>7.1%} {per_hour:>9} {p50:>12} {p90:>6}")
+
+    seconds = args.minutes * 60
+    samples = scenario("active", seconds, phrases(args.corpus))
+    result = replay(samples, spotter)
+    hour = 3600 / seconds
+    print(f"speech without the keyword every 8 s, per hour ({args.call_seconds:.2f} CPU s per Whisper call):")
+    print(f"  spotter CPU {result.spotter_seconds * hour:.0f}s ({result.spotter_seconds / seconds:.2%})")
+    print(
+        f"  Whisper calls {result.windows * hour:.0f} without the spotter"
+        f" ({result.windows * args.call_seconds / seconds:.1%} CPU),"
+        f" {result.spotted * hour:.0f} with it"
+        f" ({(result.spotted * args.call_seconds + result.spotter_seconds) / seconds:.1%} CPU)"
+    )
+
+
+if __name__ == "__main__":
+    main()
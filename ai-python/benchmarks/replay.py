@@ -0,0 +1,62 @@
+"""Replay recorded clips through ``main.record_microphone_audio`` in real time.
+
+:func:`replay_device` returns a stand-in for the ``sounddevice`` module whose
+``InputStream`` serves a clip block by block, waiting until each block would
+have been captured. ``time_scale`` below 1 replays faster; every timestamp
+the stream reports is on the scaled clock.
+"""
+
+from __future__ import annotations
+
+import time
+import types
+from typing import Optional
+
+import numpy as np
+
+
+class ReplayStream:
+    def __init__(self, samples: np.ndarray, *, samplerate: int, time_scale: float = 1.0) -> None:
+        self._samples = samples
+        self._rate = samplerate
+        self._scale = time_scale
+        self._position = 0
+        self.started: Optional[float] = None
+
+    def __enter__(self) -> "ReplayStream":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+    def time_of(self, sample: int) -> float:
+        """Clock time at which ``sample`` was captured."""
+
+        return self.started + sample / self._rate * self._scale
+
+    def read(self, frames: int):
+        block = np.zeros((frames, 1), dtype=np.int16)
+        chunk = self._samples[self._position : self._position + frames]
+        block[: len(chunk), 0] = chunk
+        self._position += frames
+        delay = self.time_of(self._position) - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        return block, False
+
+
+def replay_device(samples: np.ndarray, *, time_scale: float = 1.0) -> types.SimpleNamespace:
+    """A ``sounddevice`` stand-in whose input stream plays ``samples``.
+
+    The stream that was opened last is available as ``.stream``.
+    """
+
+    device = types.SimpleNamespace(stream=None)
+
+    def input_stream(*, samplerate: int, **_: object) -> ReplayStream:
+        device.stream = ReplayStream(samples, samplerate=samplerate, time_scale=time_scale)
+        return device.stream
+
+    device.InputStream = input_stream
+    return device
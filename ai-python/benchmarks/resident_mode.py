@@ -0,0 +1,129 @@
+"""Time from a GUI trigger to the first captured sample, per process and resident.
+
+Usage::
+
+    python -m benchmarks.resident_mode [--runs 10] [--bridge-delay-ms 0]
+
+The "per process" row starts ``python main.py`` for every command, as the GUI
+does today. The "resident" row starts ``python main.py --resident`` once and
+writes a ``listen`` request to its stdin for every command. Both are timed
+from the trigger to the ``listening`` event, which ``main.py`` prints as soon
+as the first audio block has been captured.
+
+The microphone is ``benchmarks/fake_audio/sounddevice.py`` (no PortAudio is
+needed, so the cost of opening a real device is not included), the core is a
+:class:`~ai_assistant.standin.StandInCore` whose health check takes
+``--bridge-delay-ms`` longer. ``OPENAI_API_KEY`` is removed, so commands stop
+after recording with a transcription error.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import IO, List, Optional
+
+import numpy as np
+
+from ai_assistant.standin import StandInCore
+
+ROOT = Path(__file__).resolve().parent.parent
+FAKE_AUDIO = Path(__file__).resolve().parent / "fake_audio"
+
+
+def _environment(endpoint: str) -> dict:
+    env = dict(os.environ)
+    env.pop("OPENAI_API_KEY", None)
+    env.update(
+        PYTHONPATH=os.pathsep.join([str(FAKE_AUDIO), str(ROOT)]),
+        JARVIS_CORE_ENDPOINT=endpoint,
+        JARVIS_EVENT_STREAM="1",
+    )
+    return env
+
+
+def _wait_for(stdout: IO[str], kinds: tuple, request_id: Optional[int] = None) -> dict:
+    for line in stdout:
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        if event.get("type") in kinds and event.get("id") == request_id:
+            return event
+    raise RuntimeError(f"main.py exited before a {'/'.join(kinds)} event")
+
+
+def per_process(runs: int, env: dict) -> List[float]:
+    latencies = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "main.py"], cwd=ROOT, env=env, text=True,
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+        try:
+            _wait_for(process.stdout, ("listening",))
+            latencies.append(time.perf_counter() - started)
+        finally:
+            process.kill()
+            process.wait()
+    return latencies
+
+
+def resident(runs: int, env: dict) -> tuple:
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "main.py", "--resident"], cwd=ROOT, env=env, text=True,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    )
+    latencies = []
+    try:
+        _wait_for(process.stdout, ("ready",))
+        startup = time.perf_counter() - started
+        rng = np.random.default_rng(0)
+        for request_id in range(runs):
+            # Triggers do not line up with the microphone's block clock.
+            time.sleep(rng.uniform(0.0, 0.5))
+            started = time.perf_counter()
+            process.stdin.write(json.dumps({"type": "listen", "id": request_id}) + "\n")
+            process.stdin.flush()
+            _wait_for(process.stdout, ("listening",), request_id)
+            latencies.append(time.perf_counter() - started)
+            _wait_for(process.stdout, ("done", "error"), request_id)
+        process.stdin.write(json.dumps({"type": "shutdown"}) + "\n")
+        process.stdin.flush()
+        process.wait(10)
+    finally:
+        process.kill()
+    return startup, latencies
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--bridge-delay-ms", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    with StandInCore(request_delay=args.bridge_delay_ms / 1000) as core:
+        env = _environment(core.endpoint)
+        rows = {"per process": per_process(args.runs, env)}
+        startup, rows["resident"] = resident(args.runs, env)
+
+    print(f"{args.runs} commands, trigger to first captured block, ms")
+    print(f"{'mode':<12} {'median':>7} {'p90':>7} {'max':>7}")
+    for name, latencies in rows.items():
+        print(
+            f"{name:<12} {statistics.median(latencies) * 1000:>7.0f}"
+            f" {np.percentile(latencies, 90) * 1000:>7.0f} {max(latencies) * 1000:>7.0f}"
+        )
+    print(f"resident start-up (once): {startup * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
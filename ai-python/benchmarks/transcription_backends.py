@@ -0,0 +1,83 @@
+"""Transcription latency of the local Whisper model against the OpenAI API.
+
+Usage::
+
+    python -m benchmarks.transcription_backends [--corpus DIR] [--backends local,cloud]
+
+Every clip is sent through ``speech.transcribe_audio_file`` once per backend
+(``JARVIS_TRANSCRIPTION_BACKEND``), after one warm-up call. The local model
+is loaded before timing starts and its load time is reported separately,
+since the assistant keeps it resident. ``--corpus`` takes the same layout as
+``benchmarks.transcription_upload``; without it the repository's
+``sample.wav`` is used. Word error rates are shown when the manifest has
+reference texts.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from ai_assistant import speech
+from ai_assistant.local_whisper import default_model_name, get_local_whisper
+
+from .transcription_upload import Clip, load_corpus, split_words, word_errors
+
+SAMPLE_CLIP = Path(__file__).resolve().parent.parent / "sample.wav"
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path)
+    parser.add_argument("--backends", default="local,cloud")
+    parser.add_argument("--model", default=default_model_name(), help="local Whisper model size")
+    args = parser.parse_args(argv)
+
+    clips = load_corpus(args.corpus) if args.corpus else [Clip(SAMPLE_CLIP)]
+    os.environ["WHISPER_MODEL"] = args.model
+    print(f"{len(clips)} clips, local model {args.model!r}")
+
+    for backend in (name.strip() for name in args.backends.split(",") if name.strip()):
+        os.environ["JARVIS_TRANSCRIPTION_BACKEND"] = backend
+        if backend != "cloud":
+            model = get_local_whisper(args.model)
+            try:
+                model.load()
+            except Exception as exc:  # noqa: BLE001
+                print(f"{backend}: cannot load Whisper {args.model!r}: {exc}")
+                continue
+            print(f"{backend}: model loaded in {model.load_seconds:.1f} s")
+
+        timings: List[float] = []
+        errors = words = failures = 0
+        speech.transcribe_audio_file(clips[0].path)
+        for clip in clips:
+            started = time.perf_counter()
+            try:
+                text = speech.transcribe_audio_file(clip.path)
+            except RuntimeError as exc:
+                failures += 1
+                print(f"{backend}: {clip.path.name} failed: {exc}")
+                continue
+            timings.append(time.perf_counter() - started)
+            if clip.text:
+                errors += word_errors(clip.text, text)
+                words += len(split_words(clip.text))
+
+        if not timings:
+            continue
+        ordered = sorted(timings)
+        p90 = ordered[min(len(ordered) - 1, int(0.9 * len(ordered)))]
+        wer = f", WER {errors / words:.1%}" if words else ""
+        print(
+            f"{backend}: median {statistics.median(timings) * 1000:.0f} ms,"
+            f" p90 {p90 * 1000:.0f} ms, failed {failures}{wer}"
+        )
+
+
+if __name__ == "__main__":
+    main()
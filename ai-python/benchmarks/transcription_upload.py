@@ -0,0 +1,171 @@
+"""Upload size, trimming accuracy and transcription quality per upload format.
+
+Usage::
+
+    python -m benchmarks.transcription_upload --corpus DIR [--transcribe]
+
+``DIR`` holds 16 kHz mono 16-bit WAV clips and a ``manifest.json`` list of
+``{"file", "text", "speech_start", "speech_end"}`` entries (times in seconds;
+``text`` and the times are optional). For the untrimmed and VAD-trimmed
+recording in each upload encoding it reports the mean upload size, the
+seconds of audio sent, the reference speech that trimming cut off and the
+time spent trimming and encoding.
+
+``--transcribe`` also sends every variant through
+``speech.transcribe_stream`` with the configured OpenAI endpoint and reports
+the median request latency and the word error rate against ``text``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import statistics
+import time
+import wave
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from ai_assistant import speech
+from ai_assistant.audio import UPLOAD_ENCODINGS, PcmBuffer, encode_upload
+from ai_assistant.vad import speech_bounds
+
+MIN_DURATION = 0.1  # as in speech.transcribe_stream
+
+
+@dataclass
+class Clip:
+    path: Path
+    text: Optional[str] = None
+    speech_start: Optional[float] = None
+    speech_end: Optional[float] = None
+
+
+@dataclass
+class Row:
+    sizes: List[int] = field(default_factory=list)
+    seconds: List[float] = field(default_factory=list)
+    clipped: List[float] = field(default_factory=list)
+    prepare: List[float] = field(default_factory=list)
+    latency: List[float] = field(default_factory=list)
+    errors: int = 0
+    words: int = 0
+
+
+def load_corpus(directory: Path) -> List[Clip]:
+    manifest = directory / "manifest.json"
+    if manifest.exists():
+        entries = json.loads(manifest.read_text(encoding="utf-8"))
+        return [
+            Clip(
+                directory / entry["file"],
+                entry.get("text"),
+                entry.get("speech_start"),
+                entry.get("speech_end"),
+            )
+            for entry in entries
+        ]
+    return [Clip(path) for path in sorted(directory.glob("*.wav"))]
+
+
+def read_clip(path: Path) -> PcmBuffer:
+    with wave.open(str(path), "rb") as wav_file:
+        if (wav_file.getnchannels(), wav_file.getsampwidth()) != (1, 2):
+            raise ValueError(f"{path} is not mono 16-bit PCM")
+        frames = wav_file.readframes(wav_file.getnframes())
+        audio = PcmBuffer(max(1, len(frames) // 2), sample_rate=wav_file.getframerate())
+    audio.append(frames)
+    return audio
+
+
+def split_words(text: str) -> List[str]:
+    return re.findall(r"\w+", text.lower().replace("ё", "е"))
+
+
+def word_errors(reference: str, hypothesis: str) -> int:
+    """Word-level edit distance between ``reference`` and ``hypothesis``."""
+
+    ref, hyp = split_words(reference), split_words(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, word in enumerate(ref, 1):
+        current = [i]
+        for j, other in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (word != other)))
+        previous = current
+    return previous[-1]
+
+
+def _transcribe(audio: PcmBuffer, encoding: str, trim: bool) -> str:
+    os.environ["OPENAI_TRANSCRIPTION_ENCODING"] = encoding
+    os.environ["JARVIS_TRIM_SILENCE"] = "1" if trim else "0"
+    return speech.transcribe_stream(audio)
+
+
+def measure(clips: Sequence[Clip], encodings: Sequence[str], transcribe: bool) -> Dict[str, Row]:
+    rows: Dict[str, Row] = {}
+    for clip in clips:
+        for trim in (False, True):
+            for encoding in encodings:
+                row = rows.setdefault(f"{encoding}{' trimmed' if trim else ''}", Row())
+                # pcm16 frames the buffer in place, so every variant gets a fresh copy.
+                audio = read_clip(clip.path)
+                rate = audio.sample_rate
+
+                started = time.perf_counter()
+                start, end = 0, audio.sample_count
+                if trim:
+                    start, end = speech_bounds(audio.samples, sample_rate=rate) or (start, end)
+                body, _ = encode_upload(audio, encoding, start=start, end=end, min_duration=MIN_DURATION)
+                row.prepare.append(time.perf_counter() - started)
+
+                row.sizes.append(len(body))
+                row.seconds.append((end - start) / rate)
+                if clip.speech_start is not None and clip.speech_end is not None:
+                    kept = max(0.0, min(end / rate, clip.speech_end) - max(start / rate, clip.speech_start))
+                    row.clipped.append(clip.speech_end - clip.speech_start - kept)
+
+                if transcribe:
+                    audio = read_clip(clip.path)
+                    started = time.perf_counter()
+                    text = _transcribe(audio, encoding, trim)
+                    row.latency.append(time.perf_counter() - started)
+                    if clip.text:
+                        row.errors += word_errors(clip.text, text)
+                        row.words += len(split_words(clip.text))
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, required=True)
+    parser.add_argument("--encodings", default=",".join(UPLOAD_ENCODINGS))
+    parser.add_argument("--transcribe", action="store_true", help="call the transcription API")
+    args = parser.parse_args(argv)
+
+    clips = load_corpus(args.corpus)
+    encodings = [encoding.strip() for encoding in args.encodings.split(",") if encoding.strip()]
+    rows = measure(clips, encodings, args.transcribe)
+
+    print(f"{len(clips)} clips from {args.corpus}, mean per clip")
+    header = f"{'variant':<16} {'upload':>10} {'audio':>8} {'speech cut':>11} {'prepare':>9}"
+    if args.transcribe:
+        header += f" {'latency':>9} {'WER':>7}"
+    print(header)
+    for name, row in rows.items():
+        clipped = f"{statistics.mean(row.clipped) * 1000:>8.1f} ms" if row.clipped else f"{'-':>11}"
+        line = (
+            f"{name:<16} {statistics.mean(row.sizes) / 1024:>6.1f} KiB"
+            f" {statistics.mean(row.seconds):>6.2f} s {clipped}"
+            f" {statistics.mean(row.prepare) * 1000:>6.2f} ms"
+        )
+        if args.transcribe:
+            wer = f"{row.errors / row.words:>6.1%}" if row.words else f"{'-':>7}"
+            line += f" {statistics.median(row.latency) * 1000:>6.0f} ms {wer}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
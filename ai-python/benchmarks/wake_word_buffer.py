@@ -0,0 +1,80 @@
+"""Memory allocated by ``wake_word.py`` while it accumulates audio.
+
+Usage::
+
+    python -m benchmarks.wake_word_buffer [--minutes 10] [--fixed]
+
+The ``active`` stream of ``benchmarks.wake_word_gate`` (tones standing in
+for a phrase every 8 s over -45 dBFS noise) is passed block by block through
+``wake_word.audio_callback`` and ``wake_word.process_block``, as the main
+loop does. Whisper is replaced by a stub that returns no text, so only the
+script's own buffering is measured; ``--fixed`` runs the ``WAKE_WORD_VAD=0``
+mode. ``openai-whisper`` must be installed for the import (no weights are
+loaded); ``benchmarks/fake_audio`` stands in for ``sounddevice``.
+
+With :mod:`tracemalloc`, the report gives the memory allocated per second
+above what was live before each block (summing the peak of every block) and
+the memory still traced at the end. The ring buffer is allocated when
+``wake_word`` is imported, before tracing starts, so its size is added
+separately. The gate's own frame energies account for about 66 KiB/s.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import tracemalloc
+import types
+from pathlib import Path
+from typing import List, Optional
+
+from .wake_word_gate import BLOCK, RATE, _phrases, scenario
+
+FAKE_AUDIO = Path(__file__).resolve().parent / "fake_audio"
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=10.0)
+    parser.add_argument("--fixed", action="store_true", help="transcribe fixed 3 s chunks instead of speech windows")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, str(FAKE_AUDIO))
+    import wake_word
+
+    from ai_assistant.wake_gate import VoiceGate
+
+    wake_word.whisper_model = types.SimpleNamespace(transcribe=lambda audio, **_: {"text": ""})
+    wake_word.output_event = lambda *args, **kwargs: None
+    wake_word.voice_gate = None if args.fixed else VoiceGate(sample_rate=RATE)
+    samples_per_chunk = RATE * wake_word.CHUNK_DURATION
+
+    seconds = args.minutes * 60
+    samples = scenario("active", seconds, _phrases(None))
+    blocks = [samples[start : start + BLOCK].tobytes() for start in range(0, len(samples), BLOCK)]
+
+    tracemalloc.start()
+    allocated = 0
+    started = time.process_time()
+    for data in blocks:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        wake_word.audio_callback(data, len(data) // 2, None, None)
+        wake_word.process_block(*wake_word.audio_queue.get_nowait(), samples_per_chunk)
+        allocated += tracemalloc.get_traced_memory()[1] - before
+    cpu = time.process_time() - started
+    steady = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    mode = "fixed 3 s chunks" if args.fixed else "voice gate"
+    print(f"{mode}, {args.minutes:g} min of audio in {len(blocks)} blocks")
+    print(f"  allocated   {allocated / seconds / 1024:8.1f} KiB/s")
+    print(f"  steady      {steady / 1024:8.0f} KiB traced")
+    # Every sample is stored twice
+    print(f"  ring        {wake_word.audio_ring.capacity * 2 * 2 / 1024:8.0f} KiB preallocated")
+    print(f"  CPU         {cpu / len(blocks) * 1000:8.2f} ms/block (under tracemalloc)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""CPU used by wake word listening with and without the voice gate.
+
+Usage::
+
+    python -m benchmarks.wake_word_gate [--corpus DIR] [--minutes 10]
+        [--call-seconds 2.2] [--whisper]
+
+Three synthetic streams are fed to :class:`~ai_assistant.wake_gate.VoiceGate`
+in the 0.5 s blocks ``wake_word.py`` reads:
+
+- ``idle``: a quiet room (-65 dBFS).
+- ``noise``: fan-like noise around -35 dBFS whose level drifts by 6 dB, with
+  a door click every 30 s.
+- ``active``: -45 dBFS noise with a phrase every 8 s. Phrases are the speech
+  of the corpus clips (see ``benchmarks.transcription_upload``), or tones
+  without ``--corpus``.
+
+Without the gate, ``wake_word.py`` transcribes 3 s of audio every 3 s when
+Whisper hears nothing and every 2 s when it does; the table counts the
+lower rate. Whisper pads every input to 30 s, so a call costs about the same
+CPU whatever the window length: ``--call-seconds`` per call, or the time
+measured on this machine with ``--whisper`` (needs the ``WHISPER_MODEL``
+weights).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ai_assistant.wake_gate import VoiceGate
+
+from .transcription_upload import load_corpus, read_clip
+
+RATE = 16_000
+BLOCK = 8000
+CHUNK_SECONDS = 3.0
+
+
+def _noise(rng: np.random.Generator, seconds: float, dbfs: float) -> np.ndarray:
+    return rng.normal(0, 32768 * 10 ** (dbfs / 20), int(seconds * RATE))
+
+
+def _phrases(corpus: Optional[Path]) -> List[np.ndarray]:
+    if corpus is None:
+        t = np.arange(int(1.2 * RATE)) / RATE
+        return [3000 * np.sin(2 * np.pi * 180 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))]
+    phrases = []
+    for clip in load_corpus(corpus):
+        samples = read_clip(clip.path).samples.astype(np.float64)
+        if clip.speech_start is not None and clip.speech_end is not None and "clean" in clip.path.name:
+            phrases.append(samples[int(clip.speech_start * RATE) : int((clip.speech_end + 0.1) * RATE)])
+    return phrases
+
+
+def scenario(name: str, seconds: float, phrases: List[np.ndarray]) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    if name == "idle":
+        samples = _noise(rng, seconds, -65)
+    elif name == "noise":
+        samples = _noise(rng, seconds, -35)
+        t = np.arange(len(samples)) / RATE
+        samples *= 10 ** (3 * np.sin(2 * np.pi * t / 40) / 20)
+        for start in range(int(15 * RATE), len(samples) - 800, int(30 * RATE)):
+            samples[start : start + 800] += 12000 * np.exp(-np.arange(800) / 120)
+    else:
+        samples = _noise(rng, seconds, -45)
+        for index, start in enumerate(range(int(2 * RATE), len(samples), int(8 * RATE))):
+            phrase = phrases[index % len(phrases)][: len(samples) - start]
+            samples[start : start + len(phrase)] += phrase
+    return np.clip(samples, -32768, 32767).astype(np.int16)
+
+
+def measure_call_seconds() -> float:
+    import whisper
+
+    model = whisper.load_model(os.getenv("WHISPER_MODEL", "base"))
+    audio = np.zeros(int(CHUNK_SECONDS * RATE), dtype=np.float32)
+    model.transcribe(audio, language="ru", fp16=False, beam_size=1, best_of=1)
+    started = time.process_time()
+    model.transcribe(audio, language="ru", fp16=False, beam_size=1, best_of=1)
+    return time.process_time() - started
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path)
+    parser.add_argument("--minutes", type=float, default=10.0)
+    parser.add_argument("--call-seconds", type=float, default=2.2, help="CPU seconds per Whisper call")
+    parser.add_argument("--whisper", action="store_true", help="measure --call-seconds with the real model")
+    args = parser.parse_args(argv)
+
+    call_seconds = measure_call_seconds() if args.whisper else args.call_seconds
+    seconds = args.minutes * 60
+    phrases = _phrases(args.corpus)
+    hour = 3600 / seconds
+    rows: Dict[str, Dict[str, float]] = {}
+
+    for name in ("idle", "noise", "active"):
+        samples = scenario(name, seconds, phrases)
+        gate = VoiceGate()
+        windows = []
+        started = time.process_time()
+        for start in range(0, len(samples), BLOCK):
+            windows.extend(gate.process(samples[start : start + BLOCK]))
+        gate_cpu = time.process_time() - started
+        ungated_calls = seconds / CHUNK_SECONDS
+        rows[name] = {
+            "gate_ms": gate_cpu * 1000 * hour,
+            "calls": len(windows) * hour,
+            "audio": sum(window.end - window.start for window in windows) / RATE * hour,
+            "cpu": (gate_cpu + len(windows) * call_seconds) / seconds,
+            "ungated_calls": ungated_calls * hour,
+            "ungated_cpu": ungated_calls * call_seconds / seconds,
+        }
+
+    print(f"per hour of listening, {call_seconds:.2f} CPU s per Whisper call, {args.minutes:g} min per scenario")
+    print(f"{'scenario':<9} {'gate CPU':>9} {'calls':>7} {'audio s':>8} {'CPU':>7} {'ungated calls':>14} {'ungated CPU':>12}")
+    for name, row in rows.items():
+        print(
+            f"{name:<9} {row['gate_ms']:>7.0f}ms {row['calls']:>7.0f} {row['audio']:>8.0f}"
+            f" {row['cpu']:>7.1%} {row['ungated_calls']:>14.0f} {row['ungated_cpu']:>12.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,17 @@
 
 from __future__ import annotations
 
+import argparse
+import dataclasses
 import importlib
+import json
 import logging
 import os
+import queue
 import sys
-from typing import Optional
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, TextIO
 
 # Fix Cyrillic encoding in console output
 if sys.stdout and hasattr(sys.stdout, 'reconfigure'):
@@ -14,15 +20,27 @@ if sys.stdout and hasattr(sys.stdout, 'reconfigure'):
 if sys.stderr and hasattr(sys.stderr, 'reconfigure'):
     sys.stderr.reconfigure(encoding='utf-8')
 
+from ai_assistant.audio import PcmBuffer
 from ai_assistant.bridge_requests import HttpBridge
-from ai_assistant.pipeline import process_audio_stream
+from ai_assistant.endpointing import DEFAULT_ENDPOINT, Endpointer, PeakThreshold
+from ai_assistant.events import emit_event, event_stream_enabled
+from ai_assistant.incremental import IncrementalTranscriber
+from ai_assistant.llm import ChatGPTBackend, PromptSender
+from ai_assistant.pipeline import iter_audio_stream_events, process_audio_stream
 
 logging.basicConfig(level=logging.INFO)
 DEFAULT_BRIDGE_ENDPOINT = "http://localhost:5055"
 DEFAULT_SAMPLE_RATE = 16_000
 DEFAULT_MAX_DURATION_SECONDS = 30.0
 DEFAULT_SILENCE_DURATION_SECONDS = 1.0
-DEFAULT_SILENCE_THRESHOLD = 200
+BLOCK_DURATION_SECONDS = 0.1
+# A resident stream that delivers nothing for this long has stopped.
+STREAM_TIMEOUT_SECONDS = 2.0
+
+_TRUTHY = {"1", "true", "yes", "on"}
+
+BlockObserver = Callable[[PcmBuffer, bool, int], None]
+Emit = Callable[[Dict[str, Any]], None]
 
 
 def resolve_bridge_endpoint() -> str:
@@ -37,8 +55,11 @@ def resolve_bridge_endpoint() -> str:
     return DEFAULT_BRIDGE_ENDPOINT
 
 
-def resolve_silence_threshold() -> float:
-    """Return the silence threshold, honoring the ``MIC_SILENCE_THRESHOLD`` env var."""
+def resolve_silence_threshold() -> Optional[float]:
+    """Return the ``MIC_SILENCE_THRESHOLD`` peak amplitude, if one is set.
+
+    ``None`` selects adaptive endpointing.
+    """
 
     raw_value = os.getenv("MIC_SILENCE_THRESHOLD")
     if raw_value:
@@ -54,7 +75,13 @@ def resolve_silence_threshold() -> float:
         )
         return threshold
 
-    return DEFAULT_SILENCE_THRESHOLD
+    return None
+
+
+def incremental_transcription_enabled() -> bool:
+    """Return ``True`` when ``JARVIS_INCREMENTAL_TRANSCRIPTION`` is set."""
+
+    return os.getenv("JARVIS_INCREMENTAL_TRANSCRIPTION", "").strip().lower() in _TRUTHY
 
 
 def _load_dependency(name: str):
@@ -74,21 +101,53 @@ def record_microphone_audio(
     sample_rate: int = DEFAULT_SAMPLE_RATE,
     max_duration_seconds: float = DEFAULT_MAX_DURATION_SECONDS,
     silence_duration_seconds: float = DEFAULT_SILENCE_DURATION_SECONDS,
-    silence_threshold: float = DEFAULT_SILENCE_THRESHOLD,
-) -> bytes:
-    """Capture raw PCM audio from the default microphone until silence is detected."""
+    silence_threshold: Optional[float] = None,
+    on_block: Optional[BlockObserver] = None,
+    stream: Optional["ResidentMicrophone"] = None,
+) -> PcmBuffer:
+    """Capture raw PCM audio from the default microphone until silence is detected.
+
+    Blocks are copied straight into a buffer preallocated for
+    ``max_duration_seconds``, which the transcription upload then reads in
+    place. ``on_block`` is called after every block with the buffer, whether
+    the block contained speech and the block length.
+
+    Without ``silence_threshold`` an :class:`~ai_assistant.endpointing.Endpointer`
+    tracks the noise floor and stops after a pause that adapts to the
+    speaker, at most ``silence_duration_seconds``. With it, recording stops
+    after ``silence_duration_seconds`` of blocks whose peak stays below the
+    threshold.
+
+    Blocks are read from ``stream`` when given, otherwise from a new input
+    stream on the default device.
+    """
 
     if max_duration_seconds <= 0:
         raise ValueError("max_duration_seconds must be positive")
     if silence_duration_seconds <= 0:
         raise ValueError("silence_duration_seconds must be positive")
 
-    sounddevice = _load_dependency("sounddevice")
-    numpy = _load_dependency("numpy")
-
-    block_duration = 0.2  # seconds
+    block_duration = BLOCK_DURATION_SECONDS
     block_size = int(sample_rate * block_duration)
-    silence_limit = max(1, int(round(silence_duration_seconds / block_duration)))
+    if stream is None:
+        sounddevice = _load_dependency("sounddevice")
+        stream = sounddevice.InputStream(
+            samplerate=sample_rate,
+            channels=1,
+            dtype="int16",
+            blocksize=block_size,
+        )
+    if silence_threshold is None:
+        config = dataclasses.replace(
+            DEFAULT_ENDPOINT,
+            min_silence=min(DEFAULT_ENDPOINT.min_silence, silence_duration_seconds),
+            max_silence=silence_duration_seconds,
+        )
+        endpointer = Endpointer(config, sample_rate=sample_rate)
+    else:
+        endpointer = PeakThreshold(
+            silence_threshold, silence_duration_seconds, sample_rate=sample_rate
+        )
 
     logging.info(
         "Recording audio at %d Hz until %.1f seconds of silence or %.1f seconds max",
@@ -97,61 +156,127 @@ def record_microphone_audio(
         max_duration_seconds,
     )
 
-    frames = []
-    silence_blocks = 0
-    speech_detected = False
-    logged_detection = False
-    max_blocks = int(max_duration_seconds / block_duration)
-
-    with sounddevice.InputStream(
-        samplerate=sample_rate,
-        channels=1,
-        dtype="int16",
-        blocksize=block_size,
-    ) as stream:
+    max_blocks = max(1, int(round(max_duration_seconds / block_duration)))
+    audio = PcmBuffer(max_blocks * block_size, sample_rate=sample_rate)
+    state = endpointer.state
+
+    with stream as source:
         while True:
-            block, _ = stream.read(block_size)
-            frames.append(block.copy())
-
-            amplitude = numpy.abs(block).max()
-            if amplitude >= silence_threshold:
-                speech_detected = True
-                silence_blocks = 0
-                if not logged_detection:
-                    logging.info(
-                        "Speech detected with peak amplitude %.0f (threshold %.0f)",
-                        amplitude,
-                        silence_threshold,
-                    )
-                    logged_detection = True
-            elif speech_detected:
-                silence_blocks += 1
-
-            total_blocks = len(frames)
-            if speech_detected and silence_blocks >= silence_limit:
+            block, _ = source.read(block_size)
+            audio.append(block)
+
+            started = state.speech_started
+            speaking = endpointer.process(block)
+            if on_block is not None:
+                on_block(audio, speaking, len(block))
+            if speaking and not started:
+                logging.info("Speech detected after %.1f seconds", audio.duration)
+
+            if state.done:
                 logging.info(
-                    "Detected %.1f seconds of silence; stopping recording",
-                    silence_duration_seconds,
+                    "Detected %.1f seconds of silence; stopping recording", state.silence_window
                 )
                 break
 
-            if total_blocks >= max_blocks:
+            if audio.sample_count >= audio.capacity:
                 logging.info(
                     "Reached maximum recording duration of %.1f seconds; stopping",
                     max_duration_seconds,
                 )
                 break
 
-    if not frames:
+    if not audio.sample_count:
         raise RuntimeError("No audio captured from microphone")
 
-    flattened = numpy.concatenate(frames, axis=0).reshape(-1)
-    audio_bytes = flattened.tobytes()
+    return audio
+
+
+class ResidentMicrophone:
+    """An input stream on the default microphone that stays open between commands.
+
+    PortAudio captures continuously on its own thread. Blocks are queued only
+    while a recording is in progress (inside ``with``) and dropped otherwise,
+    so each command starts with the first block captured after its trigger.
+    Pass it as ``stream`` to :func:`record_microphone_audio`.
+    """
+
+    def __init__(
+        self,
+        *,
+        sample_rate: int = DEFAULT_SAMPLE_RATE,
+        block_duration: float = BLOCK_DURATION_SECONDS,
+    ) -> None:
+        sounddevice = _load_dependency("sounddevice")
+        self.sample_rate = sample_rate
+        self.block_size = int(sample_rate * block_duration)
+        self._blocks: "queue.Queue[Any]" = queue.Queue()
+        self._recording = threading.Event()
+        try:
+            self._stream = sounddevice.InputStream(
+                samplerate=sample_rate,
+                channels=1,
+                dtype="int16",
+                blocksize=self.block_size,
+                callback=self._capture,
+            )
+            self._stream.start()
+        except sounddevice.PortAudioError as exc:
+            # No input device, or one another program holds.
+            raise RuntimeError(f"Audio device error: {exc}") from exc
+
+    def _capture(self, indata, frames, time_info, status) -> None:
+        if status:
+            logging.debug("Microphone stream status: %s", status)
+        if self._recording.is_set():
+            self._blocks.put(indata.copy())
+
+    def __enter__(self) -> "ResidentMicrophone":
+        while True:
+            try:
+                self._blocks.get_nowait()
+            except queue.Empty:
+                break
+        self._recording.set()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._recording.clear()
+
+    def read(self, frames: int):
+        try:
+            return self._blocks.get(timeout=STREAM_TIMEOUT_SECONDS), False
+        except queue.Empty:
+            raise RuntimeError("Microphone stream stopped delivering audio") from None
+
+    def close(self) -> None:
+        self._recording.clear()
+        self._stream.stop()
+        self._stream.close()
+
+
+def check_bridge(bridge: HttpBridge) -> "Future[bool]":
+    """Start ``bridge.is_available()`` on a worker thread, to overlap with capture."""
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bridge-check")
+    try:
+        return executor.submit(bridge.is_available)
+    finally:
+        executor.shutdown(wait=False)
+
+
+def _require_bridge(bridge: HttpBridge, bridge_check: Optional["Future[bool]"]) -> None:
+    if bridge_check is not None and not bridge_check.result():
+        raise RuntimeError(
+            f"C# bridge is not responding at {bridge.endpoint}. Start the Windows service and retry."
+        )
 
-    if not audio_bytes:
-        raise RuntimeError("No audio captured from microphone")
 
-    return audio_bytes
+def _incremental_transcriber(
+    incremental: Optional[bool], on_partial: Optional[Callable[[str], None]] = None
+) -> Optional[IncrementalTranscriber]:
+    if incremental is None:
+        incremental = incremental_transcription_enabled()
+    return IncrementalTranscriber(on_partial=on_partial) if incremental else None
 
 
 def process_microphone_command(
@@ -159,34 +284,186 @@ def process_microphone_command(
     *,
     max_duration_seconds: float = DEFAULT_MAX_DURATION_SECONDS,
     silence_duration_seconds: float = DEFAULT_SILENCE_DURATION_SECONDS,
-    silence_threshold: float = DEFAULT_SILENCE_THRESHOLD,
+    silence_threshold: Optional[float] = None,
+    incremental: Optional[bool] = None,
+    stream: Optional[ResidentMicrophone] = None,
+    sender: Optional[PromptSender] = None,
+    bridge_check: Optional["Future[bool]"] = None,
 ) -> Optional[dict]:
-    """Record a voice command and forward it to the bridge."""
+    """Record a voice command and forward it to the bridge.
 
-    audio_bytes = record_microphone_audio(
+    With ``incremental`` (``JARVIS_INCREMENTAL_TRANSCRIPTION`` by default),
+    phrases are transcribed during the pauses between them while recording
+    continues. ``bridge_check`` is a health check started with the recording
+    (see :func:`check_bridge`); the command is dropped when it fails.
+    """
+
+    transcriber = _incremental_transcriber(incremental)
+    audio = record_microphone_audio(
         max_duration_seconds=max_duration_seconds,
         silence_duration_seconds=silence_duration_seconds,
         silence_threshold=silence_threshold,
+        on_block=transcriber.observe if transcriber else None,
+        stream=stream,
     )
-    return process_audio_stream([audio_bytes], bridge)
+    _require_bridge(bridge, bridge_check)
+    if transcriber is not None:
+        return process_audio_stream(audio, bridge, sender=sender, transcribe=transcriber.finish)
+    return process_audio_stream(audio, bridge, sender=sender)
 
 
-def main() -> None:
-    bridge = HttpBridge(resolve_bridge_endpoint())
+def stream_microphone_command(
+    bridge: HttpBridge,
+    *,
+    max_duration_seconds: float = DEFAULT_MAX_DURATION_SECONDS,
+    silence_duration_seconds: float = DEFAULT_SILENCE_DURATION_SECONDS,
+    silence_threshold: Optional[float] = None,
+    incremental: Optional[bool] = None,
+    stream: Optional[ResidentMicrophone] = None,
+    sender: Optional[PromptSender] = None,
+    bridge_check: Optional["Future[bool]"] = None,
+    emit: Emit = emit_event,
+) -> Optional[dict]:
+    """Record a voice command and print one JSON line per pipeline milestone.
 
-    if not bridge.is_available():
-        logging.error(
-            "C# bridge is not responding at %s. Start the Windows service and retry.",
-            bridge.endpoint,
-        )
+    A ``listening`` line is printed once the first block has been captured.
+    In incremental mode a ``partial_transcript`` line is printed whenever
+    another phrase has been transcribed.
+    """
+
+    transcriber = _incremental_transcriber(
+        incremental, lambda text: emit({"type": "partial_transcript", "text": text})
+    )
+
+    def observe(audio: PcmBuffer, speaking: bool, block_samples: int) -> None:
+        if audio.sample_count == block_samples:
+            emit({"type": "listening"})
+        if transcriber is not None:
+            transcriber.observe(audio, speaking, block_samples)
+
+    audio = record_microphone_audio(
+        max_duration_seconds=max_duration_seconds,
+        silence_duration_seconds=silence_duration_seconds,
+        silence_threshold=silence_threshold,
+        on_block=observe,
+        stream=stream,
+    )
+    emit({"type": "recorded", "bytes": audio.nbytes})
+    _require_bridge(bridge, bridge_check)
+
+    options = {"transcribe": transcriber.finish} if transcriber else {}
+    result = None
+    for event in iter_audio_stream_events(audio, bridge, sender=sender, **options):
+        if event["type"] == "done":
+            result = event["result"]
+            event = {**event, "status": "ok"}
+        emit(event)
+    return result
+
+
+def serve(
+    bridge: HttpBridge,
+    microphone: ResidentMicrophone,
+    *,
+    sender: Optional[PromptSender] = None,
+    silence_threshold: Optional[float] = None,
+    requests: Optional[TextIO] = None,
+) -> None:
+    """Handle voice commands read as JSON lines from ``requests`` (stdin).
+
+    ``{"type": "listen", "id": ...}`` records and runs one command, printing
+    its events as :func:`stream_microphone_command` does, each carrying the
+    request ``id``. ``{"type": "shutdown"}`` or the end of input stops the
+    loop. Commands are handled one after another on the same microphone
+    stream, bridge and LLM client.
+    """
+
+    emit_event({"type": "ready"})
+    for line in requests or sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+            kind, request_id = request.get("type"), request.get("id")
+        except (ValueError, AttributeError):
+            emit_event({"type": "error", "status": "error", "error": f"Invalid request: {line}"})
+            continue
+
+        def emit(event: Dict[str, Any], request_id: Any = request_id) -> None:
+            emit_event(event if request_id is None else {**event, "id": request_id})
+
+        if kind == "shutdown":
+            break
+        if kind != "listen":
+            emit({"type": "error", "status": "error", "error": f"Unknown request type: {kind}"})
+            continue
+        try:
+            stream_microphone_command(
+                bridge,
+                silence_threshold=silence_threshold,
+                stream=microphone,
+                sender=sender,
+                bridge_check=check_bridge(bridge),
+                emit=emit,
+            )
+        except Exception as exc:  # noqa: BLE001
+            logging.exception("Voice command failed")
+            emit({"type": "error", "status": "error", "error": str(exc)})
+
+
+def run_resident(bridge: HttpBridge) -> None:
+    """Open the microphone and LLM client once, then :func:`serve` stdin."""
+
+    if sys.stdin and hasattr(sys.stdin, "reconfigure"):
+        sys.stdin.reconfigure(encoding="utf-8")
+    # Start the bridge heartbeat, so later checks only read its state.
+    check_bridge(bridge)
+    try:
+        microphone = ResidentMicrophone()
+    except RuntimeError as exc:
+        logging.error("Unable to open the microphone: %s", exc)
+        emit_event({"type": "error", "status": "error", "error": str(exc)})
         return
+    try:
+        sender: Optional[PromptSender] = PromptSender(ChatGPTBackend())
+    except RuntimeError as exc:
+        logging.warning("LLM client unavailable, creating one per command: %s", exc)
+        sender = None
 
     try:
-        result = process_microphone_command(
-            bridge, silence_threshold=resolve_silence_threshold()
+        serve(bridge, microphone, sender=sender, silence_threshold=resolve_silence_threshold())
+    finally:
+        microphone.close()
+        bridge.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Record a voice command and send it to the core.")
+    parser.add_argument(
+        "--resident",
+        action="store_true",
+        help="keep running and record a command for every JSON request on stdin",
+    )
+    args = parser.parse_args(argv)
+    bridge = HttpBridge(resolve_bridge_endpoint())
+    if args.resident:
+        run_resident(bridge)
+        return
+
+    run_command = (
+        stream_microphone_command if event_stream_enabled() else process_microphone_command
+    )
+    try:
+        result = run_command(
+            bridge,
+            silence_threshold=resolve_silence_threshold(),
+            bridge_check=check_bridge(bridge),
         )
     except RuntimeError as exc:
-        logging.error("Unable to capture microphone input: %s", exc)
+        logging.error("Unable to process the voice command: %s", exc)
+        if event_stream_enabled():
+            emit_event({"type": "error", "status": "error", "error": str(exc)})
         return
 
     if result:
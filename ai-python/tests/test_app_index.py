@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+from ai_assistant.app_index import ApplicationIndex
+from ai_assistant.bridge import HttpBridge
+from ai_assistant.schemas import Command
+from ai_assistant.standin import StandInCore
+from ai_assistant.transport import ConnectionPool
+
+
+def _write_registry(path: Path, entries: list[dict]) -> Path:
+    path.write_text(json.dumps(entries), encoding="utf-8")
+    return path
+
+
+def _index(tmp_path: Path) -> ApplicationIndex:
+    registry = _write_registry(
+        tmp_path / "applications.json",
+        [
+            {"name": "Telegram", "aliases": ["телеграм", "tg"], "executableName": "Telegram.exe"},
+            {"name": "Discord", "aliases": ["дискорд"]},
+            {"name": "Calculator", "aliases": ["калькулятор", "calc"]},
+            {"name": "Visual Studio Code", "aliases": ["vscode", "vs code"]},
+        ],
+    )
+    return ApplicationIndex(registry_path=registry)
+
+
+def test_lookup_folds_case_and_known_prefix(tmp_path: Path) -> None:
+    index = _index(tmp_path)
+
+    assert index.resolve("TELEGRAM") == "Telegram"
+    assert index.resolve("known_telegram") == "Telegram"
+    assert index.resolve("telegram.exe") == "Telegram"
+    assert index.resolve("VS  Code") == "Visual Studio Code"
+
+
+def test_lookup_transliterates_and_tolerates_typos(tmp_path: Path) -> None:
+    index = _index(tmp_path)
+
+    assert index.lookup("Телеграмм").method == "fuzzy"  # type: ignore[union-attr]
+    assert index.resolve("Телеграмм") == "Telegram"
+    assert index.resolve("diskord") == "Discord"
+    assert index.resolve("calculater") == "Calculator"
+
+
+def test_lookup_refuses_far_or_short_matches(tmp_path: Path) -> None:
+    index = _index(tmp_path)
+
+    assert index.resolve("photoshop") is None
+    assert index.resolve("tv") is None
+
+
+def test_index_reloads_when_registry_changes(tmp_path: Path) -> None:
+    index = _index(tmp_path)
+    assert index.resolve("spotify") is None
+
+    registry = _write_registry(tmp_path / "applications.json", [{"name": "Spotify"}])
+    stat = registry.stat()
+    os.utime(registry, (stat.st_atime, stat.st_mtime + 5))
+
+    assert index.resolve("spotify") == "Spotify"
+    assert index.resolve("telegram") is None
+
+
+def test_bridge_sends_resolved_name_once(tmp_path: Path) -> None:
+    command = Command(
+        action="open_app",
+        params={"application": "known_телеграм"},
+        uuid="11111111-2222-3333-4444-555555555555",
+        timestamp="2025-01-01T00:00:00Z",
+    )
+    with StandInCore() as core:
+        bridge = HttpBridge(
+            core.endpoint,
+            pool=ConnectionPool.for_endpoint(core.endpoint),
+            app_index=_index(tmp_path),
+        )
+        response = bridge.send_command(command)
+
+    assert response is not None
+    assert response["result"]["params"]["application"] == "Telegram"
+    assert core.requests == 1
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import io
+import types
+import wave
+
+import numpy as np
+import pytest
+
+from ai_assistant import speech
+from ai_assistant.audio import (
+    MemoryFile,
+    PcmBuffer,
+    PcmRing,
+    build_wav,
+    decode_mulaw,
+    encode_mulaw,
+    encode_upload,
+)
+
+
+def _read_wav(data: bytes) -> tuple[int, np.ndarray]:
+    with wave.open(io.BytesIO(data), "rb") as wav_file:
+        assert (wav_file.getnchannels(), wav_file.getsampwidth()) == (1, 2)
+        frames = wav_file.readframes(wav_file.getnframes())
+        return wav_file.getframerate(), np.frombuffer(frames, dtype=np.int16)
+
+
+def test_pcm_buffer_frames_samples_in_place() -> None:
+    audio = PcmBuffer(10)
+    audio.append(np.array([[1], [2], [3]], dtype=np.int16))
+    audio.append(np.array([4, 5], dtype=np.int16).tobytes())
+
+    wav = audio.wav()
+
+    assert audio.samples.tolist() == [1, 2, 3, 4, 5]
+    assert np.shares_memory(np.frombuffer(wav, dtype=np.uint8), audio.samples)
+    rate, samples = _read_wav(bytes(wav))
+    assert rate == 16_000 and samples.tolist() == [1, 2, 3, 4, 5]
+
+
+def test_pcm_buffer_pads_with_silence_and_drops_overflow() -> None:
+    audio = PcmBuffer(4, sample_rate=10)
+    assert audio.append(np.array([7, 7, 7, 7, 7, 7], dtype=np.int16)) == 4
+    audio.clear()
+    audio.append(np.array([9], dtype=np.int16))
+
+    _, samples = _read_wav(bytes(audio.wav(min_duration=0.3)))
+
+    assert samples.tolist() == [9, 0, 0]
+    with pytest.raises(ValueError):
+        audio.wav(min_duration=1.0)
+
+
+def test_pcm_buffer_frames_a_sample_range_in_place() -> None:
+    audio = PcmBuffer(40)
+    audio.append(np.arange(1, 41, dtype=np.int16))
+
+    wav = audio.wav(start=30, end=35)
+
+    assert np.shares_memory(np.frombuffer(wav, dtype=np.uint8), audio.samples)
+    assert _read_wav(bytes(wav))[1].tolist() == [31, 32, 33, 34, 35]
+    assert audio.samples[30:35].tolist() == [31, 32, 33, 34, 35]
+
+    audio.restore()
+    assert audio.samples.tolist() == list(range(1, 41))
+
+
+def test_pcm_buffer_restores_samples_under_header_and_padding() -> None:
+    audio = PcmBuffer(60, sample_rate=10)
+    audio.append(np.arange(1, 41, dtype=np.int16))
+
+    wav = audio.wav(start=25, end=30, min_duration=1.0)
+
+    assert _read_wav(bytes(wav))[1].tolist() == [26, 27, 28, 29, 30] + [0] * 5
+    # Framing another range puts the first one's overwritten samples back.
+    assert _read_wav(bytes(audio.wav(start=0, end=3)))[1].tolist() == [1, 2, 3]
+    audio.restore()
+    assert audio.samples.tolist() == list(range(1, 41))
+
+
+def test_pcm_ring_windows_are_contiguous_views_across_the_wrap() -> None:
+    ring = PcmRing(10)
+    for start in range(0, 36, 4):
+        assert ring.append(np.arange(start, start + 4, dtype=np.int16).tobytes()) == start + 4
+
+    window = ring.window(29, 35)
+
+    assert (ring.position, ring.start) == (36, 26)
+    assert window.tolist() == list(range(29, 35))
+    assert np.shares_memory(window, ring.window(26))
+    assert ring.window(0).tolist() == list(range(26, 36))
+    with pytest.raises(ValueError):
+        ring.window(30, 37)
+
+
+def test_pcm_ring_keeps_the_tail_of_long_blocks_and_scales_to_float() -> None:
+    ring = PcmRing(4)
+    ring.append(np.array([[1], [2], [3]], dtype=np.int16))
+    ring.append(np.array([-32768, 0, 16384, 100, 200, 300], dtype=np.int16))
+
+    scaled = ring.window_float(0)
+    shorter = ring.window_float(6, 8)
+
+    assert ring.position == 9 and ring.window(0).tolist() == [16384, 100, 200, 300]
+    assert shorter.dtype == np.float32
+    assert shorter.tolist() == pytest.approx([100 / 32768, 200 / 32768])
+    # The scratch buffer is reused: the earlier result has been overwritten
+    assert np.shares_memory(scaled, shorter) and scaled[0] == shorter[0]
+
+def test_encode_upload_mulaw_halves_the_body() -> None:
+    samples = np.linspace(-32768, 32767, 4000).astype(np.int16)
+    audio = PcmBuffer(len(samples))
+    audio.append(samples)
+
+    body, name = encode_upload(audio, "mulaw", start=1000)
+    codes = np.frombuffer(body, dtype=np.uint8, offset=58)
+
+    assert name == "stream.wav" and bytes(body[:4]) == b"RIFF"
+    assert bytes(body[38:42]) == b"fact" and bytes(body[50:54]) == b"data"
+    assert len(codes) == 3000
+    error = np.abs(decode_mulaw(codes).astype(np.int32) - samples[1000:])
+    assert np.all(error <= np.abs(samples[1000:].astype(np.int32)) // 16 + 8)
+    assert decode_mulaw(encode_mulaw(np.array([0, -1, 1000], dtype=np.int16))).tolist() == [0, 0, 988]
+    with pytest.raises(ValueError):
+        encode_upload(audio, "mp3")
+
+
+def test_build_wav_copies_chunks_once_and_pads() -> None:
+    chunks = [np.array([1, 2], dtype=np.int16).tobytes(), memoryview(b"\x03\x00")]
+
+    _, samples = _read_wav(bytes(build_wav(chunks, sample_rate=10, min_duration=0.5)))
+
+    assert samples.tolist() == [1, 2, 3, 0, 0]
+    with pytest.raises(ValueError):
+        build_wav([b""])
+
+
+def test_memory_file_reads_and_seeks_without_copying_source() -> None:
+    data = bytearray(b"abcdef")
+    file = MemoryFile(data, name="stream.wav")
+
+    assert file.read(4) == b"abcd"
+    data[4:] = b"XY"
+    assert file.read() == b"XY"
+    file.seek(-3, io.SEEK_END)
+    assert (file.tell(), file.read(2)) == (3, b"dX")
+    assert file.name == "stream.wav"
+
+
+def test_transcribe_stream_uploads_recording_buffer(monkeypatch: pytest.MonkeyPatch) -> None:
+    audio = PcmBuffer.for_duration(1.0)
+    audio.append(np.full(8000, 100, dtype=np.int16))
+    uploaded = {}
+
+    class DummyTranscriptions:
+        def create(self, *, file, **_: object):
+            uploaded["name"] = file.name
+            uploaded["samples"] = _read_wav(file.read())[1]
+            return types.SimpleNamespace(text="открой блокнот", language="ru")
+
+    client = types.SimpleNamespace(audio=types.SimpleNamespace(transcriptions=DummyTranscriptions()))
+    monkeypatch.setattr(speech, "build_openai_client", lambda: client)
+
+    assert speech.transcribe_stream(audio) == "открой блокнот"
+    assert uploaded["name"] == "stream.wav"
+    assert len(uploaded["samples"]) == 8000
@@ -3,13 +3,17 @@
 from __future__ import annotations
 
 import logging
+import socket
 from http.client import RemoteDisconnected
 from unittest.mock import patch
 
 import pytest
 
+from ai_assistant import bridge, bridge_requests
 from ai_assistant.bridge import HttpBridge
 from ai_assistant.schemas import Command
+from ai_assistant.standin import StandInCore
+from ai_assistant.transport import ConnectionPool
 
 
 def _sample_command() -> Command:
@@ -24,7 +28,7 @@ def _sample_command() -> Command:
 def test_send_command_handles_disconnected_bridge(caplog: pytest.LogCaptureFixture) -> None:
     bridge = HttpBridge("http://localhost:5055", timeout=0.01)
 
-    with patch("ai_assistant.bridge.request.urlopen", side_effect=RemoteDisconnected("no response")):
+    with patch.object(ConnectionPool, "request", side_effect=RemoteDisconnected("no response")):
         with caplog.at_level(logging.ERROR):
             assert bridge.send_command(_sample_command()) is None
 
@@ -34,8 +38,131 @@ def test_send_command_handles_disconnected_bridge(caplog: pytest.LogCaptureFixtu
 def test_is_available_logs_bridge_down(caplog: pytest.LogCaptureFixture) -> None:
     bridge = HttpBridge("http://localhost:5055", timeout=0.01)
 
-    with patch("ai_assistant.bridge.request.urlopen", side_effect=RemoteDisconnected("no response")):
+    with patch.object(ConnectionPool, "request", side_effect=RemoteDisconnected("no response")):
         with caplog.at_level(logging.ERROR):
             assert bridge.is_available() is False
 
     assert "unreachable" in caplog.text
+
+
+def test_bridge_reuses_pooled_connection() -> None:
+    with StandInCore() as core:
+        bridge = HttpBridge(core.endpoint, pool=ConnectionPool.for_endpoint(core.endpoint))
+
+        for _ in range(5):
+            response = bridge.send_command(_sample_command())
+            assert response is not None and response["status"] == "ok"
+        assert bridge.is_available()
+
+    assert core.connections == 1
+    assert core.requests == 6
+
+
+def _plan(*actions: str) -> list[Command]:
+    return [
+        Command(
+            action=action,
+            params={},
+            uuid=f"00000000-0000-0000-0000-00000000000{index}",
+            timestamp="2025-01-01T00:00:00Z",
+        )
+        for index, action in enumerate(actions)
+    ]
+
+
+class _FailingCore(StandInCore):
+    def execute(self, command):  # type: ignore[no-untyped-def]
+        if command.get("action") == "fail":
+            return {"status": "error", "result": None, "error": "boom"}
+        return super().execute(command)
+
+
+@pytest.mark.parametrize("module", [bridge, bridge_requests])
+def test_send_commands_uses_one_batch_request(module) -> None:  # type: ignore[no-untyped-def]
+    with StandInCore() as core:
+        client = module.HttpBridge(core.endpoint, pool=ConnectionPool.for_endpoint(core.endpoint))
+
+        responses = client.send_commands(_plan("mute", "show_desktop", "screenshot"))
+        client.send_commands(_plan("mute", "show_desktop"))
+
+    assert [response["result"]["action"] for response in responses] == [
+        "mute",
+        "show_desktop",
+        "screenshot",
+    ]
+    # One capability probe, then one request per plan.
+    assert core.requests == 3
+
+
+@pytest.mark.parametrize("module", [bridge, bridge_requests])
+def test_send_commands_falls_back_without_batch_endpoint(module) -> None:  # type: ignore[no-untyped-def]
+    with StandInCore(batch=False) as core:
+        client = module.HttpBridge(core.endpoint, pool=ConnectionPool.for_endpoint(core.endpoint))
+
+        responses = client.send_commands(_plan("mute", "show_desktop", "screenshot"))
+
+    assert len(responses) == 3
+    assert all(response["status"] == "ok" for response in responses)
+    assert core.requests == 4
+
+
+@pytest.mark.parametrize("batch", [True, False])
+def test_send_commands_stops_at_first_failure(batch: bool) -> None:
+    with _FailingCore(batch=batch) as core:
+        client = bridge.HttpBridge(core.endpoint, pool=ConnectionPool.for_endpoint(core.endpoint))
+
+        responses = client.send_commands(_plan("mute", "fail", "screenshot"))
+
+    assert [response["status"] for response in responses] == ["ok", "error"]
+
+
+def test_send_commands_retries_plain_alias_after_batch_failure() -> None:
+    class _PlainNamesOnly(StandInCore):
+        def execute(self, command):  # type: ignore[no-untyped-def]
+            if str(command.get("params", {}).get("application")).startswith("known_"):
+                return {"status": "error", "result": None, "error": "unknown application"}
+            return super().execute(command)
+
+    plan = [
+        Command(
+            action="open_app",
+            params={"application": "known_notepad"},
+            uuid="11111111-2222-3333-4444-555555555555",
+            timestamp="2025-01-01T00:00:00Z",
+        ),
+        *_plan("mute"),
+    ]
+    with _PlainNamesOnly() as core:
+        client = bridge.HttpBridge(core.endpoint, pool=ConnectionPool.for_endpoint(core.endpoint))
+
+        responses = client.send_commands(plan)
+
+    assert [response["status"] for response in responses] == ["ok", "ok"]
+    assert responses[0]["result"]["params"]["application"] == "notepad"
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix domain sockets are not available")
+@pytest.mark.parametrize("module", [bridge, bridge_requests])
+def test_bridge_works_over_unix_socket(module, tmp_path) -> None:  # type: ignore[no-untyped-def]
+    with StandInCore(unix_socket=str(tmp_path / "core.sock")) as core:
+        client = module.HttpBridge(core.endpoint, pool=ConnectionPool.for_endpoint(core.endpoint))
+
+        response = client.send_command(_sample_command())
+        assert client.is_available()
+
+    assert response is not None and response["status"] == "ok"
+    assert core.connections == 1
+
+
+@pytest.mark.parametrize("module", [bridge, bridge_requests])
+def test_closing_a_bridge_leaves_the_shared_pool_open(module) -> None:  # type: ignore[no-untyped-def]
+    with StandInCore() as core:
+        first = module.HttpBridge(core.endpoint, heartbeat_interval=None)
+        second = module.HttpBridge(core.endpoint, heartbeat_interval=None)
+        assert first.send_command(_sample_command()) is not None
+
+        first.close()
+
+        assert second.send_command(_sample_command()) is not None
+
+    assert core.connections == 1
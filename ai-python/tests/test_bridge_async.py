@@ -0,0 +1,120 @@
+"""Tests for the asyncio bridge client."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import pytest
+
+from ai_assistant.bridge_async import AsyncHttpBridge
+from ai_assistant.schemas import Command
+from ai_assistant.standin import StandInCore
+
+
+def _command(application: str = "notepad") -> Command:
+    return Command(
+        action="open_app",
+        params={"application": application},
+        uuid="11111111-2222-3333-4444-555555555555",
+        timestamp="2025-01-01T00:00:00Z",
+    )
+
+
+def test_concurrent_commands_are_bounded_by_semaphore() -> None:
+    async def scenario(endpoint: str) -> list:
+        async with AsyncHttpBridge(endpoint, max_in_flight=4) as bridge:
+            return await asyncio.gather(*(bridge.send_command(_command()) for _ in range(40)))
+
+    with StandInCore(request_delay=0.01) as core:
+        responses = asyncio.run(scenario(core.endpoint))
+
+    assert all(response["status"] == "ok" for response in responses)
+    assert core.requests == 40
+    assert core.peak_in_flight == 4
+    assert core.connections <= 4
+
+
+def test_known_alias_is_retried_with_plain_name() -> None:
+    class _RejectsKnownAliases(StandInCore):
+        async def handle(self, method, path, body):  # type: ignore[no-untyped-def]
+            if b"known_" in body:
+                return 404, {"status": "error", "result": None, "error": "unknown application"}
+            return await super().handle(method, path, body)
+
+    async def scenario(endpoint: str) -> object:
+        async with AsyncHttpBridge(endpoint) as bridge:
+            return await bridge.send_command(_command("known_zzqx"))
+
+    with _RejectsKnownAliases() as core:
+        response = asyncio.run(scenario(core.endpoint))
+
+    assert response["result"]["params"]["application"] == "zzqx"  # type: ignore[index]
+    assert core.requests == 2
+
+
+def test_is_available_logs_bridge_down(caplog: pytest.LogCaptureFixture) -> None:
+    async def scenario() -> bool:
+        async with AsyncHttpBridge("http://127.0.0.1:9", timeout=0.5) as bridge:
+            return await bridge.is_available()
+
+    with caplog.at_level(logging.ERROR):
+        assert asyncio.run(scenario()) is False
+
+    assert "unreachable" in caplog.text
+
+
+@pytest.mark.parametrize("batch", [True, False])
+def test_send_commands_stops_at_first_failure(batch: bool) -> None:
+    class _FailingCore(StandInCore):
+        def execute(self, command):  # type: ignore[no-untyped-def]
+            if command.get("action") == "fail":
+                return {"status": "error", "result": None, "error": "boom"}
+            return super().execute(command)
+
+    plan = [
+        Command(action=action, params={}, uuid=f"0000000{index}", timestamp="2025-01-01T00:00:00Z")
+        for index, action in enumerate(["mute", "fail", "screenshot"])
+    ]
+
+    async def scenario(endpoint: str) -> list:
+        async with AsyncHttpBridge(endpoint) as bridge:
+            return await bridge.send_commands(plan)
+
+    with _FailingCore(batch=batch) as core:
+        responses = asyncio.run(scenario(core.endpoint))
+
+    assert [response["status"] for response in responses] == ["ok", "error"]
+    # With batching: a capability probe and one batch; without: a probe and two commands.
+    assert core.requests == (2 if batch else 3)
+
+
+def test_slow_core_times_out_into_none(caplog: pytest.LogCaptureFixture) -> None:
+    async def scenario(endpoint: str) -> object:
+        async with AsyncHttpBridge(endpoint, timeout=0.05) as bridge:
+            return await bridge.get_status()
+
+    with StandInCore(request_delay=0.5) as core:
+        with caplog.at_level(logging.ERROR):
+            assert asyncio.run(scenario(core.endpoint)) is None
+
+    assert "status check failed" in caplog.text
+
+
+def test_non_json_answer_is_reported_as_none(caplog: pytest.LogCaptureFixture) -> None:
+    async def answer(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        await reader.readuntil(b"\r\n\r\n")
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 4\r\n\r\noops")
+        await writer.drain()
+        writer.close()
+
+    async def scenario() -> object:
+        server = await asyncio.start_server(answer, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server, AsyncHttpBridge(f"http://127.0.0.1:{port}") as bridge:
+            return await bridge.get_status()
+
+    with caplog.at_level(logging.ERROR):
+        assert asyncio.run(scenario()) is None
+
+    assert "invalid JSON" in caplog.text
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import threading
+
+from ai_assistant.bridge import HttpBridge
+from ai_assistant.cache import ResultCache
+from ai_assistant.heartbeat import Heartbeat
+from ai_assistant.schemas import Command
+from ai_assistant.standin import StandInCore
+from ai_assistant.transport import ConnectionPool
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _command(action: str, **params: object) -> Command:
+    return Command(
+        action=action,
+        params=dict(params),
+        uuid="11111111-2222-3333-4444-555555555555",
+        timestamp="2025-01-01T00:00:00Z",
+    )
+
+
+def _ok(result: object) -> dict:
+    return {"status": "ok", "result": result, "error": None}
+
+
+def test_cache_expires_entries_after_ttl() -> None:
+    clock = _Clock()
+    cache = ResultCache({"system_status": 2.0}, clock=clock)
+    cache.store(_command("system_status"), _ok({"cpu": 10}))
+
+    cached = cache.get(_command("system_status"))
+    assert cached == _ok({"cpu": 10})
+    cached["result"]["cpu"] = 99
+    assert cache.get(_command("system_status")) == _ok({"cpu": 10})
+
+    clock.now = 2.5
+    assert cache.get(_command("system_status")) is None
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_cache_skips_mutating_actions_and_errors() -> None:
+    cache = ResultCache({"list_applications": 60.0})
+
+    cache.store(_command("open_app", application="notepad"), _ok({}))
+    cache.store(_command("list_applications"), {"status": "error", "result": None, "error": "x"})
+
+    assert cache.get(_command("open_app", application="notepad")) is None
+    assert cache.get(_command("list_applications")) is None
+    assert len(cache) == 0
+
+
+def test_scan_applications_invalidates_application_list() -> None:
+    cache = ResultCache()
+    cache.store(_command("list_applications"), _ok(["Telegram"]))
+    cache.store(_command("list_applications", filter="tel"), _ok(["Telegram"]))
+    cache.store(_command("system_status"), _ok({}))
+
+    cache.store(_command("scan_applications"), None)
+
+    assert cache.get(_command("list_applications")) is None
+    assert cache.get(_command("list_applications", filter="tel")) is None
+    assert cache.get(_command("system_status")) is not None
+
+
+def test_bridge_serves_read_only_actions_from_cache() -> None:
+    with StandInCore() as core:
+        client = HttpBridge(
+            core.endpoint,
+            pool=ConnectionPool.for_endpoint(core.endpoint),
+            heartbeat_interval=None,
+        )
+
+        for _ in range(3):
+            assert client.send_command(_command("list_applications"))["status"] == "ok"
+        client.send_commands([_command("scan_applications"), _command("list_applications")])
+        client.send_commands([_command("list_applications"), _command("mute")])
+
+    # list, capability probe, batch [scan, list], then only "mute" is sent.
+    assert core.requests == 4
+    assert client.cache.hits == 3
+
+
+def test_heartbeat_keeps_state_without_blocking_callers() -> None:
+    results = iter([True, False, False])
+    probed = threading.Event()
+
+    def probe() -> bool:
+        try:
+            return next(results)
+        finally:
+            if heartbeat.probes >= 3:
+                probed.set()
+
+    heartbeat = Heartbeat(probe, interval=0.01, max_backoff=0.01)
+    assert heartbeat.available is None
+    assert heartbeat.start().available is True
+
+    assert probed.wait(5)
+    heartbeat.stop()
+    assert heartbeat.available is False
+    assert not heartbeat.running
+
+
+def test_refresh_probes_again_while_the_state_is_down() -> None:
+    results = iter([False, True])
+    heartbeat = Heartbeat(lambda: next(results), interval=60.0)
+    try:
+        assert heartbeat.start().available is False
+        # The background thread would wait a minute; refresh does not.
+        assert heartbeat.refresh() is True
+        assert heartbeat.refresh() is True
+    finally:
+        heartbeat.stop()
+
+    assert heartbeat.probes == 2
+
+
+def test_bridge_is_available_uses_heartbeat_state() -> None:
+    with StandInCore() as core:
+        client = HttpBridge(core.endpoint, pool=ConnectionPool.for_endpoint(core.endpoint))
+        try:
+            assert client.is_available()
+            client.send_command(_command("mute"))
+            assert client.is_available()
+            assert client.is_available()
+        finally:
+            client.close()
+
+    # One probe when the heartbeat starts; later checks read its state.
+    assert core.requests == 2
@@ -0,0 +1,110 @@
+"""Tests for streaming capture decoding."""
+
+from __future__ import annotations
+
+import base64
+import io
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from ai_assistant.bridge import HttpBridge
+from ai_assistant.capture import read_capture
+from ai_assistant.schemas import Command
+from ai_assistant.standin import StandInCore
+from ai_assistant.transport import ConnectionPool
+
+IMAGE = os.urandom(50_000)
+
+
+def _body(image: bytes = IMAGE, *, dotnet_escapes: bool = True) -> bytes:
+    encoded = base64.b64encode(image).decode()
+    if dotnet_escapes:
+        # System.Text.Json output: "+" is escaped as \u002B.
+        encoded = encoded.replace("+", "\\u002B")
+    return (
+        '{"status":"ok","result":{"application":"notepad","width":3840,"height":2160,'
+        f'"image":"{encoded}","capturedAt":"2025-01-01T00:00:00Z"}},"error":null}}'
+    ).encode()
+
+
+def _chunks(data: bytes, size: int):
+    return (data[index : index + size] for index in range(0, len(data), size))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 4096, 1 << 20])
+def test_image_is_decoded_across_chunk_boundaries(chunk_size: int) -> None:
+    sink = io.BytesIO()
+
+    result = read_capture(_chunks(_body(), chunk_size), sink)
+
+    assert sink.getvalue() == IMAGE
+    assert result.ok and result.image_bytes == len(IMAGE)
+    assert result.metadata == {
+        "application": "notepad",
+        "width": 3840,
+        "height": 2160,
+        "capturedAt": "2025-01-01T00:00:00Z",
+    }
+
+
+def test_image_can_be_decoded_into_preallocated_buffer() -> None:
+    buffer = bytearray(len(IMAGE) + 10)
+
+    result = read_capture(_chunks(_body(dotnet_escapes=False), 1000), buffer)
+
+    assert bytes(buffer[: result.image_bytes]) == IMAGE
+    with pytest.raises(ValueError):
+        read_capture([_body()], bytearray(10))
+
+
+def test_decoder_does_not_need_strict_mode(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Python 3.10's a2b_base64 takes no keyword arguments.
+    import binascii
+    import types
+
+    from ai_assistant import capture
+
+    plain = binascii.a2b_base64
+    python310 = types.SimpleNamespace(a2b_base64=lambda data: plain(data), Error=binascii.Error)
+    monkeypatch.setattr(capture, "binascii", python310)
+    sink = io.BytesIO()
+
+    assert read_capture(_chunks(_body(), 7), sink).image_bytes == len(IMAGE)
+    assert sink.getvalue() == IMAGE
+    with pytest.raises(ValueError):
+        read_capture([_body().replace(b'"image":"', b'"image":"*')], io.BytesIO())
+
+
+def test_error_response_leaves_no_file(tmp_path: Path) -> None:
+    body = json.dumps({"status": "error", "result": None, "error": "Window not found"})
+    target = tmp_path / "shot.png"
+
+    result = read_capture([body.encode()], target)
+
+    assert not result.ok and result.error == "Window not found"
+    assert result.path is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_bridge_streams_capture_to_file(tmp_path: Path) -> None:
+    class _CaptureCore(StandInCore):
+        def execute(self, command):  # type: ignore[no-untyped-def]
+            return json.loads(_body(dotnet_escapes=False))
+
+    command = Command(
+        action="capture_window",
+        params={"application": "notepad"},
+        uuid="11111111-2222-3333-4444-555555555555",
+        timestamp="2025-01-01T00:00:00Z",
+    )
+    with _CaptureCore() as core:
+        bridge = HttpBridge(core.endpoint, pool=ConnectionPool.for_endpoint(core.endpoint))
+        result = bridge.capture(command, tmp_path / "notepad.png")
+        assert bridge.is_available()
+
+    assert result is not None and result.path == tmp_path / "notepad.png"
+    assert result.path.read_bytes() == IMAGE
+    assert core.connections == 1
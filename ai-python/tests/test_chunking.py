@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import threading
+import types
+
+import numpy as np
+import pytest
+
+from ai_assistant import speech
+from ai_assistant.audio import PcmBuffer
+from ai_assistant.chunking import Segment, split_segments, stitch
+
+RATE = 16_000
+
+
+def _speech(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (6000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+
+
+def _phrases(lengths, pause: float = 0.5) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    parts = []
+    for length in lengths:
+        parts += [_speech(length), rng.normal(0, 30, int(pause * RATE)).astype(np.int16)]
+    return np.concatenate(parts)
+
+
+def test_long_audio_is_cut_inside_pauses() -> None:
+    samples = _phrases([4.0] * 8)  # 36 s, a pause every 4.5 s
+
+    segments = split_segments(samples, sample_rate=RATE, max_seconds=10.0)
+
+    assert segments[0].start == 0 and segments[-1].end == len(samples)
+    assert all(s.end - s.start <= 10 * RATE for s in segments)
+    assert not any(s.overlaps_previous for s in segments)
+    for previous, current in zip(segments, segments[1:]):
+        assert previous.end == current.start
+        assert np.abs(samples[current.start - 800 : current.start + 800]).max() < 500
+
+
+def test_audio_without_pauses_gets_overlapping_segments() -> None:
+    samples = _speech(25.0)
+
+    segments = split_segments(samples, sample_rate=RATE, max_seconds=10.0)
+
+    assert len(segments) == 3
+    assert [s.overlaps_previous for s in segments] == [False, True, True]
+    assert segments[0].end - segments[1].start == RATE
+    assert stitch(
+        ["Открой браузер и найди", "и найди отчёт за март,", "за март, потом"], segments
+    ) == "Открой браузер и найди отчёт за март, потом"
+    assert stitch(["one", "two"], [Segment(0, 1), Segment(1, 2)]) == "one two"
+
+
+def test_transcribe_stream_sends_segments_concurrently(monkeypatch: pytest.MonkeyPatch) -> None:
+    samples = _phrases([4.0, 4.0])
+    audio = PcmBuffer(len(samples))
+    audio.append(samples)
+    lock = threading.Lock()
+    active = {"now": 0, "max": 0}
+    barrier = threading.Barrier(2, timeout=5)
+
+    class DummyTranscriptions:
+        def create(self, *, file, **_: object):
+            seconds = (len(file.read()) - 44) / (2 * RATE)
+            with lock:
+                active["now"] += 1
+                active["max"] = max(active["max"], active["now"])
+            barrier.wait()
+            with lock:
+                active["now"] -= 1
+            return types.SimpleNamespace(text=f"{seconds:.1f}s", language="ru")
+
+    client = types.SimpleNamespace(audio=types.SimpleNamespace(transcriptions=DummyTranscriptions()))
+    monkeypatch.setattr(speech, "build_openai_client", lambda: client)
+    monkeypatch.setenv("JARVIS_TRANSCRIPTION_SEGMENT_SECONDS", "8")
+    monkeypatch.setenv("JARVIS_TRANSCRIPTION_WORKERS", "2")
+
+    assert speech.transcribe_stream(audio) == "4.3s 4.5s"
+    assert active["max"] == 2
+
+
+def test_an_empty_segment_does_not_fail_the_dictation(monkeypatch: pytest.MonkeyPatch) -> None:
+    samples = _phrases([4.0, 4.0])
+    audio = PcmBuffer(len(samples))
+    audio.append(samples)
+    # Whisper often tags a silent piece with an arbitrary language, or none.
+    answers = iter([("", "welsh"), ("вторая фраза", "ru")])
+    lock = threading.Lock()
+
+    class DummyTranscriptions:
+        def create(self, **_: object):
+            with lock:
+                text, language = next(answers)
+            return types.SimpleNamespace(text=text, language=language)
+
+    client = types.SimpleNamespace(audio=types.SimpleNamespace(transcriptions=DummyTranscriptions()))
+    monkeypatch.setattr(speech, "build_openai_client", lambda: client)
+    monkeypatch.setenv("JARVIS_TRANSCRIPTION_SEGMENT_SECONDS", "8")
+    monkeypatch.setenv("JARVIS_TRANSCRIPTION_WORKERS", "1")
+
+    assert speech.transcribe_stream(audio) == "вторая фраза"
+    answers = iter([("вторая фраза", "ru"), ("", None)])
+    assert speech.transcribe_stream(audio) == "вторая фраза"
@@ -0,0 +1,90 @@
+"""Tests for per-query deadlines and adaptive timeouts."""
+
+from __future__ import annotations
+
+import pytest
+
+from ai_assistant.deadline import Deadline, DeadlineExceeded, LatencyTracker, stage_timeout
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_deadline_caps_stage_timeouts_by_remaining_budget() -> None:
+    clock = _FakeClock()
+    deadline = Deadline(10.0, clock=clock)
+
+    assert deadline.timeout(4.0) == 4.0
+    clock.now += 8.0
+    assert deadline.timeout(4.0) == pytest.approx(2.0)
+    assert not deadline.allows(3.0)
+
+    clock.now += 5.0
+    assert deadline.expired
+    with pytest.raises(DeadlineExceeded):
+        deadline.timeout()
+
+
+def test_latency_tracker_uses_initial_until_enough_samples() -> None:
+    tracker = LatencyTracker(initial=10.0, floor=0.5, ceiling=10.0, min_samples=3, multiplier=2.0)
+
+    tracker.observe("open_app", 0.2)
+    assert tracker.timeout("open_app") == 10.0
+
+    tracker.observe("open_app", 0.3)
+    tracker.observe("open_app", 0.4)
+    assert tracker.timeout("open_app") == pytest.approx(0.8)
+    assert tracker.timeout("scan_applications") == 10.0
+
+
+def test_stage_timeout_respects_deadline() -> None:
+    clock = _FakeClock()
+    tracker = LatencyTracker(initial=10.0, floor=0.5, ceiling=10.0)
+
+    assert stage_timeout(tracker, "open_app", Deadline(3.0, clock=clock)) == 3.0
+    assert stage_timeout(tracker, "open_app") == 10.0
+
+
+def test_cancel_abandons_call_in_flight() -> None:
+    import threading
+
+    from ai_assistant.deadline import QueryCancelled
+
+    deadline = Deadline(10.0)
+    started = threading.Event()
+    release = threading.Event()
+
+    def _slow_call() -> str:
+        started.set()
+        release.wait(5)
+        return "late"
+
+    threading.Thread(target=lambda: (started.wait(5), deadline.cancel()), daemon=True).start()
+    try:
+        with pytest.raises(QueryCancelled):
+            deadline.run(_slow_call)
+    finally:
+        release.set()
+
+    assert deadline.abandoned_calls == 1
+    with pytest.raises(QueryCancelled):
+        deadline.timeout()
+
+
+def test_run_gives_up_when_the_budget_runs_out() -> None:
+    import threading
+
+    deadline = Deadline(0.05)
+    release = threading.Event()
+    try:
+        with pytest.raises(DeadlineExceeded):
+            deadline.run(release.wait, 5)
+    finally:
+        release.set()
+
+    assert deadline.abandoned_calls == 1
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import types
+
+import numpy as np
+import pytest
+
+import main
+from ai_assistant.endpointing import EndpointConfig, Endpointer
+
+RATE = 16_000
+BLOCK = 1600
+
+
+def _speech(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * RATE)) / RATE
+    return 6000 * np.sin(2 * np.pi * 220 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 3 * t))
+
+
+def _room(parts, *, noise: float) -> np.ndarray:
+    """``parts`` alternate silence and speech durations, starting with silence."""
+
+    rng = np.random.default_rng(0)
+    pieces = [_speech(seconds) if index % 2 else np.zeros(int(seconds * RATE)) for index, seconds in enumerate(parts)]
+    samples = np.concatenate(pieces)
+    return np.clip(samples + rng.normal(0, noise, len(samples)), -32768, 32767).astype(np.int16)
+
+
+def _feed(endpointer: Endpointer, samples: np.ndarray) -> float:
+    """Return the time at which ``endpointer`` ended the command."""
+
+    for start in range(0, len(samples), BLOCK):
+        endpointer.process(samples[start : start + BLOCK])
+        if endpointer.state.done:
+            return (start + BLOCK) / RATE
+    return float("inf")
+
+
+def test_endpointer_follows_a_noisy_room() -> None:
+    samples = _room([1.0, 1.0, 5.0], noise=300.0)  # peaks far above the fixed threshold
+    endpointer = Endpointer()
+
+    stopped = _feed(endpointer, samples)
+
+    assert endpointer.state.speech_started
+    assert 1.95 * RATE <= endpointer.state.speech_end <= 2.05 * RATE
+    assert 2.0 + 0.8 <= stopped <= 2.0 + 0.9
+    assert -45 < endpointer.floor_db < -30
+
+
+def test_silence_window_grows_with_pauses_between_phrases() -> None:
+    config = EndpointConfig(min_silence=0.5, max_silence=1.2)
+    quick = Endpointer(config)
+    assert _feed(quick, _room([0.5, 1.0, 3.0], noise=20.0)) == pytest.approx(2.0, abs=0.1)
+
+    paced = Endpointer(config)
+    # The first pause lengthens the window enough to outlast the second one.
+    stopped = _feed(paced, _room([0.5, 1.0, 0.4, 1.0, 0.55, 1.0, 3.0], noise=20.0))
+
+    assert paced.state.gaps == [pytest.approx(0.4, abs=0.05), pytest.approx(0.55, abs=0.05)]
+    assert paced.state.silence_window == pytest.approx(0.825, abs=0.08)
+    assert stopped == pytest.approx(4.45 + 0.825, abs=0.15)
+
+
+def test_record_microphone_audio_stops_after_adaptive_silence(monkeypatch: pytest.MonkeyPatch) -> None:
+    samples = _room([0.5, 1.0, 10.0], noise=300.0)
+
+    class Stream:
+        position = 0
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            return None
+
+        def read(self, frames):
+            block = samples[self.position : self.position + frames].reshape(-1, 1)
+            self.position += frames
+            return block, False
+
+    device = types.SimpleNamespace(InputStream=lambda **_: Stream())
+    monkeypatch.setattr(main, "_load_dependency", lambda name: device)
+
+    adaptive = main.record_microphone_audio()
+    fixed = main.record_microphone_audio(max_duration_seconds=5.0, silence_threshold=200)
+
+    assert 1.5 + 0.8 <= adaptive.duration <= 1.5 + 1.0
+    assert fixed.duration == pytest.approx(5.0)
+
+
+def test_speech_from_the_first_block_is_found_once_the_room_is_heard() -> None:
+    endpointer = Endpointer()
+
+    stopped = _feed(endpointer, _room([0.0, 1.2, 3.0], noise=300.0))
+
+    assert endpointer.state.speech_started
+    assert 1.15 * RATE <= endpointer.state.speech_end <= 1.25 * RATE
+    assert 1.2 + 0.8 <= stopped <= 1.2 + 0.9
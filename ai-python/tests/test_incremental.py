@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import threading
+from typing import List
+
+import numpy as np
+
+from ai_assistant.audio import PcmBuffer
+from ai_assistant.incremental import IncrementalTranscriber
+
+BLOCK = 1_600  # 100 ms at 16 kHz
+
+
+def _speak(audio: PcmBuffer, transcriber: IncrementalTranscriber, blocks: int, value: int) -> None:
+    for _ in range(blocks):
+        audio.append(np.full(BLOCK, value, dtype=np.int16))
+        transcriber.observe(audio, value != 0, BLOCK)
+
+
+def test_phrases_are_transcribed_during_pauses() -> None:
+    heard: List[List[int]] = []
+    partials: List[str] = []
+    release = threading.Event()
+
+    def transcribe(chunks) -> str:
+        samples = np.frombuffer(b"".join(chunks), dtype=np.int16)
+        heard.append(sorted(set(samples.tolist())))
+        release.wait(5)
+        return f"phrase{len(heard)}"
+
+    audio = PcmBuffer(16_000 * 10)
+    transcriber = IncrementalTranscriber(transcribe, on_partial=partials.append)
+    _speak(audio, transcriber, 12, 1)
+    _speak(audio, transcriber, 4, 0)  # 0.4 s pause: first phrase goes out
+    _speak(audio, transcriber, 6, 2)
+    _speak(audio, transcriber, 2, 0)
+    assert [(s.start, s.end) for s in transcriber.segments] == [(0, 16 * BLOCK)]
+    assert transcriber.partial == ""
+
+    release.set()
+    assert transcriber.finish(audio) == "phrase1 phrase2"
+    assert heard == [[0, 1], [0, 2]]
+    assert partials[-1] == "phrase1 phrase2"
+
+
+def test_failed_segment_falls_back_to_one_request() -> None:
+    calls: List[int] = []
+
+    def transcribe(chunks) -> str:
+        audio = chunks if isinstance(chunks, PcmBuffer) else PcmBuffer.from_chunks(chunks)
+        calls.append(audio.sample_count)
+        if len(calls) == 1:
+            raise RuntimeError("No transcription text returned")
+        return "whole"
+
+    audio = PcmBuffer(16_000 * 10)
+    transcriber = IncrementalTranscriber(transcribe)
+    _speak(audio, transcriber, 12, 1)
+    _speak(audio, transcriber, 10, 0)
+
+    assert transcriber.finish(audio) == "whole"
+    assert calls == [16 * BLOCK, 22 * BLOCK]
+
+
+def test_short_phrases_wait_for_more_audio() -> None:
+    audio = PcmBuffer(16_000 * 10)
+    transcriber = IncrementalTranscriber(lambda chunks: "all")
+    _speak(audio, transcriber, 3, 1)
+    _speak(audio, transcriber, 5, 0)
+
+    assert transcriber.segments == []
+    assert transcriber.finish(audio) == "all"
+    assert [(s.start, s.end) for s in transcriber.segments] == [(0, 8 * BLOCK)]
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from ai_assistant.keyword_spotting import KeywordSpotter
+
+RATE = 16_000
+
+
+def _word(pitches, *, seconds: float = 0.2, noise: float = 30.0, seed: int = 0) -> np.ndarray:
+    """A tone that steps through ``pitches`` with 0.3 s of noise around it."""
+
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * RATE)) / RATE
+    tones = [5000 * np.sin(2 * np.pi * pitch * t) for pitch in pitches]
+    silence = np.zeros(int(0.3 * RATE))
+    samples = np.concatenate([silence, *tones, silence])
+    return np.clip(samples + rng.normal(0, noise, len(samples)), -32768, 32767).astype(np.int16)
+
+
+AURORA = (300, 900, 600, 1500)
+
+
+def _spotter() -> KeywordSpotter:
+    recordings = [_word(AURORA, seconds=length, seed=seed) for seed, length in enumerate((0.18, 0.2, 0.22))]
+    return KeywordSpotter.enroll(recordings)
+
+
+def test_enrolled_word_is_spotted_inside_longer_audio() -> None:
+    spotter = _spotter()
+    window = np.concatenate((_word(AURORA, seconds=0.21, seed=5), _word((450, 2000, 1200), seed=6)))
+
+    detection = spotter.detect(window)
+
+    assert detection is not None
+    assert detection.distance <= spotter.threshold
+    assert detection.end == pytest.approx((0.3 + 4 * 0.21) * RATE, abs=0.1 * RATE)
+
+
+def test_other_words_and_noise_are_rejected() -> None:
+    spotter = _spotter()
+
+    assert spotter.detect(_word((1500, 600, 900, 300), seed=7)) is None
+    assert spotter.detect(_word((450, 2000), seed=8)) is None
+    assert spotter.detect(np.random.default_rng(9).normal(0, 300, RATE).astype(np.int16)) is None
+    assert spotter.detect(np.zeros(100, dtype=np.int16)) is None
+
+
+def test_saved_templates_detect_the_same(tmp_path) -> None:
+    spotter = _spotter()
+    path = tmp_path / "aurora.npz"
+
+    spotter.save(path)
+    loaded = KeywordSpotter.load(path)
+
+    assert loaded.threshold == pytest.approx(spotter.threshold)
+    assert [len(template) for template in loaded.templates] == [len(template) for template in spotter.templates]
+    window = _word(AURORA, seed=10)
+    assert loaded.score(window) == pytest.approx(spotter.score(window))
+    with pytest.raises(ValueError):
+        KeywordSpotter.enroll([_word(AURORA, seed=11), _word(AURORA, seed=12)])
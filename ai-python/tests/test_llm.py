@@ -26,3 +26,97 @@ def test_parse_json_safely_rejects_empty_response():
         assert "empty" in str(exc).lower()
     else:  # pragma: no cover
         raise AssertionError("Expected ValueError for empty response")
+
+
+class _RecordingBackend:
+    def __init__(self) -> None:
+        self.profiles: list[llm.GenerationProfile] = []
+
+    def complete(self, prompt: str, *, profile: llm.GenerationProfile, **_: object) -> str:
+        self.profiles.append(profile)
+        return "{}"
+
+
+def test_prompt_sender_uses_profile_per_call_type():
+    backend = _RecordingBackend()
+    sender = llm.PromptSender(backend)
+
+    sender.send("открой блокнот")
+    sender.answer("сколько времени?")
+    sender.complete_custom("prompt", profile="recovery")
+
+    assert [profile.name for profile in backend.profiles] == ["command", "answer", "recovery"]
+    assert all(profile.max_tokens > 0 for profile in backend.profiles)
+
+
+def test_profile_tuner_shrinks_limit_to_observed_lengths():
+    tuner = llm.ProfileTuner(min_samples=5, headroom=1.5, floor=16)
+    profile = llm.GenerationProfile(name="command", max_tokens=256)
+
+    for _ in range(10):
+        tuner.observe(profile, 40, truncated=False)
+
+    assert tuner.max_tokens_for(profile) == 60
+
+
+def test_profile_tuner_grows_limit_after_truncation():
+    tuner = llm.ProfileTuner(min_samples=5, max_truncation_rate=0.1)
+    profile = llm.GenerationProfile(name="recovery", max_tokens=100)
+
+    tuner.observe(profile, 100, truncated=True)
+
+    assert tuner.max_tokens_for(profile) == 200
+    assert tuner.snapshot()["recovery"]["max_tokens"] == 200
+
+
+class _FlakyCompletions:
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+        self.timeouts: list[float] = []
+
+    def create(self, **kwargs):
+        import httpx
+        from openai import APIConnectionError
+        from types import SimpleNamespace
+
+        self.timeouts.append(kwargs["timeout"])
+        if len(self.timeouts) <= self.failures:
+            raise APIConnectionError(request=httpx.Request("POST", "http://llm"))
+        message = SimpleNamespace(content="{}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")], usage=None)
+
+
+class _FakeClient:
+    def __init__(self, completions: _FlakyCompletions) -> None:
+        from types import SimpleNamespace
+
+        self.chat = SimpleNamespace(completions=completions)
+        self.options: dict = {}
+
+    def with_options(self, **options):
+        self.options = options
+        return self
+
+
+def test_chatgpt_backend_retries_within_the_deadline_only(monkeypatch):
+    import openai
+
+    from ai_assistant.deadline import Deadline
+
+    completions = _FlakyCompletions(failures=1)
+    client = _FakeClient(completions)
+    monkeypatch.setattr(llm, "build_openai_client", lambda **_: client)
+    backend = llm.ChatGPTBackend(api_key="key")
+
+    assert backend.complete("prompt", deadline=Deadline(10.0)) == "{}"
+    assert client.options == {"max_retries": 0}
+    assert len(completions.timeouts) == 2 and all(timeout <= 10.0 for timeout in completions.timeouts)
+
+    completions = client.chat.completions = _FlakyCompletions(failures=5)
+    try:
+        backend.complete("prompt", deadline=Deadline(0.5))
+    except openai.APIConnectionError:
+        pass
+    else:  # pragma: no cover
+        raise AssertionError("Expected the connection error once the budget is too small to retry")
+    assert len(completions.timeouts) == 1
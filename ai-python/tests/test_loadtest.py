@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from ai_assistant.loadtest import (
+    READ_ONLY_MIX,
+    LatencyHistogram,
+    LoadConfig,
+    generate_mix,
+    load_mix,
+    main,
+    run_load,
+)
+from ai_assistant.standin import ActionProfile, SimulatedCore
+
+_CUSTOM_INPUTS = Path(__file__).with_name("custom_inputs.json")
+
+
+def test_closed_loop_sends_requested_commands_without_cache() -> None:
+    mix = load_mix(_CUSTOM_INPUTS) + generate_mix({"system_status": 1}, size=2)
+    config = LoadConfig(concurrency=4, duration=None, requests=40)
+
+    with SimulatedCore(time_scale=0) as core:
+        report = asyncio.run(run_load(core.endpoint, mix, config))
+
+    assert report.completed == 40 == core.requests
+    assert report.outcomes == {"ok": 40, "error": 0, "failed": 0}
+    assert set(report.per_action) == {"open_app", "search_files", "system_status"}
+    assert report.to_json()["latency"]["count"] == 40
+
+
+def test_open_loop_keeps_arrival_rate_and_counts_errors() -> None:
+    profiles = {"mute": ActionProfile(median_ms=0, error_rate=1.0)}
+    config = LoadConfig(mode="open", rate=200, arrivals="uniform", duration=0.5)
+
+    with SimulatedCore(profiles=profiles, seed=1) as core:
+        report = asyncio.run(run_load(core.endpoint, generate_mix({"mute": 1}, size=1), config))
+
+    assert 95 <= report.completed <= 100
+    assert report.error_rate == 1.0
+    assert report.elapsed == pytest.approx(0.5, abs=0.2)
+
+
+def test_histogram_percentiles_and_buckets() -> None:
+    histogram = LatencyHistogram()
+    for millis in range(1, 101):
+        histogram.record(millis / 1000)
+
+    assert histogram.percentile(0.5) == 0.05
+    assert histogram.percentile(0.99) == 0.099
+    buckets = histogram.buckets()
+    assert sum(buckets) == 100
+    assert buckets[2] == 1  # 1 ms lands in the "<= 1 ms" bucket
+
+
+def test_cli_sends_only_read_only_commands_to_a_real_core(capsys: pytest.CaptureFixture) -> None:
+    with SimulatedCore(time_scale=0) as core:
+        main(["--endpoint", core.endpoint, "--requests", "30", "--concurrency", "2", "--json"])
+
+    actions = set(json.loads(capsys.readouterr().out)["per_action"])
+    assert actions <= set(READ_ONLY_MIX)
+    with pytest.raises(SystemExit):
+        main(["--mode", "open"])
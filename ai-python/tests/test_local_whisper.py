@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import types
+from typing import List
+
+import numpy as np
+import pytest
+
+from ai_assistant import speech
+from ai_assistant.audio import PcmBuffer
+from ai_assistant.local_whisper import LocalWhisper
+
+
+class FakeModel:
+    def __init__(self, text: str = "открой блокнот", language: str = "ru") -> None:
+        self.text = text
+        self.language = language
+        self.calls: List[dict] = []
+
+    def transcribe(self, audio, **options):
+        self.calls.append({"audio": audio, **options})
+        return {"text": f" {self.text} ", "language": self.language}
+
+
+def _recording() -> PcmBuffer:
+    audio = PcmBuffer(16_000)
+    audio.append(np.full(16_000, 16_384, dtype=np.int16))
+    return audio
+
+
+def _cloud(monkeypatch: pytest.MonkeyPatch, calls: List[str]) -> None:
+    class DummyTranscriptions:
+        def create(self, *, file, **_: object):
+            calls.append(file.name)
+            return types.SimpleNamespace(text="cloud text", language="en")
+
+    client = types.SimpleNamespace(audio=types.SimpleNamespace(transcriptions=DummyTranscriptions()))
+    monkeypatch.setattr(speech, "build_openai_client", lambda: client)
+
+
+def test_local_model_is_loaded_once_and_gets_float_audio() -> None:
+    model = FakeModel()
+    loads = []
+    local = LocalWhisper("tiny", loader=lambda name, device: loads.append((name, device)) or model)
+
+    first = local.transcribe(np.array([16_384, -32_768], dtype=np.int16), language="ru")
+    local.transcribe(np.zeros(4, dtype=np.float32))
+
+    assert (first.text, first.language) == ("открой блокнот", "ru")
+    assert loads == [("tiny", "cpu")]
+    assert model.calls[0]["audio"].tolist() == [0.5, -1.0]
+    assert model.calls[0]["language"] == "ru" and model.calls[0]["fp16"] is False
+
+
+def test_local_backend_applies_language_checks(monkeypatch: pytest.MonkeyPatch) -> None:
+    model = FakeModel(language="de")
+    monkeypatch.setattr(speech, "get_local_whisper", lambda: LocalWhisper(loader=lambda *_: model))
+    monkeypatch.setenv("JARVIS_TRANSCRIPTION_BACKEND", "local")
+
+    with pytest.raises(RuntimeError, match="Unsupported transcription language"):
+        speech.transcribe_stream(_recording())
+
+    model.language = "ru"
+    assert speech.transcribe_stream(_recording()) == "открой блокнот"
+    assert len(model.calls[-1]["audio"]) == 16_000
+
+
+def test_local_first_falls_back_to_cloud(monkeypatch: pytest.MonkeyPatch) -> None:
+    def broken_loader(name: str, device: str):
+        raise RuntimeError("no weights")
+
+    uploads: List[str] = []
+    _cloud(monkeypatch, uploads)
+    monkeypatch.setattr(speech, "get_local_whisper", lambda: LocalWhisper(loader=broken_loader))
+    monkeypatch.setenv("JARVIS_TRANSCRIPTION_BACKEND", "local_first")
+
+    assert speech.transcribe_stream(_recording()) == "cloud text"
+    assert uploads == ["stream.wav"]
+
+    monkeypatch.setenv("JARVIS_TRANSCRIPTION_BACKEND", "local")
+    with pytest.raises(RuntimeError, match="Local Whisper"):
+        speech.transcribe_stream(_recording())
+    assert uploads == ["stream.wav"]
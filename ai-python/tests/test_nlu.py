@@ -27,7 +27,7 @@ class _StubBackend:
     def __init__(self, payload: dict) -> None:
         self._payload = payload
 
-    def complete(self, prompt: str) -> str:  # type: ignore[override]
+    def complete(self, prompt: str, **_: object) -> str:  # type: ignore[override]
         return json.dumps(self._payload)
 
 
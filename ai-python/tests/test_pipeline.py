@@ -27,7 +27,7 @@ else:
     if not hasattr(module, "OpenAI"):
         module.OpenAI = object  # type: ignore[attr-defined]
 
-from ai_assistant.pipeline import process_text
+from ai_assistant.pipeline import iter_text_events, process_text
 from ai_assistant.schemas import Command
 
 
@@ -37,7 +37,7 @@ class RecordingBridge:
     def __init__(self) -> None:
         self.sent_commands: List[Command] = []
 
-    def send_command(self, command: Command) -> Dict[str, object]:
+    def send_command(self, command: Command, **_: object) -> Dict[str, object]:
         self.sent_commands.append(command)
         return {"status": "ok", "result": command.to_json(), "error": None}
 
@@ -49,7 +49,7 @@ class ErrorRecordingBridge:
         self.sent_commands: List[Command] = []
         self._responses = responses
 
-    def send_command(self, command: Command) -> Dict[str, object]:
+    def send_command(self, command: Command, **_: object) -> Dict[str, object]:
         self.sent_commands.append(command)
         index = min(len(self.sent_commands) - 1, len(self._responses) - 1)
         return self._responses[index]
@@ -65,15 +65,15 @@ class StaticSender:
         self.last_answered: List[str] = []
         self.last_custom: List[str] = []
 
-    def send(self, user_message: str) -> str:
+    def send(self, user_message: str, **_: object) -> str:
         self.last_sent.append(user_message)
         return json.dumps(self._payload)
 
-    def answer(self, user_message: str) -> str:
+    def answer(self, user_message: str, **_: object) -> str:
         self.last_answered.append(user_message)
         return self.answer_text
 
-    def complete_custom(self, prompt: str) -> str:
+    def complete_custom(self, prompt: str, *, profile: str = "command", **_: object) -> str:
         self.last_custom.append(prompt)
         return json.dumps(self._payload)
 
@@ -95,17 +95,17 @@ class SequencedSender:
         self.custom_prompts: List[str] = []
         self.answered: List[str] = []
 
-    def send(self, user_message: str) -> str:
+    def send(self, user_message: str, **_: object) -> str:
         self.sent_prompts.append(user_message)
         payload = self._send_payloads.pop(0)
         return json.dumps(payload)
 
-    def complete_custom(self, prompt: str) -> str:
+    def complete_custom(self, prompt: str, *, profile: str = "command", **_: object) -> str:
         self.custom_prompts.append(prompt)
         payload = self._custom_payloads.pop(0)
         return json.dumps(payload)
 
-    def answer(self, user_message: str) -> str:
+    def answer(self, user_message: str, **_: object) -> str:
         self.answered.append(user_message)
         return self.answer_text
 
@@ -195,3 +195,198 @@ def test_error_response_is_rerouted_through_llm() -> None:
         "unknown",
         "calculator",
     ]
+
+
+def test_plan_is_batched_and_resumes_after_recovery() -> None:
+    class BatchingBridge(RecordingBridge):
+        def __init__(self) -> None:
+            super().__init__()
+            self.batches: List[List[str]] = []
+
+        def send_commands(self, commands: List[Command], **_: object) -> List[Dict[str, object]]:
+            self.batches.append([command.action for command in commands])
+            responses = []
+            for command in commands:
+                if command.params.get("application") == "unknown":
+                    responses.append({"status": "error", "result": None, "error": "not found"})
+                    break
+                responses.append(self.send_command(command))
+            return responses
+
+    bridge = BatchingBridge()
+    sender = SequencedSender(
+        send_payloads=[
+            [
+                {"action": "system_status", "params": {}},
+                {"action": "open_app", "params": {"application": "unknown"}},
+                {"action": "search_files", "params": {"query": "report"}},
+                {"action": "system_status", "params": {}},
+            ]
+        ],
+        custom_payloads=[{"action": "open_app", "params": {"application": "calculator"}}],
+    )
+
+    response = process_text("комбинированная задача", bridge, sender=sender)
+
+    assert bridge.batches == [
+        ["system_status", "open_app", "search_files", "system_status"],
+        ["search_files", "system_status"],
+    ]
+    assert [command.action for command in bridge.sent_commands] == [
+        "system_status",
+        "open_app",
+        "search_files",
+        "system_status",
+    ]
+    assert bridge.sent_commands[1].params["application"] == "calculator"
+    assert isinstance(response, list) and len(response) == 4
+
+
+def test_second_recovery_attempt_uses_compact_prompt() -> None:
+    from ai_assistant import prompts
+
+    bridge = ErrorRecordingBridge(
+        [
+            {"status": "error", "result": None, "error": "Application not found"},
+            {"status": "error", "result": None, "error": "Application not found"},
+            {"status": "ok", "result": {"application": "calculator"}, "error": None},
+        ]
+    )
+    sender = SequencedSender(
+        send_payloads=[{"action": "open_app", "params": {"application": "calc"}}],
+        custom_payloads=[
+            {"action": "open_app", "params": {"application": "calculator.exe"}},
+            {"action": "open_app", "params": {"application": "calculator"}},
+        ],
+    )
+
+    response = process_text("запусти калькулятор", bridge, sender=sender)
+
+    assert isinstance(response, dict)
+    assert response.get("status") == "ok"
+    assert len(sender.custom_prompts) == 2
+    assert prompts.SYSTEM_PROMPT in sender.custom_prompts[0]
+    assert prompts.SYSTEM_PROMPT not in sender.custom_prompts[1]
+
+
+def test_single_action_with_conjunction_is_not_expanded() -> None:
+    bridge = RecordingBridge()
+    sender = StaticSender({"action": "open_app", "params": {"application": "Ромео и Джульетта"}})
+
+    response = process_text("открой Ромео и Джульетта", bridge, sender=sender)
+
+    assert isinstance(response, dict)
+    assert not sender.last_custom, "Single-action request triggered a multistep prompt"
+    assert len(bridge.sent_commands) == 1
+
+
+def test_recovery_is_skipped_when_query_budget_is_short() -> None:
+    from ai_assistant.deadline import Deadline
+
+    bridge = ErrorRecordingBridge(
+        [{"status": "error", "result": None, "error": "Application not found"}]
+    )
+    sender = SequencedSender(
+        send_payloads=[{"action": "open_app", "params": {"application": "unknown"}}],
+        custom_payloads=[],
+    )
+
+    response = process_text("запусти неизвестное", bridge, sender=sender, deadline=Deadline(1.0))
+
+    assert isinstance(response, dict)
+    assert response.get("status") == "error"
+    assert not sender.custom_prompts, "Recovery ran despite the exhausted budget"
+
+
+def test_new_query_in_same_session_cancels_previous_one() -> None:
+    import threading
+
+    class BlockingSender(StaticSender):
+        def __init__(self, payload: object) -> None:
+            super().__init__(payload)
+            self.entered = threading.Event()
+            self.release = threading.Event()
+
+        def send(self, user_message: str, **kwargs: object) -> str:
+            if not self.entered.is_set():
+                self.entered.set()
+                self.release.wait(5)
+            return super().send(user_message, **kwargs)
+
+    bridge = RecordingBridge()
+    sender = BlockingSender({"action": "open_app", "params": {"application": "notepad"}})
+    results: List[object] = []
+
+    first = threading.Thread(
+        target=lambda: results.append(
+            process_text("открой блокнот", bridge, sender=sender, session_id="gui")
+        )
+    )
+    first.start()
+    assert sender.entered.wait(5)
+
+    second = process_text("открой блокнот", bridge, sender=sender, session_id="gui")
+    sender.release.set()
+    first.join(5)
+
+    assert second is not None
+    assert results == [None], "Superseded query still returned a result"
+    assert len(bridge.sent_commands) == 1
+
+
+def test_event_stream_reports_each_milestone_in_order() -> None:
+    bridge = ErrorRecordingBridge(
+        [
+            {"status": "error", "result": None, "error": "Application not found"},
+            {"status": "ok", "result": {"application": "calculator"}, "error": None},
+        ]
+    )
+    sender = SequencedSender(
+        send_payloads=[{"action": "open_app", "params": {"application": "unknown"}}],
+        custom_payloads=[{"action": "open_app", "params": {"application": "calculator"}}],
+    )
+
+    events = list(iter_text_events("запусти неизвестное приложение", bridge, sender=sender))
+
+    assert [event["type"] for event in events] == [
+        "commands",
+        "result",
+        "recovery",
+        "result",
+        "done",
+    ]
+    assert events[1]["response"]["status"] == "error"
+    assert events[-1]["result"] == {
+        "status": "ok",
+        "result": {"application": "calculator"},
+        "error": None,
+    }
+
+
+def test_cancellation_during_llm_fallbacks_is_not_swallowed() -> None:
+    from ai_assistant.deadline import QueryCancelled
+
+    class CancelledSender(SequencedSender):
+        def complete_custom(self, prompt: str, **kwargs: object) -> str:
+            super().complete_custom(prompt, **kwargs)
+            raise QueryCancelled("superseded")
+
+        def answer(self, user_message: str, **_: object) -> str:
+            raise QueryCancelled("superseded")
+
+    failing = ErrorRecordingBridge([{"status": "error", "result": None, "error": "Application not found"}])
+    recovery = CancelledSender(
+        send_payloads=[{"action": "open_app", "params": {"application": "unknown"}}], custom_payloads=[{}]
+    )
+    assert process_text("запусти неизвестное", failing, sender=recovery) is None
+    assert len(failing.sent_commands) == 1
+
+    expansion = CancelledSender(
+        send_payloads=[{"action": "open_app", "params": {"application": "telegram"}}], custom_payloads=[{}]
+    )
+    bridge = RecordingBridge()
+    assert process_text("открой телеграм и калькулятор", bridge, sender=expansion) is None
+    assert expansion.custom_prompts and not bridge.sent_commands
+
+    fallback = CancelledSender(send_payloads=[{"action": "fly"}], custom_payloads=[])
+    assert process_text("сделай что-нибудь", RecordingBridge(), sender=fallback) is None
@@ -33,3 +33,34 @@ def test_load_available_applications_reads_registry(tmp_path: Path) -> None:
     assert "дискорд" in apps
     assert "Visual Studio Code" in apps
     assert "vscode" in apps
+
+
+def test_error_resolution_prompt_compacts_large_results() -> None:
+    error_response = {
+        "status": "error",
+        "error": "Application not found",
+        "result": [{"name": f"App {index}", "path": "C:/" + "x" * 80} for index in range(500)],
+    }
+
+    prompt = prompts.build_error_resolution_prompt(
+        "открой дискорд",
+        {"action": "open_app", "params": {"application": "discord"}},
+        error_response,
+        max_payload_bytes=1024,
+    )
+
+    embedded = json.loads(prompt.split("Bridge response: ", 1)[1].split("\n", 1)[0])
+    assert embedded["error"] == "Application not found"
+    assert len(json.dumps(embedded, ensure_ascii=False).encode("utf-8")) <= 1024
+    assert "omitted" in embedded["result"][-1]
+
+
+def test_second_recovery_attempt_drops_system_prompt() -> None:
+    failed = {"action": "open_app", "params": {"application": "discord"}}
+
+    first = prompts.build_error_resolution_prompt("открой", failed, {"status": "error"})
+    second = prompts.build_error_resolution_prompt("открой", failed, {"status": "error"}, attempt=2)
+
+    assert prompts.SYSTEM_PROMPT in first
+    assert prompts.SYSTEM_PROMPT not in second
+    assert len(second) < len(first)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import io
+import json
+import types
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+import main
+
+
+class FakeInputStream:
+    def __init__(self, *, callback, **_: object) -> None:
+        self.callback = callback
+        self.started = self.closed = False
+
+    def start(self) -> None:
+        self.started = True
+
+    def stop(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class ScriptedMicrophone:
+    """Serves one second of tone, then silence, for every recording."""
+
+    def __init__(self) -> None:
+        self.recordings = 0
+
+    def __enter__(self):
+        self.recordings += 1
+        self._position = 0
+        return self
+
+    def __exit__(self, *exc_info):
+        return None
+
+    def read(self, frames):
+        t = (self._position + np.arange(frames)) / main.DEFAULT_SAMPLE_RATE
+        block = np.where(t < 1.0, 6000 * np.sin(2 * np.pi * 220 * t), 0).astype(np.int16)
+        self._position += frames
+        return block.reshape(-1, 1), False
+
+
+class StubBridge:
+    endpoint = "http://core"
+
+    def __init__(self, available: bool = True) -> None:
+        self.available = available
+
+    def is_available(self) -> bool:
+        return self.available
+
+
+def _events(out: str):
+    return [json.loads(line) for line in out.splitlines()]
+
+
+def test_resident_microphone_only_queues_blocks_while_recording(monkeypatch: pytest.MonkeyPatch) -> None:
+    device = types.SimpleNamespace(InputStream=FakeInputStream)
+    monkeypatch.setattr(main, "_load_dependency", lambda name: device)
+    microphone = main.ResidentMicrophone()
+    capture = microphone._stream.callback
+    block = np.ones((microphone.block_size, 1), dtype=np.int16)
+
+    capture(block * 1, microphone.block_size, None, None)
+    with microphone:
+        capture(block * 2, microphone.block_size, None, None)
+        assert microphone.read(microphone.block_size)[0][0, 0] == 2
+    capture(block * 3, microphone.block_size, None, None)
+    microphone.close()
+
+    assert microphone._stream.started and microphone._stream.closed
+    assert microphone._blocks.empty()
+
+
+def test_serve_handles_commands_in_turn_and_tags_their_events(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    seen = []
+
+    def pipeline(audio, bridge, *, sender=None, **_):
+        seen.append((round(audio.duration, 1), sender))
+        yield {"type": "done", "result": {"n": len(seen)}}
+
+    monkeypatch.setattr(main, "iter_audio_stream_events", pipeline)
+    microphone = ScriptedMicrophone()
+    requests = io.StringIO(
+        '{"type": "listen", "id": "a"}\nnot json\n{"type": "listen", "id": 7}\n'
+        '{"type": "shutdown"}\n{"type": "listen", "id": "late"}\n'
+    )
+
+    main.serve(StubBridge(), microphone, sender="sender", requests=requests)
+
+    events = _events(capsys.readouterr().out)
+    assert microphone.recordings == 2
+    assert seen == [(pytest.approx(1.8, abs=0.2), "sender")] * 2
+    assert [event["type"] for event in events] == [
+        "ready", "listening", "recorded", "done", "error", "listening", "recorded", "done",
+    ]
+    assert [event.get("id") for event in events if event["type"] == "done"] == ["a", 7]
+    assert events[3]["result"] == {"n": 1} and events[3]["status"] == "ok"
+
+
+def test_command_is_dropped_when_the_bridge_check_fails(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    monkeypatch.setattr(main, "iter_audio_stream_events", pytest.fail)
+    check: Future = Future()
+    check.set_result(False)
+
+    with pytest.raises(RuntimeError, match="not responding at http://core"):
+        main.process_microphone_command(StubBridge(False), stream=ScriptedMicrophone(), bridge_check=check)
+
+    main.serve(StubBridge(False), ScriptedMicrophone(), requests=io.StringIO('{"type": "listen"}\n'))
+    events = _events(capsys.readouterr().out)
+    assert events[-1]["type"] == "error" and "not responding" in events[-1]["error"]
+
+
+def test_run_resident_reports_a_missing_input_device(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    class PortAudioError(Exception):
+        pass
+
+    def no_device(**_: object) -> None:
+        raise PortAudioError("Error querying device -1")
+
+    device = types.SimpleNamespace(InputStream=no_device, PortAudioError=PortAudioError)
+    monkeypatch.setattr(main, "_load_dependency", lambda name: device)
+
+    main.run_resident(StubBridge())
+
+    error = _events(capsys.readouterr().out)[-1]
+    assert error["type"] == "error" and "Error querying device" in error["error"]
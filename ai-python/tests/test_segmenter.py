@@ -0,0 +1,35 @@
+"""Tests for the local compound-request segmenter."""
+
+from __future__ import annotations
+
+import pytest
+
+from ai_assistant.segmenter import count_actionable_clauses, segment_clauses
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("открой телеграм и калькулятор", 2),
+        ("открой блокнот, затем найди отчёт", 2),
+        ("open notepad and then search for report", 2),
+        ("запусти хром, открой проводник и сделай скриншот", 3),
+        ("открой Ромео и Джульетта", 1),
+        ("Скажи, пожалуйста, сколько сейчас времени?", 0),
+        ("что такое Python, и зачем он нужен?", 0),
+    ],
+)
+def test_count_actionable_clauses(text: str, expected: int) -> None:
+    assert count_actionable_clauses(text) == expected
+
+
+def test_known_application_names_are_separate_objects() -> None:
+    assert count_actionable_clauses("открой Telegram и Discord") == 1
+    assert count_actionable_clauses("открой Telegram и Discord", known_names=["discord"]) == 2
+
+
+def test_segment_clauses_extracts_verb_and_objects() -> None:
+    clauses = segment_clauses("открой блокнот, потом найди отчёт")
+
+    assert [clause.verb for clause in clauses] == ["открой", "найди"]
+    assert clauses[0].objects == ["блокнот"]
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+import random
+import time
+from pathlib import Path
+
+import pytest
+
+from ai_assistant.bridge import HttpBridge
+from ai_assistant.schemas import Command
+from ai_assistant.standin import (
+    REQUIRED_PARAMS,
+    ActionProfile,
+    SimulatedCore,
+    StandInCore,
+    load_profiles,
+    validate,
+)
+from ai_assistant.transport import ConnectionPool
+
+_PARAMS = {
+    "application": "notepad",
+    "path": "C:\\temp\\tool.exe",
+    "query": "report",
+    "setting": "brightness",
+    "value": "50",
+    "source": "C:\\a.txt",
+    "destination": "C:\\b.txt",
+    "answer": "42",
+    "level": 30,
+    "duration": 0.01,
+}
+
+
+def _command(action: str) -> Command:
+    return Command(
+        action=action,
+        params={name: _PARAMS[name] for name in REQUIRED_PARAMS[action]},
+        uuid="11111111-2222-3333-4444-555555555555",
+        timestamp="2025-01-01T00:00:00Z",
+    )
+
+
+def _client(core: SimulatedCore) -> HttpBridge:
+    return HttpBridge(
+        core.endpoint,
+        pool=ConnectionPool.for_endpoint(core.endpoint),
+        heartbeat_interval=None,
+    )
+
+
+def test_simulated_core_answers_every_executor_action() -> None:
+    with SimulatedCore(time_scale=0, seed=1) as core:
+        client = _client(core)
+        responses = {action: client.send_command(_command(action)) for action in REQUIRED_PARAMS}
+
+    assert all(response["status"] == "ok" for response in responses.values())
+    assert responses["open_app"]["result"]["application"] == "notepad"
+    assert responses["search_files"]["result"]["filesFound"] == 25
+    assert len(responses["screenshot"]["result"]["image"]) == 4_000_000
+    assert responses["list_applications"]["result"]["count"] == 150
+    assert core.executed["mute"] == 1
+
+
+def test_simulated_core_rejects_invalid_commands() -> None:
+    with SimulatedCore(time_scale=0) as core:
+        response = _client(core).send_command(
+            Command(action="set_volume", params={}, uuid="u", timestamp="2025-01-01T00:00:00Z")
+        )
+
+    assert response["status"] == "error"
+    assert response["error"] == "Validation failed: Missing required parameter: level"
+    assert validate({"action": "format_disk", "uuid": "u", "timestamp": "soon"}) == [
+        f"Action 'format_disk' is not allowed. Allowed actions: {', '.join(REQUIRED_PARAMS)}",
+        "Timestamp must be in ISO 8601 format",
+    ]
+
+
+def test_simulated_core_injects_errors_and_latency() -> None:
+    profiles = {"mute": ActionProfile(median_ms=20, p99_ms=20, error_rate=0.5)}
+    with SimulatedCore(profiles=profiles, seed=7) as core:
+        client = _client(core)
+        started = time.perf_counter()
+        statuses = [client.send_command(_command("mute"))["status"] for _ in range(20)]
+        elapsed = time.perf_counter() - started
+
+    assert statuses.count("error") == core.injected_errors
+    assert 0 < core.injected_errors < 20
+    assert elapsed >= 20 * 0.02
+
+
+def test_latency_distribution_matches_profile() -> None:
+    profile = ActionProfile(median_ms=100, p99_ms=1000)
+    rng = random.Random(3)
+    samples = sorted(profile.sample_latency(rng) for _ in range(20_000))
+
+    assert samples[10_000] == pytest.approx(0.1, rel=0.05)
+    assert samples[19_800] == pytest.approx(1.0, rel=0.15)
+
+
+def test_load_profiles_keeps_defaults_for_missing_fields(tmp_path: Path) -> None:
+    path = tmp_path / "profile.json"
+    path.write_text(json.dumps({"screenshot": {"median_ms": 5}, "*": {"error_rate": 0.1}}))
+
+    profiles = load_profiles(path)
+
+    assert profiles["screenshot"] == ActionProfile(median_ms=5, p99_ms=600, payload_bytes=3_000_000)
+    assert profiles["*"].error_rate == 0.1
+
+    path.write_text(json.dumps({"mute": {"latency": 5}}))
+    with pytest.raises(ValueError, match="latency"):
+        load_profiles(path)
+
+
+def test_stop_finishes_connection_handlers_still_running() -> None:
+    import asyncio
+    import gc
+
+    with StandInCore(request_delay=5.0) as core:
+        # The client gives up while the handler is still sleeping on the request.
+        with pytest.raises(OSError):
+            ConnectionPool.for_endpoint(core.endpoint).request("GET", "/", timeout=0.05)
+
+    pending = [
+        task
+        for task in gc.get_objects()
+        if isinstance(task, asyncio.Task)
+        and not task.done()
+        and task.get_coro().__qualname__ == "StandInCore._handle_connection"
+    ]
+    assert pending == []
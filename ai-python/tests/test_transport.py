@@ -0,0 +1,225 @@
+"""Tests for the keep-alive connection pool."""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+import threading
+from pathlib import Path
+
+import pytest
+
+from ai_assistant.standin import StandInCore
+from ai_assistant.transport import (
+    AsyncConnectionPool,
+    ConnectionPool,
+    _read_response,
+    unix_endpoint,
+)
+
+requires_unix_sockets = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="Unix domain sockets are not available"
+)
+
+
+def test_pool_reuses_connection_between_requests() -> None:
+    with StandInCore() as core:
+        pool = ConnectionPool.for_endpoint(core.endpoint)
+        for _ in range(10):
+            assert pool.request("GET", "/system/status").status == 200
+
+    assert core.connections == 1
+    assert pool.connections_opened == 1
+
+
+def test_pool_reconnects_after_server_drops_idle_socket() -> None:
+    with StandInCore() as core:
+        pool = ConnectionPool.for_endpoint(core.endpoint)
+        assert pool.request("GET", "/system/status").status == 200
+
+        core.drop_idle_connections()
+
+        assert pool.request("GET", "/system/status").status == 200
+        assert core.connections == 2
+
+
+class _HangUpAfterFirstResponse:
+    """Answers the first request on a connection, then reads the next and hangs up.
+
+    That is what a core that ran a request and crashed (or restarted) before
+    answering looks like to the client.
+    """
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self._server = socket.create_server(("127.0.0.1", 0))
+        self.endpoint = "http://127.0.0.1:%d" % self._server.getsockname()[1]
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self) -> None:
+        while True:
+            try:
+                connection, _ = self._server.accept()
+            except OSError:
+                return
+            with connection, connection.makefile("rb") as stream:
+                for answered in range(2):
+                    if not self._read_request(stream):
+                        break
+                    self.requests += 1
+                    if answered:
+                        break
+                    connection.sendall(
+                        b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n{}"
+                    )
+
+    @staticmethod
+    def _read_request(stream) -> bool:  # type: ignore[no-untyped-def]
+        # Headers and body may arrive in separate segments; read both.
+        length = 0
+        while True:
+            line = stream.readline()
+            if not line:
+                return False
+            if line in (b"\r\n", b"\n"):
+                break
+            name, _, value = line.partition(b":")
+            if name.strip().lower() == b"content-length":
+                length = int(value)
+        stream.read(length)
+        return True
+
+    def close(self) -> None:
+        self._server.close()
+
+
+def test_pool_does_not_resend_a_post_the_core_may_have_run() -> None:
+    core = _HangUpAfterFirstResponse()
+    try:
+        pool = ConnectionPool.for_endpoint(core.endpoint)
+        assert pool.request("POST", "/action/execute", body=b"{}").status == 200
+        with pytest.raises(OSError):
+            pool.request("POST", "/action/execute", body=b"{}")
+    finally:
+        core.close()
+
+    assert core.requests == 2
+
+
+def test_pool_retries_a_get_the_core_hung_up_on() -> None:
+    core = _HangUpAfterFirstResponse()
+    try:
+        pool = ConnectionPool.for_endpoint(core.endpoint)
+        assert pool.request("GET", "/system/status").status == 200
+        assert pool.request("GET", "/system/status").status == 200
+    finally:
+        core.close()
+
+    assert core.requests == 3
+    assert pool.connections_opened == 2
+
+
+def test_pool_evicts_idle_connections() -> None:
+    with StandInCore() as core:
+        pool = ConnectionPool.for_endpoint(core.endpoint, idle_timeout=0.0)
+        pool.request("GET", "/system/status")
+        pool.request("GET", "/system/status")
+
+    assert pool.connections_opened == 2
+
+
+def test_pool_size_bounds_concurrent_connections() -> None:
+    with StandInCore() as core:
+        pool = ConnectionPool.for_endpoint(core.endpoint, max_size=2)
+
+        def _hammer() -> None:
+            for _ in range(20):
+                pool.request("POST", "/action/execute", body=b'{"action": "system_status"}')
+
+        workers = [threading.Thread(target=_hammer) for _ in range(6)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    assert core.requests == 120
+    assert pool.connections_opened <= 2
+
+
+def test_pool_without_keep_alive_opens_a_connection_per_request() -> None:
+    with StandInCore() as core:
+        pool = ConnectionPool.for_endpoint(core.endpoint, keep_alive=False)
+        for _ in range(3):
+            pool.request("GET", "/system/status")
+
+    assert core.connections == 3
+
+
+def test_async_pool_reuses_and_reconnects() -> None:
+    async def scenario(core: StandInCore) -> AsyncConnectionPool:
+        pool = AsyncConnectionPool.for_endpoint(core.endpoint)
+        for _ in range(5):
+            assert (await pool.request("GET", "/system/status")).status == 200
+        await asyncio.to_thread(core.drop_idle_connections)
+        assert (await pool.request("GET", "/system/status")).status == 200
+        await pool.aclose()
+        return pool
+
+    with StandInCore() as core:
+        pool = asyncio.run(scenario(core))
+
+    assert core.connections == 2
+    assert pool.connections_opened == 2
+
+
+def test_async_pool_reads_chunked_responses() -> None:
+    async def scenario() -> tuple:
+        reader = asyncio.StreamReader()
+        reader.feed_data(
+            b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+            b"7\r\n{\"a\": 1\r\n1\r\n}\r\n0\r\n\r\n"
+        )
+        return await _read_response(reader, "POST")
+
+    response, will_close = asyncio.run(scenario())
+
+    assert response.status == 200
+    assert response.body == b'{"a": 1}'
+    assert will_close is False
+
+
+@requires_unix_sockets
+def test_pools_talk_to_core_over_unix_socket(tmp_path: Path) -> None:
+    socket_path = str(tmp_path / "core.sock")
+
+    async def async_status(endpoint: str) -> int:
+        pool = AsyncConnectionPool.for_endpoint(endpoint)
+        response = await pool.request("GET", "/system/status")
+        await pool.aclose()
+        return response.status
+
+    with StandInCore(unix_socket=socket_path) as core:
+        assert core.endpoint == unix_endpoint(socket_path)
+        pool = ConnectionPool.for_endpoint(core.endpoint)
+        for _ in range(3):
+            assert pool.request("GET", "/system/status").status == 200
+        assert asyncio.run(async_status(core.endpoint)) == 200
+
+    assert core.connections == 2
+    assert not Path(socket_path).exists()
+
+
+def test_async_pool_timeout_is_the_builtin_timeout_error() -> None:
+    async def scenario(endpoint: str) -> None:
+        pool = AsyncConnectionPool.for_endpoint(endpoint)
+        try:
+            await pool.request("GET", "/system/status", timeout=0.05)
+        finally:
+            await pool.aclose()
+
+    with StandInCore(request_delay=0.5) as core:
+        # Before Python 3.11 asyncio.TimeoutError is not an OSError; callers rely on it being one.
+        with pytest.raises(OSError) as raised:
+            asyncio.run(scenario(core.endpoint))
+
+    assert isinstance(raised.value, TimeoutError)
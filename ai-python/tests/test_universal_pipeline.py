@@ -39,7 +39,7 @@ class InMemoryBridge:
     def __init__(self) -> None:
         self.sent_commands: List[Dict[str, object]] = []
 
-    def send_command(self, command: Command) -> Dict[str, object]:
+    def send_command(self, command: Command, **_: object) -> Dict[str, object]:
         payload = command.to_json()
         self.sent_commands.append(payload)
         return {"status": "ok", "result": payload, "error": None}
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import io
+import types
+import wave
+
+import numpy as np
+import pytest
+
+from ai_assistant import speech
+from ai_assistant.audio import PcmBuffer
+from ai_assistant.vad import VadConfig, speech_bounds, trim_silence
+
+RATE = 16_000
+
+
+def _recording(lead: float, speech_seconds: float, tail: float, *, noise: float = 30.0) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    total = int((lead + speech_seconds + tail) * RATE)
+    samples = rng.normal(0, noise, total)
+    t = np.arange(int(speech_seconds * RATE)) / RATE
+    start = int(lead * RATE)
+    samples[start : start + len(t)] += 6000 * np.sin(2 * np.pi * 220 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 3 * t))
+    return samples.astype(np.int16)
+
+
+def test_speech_bounds_keep_guard_margins_around_speech() -> None:
+    samples = _recording(1.0, 0.8, 1.2)
+
+    start, end = speech_bounds(samples)
+
+    assert 0.78 * RATE <= start <= 1.0 * RATE - 0.15 * RATE
+    assert 1.8 * RATE + 0.25 * RATE <= end <= 1.8 * RATE + 0.34 * RATE
+    trimmed = trim_silence(samples)
+    assert np.shares_memory(trimmed, samples) and len(trimmed) == end - start
+
+
+def test_short_clicks_and_steady_noise_are_not_speech() -> None:
+    samples = _recording(1.0, 0.0, 1.0, noise=400.0)
+    samples[8000:8160] = 20000  # one 10 ms click
+
+    assert speech_bounds(samples) is None
+    assert speech_bounds(samples, config=VadConfig(min_speech_frames=1)) is not None
+    assert trim_silence(samples) is samples
+
+
+def test_transcribe_stream_uploads_trimmed_mulaw(monkeypatch: pytest.MonkeyPatch) -> None:
+    samples = _recording(1.0, 0.8, 1.2)
+    audio = PcmBuffer(len(samples))
+    audio.append(samples)
+    uploaded = {}
+
+    class DummyTranscriptions:
+        def create(self, *, file, **_: object):
+            uploaded["name"] = file.name
+            uploaded["body"] = file.read()
+            return types.SimpleNamespace(text="открой блокнот", language="ru")
+
+    client = types.SimpleNamespace(audio=types.SimpleNamespace(transcriptions=DummyTranscriptions()))
+    monkeypatch.setattr(speech, "build_openai_client", lambda: client)
+    monkeypatch.setenv("OPENAI_TRANSCRIPTION_ENCODING", "mulaw")
+
+    assert speech.transcribe_stream(audio) == "открой блокнот"
+    start, end = speech_bounds(samples)
+    assert uploaded["name"] == "stream.wav"
+    assert len(uploaded["body"]) == 58 + end - start
+
+    monkeypatch.setenv("OPENAI_TRANSCRIPTION_ENCODING", "pcm16")
+    monkeypatch.setenv("JARVIS_TRIM_SILENCE", "0")
+    speech.transcribe_stream(audio)
+    with wave.open(io.BytesIO(uploaded["body"]), "rb") as wav_file:
+        assert wav_file.getnframes() == len(samples)
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from ai_assistant.wake_gate import GateConfig, VoiceGate, Window
+
+RATE = 16_000
+BLOCK = 8000
+
+
+def _stream(parts, *, noise: float) -> np.ndarray:
+    """``parts`` alternate silence and speech durations, starting with silence."""
+
+    rng = np.random.default_rng(1)
+    pieces = []
+    for index, seconds in enumerate(parts):
+        t = np.arange(int(seconds * RATE)) / RATE
+        tone = 6000 * np.sin(2 * np.pi * 220 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 3 * t))
+        pieces.append(tone if index % 2 else np.zeros(len(t)))
+    samples = np.concatenate(pieces)
+    return np.clip(samples + rng.normal(0, noise, len(samples)), -32768, 32767).astype(np.int16)
+
+
+def _windows(gate: VoiceGate, samples: np.ndarray):
+    found = []
+    for start in range(0, len(samples), BLOCK):
+        found.extend(gate.process(samples[start : start + BLOCK]))
+    return found
+
+
+def test_silence_and_steady_noise_open_no_window() -> None:
+    for noise in (5.0, 600.0):
+        gate = VoiceGate()
+        assert _windows(gate, _stream([20.0], noise=noise)) == []
+        assert not gate.speaking
+
+
+def test_windows_follow_speech_onsets_and_vary_in_length() -> None:
+    gate = VoiceGate()
+
+    windows = _windows(gate, _stream([2.0, 0.8, 3.0, 2.0, 3.0], noise=300.0))
+
+    assert len(windows) == 2
+    (first, second) = windows
+    assert first.start == pytest.approx((2.0 - 0.3) * RATE, abs=0.04 * RATE)
+    assert first.end == pytest.approx((2.8 + 0.3) * RATE, abs=0.04 * RATE)
+    assert second.start == pytest.approx((5.8 - 0.3) * RATE, abs=0.04 * RATE)
+    assert second.end - second.start == pytest.approx(2.6 * RATE, abs=0.08 * RATE)
+
+
+def test_long_speech_is_split_into_overlapping_windows() -> None:
+    gate = VoiceGate(GateConfig(max_window=3.0, overlap=1.0))
+
+    windows = _windows(gate, _stream([1.0, 6.0, 2.0], noise=20.0))
+
+    assert [window.start for window in windows] == pytest.approx([0.7 * RATE, 2.7 * RATE, 4.7 * RATE], abs=800)
+    assert all(window.end - window.start <= 3.0 * RATE for window in windows)
+    assert windows[-1].end == pytest.approx(7.3 * RATE, abs=800)
+    assert isinstance(windows[0], Window)
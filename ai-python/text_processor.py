@@ -1,29 +1,39 @@
-"""Process a text query via the Python GPT pipeline and forward to the core service."""
+"""Process a text query via the Python GPT pipeline and forward to the core service.
+
+With ``JARVIS_EVENT_STREAM=1`` one JSON line is printed per pipeline milestone
+(``transcript``, ``commands``, ``result``, ``recovery``, ``done``). The final
+``done`` line carries the same ``status``/``result`` fields as the single JSON
+blob printed otherwise.
+"""
 
 from __future__ import annotations
 
-import json
 import logging
 import os
 import sys
-from typing import Any
 
 from ai_assistant.bridge_requests import HttpBridge
-from ai_assistant.pipeline import process_text
+from ai_assistant.events import emit_event, event_stream_enabled, serialize
+from ai_assistant.pipeline import iter_text_events, process_text
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 
-def _serialize(data: Any) -> str:
-    return json.dumps(data, ensure_ascii=False, default=str)
+def _stream_events(text: str, bridge: HttpBridge) -> int:
+    emit_event({"type": "transcript", "text": text})
+    for event in iter_text_events(text, bridge):
+        if event["type"] == "done":
+            event = {**event, "status": "ok"}
+        emit_event(event)
+    return 0
 
 
 def main() -> int:
     text = os.getenv("TEXT_QUERY", "").strip()
     if not text:
         error = "TEXT_QUERY environment variable is required"
-        print(_serialize({"status": "error", "error": error}))
+        print(serialize({"status": "error", "error": error}))
         return 1
 
     endpoint = os.getenv("JARVIS_CORE_ENDPOINT", "http://localhost:5055")
@@ -31,13 +41,15 @@ def main() -> int:
 
     try:
         bridge = HttpBridge(endpoint)
+        if event_stream_enabled():
+            return _stream_events(text, bridge)
         result = process_text(text, bridge)
     except Exception as exc:  # noqa: BLE001
         logger.exception("Failed to process text query")
-        print(_serialize({"status": "error", "error": str(exc)}))
+        print(serialize({"type": "error", "status": "error", "error": str(exc)}))
         return 1
 
-    print(_serialize({"status": "ok", "result": result}))
+    print(serialize({"status": "ok", "result": result}))
     return 0
 
 
@@ -31,6 +31,10 @@ except ImportError:
     print(json.dumps({"type": "error", "message": "whisper not installed. Run: pip install openai-whisper"}))
     sys.exit(1)
 
+from ai_assistant.audio import PcmRing
+from ai_assistant.keyword_spotting import KeywordSpotter
+from ai_assistant.wake_gate import DEFAULT_GATE, VoiceGate
+
 # Wake words to detect
 WAKE_WORDS = ['аврора', 'аврор', 'авроры', 'aurora', 'эй аврора', 'привет аврора']
 
@@ -42,11 +46,27 @@ CHUNK_DURATION = 3  # seconds - process audio every 3 seconds
 # Whisper model (можно поменять на 'small' для лучшего качества)
 WHISPER_MODEL = os.getenv('WHISPER_MODEL', 'base')  # base, small, medium
 
+# Only transcribe windows that contain speech (WAKE_WORD_VAD=0 transcribes
+# every CHUNK_DURATION seconds instead)
+VAD_ENABLED = os.getenv('WAKE_WORD_VAD', '1').strip().lower() not in {'0', 'false', 'no', 'off'}
+# Enrolled keyword templates (python -m ai_assistant.keyword_spotting); when
+# set, Whisper only runs on windows where the keyword was spotted
+KEYWORD_TEMPLATES = os.getenv('WAKE_WORD_TEMPLATES', '').strip()
+# Audio kept for cutting out speech windows
+HISTORY_SAMPLES = int((DEFAULT_GATE.max_window + DEFAULT_GATE.pre_roll) * SAMPLE_RATE) + BLOCK_SIZE
+# How far processing may fall behind the microphone (e.g. during a slow
+# transcription) before audio is lost
+BACKLOG_SECONDS = 10
+
 # Global state
-audio_queue = queue.Queue()
-audio_buffer = []
+audio_queue = queue.Queue()  # (start, end) stream positions of captured blocks
+audio_ring = PcmRing(HISTORY_SAMPLES + BACKLOG_SECONDS * SAMPLE_RATE, sample_rate=SAMPLE_RATE)
+chunk_start = 0  # stream position where the current fixed chunk starts
 running = True
 whisper_model = None
+keyword_spotter = None
+voice_gate = None
+window_spotted = False  # the keyword was spotted in the open window
 
 
 def signal_handler(sig, frame):
@@ -69,10 +89,11 @@ def output_event(event_type: str, message: str = "", data: dict = None):
 
 
 def audio_callback(indata, frames, time, status):
-    """Callback for audio stream - puts audio data in queue"""
+    """Callback for audio stream - copies the block into the ring and queues its position"""
     if status:
         output_event("audio_error", str(status))
-    audio_queue.put(bytes(indata))
+    end = audio_ring.append(np.frombuffer(indata, dtype=np.int16))
+    audio_queue.put((end - frames, end))
 
 
 def check_wake_word(text: str) -> Tuple[bool, str, str]:
@@ -92,8 +113,113 @@ def check_wake_word(text: str) -> Tuple[bool, str, str]:
     return False, "", ""
 
 
+def transcribe_window(audio_array: np.ndarray) -> Tuple[str, bool]:
+    """
+    Transcribe float32 audio and report a wake word if it contains one
+    Returns: (text, detected)
+    """
+    try:
+        result = whisper_model.transcribe(
+            audio_array,
+            language='ru',
+            fp16=False,  # CPU mode
+            beam_size=1,  # Faster inference
+            best_of=1
+        )
+    except Exception as e:
+        output_event("error", f"Transcription error: {e}")
+        return "", False
+
+    text = result.get('text', '').strip()
+    if not text:
+        return "", False
+
+    output_event("transcription", text)
+
+    # Check for wake word
+    detected, wake_word, command = check_wake_word(text)
+    if detected:
+        output_event("wake_word", f"Detected: {text}", {
+            "text": text,
+            "wake_word": wake_word,
+            "command": command
+        })
+    return text, detected
+
+
+def spot_keyword(audio_array: np.ndarray) -> bool:
+    """Run the keyword spotter on int16 audio and report a hit"""
+    detection = keyword_spotter.detect(audio_array)
+    if detection is None:
+        return False
+    output_event("keyword", "Keyword spotted", {"distance": round(detection.distance, 3)})
+    return True
+
+
+def process_fixed_chunks(end: int, samples_per_chunk: int):
+    """Transcribe every CHUNK_DURATION seconds of audio, speech or not"""
+    global chunk_start
+
+    # Check if we have enough audio
+    if end - chunk_start < samples_per_chunk:
+        return
+    chunk_start = max(chunk_start, audio_ring.start)
+    if keyword_spotter is not None and not spot_keyword(audio_ring.window(chunk_start, end)):
+        # Keep last second in case the word is cut at the chunk boundary
+        chunk_start = end - SAMPLE_RATE
+        return
+    text, detected = transcribe_window(audio_ring.window_float(chunk_start, end))
+    if text and not detected:
+        # Keep last second for overlap
+        chunk_start = end - SAMPLE_RATE
+    else:
+        # Start afresh after detection or if no speech detected
+        chunk_start = end
+
+
+def process_gated(start: int, end: int, gate: VoiceGate):
+    """Transcribe only the speech windows found by the voice gate"""
+    global window_spotted
+
+    windows = gate.process(audio_ring.window(start, end))
+    # Look for the keyword while the user is still speaking, so that it is
+    # reported as soon as it has been said
+    spot_open = keyword_spotter is not None and gate.speaking and not window_spotted
+    for window in windows:
+        if (
+            keyword_spotter is None
+            or window_spotted
+            or spot_keyword(audio_ring.window(window.start, window.end))
+        ):
+            transcribe_window(audio_ring.window_float(window.start, window.end))
+    if not gate.speaking:
+        window_spotted = False
+    elif spot_open:
+        window_spotted = spot_keyword(audio_ring.window(gate.window_start, end))
+
+
+def process_block(start: int, end: int, samples_per_chunk: int):
+    """Handle the captured block at stream positions start:end"""
+    global voice_gate, window_spotted
+
+    if start < audio_ring.start:
+        # Processing fell more than the ring behind the microphone: continue
+        # from the oldest audio still kept, with a fresh gate
+        output_event("audio_error", "Audio processing fell behind, older audio was skipped")
+        start = audio_ring.start
+        if voice_gate is not None:
+            voice_gate = VoiceGate(sample_rate=SAMPLE_RATE)
+            voice_gate.position = start
+            window_spotted = False
+
+    if voice_gate is None:
+        process_fixed_chunks(end, samples_per_chunk)
+    else:
+        process_gated(start, end, voice_gate)
+
+
 def main():
-    global running, whisper_model, audio_buffer
+    global running, whisper_model, keyword_spotter, voice_gate
 
     # Setup signal handlers
     signal.signal(signal.SIGINT, signal_handler)
@@ -108,10 +234,19 @@ def main():
         output_event("error", f"Failed to load Whisper model: {e}")
         sys.exit(1)
 
+    if KEYWORD_TEMPLATES:
+        try:
+            keyword_spotter = KeywordSpotter.load(KEYWORD_TEMPLATES)
+            output_event("status", f"Keyword templates loaded from {KEYWORD_TEMPLATES}")
+        except Exception as e:
+            output_event("error", f"Failed to load keyword templates: {e}")
+            sys.exit(1)
+
     output_event("ready", "Wake word detection ready. Say 'Аврора'")
 
     # Calculate samples per chunk
     samples_per_chunk = SAMPLE_RATE * CHUNK_DURATION
+    voice_gate = VoiceGate(sample_rate=SAMPLE_RATE) if VAD_ENABLED else None
 
     # Start audio stream
     try:
@@ -124,55 +259,11 @@ def main():
         ):
             while running:
                 try:
-                    data = audio_queue.get(timeout=0.5)
+                    start, end = audio_queue.get(timeout=0.5)
                 except queue.Empty:
                     continue
 
-                # Add to buffer
-                audio_buffer.append(np.frombuffer(data, dtype=np.int16))
-
-                # Check if we have enough audio
-                total_samples = sum(len(chunk) for chunk in audio_buffer)
-                if total_samples >= samples_per_chunk:
-                    # Concatenate and convert to float32
-                    audio_array = np.concatenate(audio_buffer)
-                    audio_float = audio_array.astype(np.float32) / 32768.0
-
-                    # Transcribe with Whisper
-                    try:
-                        result = whisper_model.transcribe(
-                            audio_float,
-                            language='ru',
-                            fp16=False,  # CPU mode
-                            beam_size=1,  # Faster inference
-                            best_of=1
-                        )
-                        text = result.get('text', '').strip()
-
-                        if text:
-                            output_event("transcription", text)
-
-                            # Check for wake word
-                            detected, wake_word, command = check_wake_word(text)
-                            if detected:
-                                output_event("wake_word", f"Detected: {text}", {
-                                    "text": text,
-                                    "wake_word": wake_word,
-                                    "command": command
-                                })
-                                # Clear buffer after detection
-                                audio_buffer = []
-                            else:
-                                # Keep last second for overlap
-                                samples_to_keep = SAMPLE_RATE
-                                audio_buffer = [audio_array[-samples_to_keep:]]
-                        else:
-                            # Clear buffer if no speech detected
-                            audio_buffer = []
-
-                    except Exception as e:
-                        output_event("error", f"Transcription error: {e}")
-                        audio_buffer = []
+                process_block(start, end, samples_per_chunk)
 
     except sd.PortAudioError as e:
         output_event("error", f"Audio device error: {e}")
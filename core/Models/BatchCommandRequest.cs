@@ -0,0 +1,17 @@
+namespace JarvisCore.Models;
+
+/// <summary>
+/// Ordered plan of commands submitted in a single request
+/// </summary>
+public class BatchCommandRequest
+{
+    /// <summary>
+    /// Commands to execute, in order
+    /// </summary>
+    public List<CommandRequest> Commands { get; set; } = new();
+
+    /// <summary>
+    /// Stop at the first failed command so later steps never run on a broken state
+    /// </summary>
+    public bool StopOnError { get; set; } = true;
+}
@@ -17,7 +17,28 @@ var builder = WebApplication.CreateBuilder(args);
 
 // Listen on all interfaces so the Python bridge can reach the service regardless of
 // whether it uses 127.0.0.1 or localhost.
-builder.WebHost.UseUrls("http://localhost:5055");
+// JARVIS_CORE_UNIX_SOCKET additionally exposes the same API on a Unix domain
+// socket (Linux, macOS, Windows 10+), which skips the loopback TCP stack for the
+// Python bridge (endpoint "http+unix://<percent-encoded socket path>").
+var unixSocketPath = Environment.GetEnvironmentVariable("JARVIS_CORE_UNIX_SOCKET");
+if (!string.IsNullOrWhiteSpace(unixSocketPath))
+{
+    // A socket file left over from an unclean shutdown would make the bind fail.
+    if (File.Exists(unixSocketPath))
+    {
+        File.Delete(unixSocketPath);
+    }
+
+    builder.WebHost.ConfigureKestrel(options =>
+    {
+        options.ListenLocalhost(5055);
+        options.ListenUnixSocket(unixSocketPath);
+    });
+}
+else
+{
+    builder.WebHost.UseUrls("http://localhost:5055");
+}
 
 // Configure Serilog
 Log.Logger = new LoggerConfiguration()
@@ -120,6 +141,7 @@ app.MapGet("/", () =>
         endpoints = new
         {
             execute = "POST /action/execute",
+            batch = "POST /action/batch",
             status = "GET /system/status"
         },
         availableActions = new[]
@@ -155,6 +177,48 @@ app.MapPost("/action/execute", async (CommandRequest request, ICommandValidator
     return Results.Ok(result);
 });
 
+// POST /action/batch - Execute an ordered plan in one round trip
+app.MapPost("/action/batch", async (BatchCommandRequest batch, ICommandValidator validator, IActionExecutor executor) =>
+{
+    Log.Information("Received batch of {Count} commands", batch.Commands.Count);
+
+    var results = new List<CommandResponse>();
+    foreach (var request in batch.Commands)
+    {
+        Log.Information("Batch command: {Action} with UUID: {Uuid}", request.Action, request.Uuid);
+
+        CommandResponse result;
+        var validationResult = validator.Validate(request);
+        if (!validationResult.IsValid)
+        {
+            Log.Warning("Command validation failed: {Errors}", string.Join(", ", validationResult.Errors));
+            result = new CommandResponse
+            {
+                Status = "error",
+                Result = null,
+                Error = $"Validation failed: {string.Join(", ", validationResult.Errors)}"
+            };
+        }
+        else
+        {
+            result = await executor.ExecuteAsync(request);
+        }
+
+        results.Add(result);
+        if (batch.StopOnError && result.Status == "error")
+        {
+            break;
+        }
+    }
+
+    return Results.Ok(new CommandResponse
+    {
+        Status = "ok",
+        Result = results,
+        Error = null
+    });
+});
+
 // GET /system/status - Get system status
 app.MapGet("/system/status", () =>
 {
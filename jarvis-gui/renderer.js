@@ -1043,12 +1043,17 @@ function buildPythonEnv(extraEnv = {}) {
 function runTextThroughGpt(text) {
   return new Promise((resolve, reject) => {
     let stdout = '';
+    let pending = '';
     const python = processAPI.spawnPythonScript('text_processor.py', {
-      env: buildPythonEnv({ TEXT_QUERY: text }),
+      env: buildPythonEnv({ TEXT_QUERY: text, JARVIS_EVENT_STREAM: '1' }),
     });
 
     python.onStdout((data) => {
       stdout += data;
+      pending += data;
+      const lines = pending.split('\n');
+      pending = lines.pop();
+      lines.filter(Boolean).forEach(handlePipelineEvent);
     });
 
     python.onStderr((data) => {
@@ -1080,6 +1085,25 @@ function runTextThroughGpt(text) {
   });
 }
 
+// Progressive updates from text_processor.py (JARVIS_EVENT_STREAM=1):
+// one JSON object per line, the final "done" line is resolved by the caller.
+function handlePipelineEvent(line) {
+  let event;
+  try {
+    event = JSON.parse(line);
+  } catch {
+    return;
+  }
+
+  if (event.type === 'commands') {
+    commandBox.textContent = JSON.stringify(event.commands, null, 2);
+  } else if (event.type === 'result') {
+    responseBox.textContent = JSON.stringify(event.response, null, 2);
+  } else if (event.type === 'recovery') {
+    addLog(`Команда ${event.command?.action} не выполнена, пробуем исправить`, 'warning');
+  }
+}
+
 function startPythonAssistant() {
   if (pythonProcess) return;
 
@@ -2,55 +2,51 @@
 """
 Тест захвата окна - введи название приложения и получи скриншот
 """
-import requests
-import base64
+import sys
 import uuid
 from datetime import datetime
+from pathlib import Path
 
-def capture_window(app_name: str, save_path: str = None):
-    """Захватить окно приложения и сохранить скриншот"""
+sys.path.insert(0, str(Path(__file__).resolve().parent / "ai-python"))
 
-    url = "http://localhost:5055/action/execute"
-    payload = {
-        "action": "capture_window",
-        "params": {"application": app_name},
-        "uuid": str(uuid.uuid4()),
-        "timestamp": datetime.utcnow().isoformat() + "Z"
-    }
+from ai_assistant.bridge import HttpBridge  # noqa: E402
+from ai_assistant.schemas import Command  # noqa: E402
 
-    print(f"📸 Захватываю окно: {app_name}...")
+bridge = HttpBridge("http://localhost:5055", timeout=30)
 
-    try:
-        response = requests.post(url, json=payload, timeout=30)
-        data = response.json()
-
-        if data["status"] == "ok":
-            result = data["result"]
-            print(f"✅ Успешно!")
-            print(f"   Заголовок: {result['windowTitle']}")
-            print(f"   Размер: {result['width']}x{result['height']}")
-            print(f"   Процесс: {result['processName']}")
+def capture_window(app_name: str, save_path: str = None):
+    """Захватить окно приложения и сохранить скриншот"""
 
-            # Сохранить изображение
-            if save_path is None:
-                save_path = f"screenshot_{app_name}.png"
+    command = Command(
+        action="capture_window",
+        params={"application": app_name},
+        uuid=str(uuid.uuid4()),
+        timestamp=datetime.utcnow().isoformat() + "Z",
+    )
 
-            image_data = base64.b64decode(result["image"])
-            with open(save_path, "wb") as f:
-                f.write(image_data)
+    print(f"📸 Захватываю окно: {app_name}...")
 
-            print(f"   💾 Сохранено: {save_path}")
-            return True
-        else:
-            print(f"❌ Ошибка: {data['error']}")
-            return False
+    if save_path is None:
+        save_path = f"screenshot_{app_name}.png"
 
-    except requests.exceptions.ConnectionError:
+    # Изображение декодируется из base64 по мере получения ответа и сразу
+    # пишется в файл, не держа весь JSON в памяти.
+    result = bridge.capture(command, save_path)
+    if result is None:
         print("❌ Не удалось подключиться к серверу. Запусти C# Core (dotnet run)")
         return False
-    except Exception as e:
-        print(f"❌ Ошибка: {e}")
-        return False
+
+    if result.ok:
+        metadata = result.metadata
+        print(f"✅ Успешно!")
+        print(f"   Заголовок: {metadata['windowTitle']}")
+        print(f"   Размер: {metadata['width']}x{metadata['height']}")
+        print(f"   Процесс: {metadata['processName']}")
+        print(f"   💾 Сохранено: {result.path} ({result.image_bytes} байт)")
+        return True
+
+    print(f"❌ Ошибка: {result.error}")
+    return False
 
 if __name__ == "__main__":
     print("=" * 50)